@@ -19,4 +19,5 @@ from .monte_carlo_phase_space import *
 from .phase_space_models import *
 from .profile_helpers import *
 from .profile_models import *
-from .velocity_models import *
\ No newline at end of file
+from .velocity_models import *
+from .tabulated_clustering import *
\ No newline at end of file
@@ -6,8 +6,6 @@ and conditional abundance matching (CAM).
 """
 import numpy as np
 
-from scipy.stats import pearsonr
-from scipy.optimize import minimize_scalar
 from astropy.extern import six
 from abc import ABCMeta, abstractmethod, abstractproperty
 
@@ -27,6 +25,70 @@ from functools import partial
 
 __all__ = ['ConditionalAbunMatch']
 
+def _rank_correlation_of_noise_level(noise_level):
+    """ Spearman rank-order correlation coefficient between :math:`u` and 
+    :math:`u + r s`, where :math:`u` and :math:`s` are independent uniform randoms 
+    and :math:`r` is the input ``noise_level``. 
+
+    This is the correlation strength that `ConditionalAbunMatch` attains 
+    between ``sec_haloprop_key`` and ``galprop_key`` when galaxies are 
+    rank-ordered by :math:`u + r s`. The integral defining the coefficient 
+    is piecewise polynomial in :math:`r`. 
+    """
+    r = np.asarray(noise_level, dtype=float)
+    low = np.minimum(r, 1.)
+    high = np.maximum(r, 1.)
+    return np.where(r <= 1, 1. - low**2/2. + low**3/5., 1./high - 3./(10.*high**2))
+
+# Calibration curve used to map a desired correlation strength onto a noise level. 
+# The curve is tabulated once, when the module is imported. 
+_noise_level_calibration_abcissa = np.logspace(-4, 6, 2001)
+_noise_level_calibration_ordinates = _rank_correlation_of_noise_level(
+    _noise_level_calibration_abcissa)
+
+def _noise_weights(correlation_strength):
+    """ Weights :math:`a, b` such that ranking galaxies by :math:`a u + b s` 
+    results in the input Spearman ``correlation_strength``. 
+
+    Parameters 
+    ----------
+    correlation_strength : array_like 
+        Desired correlation strength. Only the absolute value is used. 
+
+    Returns 
+    -------
+    signal_weight, noise_weight : array_like 
+        Arrays of the same length as ``correlation_strength``. 
+    """
+    target = np.abs(np.atleast_1d(correlation_strength)).astype(float)
+
+    # np.interp requires increasing abcissa values 
+    lognoise = np.interp(target, _noise_level_calibration_ordinates[::-1], 
+        np.log10(_noise_level_calibration_abcissa[::-1]))
+    noise_level = 10.**lognoise
+
+    noise_level[target >= _noise_level_calibration_ordinates[0]] = 0.
+    signal_weight = 1./(1. + noise_level)
+    noise_weight = noise_level/(1. + noise_level)
+
+    # Vanishing correlation strength: rank-order by the noise alone 
+    uncorrelated = target <= _noise_level_calibration_ordinates[-1]
+    signal_weight[uncorrelated] = 0.
+    noise_weight[uncorrelated] = 1.
+
+    return signal_weight, noise_weight
+
+def _argsort_within_bins(values, bins):
+    """ Indices that sort the input ``values`` first by ``bins``, 
+    and then by ``values`` within each bin. 
+
+    Equivalent to ``np.lexsort((values, bins))``, but faster: 
+    the floats are sorted once with quicksort, 
+    and the integer bins are then sorted with a stable sort. 
+    """
+    idx_sorted = np.argsort(values)
+    return idx_sorted[np.argsort(bins[idx_sorted], kind='mergesort')]
+
 class AbunMatchSmHm(PrimGalpropModel):
     """ Stellar-to-halo-mass relation based on traditional abundance matching. 
     """
@@ -140,8 +202,9 @@ class ConditionalAbunMatch(model_helpers.GalPropModel):
             between the abcissa are solved for by spline interpolation. 
 
         tol : float, optional  
-            Tolerance for the difference between the actual and desired 
-            correlation strength. Default is 0.01. 
+            Retained for backwards compatibility. The noise level 
+            implementing the desired correlation strength is now read off 
+            an exact calibration curve, and so no tolerance is required. 
 
         minimum_sampling_requirement : int, optional  
             Minimum number of galaxies in the ``prim_galprop_key`` bin required to 
@@ -311,82 +374,60 @@ class ConditionalAbunMatch(model_helpers.GalPropModel):
         self.add_new_haloprops(galaxy_table)
 
         # All at once, draw all the randoms we will need
-        np.random.seed(seed=seed)
-        all_randoms = np.random.random(len(galaxy_table)*2)
+        rng = model_helpers.random_stream(seed)
+        all_randoms = rng.random_sample(len(galaxy_table)*2)
         galprop_cumprob = all_randoms[0:len(galaxy_table)]
         galprop_scatter = all_randoms[len(galaxy_table):]
 
         # Initialize the output array
         output_galprop = np.zeros(len(galaxy_table))
 
-        # Determine binning and loop range
+        # Determine the prim_galprop bin of every galaxy
         if 'galaxy_table_slice_array' not in kwargs.keys():
             binned_prim_galprop = np.digitize(
                 galaxy_table[self.prim_galprop_key], 
                 self.prim_galprop_bins)
-            prim_galprop_loop_range = set(binned_prim_galprop)
         else:
-            prim_galprop_loop_range = range(len(self.one_point_lookup_table))
-
-        for i in prim_galprop_loop_range:
-
-            # Determine the slice corresponding to the i^th prim_galprop bin
-            if 'galaxy_table_slice_array' not in kwargs.keys():
-                idx_bini = np.where(binned_prim_galprop==i)[0]
-                num_bini = len(idx_bini)
-            else:
-                idx_bini = kwargs['galaxy_table_slice_array'][i]
-                num_bini = len(galaxy_table[idx_bini])
-
-            if len(idx_bini) > 0:
-                # Fetch the appropriate number of randoms
-                # for the i^th prim_galprop bin
-                galprop_cumprob_bini = galprop_cumprob[idx_bini]
-                galprop_scatter_bini = galprop_scatter[idx_bini]
-
-                # Fetch the halo_table in the i^th prim_galprop bin, 
-                # and determine how they are sorted
-                haloprop_bini = galaxy_table[idx_bini][self.sec_haloprop_key]
-                idx_sorted_haloprop_bini = np.argsort(haloprop_bini)
-
-                galprop_bini = self._condition_matched_galprop(
-                    haloprop_bini[idx_sorted_haloprop_bini], 
-                    galprop_cumprob_bini, i, galprop_scatter_bini, self.tol)
+            binned_prim_galprop = np.zeros(len(galaxy_table), dtype=int) - 1
+            for i, idx_bini in enumerate(kwargs['galaxy_table_slice_array']):
+                binned_prim_galprop[idx_bini] = i
+        idx_binned = np.where(binned_prim_galprop >= 0)[0]
+        binned_prim_galprop = binned_prim_galprop[idx_binned]
+        galprop_cumprob = galprop_cumprob[idx_binned]
+        galprop_scatter = galprop_scatter[idx_binned]
+
+        # Scatter the randoms by the noise level required for the 
+        # correlation strength of each bin. Anti-correlations are implemented 
+        # by rank-ordering the halos by the negative of sec_haloprop
+        signal_weight, noise_weight = _noise_weights(self.correlation_strength)
+        scattered_cumprob = (signal_weight[binned_prim_galprop]*galprop_cumprob + 
+            noise_weight[binned_prim_galprop]*galprop_scatter)
+        sign = np.where(self.correlation_strength < 0, -1., 1.)
+        haloprop = (np.asarray(galaxy_table[self.sec_haloprop_key])[idx_binned]*
+            sign[binned_prim_galprop])
+
+        # Sort all galaxies at once by (bin, sec_haloprop) and by (bin, scattered randoms). 
+        # Within each bin, the galaxy with the n^th smallest sec_haloprop is assigned 
+        # the galprop of the n^th smallest scattered random. 
+        idx_sorted_haloprop = _argsort_within_bins(haloprop, binned_prim_galprop)
+        idx_sorted_scatter = _argsort_within_bins(scattered_cumprob, binned_prim_galprop)
+        sorted_cumprob = galprop_cumprob[idx_sorted_scatter]
+
+        sorted_bins = binned_prim_galprop[idx_sorted_haloprop]
+        bin_edges = np.searchsorted(sorted_bins, 
+            np.arange(len(self.one_point_lookup_table)+1))
+
+        galprop = np.zeros(len(idx_binned))
+        for i in range(len(self.one_point_lookup_table)):
+            first, last = bin_edges[i], bin_edges[i+1]
+            if last > first:
+                galprop[first:last] = self.one_point_lookup_table[i](
+                    sorted_cumprob[first:last])
 
-                # Assign the final values to the 
-                # appropriately sorted subarray of output_galprop
-                output_galprop[idx_bini[idx_sorted_haloprop_bini]] = galprop_bini
+        output_galprop[idx_binned[idx_sorted_haloprop]] = galprop
 
         return output_galprop
 
-    def _condition_matched_galprop(self, sorted_haloprop, galprop_cumprob, 
-        ibin, randoms, tol):
-
-        def compute_pearson_difference(r):
-            new_randoms = galprop_cumprob + r*randoms
-            idx_sorted = np.argsort(new_randoms)
-            galprop = (
-                self.one_point_lookup_table[ibin](galprop_cumprob[idx_sorted]))
-            return abs(pearsonr(galprop, sorted_haloprop)[0]-abs(self.correlation_strength[ibin]))
-
-        if hasattr(self, 'correlation_strength'):
-            result = minimize_scalar(compute_pearson_difference, tol=tol)
-            new_randoms = galprop_cumprob + result.x*randoms
-            idx_sorted = np.argsort(new_randoms)
-            galprop = (
-                self.one_point_lookup_table[ibin](galprop_cumprob[idx_sorted]))
-        else:
-            # Zero scatter case
-            idx_sorted = np.argsort(galprop_cumprob)
-            galprop = (
-                self.one_point_lookup_table[ibin](galprop_cumprob[idx_sorted]))
-
-        if self.correlation_strength[ibin] < 0:
-            return galprop[::-1]
-        else:
-            return galprop
-
-
     def build_one_point_lookup_table(self, **kwargs):
         """
         Method computes lookup tables of the cumulative ``galprop`` PDF 
@@ -250,12 +250,11 @@ class HeavisideAssembias(object):
             return result
 
         elif self._loginterp is True:
-            spline_function = model_helpers.custom_spline(
+            spline_function = model_helpers.cached_interpolant(self, 'percentile_splitting', 
                 np.log10(self._split_abcissa), self._split_ordinates)
             result = spline_function(np.log10(prim_haloprop))
         else:
-            model_abcissa = self._split_abcissa
-            spline_function = model_helpers.custom_spline(
+            spline_function = model_helpers.cached_interpolant(self, 'percentile_splitting', 
                 self._split_abcissa, self._split_ordinates)
             result = spline_function(prim_haloprop)
 
@@ -289,7 +288,8 @@ class HeavisideAssembias(object):
 
         model_ordinates = (self.param_dict[self._get_assembias_param_dict_key(ipar)] 
             for ipar in range(len(self._assembias_strength_abcissa)))
-        spline_function = model_helpers.custom_spline(
+        # The spline is only rebuilt when the assembias parameters have changed
+        spline_function = model_helpers.cached_interpolant(self, 'assembias_strength', 
             self._assembias_strength_abcissa, list(model_ordinates))
 
         if self._loginterp is True:
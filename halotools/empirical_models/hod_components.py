@@ -15,7 +15,6 @@ from copy import copy
 import numpy as np
 import math
 from scipy.special import erf 
-from scipy.stats import poisson
 from scipy.optimize import brentq
 from scipy.interpolate import InterpolatedUnivariateSpline as spline
 
@@ -111,12 +110,21 @@ class OccupationComponent(object):
             Random number seed used to generate the Monte Carlo realization. 
             Default is None. 
 
+        first_occupation_moment : array, optional 
+            Pre-computed output of `mean_occupation` for the input halos. 
+            If passed, `mean_occupation` is not called. This allows the 
+            `~halotools.empirical_models.HodMockFactory` to re-use the mean occupations 
+            of the halos when repopulating a mock with unchanged parameters. 
+
         Returns
         -------
         mc_abundance : array
             Integer array giving the number of galaxies in each of the input halo_table.     
         """ 
-        first_occupation_moment = self.mean_occupation(**kwargs)
+        if 'first_occupation_moment' in kwargs:
+            first_occupation_moment = kwargs.pop('first_occupation_moment')
+        else:
+            first_occupation_moment = self.mean_occupation(**kwargs)
         if self._upper_bound == 1:
             return self._nearest_integer_distribution(first_occupation_moment, seed=seed, **kwargs)
         elif self._upper_bound == float("inf"):
@@ -143,8 +151,8 @@ class OccupationComponent(object):
         mc_abundance : array
             Integer array giving the number of galaxies in each of the input halo_table. 
         """
-        np.random.seed(seed=seed)
-        mc_generator = np.random.random(custom_len(first_occupation_moment))
+        rng = model_helpers.random_stream(seed)
+        mc_generator = rng.random_sample(custom_len(first_occupation_moment))
 
         result = np.where(mc_generator < first_occupation_moment, 1, 0)
         if 'halo_table' in kwargs:
@@ -169,13 +177,13 @@ class OccupationComponent(object):
         mc_abundance : array
             Integer array giving the number of galaxies in each of the input halo_table. 
         """
-        np.random.seed(seed=seed)
-        # The scipy built-in Poisson number generator raises an exception 
-        # if its input is zero, so here we impose a simple workaround
+        rng = model_helpers.random_stream(seed)
+        # The Poisson number generator raises an exception 
+        # if its input is negative, so here we impose a simple workaround
         first_occupation_moment = np.where(first_occupation_moment <=0, 
             model_defaults.default_tiny_poisson_fluctuation, first_occupation_moment)
 
-        result = poisson.rvs(first_occupation_moment)
+        result = rng.poisson(first_occupation_moment)
         if 'halo_table' in kwargs:
             kwargs['halo_table']['halo_num_'+self.gal_type] = result
         return result
@@ -658,14 +666,15 @@ class Zheng07Sats(OccupationComponent):
         # Call to np.where raises a harmless RuntimeWarning exception if 
         # there are entries of input logM for which mean_nsat = 0
         # Evaluating mean_nsat using the catch_warnings context manager 
-        # suppresses this warning
-        mean_nsat = np.zeros_like(mass)
-
-        idx_nonzero = np.where(mass - M0 > 0)[0]
+        # suppresses this warning. 
+        # Written with np.where so that M0, M1 and alpha may also be 
+        # column arrays of parameter values, in which case mean_nsat 
+        # is a 2-d array with one row per set of parameters. 
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", RuntimeWarning)
 
-            mean_nsat[idx_nonzero] = ((mass[idx_nonzero] - M0)/M1)**self.param_dict['alpha']
+            mean_nsat = np.where(mass > M0, 
+                ((mass - M0)/M1)**self.param_dict['alpha'], 0.)
 
         # If a central occupation model was passed to the constructor, 
         # multiply mean_nsat by an overall factor of mean_ncen
@@ -9,7 +9,8 @@ Currently only composite HOD models are supported.
 """
 
 import numpy as np
-from multiprocessing import cpu_count
+from numbers import Integral
+from multiprocessing import cpu_count, Pool
 from copy import copy 
 
 from astropy.extern import six
@@ -18,7 +19,9 @@ from abc import ABCMeta, abstractmethod, abstractproperty
 from astropy.table import Table 
 
 from . import model_helpers, model_defaults
-from .mock_helpers import three_dim_pos_bundle, infer_mask_from_kwargs
+from .mock_helpers import three_dim_pos_bundle, infer_mask_from_kwargs, GalaxyColumns
+from .mock_helpers import split_halo_indices, concatenate_galaxy_columns
+from .mock_helpers import write_galaxy_table, StoredMock
 
 from ..custom_exceptions import *
 
@@ -96,6 +99,25 @@ class MockFactory(object):
 
         self.galaxy_table = Table() 
 
+    @property 
+    def galaxy_table(self):
+        """ `~astropy.table.Table` storing the mock galaxy population. 
+
+        During population, the galaxy properties are stored in a 
+        `~halotools.empirical_models.mock_helpers.GalaxyColumns` instance, 
+        one numpy array per column. The `~astropy.table.Table` 
+        is only created the first time ``galaxy_table`` is accessed 
+        after the mock has been populated, and shares memory with these arrays. 
+        """
+        if self._galaxy_table is None:
+            self._galaxy_table = self._galaxy_columns.to_table()
+        return self._galaxy_table
+
+    @galaxy_table.setter
+    def galaxy_table(self, table):
+        self._galaxy_table = table
+        self._galaxy_columns = None
+
     @abstractmethod
     def populate(self, **kwargs):
         """ Method populating halos with mock galaxies. 
@@ -106,6 +128,77 @@ class MockFactory(object):
         raise NotImplementedError("All subclasses of MockFactory"
         " must include a populate method")
 
+    def save(self, fname, overwrite = False, chunk_size = 65536, compression = 'gzip'):
+        """ Store the ``galaxy_table`` in an hdf5 file, one chunked and compressed 
+        dataset per column, together with the ``param_dict`` of the model 
+        and the ``simname``, ``halo_finder``, ``redshift`` and ``Lbox`` of the snapshot. 
+        If the mock was populated with a ``seed``, the seed is also stored. 
+
+        Parameters 
+        ----------
+        fname : string 
+            Name of the output hdf5 file. 
+
+        overwrite : bool, optional 
+            If False (the default), an existing file ``fname`` raises an exception. 
+
+        chunk_size : int, optional 
+            Number of rows of each hdf5 chunk. Default is 65536. 
+
+        compression : string, optional 
+            Compression filter of the hdf5 datasets, or None for no compression. 
+            Default is ``gzip``. 
+
+        Examples 
+        --------
+        >>> model.mock.save('mock.hdf5') # doctest: +SKIP
+        >>> stored_mock = MockFactory.load('mock.hdf5') # doctest: +SKIP
+
+        Notes 
+        -----
+        See `~halotools.empirical_models.mock_helpers.write_galaxy_table`. 
+        """
+        metadata = {}
+        for attr in ('simname', 'halo_finder', 'redshift', 'Lbox'):
+            metadata[attr] = getattr(self.snapshot, attr, None)
+        metadata['seed'] = getattr(self, 'seed', None)
+        metadata['mock_factory'] = self.__class__.__name__
+
+        if self._galaxy_columns is not None:
+            table = self._galaxy_columns
+        else:
+            table = self.galaxy_table
+
+        write_galaxy_table(fname, table, metadata = metadata, 
+            param_dict = getattr(self.model, 'param_dict', None), 
+            overwrite = overwrite, chunk_size = chunk_size, compression = compression)
+
+    @staticmethod
+    def load(fname):
+        """ Open a mock stored by `save`. 
+
+        Only the metadata is read when the file is opened; 
+        each column of the galaxy table is read from disk when it is accessed. 
+
+        Parameters 
+        ----------
+        fname : string 
+            Name of the hdf5 file. 
+
+        Returns 
+        -------
+        stored_mock : `~halotools.empirical_models.mock_helpers.StoredMock` 
+            Object providing access to the columns of the stored galaxy table 
+            and to the ``param_dict``, ``simname``, ``redshift`` and ``seed`` of the mock. 
+
+        Examples 
+        --------
+        >>> stored_mock = MockFactory.load('mock.hdf5') # doctest: +SKIP
+        >>> mask = stored_mock['gal_type'] == 'centrals' # doctest: +SKIP
+        >>> centrals = stored_mock.read(keys = ['x', 'y', 'z'], rows = mask) # doctest: +SKIP
+        """
+        return StoredMock(fname)
+
     def _build_additional_haloprops_list(self, **kwargs):
 
         # Create a list of halo properties that will be inherited by the mock galaxies
@@ -258,7 +351,8 @@ class MockFactory(object):
             return rbin_centers, xi11, xi12, xi22 
 
 
-    def compute_galaxy_matter_cross_clustering(self, include_complement = False, N_threads=1, **kwargs):
+    def compute_galaxy_matter_cross_clustering(self, include_complement = False, N_threads=1, 
+        ptcl_seed = None, **kwargs):
         """
         Built-in method for all mock catalogs to compute the galaxy-matter cross-correlation function. 
 
@@ -289,6 +383,13 @@ class MockFactory(object):
         N_threads : int, optional
             number of threads to use in calculation. Default is 1 thread for a serial calculation. 
 
+        ptcl_seed : int, optional 
+            Random number seed used to select the downsampling of dark matter particles. 
+            The downsampling is computed once for each ``ptcl_seed`` and stored by the mock, 
+            so that repeated calls, including calls after the mock is re-populated, 
+            use the same particles. Default is None, in which case a new 
+            downsampling is chosen at random in each call. 
+
         Returns 
         --------
         rbin_centers : array 
@@ -339,6 +440,9 @@ class MockFactory(object):
         around the `~halotools.mock_observables.clustering.tpcf` function. If you wish for greater 
         control over how your galaxy clustering signal is estimated, 
         see the `~halotools.mock_observables.clustering.tpcf` documentation. 
+        To evaluate the galaxy-matter cross-correlation or galaxy-galaxy lensing signal 
+        of many HOD parameter sets without populating a mock for each, 
+        see `~halotools.empirical_models.TabulatedHodClustering`. 
         """
         if HAS_MOCKOBS is False:
             msg = ("\nThe compute_galaxy_matter_cross_clustering method is only available "
@@ -348,11 +452,7 @@ class MockFactory(object):
                 )
             raise HalotoolsError(msg)
 
-        nptcl = np.max([model_defaults.default_nptcls, len(self.galaxy_table)])
-        ptcl_table = randomly_downsample_data(self.snapshot.ptcl_table, nptcl)
-        ptcl_pos = three_dim_pos_bundle(table = ptcl_table, 
-            key1='x', key2='y', key3='z')
-
+        ptcl_pos = self._particle_subsample(len(self.galaxy_table), ptcl_seed)
 
         if 'rbins' in kwargs:
             rbins = kwargs['rbins']
@@ -391,6 +491,41 @@ class MockFactory(object):
             return rbin_centers, clustering, clustering2 
 
 
+    def _particle_subsample(self, num_gals, ptcl_seed):
+        """ Positions of the random downsampling of ``snapshot.ptcl_table`` 
+        used to compute the galaxy-matter cross-correlation of ``num_gals`` galaxies. 
+
+        The number of particles is at least ``model_defaults.default_nptcls``, 
+        and is doubled until it exceeds ``num_gals``, so that the many realizations 
+        of a model, whose galaxy numbers differ only slightly, share the same downsampling. 
+        If ``ptcl_seed`` is not None, each downsampling is computed only once and cached, 
+        keyed by the number of particles and ``ptcl_seed``. 
+        """
+        try:
+            cache = self._ptcl_subsample_cache
+        except AttributeError:
+            cache = {}
+            self._ptcl_subsample_cache = cache
+
+        nptcl = int(model_defaults.default_nptcls)
+        while nptcl < num_gals:
+            nptcl *= 2
+
+        key = (nptcl, ptcl_seed)
+        if key in cache:
+            return cache[key]
+
+        ptcl_table = self.snapshot.ptcl_table
+        nptcl = min(nptcl, len(ptcl_table))
+        ptcl_table = randomly_downsample_data(ptcl_table, nptcl, seed=ptcl_seed)
+        ptcl_pos = three_dim_pos_bundle(table = ptcl_table, 
+            key1='x', key2='y', key3='z')
+        ptcl_pos = np.ascontiguousarray(ptcl_pos, dtype=np.float64)
+        # Without a seed, each call draws a new random downsampling
+        if ptcl_seed is not None:
+            cache[key] = ptcl_pos
+        return ptcl_pos
+
     def compute_fof_group_ids(self, zspace = True, N_threads=1,
         b_perp = model_defaults.default_b_perp, 
         b_para = model_defaults.default_b_para, **kwargs):
@@ -458,7 +593,7 @@ class MockFactory(object):
         """ Fraction of mock galaxies that are satellites. 
         """
         satmask = self.galaxy_table['gal_type'] != 'centrals'
-        return len(self.galaxy_table[satmask]) / float(len(self.galaxy_table))
+        return np.count_nonzero(satmask) / float(len(self.galaxy_table))
 
 class HodMockFactory(MockFactory):
     """ Class responsible for populating a simulation with a 
@@ -558,10 +693,73 @@ class HodMockFactory(MockFactory):
 
         self.model.build_lookup_tables(**kwargs)
 
+        # The halo-level outputs cached by allocate_memory refer to the previous halo_table
+        self._halo_level_param_cache = {}
+        self._mean_occupation = {}
+
     def populate(self, **kwargs):
         """ Method populating halos with mock galaxies. 
+
+        Methods of the model that act on the ``halo_table``, such as the 
+        computation of the mean occupation of each halo, are only called again 
+        when the values of the ``param_dict`` keys they depend on have changed 
+        since the previous call to `populate`. So when repopulating the mock 
+        during a likelihood analysis, only the stages of mock generation 
+        affected by the change in ``param_dict`` are re-computed. 
+
+        Parameters 
+        ----------
+        occupations : dict, optional 
+            Keys are the ``gal_types`` of the model, values are integer arrays 
+            storing the number of galaxies of that type in each halo of the ``halo_table``. 
+            If passed, these occupations are used instead of calling 
+            the ``mc_occupation`` methods of the model, e.g., when populating 
+            the occupations drawn by 
+            `~halotools.empirical_models.HodModelFactory.mc_occupation_batch`. 
+
+        seed : int, optional 
+            Random number seed used to generate the Monte Carlo realization. 
+            Default is None. 
+
+        N_threads : int, optional 
+            Number of processes used to populate the mock. Default is 1. 
+            A string 'max' may be used to indicate that all available cores 
+            on the machine should be used. 
+
+        num_chunks : int, optional 
+            Number of chunks the ``halo_table`` is split into when populating in parallel. 
+            Each chunk is populated independently, with its own random number seed 
+            derived from ``seed``, so that for a fixed ``seed`` and ``num_chunks`` the 
+            mock is identical regardless of ``N_threads``. Default is ``N_threads``. 
+            Component models that rank galaxies against each other, such as 
+            `~halotools.empirical_models.ConditionalAbunMatch`, only rank 
+            the galaxies within the same chunk. 
+
+        chunk_by : string, optional 
+            Either ``index`` or ``slab``, see 
+            `~halotools.empirical_models.mock_helpers.split_halo_indices`. 
+            Default is ``index``. 
         """
-        self.allocate_memory()
+        N_threads = kwargs.get('N_threads', 1)
+        num_chunks = kwargs.get('num_chunks', None)
+        seed = kwargs.get('seed', None)
+        self.seed = seed
+        if (N_threads != 1) or (num_chunks is not None):
+            return self._populate_parallel(N_threads = N_threads, num_chunks = num_chunks, 
+                seed = seed, chunk_by = kwargs.get('chunk_by', 'index'), 
+                occupations = kwargs.get('occupations', None))
+
+        # When a seed is passed, each Monte Carlo stage of mock generation 
+        # draws from its own stream of the seed, see model_helpers.random_stream
+        if seed is not None:
+            occupation_seeds = {gal_type: model_helpers.stream_seed(seed, 'mc_occupation', gal_type) 
+                for gal_type in self.gal_types}
+        else:
+            occupation_seeds = None
+
+        self.allocate_memory(occupations = kwargs.get('occupations', None), 
+            occupation_seeds = occupation_seeds)
+        galaxy_columns = self._galaxy_columns
 
         # Loop over all gal_types in the model 
         for gal_type in self.gal_types:
@@ -572,40 +770,46 @@ class HodMockFactory(MockFactory):
             # gal_type_slice is a slice object
 
             # For the gal_type_slice indices of 
-            # the pre-allocated array self.gal_type, 
-            # set each string-type entry equal to the gal_type string
-            self.galaxy_table['gal_type'][gal_type_slice] = (
-                np.repeat(gal_type, self._total_abundance[gal_type],axis=0))
+            # the pre-allocated categorical array self.gal_type, 
+            # set each entry equal to the integer code of the gal_type string
+            galaxy_columns['gal_type'][gal_type_slice] = (
+                galaxy_columns['gal_type'].category_code(gal_type))
 
             # Store all other relevant host halo properties into their 
             # appropriate pre-allocated array 
             for halocatkey in self.additional_haloprops:
-                self.galaxy_table[halocatkey][gal_type_slice] = np.repeat(
-                    self.halo_table[halocatkey], self._occupation[gal_type], axis=0)
+                galaxy_columns[halocatkey][gal_type_slice] = np.repeat(
+                    np.asarray(self.halo_table[halocatkey]), self._occupation[gal_type], axis=0)
 
-        self.galaxy_table['x'] = self.galaxy_table['halo_x']
-        self.galaxy_table['y'] = self.galaxy_table['halo_y']
-        self.galaxy_table['z'] = self.galaxy_table['halo_z']
+        galaxy_columns['x'] = galaxy_columns['halo_x']
+        galaxy_columns['y'] = galaxy_columns['halo_y']
+        galaxy_columns['z'] = galaxy_columns['halo_z']
 
+        # Each method is passed a GalaxyColumns view of the gal_type slice, 
+        # so that the component models write directly into the pre-allocated arrays
         for method in self._remaining_methods_to_call:
             func = getattr(self.model, method)
             gal_type_slice = self._gal_type_indices[func.gal_type]
-            func(halo_table = self.galaxy_table[gal_type_slice])
+            if seed is None:
+                func(halo_table = galaxy_columns[gal_type_slice])
+            else:
+                func(halo_table = galaxy_columns[gal_type_slice], 
+                    seed = model_helpers.stream_seed(seed, method))
                 
         # Positions are now assigned to all populations. 
         # Now enforce the periodic boundary conditions for all populations at once
-        self.galaxy_table['x'] = model_helpers.enforce_periodicity_of_box(
-            self.galaxy_table['x'], self.snapshot.Lbox)
-        self.galaxy_table['y'] = model_helpers.enforce_periodicity_of_box(
-            self.galaxy_table['y'], self.snapshot.Lbox)
-        self.galaxy_table['z'] = model_helpers.enforce_periodicity_of_box(
-            self.galaxy_table['z'], self.snapshot.Lbox)
+        galaxy_columns['x'] = model_helpers.enforce_periodicity_of_box(
+            galaxy_columns['x'], self.snapshot.Lbox)
+        galaxy_columns['y'] = model_helpers.enforce_periodicity_of_box(
+            galaxy_columns['y'], self.snapshot.Lbox)
+        galaxy_columns['z'] = model_helpers.enforce_periodicity_of_box(
+            galaxy_columns['z'], self.snapshot.Lbox)
 
         if hasattr(self.model, 'galaxy_selection_func'):
-            mask = self.model.galaxy_selection_func(self.galaxy_table)
-            self.galaxy_table = self.galaxy_table[mask]
+            mask = self.model.galaxy_selection_func(galaxy_columns)
+            self._galaxy_columns = galaxy_columns[mask]
 
-    def allocate_memory(self):
+    def allocate_memory(self, occupations=None, occupation_seeds=None):
         """ Method allocates the memory for all the numpy arrays 
         that will store the information about the mock. 
         These arrays are bound directly to the mock object. 
@@ -613,9 +817,15 @@ class HodMockFactory(MockFactory):
         The main bookkeeping devices generated by this method are 
         ``_occupation`` and ``_gal_type_indices``. 
 
-        """
+        Parameters 
+        ----------
+        occupations : dict, optional 
+            Pre-computed number of galaxies of each gal_type in each halo. 
+            If passed, the ``mc_occupation`` methods of the model are not called. 
 
-        self.galaxy_table = Table() 
+        occupation_seeds : dict, optional 
+            Random number seed passed to the ``mc_occupation`` method of each gal_type. 
+        """
 
         # We will keep track of the calling sequence with a list called _remaining_methods_to_call
         # Each time a function in this list is called, we will remove that function from the list
@@ -625,13 +835,20 @@ class HodMockFactory(MockFactory):
         # Call all composite model methods that should be called prior to mc_occupation 
         # All such function calls must be applied to the halo_table, since we do not yet know 
         # how much memory we need for the mock galaxy_table
+        # A halo-level function is only called again if the values of the param_dict keys 
+        # it depends on have changed since the last call, or if a function upstream 
+        # of it was called again, since the halo_table columns it created are unchanged. 
         galprops_assigned_to_halo_table = []
+        upstream_changed = False
         for func_name in self.model._mock_generation_calling_sequence:
             if 'mc_occupation' in func_name:
                 break
             else:
                 func = getattr(self.model, func_name)
-                func(halo_table = self.halo_table)
+                if (upstream_changed is True) or (self._halo_level_func_is_stale(func_name, func)):
+                    func(halo_table = self.halo_table)
+                    self._update_halo_level_param_cache(func_name, func)
+                    upstream_changed = True
                 galprops_assigned_to_halo_table_by_func = func._galprop_dtypes_to_allocate.names
                 galprops_assigned_to_halo_table.extend(galprops_assigned_to_halo_table_by_func)
                 self._remaining_methods_to_call.remove(func_name)
@@ -654,9 +871,37 @@ class HodMockFactory(MockFactory):
         for gal_type in self.gal_types:
             occupation_func_name = 'mc_occupation_'+gal_type
             occupation_func = getattr(self.model, occupation_func_name)
-            # Call the component model to get a Monte Carlo
-            # realization of the abundance of gal_type galaxies
-            self._occupation[gal_type] = occupation_func(halo_table=self.halo_table)
+            if occupation_seeds is not None:
+                seed_kwargs = {'seed': occupation_seeds[gal_type]}
+            else:
+                seed_kwargs = {}
+
+            # The mean occupation of the halos is only re-computed 
+            # if the parameters it depends on have changed
+            mean_occupation_func_name = 'mean_occupation_'+gal_type
+            if (occupations is not None) and (gal_type in occupations):
+                occupation = np.asarray(occupations[gal_type]).astype(int)
+                if len(occupation) != len(self.halo_table):
+                    raise HalotoolsError("Input occupations of %s must have one entry "
+                        "per halo of the halo_table" % gal_type)
+                self.halo_table['halo_num_'+gal_type] = occupation
+                self._occupation[gal_type] = occupation
+            elif hasattr(self.model, mean_occupation_func_name):
+                mean_occupation_func = getattr(self.model, mean_occupation_func_name)
+                if ((upstream_changed is True) or 
+                    (gal_type not in self._mean_occupation) or 
+                    (self._halo_level_func_is_stale(mean_occupation_func_name, mean_occupation_func))):
+                    self._mean_occupation[gal_type] = mean_occupation_func(halo_table=self.halo_table)
+                    self._update_halo_level_param_cache(mean_occupation_func_name, mean_occupation_func)
+                # Call the component model to get a Monte Carlo
+                # realization of the abundance of gal_type galaxies
+                self._occupation[gal_type] = occupation_func(halo_table=self.halo_table, 
+                    first_occupation_moment=self._mean_occupation[gal_type], **seed_kwargs)
+            else:
+                # Call the component model to get a Monte Carlo
+                # realization of the abundance of gal_type galaxies
+                self._occupation[gal_type] = occupation_func(halo_table=self.halo_table, 
+                    **seed_kwargs)
 
             # Now use the above result to set up the indexing scheme
             self._total_abundance[gal_type] = (
@@ -675,23 +920,173 @@ class HodMockFactory(MockFactory):
             
         self.Ngals = np.sum(self._total_abundance.values())
 
+        # The galaxy properties are stored in one contiguous array per column. 
+        # The galaxy_table is only built from these arrays when it is requested. 
+        self._galaxy_columns = GalaxyColumns(self.Ngals)
+        self._galaxy_table = None
+
         # Allocate memory for all additional halo properties, 
         # including profile parameters of the halos such as 'conc_NFWmodel'
         for halocatkey in self.additional_haloprops:
-            self.galaxy_table[halocatkey] = np.zeros(self.Ngals, 
-                dtype = self.halo_table[halocatkey].dtype)
+            self._galaxy_columns.allocate(halocatkey, self.halo_table[halocatkey].dtype)
 
         # Separately allocate memory for the galaxy profile parameters
         for galcatkey in self.model.prof_param_keys:
-            self.galaxy_table[galcatkey] = 0.
+            self._galaxy_columns.allocate(galcatkey, float)
 
-        self.galaxy_table['gal_type'] = np.zeros(self.Ngals, dtype=object)
+        self._galaxy_columns.allocate_categorical('gal_type', self.gal_types)
 
         dt = self.model._galprop_dtypes_to_allocate
         for key in dt.names:
-            self.galaxy_table[key] = np.zeros(self.Ngals, dtype = dt[key].type)
+            self._galaxy_columns.allocate(key, dt[key].type)
+
+    def _halo_level_param_values(self, func):
+        """ Return a dictionary of the current values of the ``param_dict`` keys 
+        that the behavior of ``func`` depends on, or None if this dependence is unknown. 
+        """
+        try:
+            param_keys = func._param_dict_keys
+        except AttributeError:
+            return None
+        return {key: copy(self.model.param_dict[key]) 
+            for key in param_keys if key in self.model.param_dict}
+
+    def _halo_level_func_is_stale(self, func_name, func):
+        """ Determine whether the halo-level function ``func_name`` needs to be called again, 
+        i.e., whether any of the ``param_dict`` values it depends on have changed 
+        since it was last called. Functions whose parameter dependence is unknown 
+        are always stale. 
+        """
+        current_values = self._halo_level_param_values(func)
+        if (current_values is None) or (func_name not in self._halo_level_param_cache):
+            return True
+
+        cached_values = self._halo_level_param_cache[func_name]
+        if set(current_values.keys()) != set(cached_values.keys()):
+            return True
+        for key, value in current_values.items():
+            if not np.array_equal(value, cached_values[key]):
+                return True
+        return False
+
+    def _update_halo_level_param_cache(self, func_name, func):
+        """ Store the ``param_dict`` values used in the most recent call to ``func_name``. 
+        """
+        current_values = self._halo_level_param_values(func)
+        if current_values is None:
+            self._halo_level_param_cache.pop(func_name, None)
+        else:
+            self._halo_level_param_cache[func_name] = current_values
+
+    def _populate_parallel(self, N_threads=1, num_chunks=None, seed=None, chunk_by='index', 
+        occupations=None):
+        """ Populate the mock by splitting the ``halo_table`` into chunks 
+        and populating each chunk in a separate process. 
+        See `populate` for a description of the arguments. 
+
+        The galaxies of the chunks are merged so that, as in the serial case, 
+        galaxies of the same gal_type are stored contiguously. 
+
+        Each chunk is populated by a separate call to `populate`, so component models 
+        that rank galaxies against the rest of the mock, such as the conditional 
+        abundance matching of `~halotools.empirical_models.ConditionalAbunMatch`, 
+        rank the galaxies of each chunk separately. For such models, 
+        the mock only reproduces the serial result in the limit of large chunks. 
+        """
+        global _parallel_mock
+
+        if N_threads == 'max':
+            N_threads = cpu_count()
+        if not isinstance(N_threads, Integral) or N_threads < 1:
+            raise HalotoolsError("N_threads argument must be a positive integer or 'max'")
+        if num_chunks is None:
+            num_chunks = N_threads
+        if not isinstance(num_chunks, Integral) or num_chunks < 1:
+            raise HalotoolsError("num_chunks argument must be a positive integer")
+        if occupations is not None:
+            for gal_type, occupation in occupations.items():
+                if len(occupation) != len(self.halo_table):
+                    raise HalotoolsError("Input occupations of %s must have one entry "
+                        "per halo of the halo_table" % gal_type)
+
+        halo_indices = split_halo_indices(self.halo_table, num_chunks, chunk_by = chunk_by)
+        # Each chunk has an independent random stream. The chunk seeds only depend on 
+        # seed and num_chunks, so the result does not depend on N_threads
+        if seed is None:
+            seed = np.random.randint(0, 2**31 - 1)
+        chunk_seeds = [model_helpers.stream_seed(seed, 'chunk', ichunk) 
+            for ichunk in range(len(halo_indices))]
+        # Each chunk is populated with the input occupations of its own halos
+        if occupations is None:
+            chunk_occupations = [None]*len(halo_indices)
+        else:
+            chunk_occupations = [{gal_type: np.asarray(occupation)[indices] 
+                for gal_type, occupation in occupations.items()} 
+                for indices in halo_indices]
+        chunks = list(zip(halo_indices, chunk_seeds, chunk_occupations))
+
+        # The methods of the model are closures that cannot be pickled, 
+        # so the worker processes access the mock through a module attribute 
+        # that is inherited when the processes are forked
+        _parallel_mock = self
+        try:
+            if N_threads > 1:
+                pool = Pool(N_threads)
+                result = pool.map(_populate_chunk, chunks)
+                pool.close()
+                pool.join()
+            else:
+                result = list(map(_populate_chunk, chunks))
+        finally:
+            _parallel_mock = None
+
+        column_dicts = [chunk_result[0] for chunk_result in result]
+        self._galaxy_columns = concatenate_galaxy_columns(column_dicts, 
+            categories = {'gal_type': self.gal_types})
+        self._galaxy_table = None
+
+        # Store galaxies of the same gal_type contiguously, in the order of self.gal_types
+        gal_type_codes = np.asarray(self._galaxy_columns['gal_type'])
+        self._galaxy_columns = self._galaxy_columns[np.argsort(gal_type_codes, kind='mergesort')]
+        gal_type_codes = np.asarray(self._galaxy_columns['gal_type'])
+
+        self._occupation = {}
+        self._total_abundance = {}
+        self._gal_type_indices = {}
+        for code, gal_type in enumerate(self.gal_types):
+            occupation = np.zeros(len(self.halo_table), dtype=int)
+            for indices, chunk_result in zip(halo_indices, result):
+                occupation[indices] = chunk_result[1][gal_type]
+            self.halo_table['halo_num_'+gal_type] = occupation
+            self._occupation[gal_type] = occupation
+            self._total_abundance[gal_type] = occupation.sum()
+            first_galaxy_index, last_galaxy_index = np.searchsorted(
+                gal_type_codes, [code, code+1])
+            self._gal_type_indices[gal_type] = slice(first_galaxy_index, last_galaxy_index)
+
+        self.Ngals = len(self._galaxy_columns)
+
+# Mock populated by _populate_chunk, bound by HodMockFactory._populate_parallel
+_parallel_mock = None
+
+def _populate_chunk(chunk):
+    """ Populate the halos of one chunk of the ``halo_table`` of ``_parallel_mock``. 
+
+    Returns a dictionary of the galaxy property arrays and a dictionary of 
+    the occupations of the halos in the chunk. 
+    """
+    halo_indices, seed, occupations = chunk
 
+    mock = copy(_parallel_mock)
+    mock.halo_table = _parallel_mock.halo_table[halo_indices]
+    mock.additional_haloprops = copy(_parallel_mock.additional_haloprops)
+    mock._halo_level_param_cache = {}
+    mock._mean_occupation = {}
+    mock.populate(seed = seed, occupations = occupations)
 
+    columns = {key: np.asarray(mock._galaxy_columns[key]) for key in mock._galaxy_columns.keys()}
+    occupations = {gal_type: mock._occupation[gal_type] for gal_type in mock.gal_types}
+    return columns, occupations
 
 
 
@@ -761,36 +1156,64 @@ class SubhaloMockFactory(MockFactory):
     def precompute_galprops(self):
         """ Method pre-processes the input subhalo catalog, and pre-computes 
         all halo properties that will be inherited by the ``galaxy_table``. 
+
+        The inherited halo properties, and the phase space coordinates 
+        copied from those of the host halos, are read-only views of 
+        the columns of the ``halo_table``, so that they do not 
+        duplicate its memory. A column is only copied when it is set, 
+        either by the model or in the ``galaxy_table``, see 
+        `~halotools.empirical_models.mock_helpers.GalaxyColumns.bind_view`. 
         """
+        galaxy_columns = GalaxyColumns(len(self.halo_table))
 
         for key in self.additional_haloprops:
-            self.galaxy_table[key] = self.halo_table[key]
+            galaxy_columns.bind_view(key, self.halo_table[key])
 
         phase_space_keys = ['x', 'y', 'z', 'vx', 'vy', 'vz']
         for newkey in phase_space_keys:
-            self.galaxy_table[newkey] = self.galaxy_table[model_defaults.host_haloprop_prefix+newkey]
+            galaxy_columns.bind_view(newkey, 
+                self.halo_table[model_defaults.host_haloprop_prefix+newkey])
 
-        self.galaxy_table['galid'] = np.arange(len(self.galaxy_table))
+        galaxy_columns['galid'] = np.arange(len(galaxy_columns))
 
         for galprop in self.model.galprop_list:
             component_model = self.model.model_blueprint[galprop]
             if hasattr(component_model, 'gal_type_func'):
                 newkey = galprop + '_gal_type'
-                self.galaxy_table[newkey] = (
-                    component_model.gal_type_func(halo_table=self.galaxy_table)
+                galaxy_columns[newkey] = (
+                    component_model.gal_type_func(halo_table=galaxy_columns)
                     )
 
+        self._galaxy_columns = galaxy_columns
+        self._galaxy_table = None
+
     def populate(self):
         """ Method populating subhalos with mock galaxies. 
+
+        The galaxy properties computed by the model are written into 
+        the memory allocated by the previous call to `populate`, if any, 
+        unless the ``galaxy_table`` sharing this memory has been accessed 
+        since then. In that case new arrays are allocated, 
+        so that a previously returned ``galaxy_table`` is left unchanged. 
         """
+        galaxy_columns = self._galaxy_columns
+
+        if self._galaxy_table is not None:
+            for galprop_key in self.model.galprop_list:
+                if galprop_key in galaxy_columns:
+                    del galaxy_columns[galprop_key]
+
         for galprop_key in self.model.galprop_list:
             
             model_func_name = 'mc_'+galprop_key
             model_func = getattr(self.model, model_func_name)
-            self.galaxy_table[galprop_key] = model_func(halo_table=self.galaxy_table)
+            galaxy_columns[galprop_key] = model_func(halo_table=galaxy_columns)
 
         if hasattr(self.model, 'galaxy_selection_func'):
-            mask = self.model.galaxy_selection_func(self.galaxy_table)
-            self.galaxy_table = self.galaxy_table[mask]
+            mask = self.model.galaxy_selection_func(galaxy_columns)
+            galaxy_columns = galaxy_columns[mask]
+
+        self._galaxy_columns = galaxy_columns
+        self._galaxy_table = None
 
 
@@ -5,8 +5,12 @@ This module contains general purpose helper functions
 used to provide convenience wrappers for mock objects
 """
 
+import os
 import numpy as np 
-from ..custom_exceptions import HalotoolsError
+from collections import OrderedDict
+from astropy.extern import six
+from astropy.table import Table, Column 
+from ..custom_exceptions import HalotoolsError, HalotoolsIOError
 from warnings import warn
 
 def three_dim_pos_bundle(table, key1, key2, key3, 
@@ -73,13 +77,626 @@ def infer_mask_from_kwargs(galaxy_table, **kwargs):
     return mask
 
 
+def split_halo_indices(halo_table, num_chunks, chunk_by='index', xkey='halo_x'):
+    """ Split the rows of a halo catalog into chunks that can be populated 
+    independently of one another, e.g., by different processes. 
 
+    Parameters 
+    ----------
+    halo_table : table 
+        Data table storing the halo catalog. 
+
+    num_chunks : int 
+        Number of chunks. 
+
+    chunk_by : string, optional 
+        If set to ``index``, each chunk is a contiguous range of rows of ``halo_table``. 
+        If set to ``slab``, each chunk stores the halos of a slab of the simulation box 
+        along the x-axis, with roughly the same number of halos in each slab. 
+        Default is ``index``. 
+
+    xkey : string, optional 
+        Column of ``halo_table`` storing the x-coordinate of the halos. 
+        Only used when ``chunk_by`` is set to ``slab``. Default is ``halo_x``. 
+
+    Returns 
+    -------
+    chunks : list 
+        List of ``num_chunks`` integer arrays storing the row indices of each chunk. 
+        Every row of ``halo_table`` appears in exactly one chunk. 
+    """
+    num_chunks = int(num_chunks)
+    if num_chunks < 1:
+        raise HalotoolsError("num_chunks must be a positive integer")
+
+    if chunk_by == 'index':
+        indices = np.arange(len(halo_table))
+    elif chunk_by == 'slab':
+        # A stable sort keeps the halos of each slab in their original order
+        indices = np.argsort(np.asarray(halo_table[xkey]), kind='mergesort')
+    else:
+        raise HalotoolsError("chunk_by must be either ``index`` or ``slab``")
+
+    return np.array_split(indices, num_chunks)
+
+
+def concatenate_galaxy_columns(column_dicts, categories=None):
+    """ Concatenate the galaxy properties of several chunks of a mock 
+    into a single `GalaxyColumns` instance. 
+
+    Parameters 
+    ----------
+    column_dicts : list 
+        List of dictionaries, one per chunk, storing the arrays of galaxy properties. 
+        Every dictionary must have the same keys. 
+
+    categories : dict, optional 
+        Keys are the names of categorical columns, values are the lookup tables 
+        of the columns, e.g., ``{'gal_type': ['centrals', 'satellites']}``. 
+        The arrays of these columns store the integer codes of the categories. 
+
+    Returns 
+    -------
+    galaxy_columns : `GalaxyColumns`
+    """
+    if categories is None:
+        categories = {}
+    column_dicts = list(column_dicts)
+    if len(column_dicts) == 0:
+        return GalaxyColumns()
+
+    keys = list(column_dicts[0].keys())
+    if len(keys) == 0:
+        return GalaxyColumns()
+    num_rows = np.sum([len(column_dict[keys[0]]) for column_dict in column_dicts])
+
+    galaxy_columns = GalaxyColumns(num_rows)
+    for key in keys:
+        column = np.concatenate([column_dict[key] for column_dict in column_dicts])
+        if key in categories:
+            galaxy_columns.allocate_categorical(key, categories[key])
+        else:
+            galaxy_columns.allocate(key, column.dtype)
+        galaxy_columns[key] = column
+
+    return galaxy_columns
+
+
+class GalaxyColumns(object):
+    """ Container storing the properties of a mock galaxy population 
+    as a collection of contiguous numpy arrays, one per column. 
+
+    `GalaxyColumns` supports the subset of the `~astropy.table.Table` 
+    interface used by the component models during mock population: 
+    columns are accessed and set by key, and slicing or masking returns 
+    a new `GalaxyColumns` instance. When the rows are selected with a slice, 
+    the columns of the new instance are views into the original arrays, 
+    so that setting an existing column of a ``gal_type`` slice writes 
+    directly into the memory of the full galaxy population. 
+    Columns bound with `bind_view` are read-only views of the memory of 
+    another array, such as a column of the halo catalog, 
+    which is only copied if the column is set. 
+    Use `to_table` to create an `~astropy.table.Table` from the columns. 
+    """
+
+    def __init__(self, num_rows=0):
+        """
+        Parameters 
+        ----------
+        num_rows : int, optional 
+            Length of the columns. Default is 0. 
+        """
+        self._columns = OrderedDict()
+        self._num_rows = int(num_rows)
+
+    def allocate_categorical(self, key, categories):
+        """ Allocate memory for the categorical column ``key``, 
+        storing one int8 code per row. 
+
+        Parameters 
+        ----------
+        key : string 
+            Name of the column. 
+
+        categories : list of strings 
+            Lookup table of the column. Rows with code ``i`` 
+            belong to category ``categories[i]``. 
+        """
+        self._columns[key] = CategoricalColumn(
+            np.zeros(self._num_rows, dtype=np.int8), categories=categories, name=key)
+
+    def allocate(self, key, dtype):
+        """ Allocate zero-filled memory for the column ``key``. 
+
+        Parameters 
+        ----------
+        key : string 
+            Name of the column. 
+
+        dtype : numpy dtype 
+            Data type of the column. 
+        """
+        self._columns[key] = np.zeros(self._num_rows, dtype=dtype)
+
+    def bind_view(self, key, array):
+        """ Bind a read-only view of ``array`` to the column ``key``, 
+        without copying its memory. 
+
+        Setting the column later replaces the view by a newly allocated array, 
+        so that the memory of ``array`` is never written to. 
+
+        Parameters 
+        ----------
+        key : string 
+            Name of the column. 
+
+        array : array_like 
+            Length-``num_rows`` array, e.g., a column of the halo catalog. 
+        """
+        view = np.asarray(array).view()
+        if len(view) != self._num_rows:
+            raise HalotoolsError("Cannot bind an array of length %i "
+                "to a column of length %i" % (len(view), self._num_rows))
+        view.flags.writeable = False
+        self._columns[key] = view
+
+    def keys(self):
+        return list(self._columns.keys())
+
+    @property 
+    def colnames(self):
+        return self.keys()
+
+    def __len__(self):
+        return self._num_rows
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def __getitem__(self, item):
+        if isinstance(item, six.string_types):
+            return self._columns[item]
+        else:
+            rows = GalaxyColumns()
+            for key, column in self._columns.items():
+                rows._columns[key] = column[item]
+            if len(self._columns) > 0:
+                rows._num_rows = len(column[item])
+            else:
+                rows._num_rows = len(np.arange(self._num_rows)[item])
+            return rows
+
+    def __setitem__(self, key, value):
+        """ Setting an existing column overwrites its memory in-place; 
+        setting a new column, or a read-only column bound with `bind_view`, 
+        allocates a new array, broadcasting scalar values to the length of the table. 
+        """
+        if (key in self._columns) and self._columns[key].flags.writeable:
+            self._columns[key][:] = value
+        else:
+            value = np.asarray(value)
+            column = np.empty(self._num_rows, dtype=value.dtype)
+            column[:] = value
+            self._columns[key] = column
+
+    def __delitem__(self, key):
+        del self._columns[key]
+
+    def to_table(self):
+        """ Create a `GalaxyTable` storing the columns. 
+
+        The memory of the columns is not copied. The columns bound with `bind_view` 
+        remain read-only views in the table, and are only copied if they are set. 
+
+        Returns 
+        -------
+        table : `GalaxyTable`
+        """
+        if len(self._columns) == 0:
+            return GalaxyTable()
+        table = GalaxyTable(list(self._columns.values()), 
+            names=list(self._columns.keys()), copy=False)
+
+        return _bind_categorical_columns(table, self._columns)
+
+
+class GalaxyTable(Table):
+    """ `~astropy.table.Table` created by `GalaxyColumns.to_table`. 
+
+    Columns bound with `GalaxyColumns.bind_view` are read-only views of 
+    the memory of another array, such as a column of the halo catalog, 
+    and cannot be modified in-place. Setting such a column, 
+    e.g., ``galaxy_table['x'] = x``, replaces the view by a newly allocated column, 
+    so that only the columns that are changed are copied. 
+    """
+
+    def __setitem__(self, item, value):
+        if (isinstance(item, six.string_types) and (item in self.colnames) 
+            and not self[item].flags.writeable):
+            value = np.asarray(value)
+            column = np.empty(len(self), dtype=value.dtype)
+            column[:] = value
+            self.replace_column(item, Column(column, name=item))
+        else:
+            super(GalaxyTable, self).__setitem__(item, value)
+
+
+# Suffix of the table metadata keys storing the lookup tables of categorical columns
+categorical_meta_suffix = '_categories'
+
+
+def _bind_categorical_columns(table, columns):
+    """ Bind the `CategoricalColumn` instances among the values of the ``columns`` dictionary 
+    to the columns of ``table`` with the same keys, and return ``table``. 
+    """
+    for key, column in columns.items():
+        if isinstance(column, CategoricalColumn):
+            # Store the lookup tables of categorical columns in the table metadata 
+            # so that they survive serialization, see restore_categorical_columns
+            table.meta[key + categorical_meta_suffix] = column.categories
+            # The Table constructor may rebuild each column as a plain Column, 
+            # losing the comparisons of the categorical column to strings
+            if not isinstance(table[key], CategoricalColumn):
+                table.replace_column(key, column)
+    return table
+
+
+class CategoricalColumn(Column):
+    """ `~astropy.table.Column` storing a categorical property such as ``gal_type`` 
+    as int8 codes together with a lookup table of the category names. 
+
+    Comparing the column to a string, e.g. ``galaxy_table['gal_type'] == 'centrals'``, 
+    is a vectorized integer comparison against the code of the category. 
+    Compared to storing the names as python strings, the memory of the 
+    column is reduced by a factor of 8. 
+    """
+
+    def __new__(cls, data=None, categories=None, name=None, **kwargs):
+        """
+        Parameters 
+        ----------
+        data : array_like 
+            Either the integer codes of each row, or the category name of each row. 
+
+        categories : list of strings 
+            Lookup table of the column. Rows with code ``i`` 
+            belong to category ``categories[i]``. 
+            Default is the lookup table of ``data``, if ``data`` is a `CategoricalColumn`.
 
+        name : string, optional 
+            Name of the column. 
+        """
+        if categories is None:
+            categories = getattr(data, 'categories', None)
+        if (categories is None) and (kwargs.get('meta') is not None):
+            categories = kwargs['meta'].get('categories', None)
+        if categories is None:
+            raise HalotoolsError("Must pass the lookup table of categories "
+                "to create a CategoricalColumn")
+        categories = [str(category) for category in categories]
+        if len(categories) > np.iinfo(np.int8).max:
+            raise HalotoolsError("CategoricalColumn supports at most %i categories" 
+                % np.iinfo(np.int8).max)
 
+        data = np.asarray(data)
+        if data.dtype.kind in ('U', 'S', 'O'):
+            data = encode_categorical(data, categories)
+        kwargs['dtype'] = np.int8
+
+        self = super(CategoricalColumn, cls).__new__(cls, 
+            data=data.astype(np.int8, copy=False), name=name, **kwargs)
+        self.meta['categories'] = categories
+        return self
+
+    @property 
+    def categories(self):
+        """ Lookup table of the category names. 
+        """
+        return self.meta['categories']
+
+    def category_code(self, category):
+        """ Integer code of ``category``, or -1 if ``category`` is not in the lookup table. 
+        """
+        try:
+            return self.categories.index(category)
+        except ValueError:
+            return -1
+
+    def decode(self):
+        """ Return an array of the category name of each row. 
+        """
+        return np.array(self.categories, dtype=object)[self.data]
+
+    def __eq__(self, other):
+        if isinstance(other, six.string_types):
+            return self.data == self.category_code(other)
+        else:
+            return super(CategoricalColumn, self).__eq__(other)
+
+    def __ne__(self, other):
+        if isinstance(other, six.string_types):
+            return self.data != self.category_code(other)
+        else:
+            return super(CategoricalColumn, self).__ne__(other)
+
+
+def encode_categorical(values, categories):
+    """ Convert an array of category names into an array of int8 codes. 
+
+    Parameters 
+    ----------
+    values : array_like 
+        Array of category names. 
+
+    categories : list of strings 
+        Lookup table of the categories. 
+
+    Returns 
+    -------
+    codes : array 
+        int8 array, ``codes[i]`` is the index of ``values[i]`` in ``categories``. 
+    """
+    values = np.asarray(values)
+    codes = np.zeros(len(values), dtype=np.int8)
+    found = np.zeros(len(values), dtype=bool)
+    for code, category in enumerate(categories):
+        mask = values == category
+        codes[mask] = code
+        found |= mask
+    if not np.all(found):
+        msg = ("The following values do not appear in the lookup table of categories:\n%s")
+        raise HalotoolsError(msg % str(list(set(values[~found]))))
+    return codes
+
+
+def restore_categorical_columns(table):
+    """ Convert the integer columns of ``table`` whose lookup table is stored in 
+    ``table.meta`` back into `CategoricalColumn` instances. 
+
+    `~halotools.empirical_models.mock_helpers.GalaxyColumns.to_table` stores the lookup 
+    table of each categorical column ``key`` in ``table.meta[key + '_categories']``, 
+    which is written to disk together with the table, e.g. in hdf5 format. 
+    This function restores the categorical columns after such a table is read. 
+
+    Parameters 
+    ----------
+    table : `~astropy.table.Table`
+
+    Returns 
+    -------
+    table : `~astropy.table.Table`
+    """
+    for metakey in list(table.meta.keys()):
+        if not metakey.endswith(categorical_meta_suffix):
+            continue
+        key = metakey[:-len(categorical_meta_suffix)]
+        if (key in table.keys()) and (not isinstance(table[key], CategoricalColumn)):
+            categories = [category.decode() if isinstance(category, bytes) else category 
+                for category in table.meta[metakey]]
+            table.replace_column(key, CategoricalColumn(table[key], 
+                categories=categories, name=key))
+    return table
+
+
+def write_galaxy_table(fname, table, metadata=None, param_dict=None, 
+    overwrite=False, chunk_size=65536, compression='gzip'):
+    """ Write a galaxy table to an hdf5 file, storing each column 
+    as a separate chunked and compressed dataset, so that the columns 
+    can be read back independently of one another with `StoredMock`. 
+
+    Parameters 
+    ----------
+    fname : string 
+        Name of the output hdf5 file. 
+
+    table : `~astropy.table.Table` or `GalaxyColumns` 
+        Galaxy table to store. 
+
+    metadata : dict, optional 
+        Attributes of the hdf5 file, e.g., ``simname`` and ``redshift``. 
+        Entries with value None are not stored. 
+
+    param_dict : dict, optional 
+        ``param_dict`` of the model used to populate the mock. 
+
+    overwrite : bool, optional 
+        If False (the default), an existing file ``fname`` raises an exception. 
+
+    chunk_size : int, optional 
+        Number of rows of each hdf5 chunk. Default is 65536. 
+
+    compression : string, optional 
+        Compression filter of the hdf5 datasets, or None for no compression. 
+        Default is ``gzip``. 
+
+    Notes 
+    -----
+    Columns of strings, such as a ``gal_type`` column of python strings, 
+    are stored as the int8 codes of a `CategoricalColumn` together with 
+    the lookup table of the categories. 
+    """
+    try:
+        import h5py
+    except ImportError:
+        raise HalotoolsError("Must have h5py package installed to use this feature")
+
+    if os.path.isfile(fname) and (overwrite is False):
+        raise HalotoolsIOError("The file %s already exists. \n"
+            "Call write_galaxy_table with overwrite = True to overwrite it." % fname)
+
+    num_rows = len(table)
+    chunks = (max(1, min(int(chunk_size), num_rows)), )
+    shuffle = compression is not None
+
+    f = h5py.File(fname, 'w')
+    try:
+        if metadata is not None:
+            for key, value in metadata.items():
+                if value is not None:
+                    f.attrs[key] = value
+        f.attrs['num_rows'] = num_rows
+
+        param_group = f.create_group('param_dict')
+        if param_dict is not None:
+            for key, value in param_dict.items():
+                param_group.attrs[key] = value
+
+        group = f.create_group('galaxy_table')
+        colnames = list(table.keys())
+        # hdf5 groups do not preserve the order of their datasets
+        group.attrs['colnames'] = np.array(colnames, dtype='S')
+        for key in colnames:
+            column = table[key]
+            categories = getattr(column, 'categories', None)
+            data = np.asarray(column)
+            if (categories is None) and (data.dtype.kind in ('U', 'S', 'O')):
+                data = data.astype(str)
+                unique_values = [str(value) for value in np.unique(data)]
+                if len(unique_values) <= np.iinfo(np.int8).max:
+                    categories = unique_values
+                    data = encode_categorical(data, categories)
+                else:
+                    data = np.char.encode(data, 'utf-8')
+
+            dset = group.create_dataset(key, data=data, chunks=chunks, 
+                compression=compression, shuffle=shuffle)
+            if categories is not None:
+                dset.attrs['categories'] = np.array(categories, dtype='S')
+    finally:
+        f.close()
+
+
+def _decode(value):
+    """ Convert the bytes returned by h5py for string attributes into strings. 
+    """
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+class StoredMock(object):
+    """ Read-only access to a mock galaxy population stored in an hdf5 file 
+    by `~halotools.empirical_models.MockFactory.save` or `write_galaxy_table`. 
+
+    Opening the file only reads its metadata. Each column is read from disk 
+    when it is accessed, so that a subset of galaxies can be selected 
+    from a few of the columns of a very large mock 
+    without loading the other columns into memory. 
+    """
+
+    def __init__(self, fname):
+        """
+        Parameters 
+        ----------
+        fname : string 
+            Name of the hdf5 file. 
+
+        Examples 
+        --------
+        >>> mock = StoredMock('mock.hdf5') # doctest: +SKIP
+        >>> mask = mock['stellar_mass'] > 1e10 # doctest: +SKIP
+        >>> massive_galaxies = mock.read(keys = ['x', 'y', 'z'], rows = mask) # doctest: +SKIP
+        """
+        try:
+            import h5py
+        except ImportError:
+            raise HalotoolsError("Must have h5py package installed to use this feature")
+
+        self.fname = fname
+        self._f = h5py.File(fname, 'r')
+        self._group = self._f['galaxy_table']
+        self.colnames = [_decode(key) for key in self._group.attrs['colnames']]
+
+        self.metadata = {key: _decode(value) for key, value in self._f.attrs.items()}
+        self._num_rows = int(self.metadata.pop('num_rows'))
+        self.param_dict = {key: _decode(value) 
+            for key, value in self._f['param_dict'].attrs.items()}
+
+    def __getattr__(self, attr):
+        # Expose the metadata such as simname and redshift as attributes
+        metadata = self.__dict__.get('metadata', {})
+        if attr in metadata:
+            return metadata[attr]
+        raise AttributeError(attr)
+
+    def keys(self):
+        return list(self.colnames)
+
+    def __len__(self):
+        return self._num_rows
+
+    def __contains__(self, key):
+        return key in self.colnames
+
+    def __getitem__(self, item):
+        """ Read a column by key, or the rows ``item`` of all columns into a new table. 
+        """
+        if isinstance(item, six.string_types):
+            return self.read_column(item)
+        else:
+            return self.read(rows = item)
+
+    def read_column(self, key, rows=None):
+        """ Read a single column from disk. 
+
+        Parameters 
+        ----------
+        key : string 
+            Name of the column. 
+
+        rows : slice or array, optional 
+            Rows of the column to return. Slices only read the 
+            chunks of the file storing the selected rows. Default is all rows. 
+
+        Returns 
+        -------
+        column : array or `CategoricalColumn` 
+        """
+        if key not in self.colnames:
+            raise KeyError(key)
+        dset = self._group[key]
+        if isinstance(rows, slice):
+            data = dset[rows]
+        else:
+            data = dset[...]
+            if rows is not None:
+                data = data[rows]
+
+        if 'categories' in dset.attrs:
+            categories = [_decode(category) for category in dset.attrs['categories']]
+            return CategoricalColumn(data, categories=categories, name=key)
+        else:
+            return data
 
+    def read(self, keys=None, rows=None):
+        """ Read a subset of the columns and rows into memory. 
 
+        Parameters 
+        ----------
+        keys : list of strings, optional 
+            Columns to read. Default is all columns. 
 
+        rows : slice or array, optional 
+            Rows to read, e.g., a boolean mask computed from other columns. 
+            Default is all rows. 
 
+        Returns 
+        -------
+        table : `~astropy.table.Table`
+        """
+        if keys is None:
+            keys = self.colnames
+        if len(keys) == 0:
+            return Table()
+        columns = OrderedDict((key, self.read_column(key, rows = rows)) for key in keys)
+        table = Table(list(columns.values()), names = keys, copy = False)
+        return _bind_categorical_columns(table, columns)
 
+    def close(self):
+        self._f.close()
 
+    def __enter__(self):
+        return self
 
+    def __exit__(self, *args):
+        self.close()
@@ -9,6 +9,7 @@ __author__ = ['Andrew Hearin']
 import numpy as np
 from copy import copy
 from functools import partial
+from multiprocessing import cpu_count, Pool
 
 from astropy.extern import six
 from abc import ABCMeta, abstractmethod, abstractproperty
@@ -85,6 +86,15 @@ class ModelFactory(object):
             Redshift of the desired catalog. 
             Default is set in `~halotools.sim_manager.sim_defaults`. 
 
+        """
+        self._bind_mock(**kwargs)
+        self.mock.populate()
+
+    def _bind_mock(self, **kwargs):
+        """ Private method binding a mock to the model, without populating it, 
+        if no mock is already bound. Otherwise verify that the snapshot requested 
+        by ``kwargs`` is consistent with the snapshot of the existing mock. 
+        See `populate_mock` for a description of the keyword arguments. 
         """
         inconsistent_redshift_error_msg = ("Inconsistency between the model redshift = %.2f "
             "and the snapshot redshift = %.2f.\n"
@@ -146,10 +156,70 @@ class ModelFactory(object):
             mock_factory = self.model_blueprint['mock_factory']
             self.mock = mock_factory(snapshot=snapshot, model=self, populate=False)
 
+    def _compute_average_summary(self, method_name, num_iterations, summary_func, 
+        num_workers, seed, kwargs):
+        """ Private method populating ``num_iterations`` Monte Carlo realizations of the model, 
+        calling the ``method_name`` method of the mock on each realization, 
+        and returning the bin centers and the ``summary_func`` of each of the 
+        other returned arrays across the realizations. 
+
+        Realization ``i`` is populated with its own random number seed derived from ``seed``, 
+        so that for a fixed ``seed`` the result does not depend on ``num_workers``. 
+        With ``num_workers`` > 1, the realizations are distributed over worker processes 
+        forked from the current process, which share the memory of the halo catalog 
+        and only send back the arrays returned by ``method_name``, 
+        so that the mock bound to the model is left unpopulated by the workers. 
+        """
+        global _parallel_realization_mock
 
-        self.mock.populate()
+        if num_workers == 'max':
+            num_workers = cpu_count()
+        if not isinstance(num_workers, int) or num_workers < 1:
+            raise HalotoolsError("num_workers argument must be a positive integer or 'max'")
 
-    def compute_average_galaxy_clustering(self, num_iterations=5, summary_statistic = 'median', **kwargs):
+        halocat_kwargs = {}
+        if 'simname' in kwargs:
+            halocat_kwargs['simname'] = kwargs['simname']
+        if 'desired_redshift' in kwargs:
+            halocat_kwargs['redshift'] = kwargs['desired_redshift']
+        if 'halo_finder' in kwargs:
+            halocat_kwargs['halo_finder'] = kwargs['halo_finder']
+
+        snapshot = HaloCatalog(preload_halo_table = True, **halocat_kwargs)
+        self._bind_mock(snapshot = snapshot)
+
+        # Forked workers inherit the state of the global random number generator, 
+        # so parallel realizations always need distinct seeds
+        if (seed is None) and (num_workers > 1):
+            seed = np.random.randint(0, 2**31 - 1)
+        if seed is None:
+            realization_seeds = [None]*num_iterations
+        else:
+            realization_seeds = [model_helpers.stream_seed(seed, 'realization', i) 
+                for i in range(num_iterations)]
+
+        # The methods of the model are closures, and ``kwargs`` may contain 
+        # a mask_function, neither of which can be pickled, so the worker processes 
+        # access them through a module attribute that is inherited when they are forked
+        _parallel_realization_mock = (self.mock, method_name, kwargs)
+        try:
+            if num_workers > 1:
+                pool = Pool(min(num_workers, num_iterations))
+                result = pool.map(_realization_summary, realization_seeds, chunksize=1)
+                pool.close()
+                pool.join()
+            else:
+                result = list(map(_realization_summary, realization_seeds))
+        finally:
+            _parallel_realization_mock = None
+
+        rbin_centers = result[0][0]
+        summaries = [summary_func(np.array([realization[i] for realization in result]), axis=0) 
+            for i in range(1, len(result[0]))]
+        return tuple([rbin_centers] + summaries)
+
+    def compute_average_galaxy_clustering(self, num_iterations=5, summary_statistic = 'median', 
+        num_workers = 1, seed = None, **kwargs):
         """
         Method repeatedly populates a simulation with a mock galaxy catalog, computes the clustering 
         signal of each Monte Carlo realization, and returns a summary statistic of the clustering 
@@ -166,6 +236,16 @@ class ModelFactory(object):
             collection of Monte Carlo realizations. Options are ``median`` and ``mean``. 
             Default is ``median``. 
 
+        num_workers : int, optional 
+            Number of processes used to generate the Monte Carlo realizations in parallel. 
+            A string 'max' may be used to indicate that all available cores 
+            on the machine should be used. Default is 1. 
+
+        seed : int, optional 
+            Random number seed used to generate the Monte Carlo realizations. 
+            For a fixed ``seed``, the result does not depend on ``num_workers``. 
+            Default is None. 
+
         simname : string, optional 
             Nickname of the simulation into which mock galaxies will be populated. 
             Currently supported simulations are 
@@ -281,53 +361,11 @@ class ModelFactory(object):
             summary_func = np.median
 
 
-        halocat_kwargs = {}
-        if 'simname' in kwargs:
-            halocat_kwargs['simname'] = kwargs['simname']
-        if 'desired_redshift' in kwargs:
-            halocat_kwargs['redshift'] = kwargs['desired_redshift']
-        if 'halo_finder' in kwargs:
-            halocat_kwargs['halo_finder'] = kwargs['halo_finder']
-
-        snapshot = HaloCatalog(preload_halo_table = True, **halocat_kwargs)
-
-        if 'rbins' in kwargs:
-            rbins = kwargs['rbins']
-        else:
-            rbins = model_defaults.default_rbins
-
-        if 'include_crosscorr' in kwargs.keys():
-            include_crosscorr = kwargs['include_crosscorr']
-        else:
-            include_crosscorr = False
-
-        if include_crosscorr is True:
-
-            xi_coll = np.zeros(
-                (len(rbins)-1)*num_iterations*3).reshape(3, num_iterations, len(rbins)-1)
-
-            for i in range(num_iterations):
-                self.populate_mock(snapshot = snapshot)
-                rbin_centers, xi_coll[0, i, :], xi_coll[1, i, :], xi_coll[2, i, :] = (
-                    self.mock.compute_galaxy_clustering(**kwargs)
-                    )
-            xi_11 = summary_func(xi_coll[0, :], axis=0)
-            xi_12 = summary_func(xi_coll[1, :], axis=0)
-            xi_22 = summary_func(xi_coll[2, :], axis=0)
-            return rbin_centers, xi_11, xi_12, xi_22
-        else:
-
-            xi_coll = np.zeros(
-                (len(rbins)-1)*num_iterations).reshape(num_iterations, len(rbins)-1)
-
-            for i in range(num_iterations):
-                self.populate_mock(snapshot = snapshot)
-                rbin_centers, xi_coll[i, :] = self.mock.compute_galaxy_clustering(**kwargs)
-            xi = summary_func(xi_coll, axis=0)
-            return rbin_centers, xi
+        return self._compute_average_summary('compute_galaxy_clustering', 
+            num_iterations, summary_func, num_workers, seed, kwargs)
 
     def compute_average_galaxy_matter_cross_clustering(self, num_iterations=5, 
-        summary_statistic = 'median', **kwargs):
+        summary_statistic = 'median', num_workers = 1, seed = None, **kwargs):
         """
         Method repeatedly populates a simulation with a mock galaxy catalog, 
         computes the galaxy-matter cross-correlation  
@@ -345,6 +383,16 @@ class ModelFactory(object):
             collection of Monte Carlo realizations. Options are ``median`` and ``mean``. 
             Default is ``median``. 
 
+        num_workers : int, optional 
+            Number of processes used to generate the Monte Carlo realizations in parallel. 
+            A string 'max' may be used to indicate that all available cores 
+            on the machine should be used. Default is 1. 
+
+        seed : int, optional 
+            Random number seed used to generate the Monte Carlo realizations. 
+            For a fixed ``seed``, the result does not depend on ``num_workers``. 
+            Default is None. 
+
         simname : string, optional 
             Nickname of the simulation into which mock galaxies will be populated. 
             Currently supported simulations are 
@@ -386,6 +434,11 @@ class ModelFactory(object):
         N_threads : int, optional
             number of threads to use in calculation. Default is 1 thread for a serial calculation. 
 
+        ptcl_seed : int, optional 
+            Random number seed used to select the downsampling of dark matter particles, 
+            which is shared by all the Monte Carlo realizations. 
+            Default is derived from ``seed``. 
+
         Examples 
         ---------
         The simplest use-case of the `compute_average_galaxy_matter_cross_clustering` function 
@@ -459,49 +512,31 @@ class ModelFactory(object):
         else:
             summary_func = np.median
 
-        halocat_kwargs = {}
-        if 'simname' in kwargs:
-            halocat_kwargs['simname'] = kwargs['simname']
-        if 'desired_redshift' in kwargs:
-            halocat_kwargs['redshift'] = kwargs['desired_redshift']
-        if 'halo_finder' in kwargs:
-            halocat_kwargs['halo_finder'] = kwargs['halo_finder']
-
-        snapshot = HaloCatalog(preload_halo_table = True, **halocat_kwargs)
-
-        if 'rbins' in kwargs:
-            rbins = kwargs['rbins']
-        else:
-            rbins = model_defaults.default_rbins
+        if 'ptcl_seed' not in kwargs:
+            kwargs['ptcl_seed'] = model_helpers.stream_seed(seed, 'ptcl')
 
-        if 'include_complement' in kwargs.keys():
-            include_complement = kwargs['include_complement']
-        else:
-            include_complement = False
+        return self._compute_average_summary('compute_galaxy_matter_cross_clustering', 
+            num_iterations, summary_func, num_workers, seed, kwargs)
 
-        if include_complement is True:
-
-            xi_coll = np.zeros(
-                (len(rbins)-1)*num_iterations*2).reshape(2, num_iterations, len(rbins)-1)
-
-            for i in range(num_iterations):
-                self.populate_mock(snapshot = snapshot)
-                rbin_centers, xi_coll[0, i, :], xi_coll[1, i, :] = (
-                    self.mock.compute_galaxy_matter_cross_clustering(**kwargs)
-                    )
-            xi_11 = summary_func(xi_coll[0, :], axis=0)
-            xi_22 = summary_func(xi_coll[1, :], axis=0)
-            return rbin_centers, xi_11, xi_22
-        else:
 
-            xi_coll = np.zeros(
-                (len(rbins)-1)*num_iterations).reshape(num_iterations, len(rbins)-1)
+# Mock, mock method and keyword arguments used by _realization_summary, 
+# bound by ModelFactory._compute_average_summary
+_parallel_realization_mock = None
 
-            for i in range(num_iterations):
-                self.populate_mock(snapshot = snapshot)
-                rbin_centers, xi_coll[i, :] = self.mock.compute_galaxy_matter_cross_clustering(**kwargs)
-            xi = summary_func(xi_coll, axis=0)
-            return rbin_centers, xi
+def _realization_summary(seed):
+    """ Populate the mock of ``_parallel_realization_mock`` with random number ``seed`` 
+    and return the arrays returned by its method. 
+    """
+    mock, method_name, kwargs = _parallel_realization_mock
+    if seed is None:
+        mock.populate()
+    elif isinstance(mock, mock_factories.HodMockFactory):
+        mock.populate(seed = seed)
+    else:
+        # The populate method of other mocks draws from the global random number generator
+        np.random.seed(seed)
+        mock.populate()
+    return getattr(mock, method_name)(**kwargs)
 
 
 class SubhaloModelFactory(ModelFactory):
@@ -885,6 +920,11 @@ class HodModelFactory(ModelFactory):
                 gal_type, 'occupation', 'mc_occupation')
             setattr(self, new_method_name, new_method_behavior)
 
+            new_method_name = 'mean_occupation_'+gal_type
+            new_method_behavior = self._update_param_dict_decorator(
+                gal_type, 'occupation', 'mean_occupation')
+            setattr(self, new_method_name, new_method_behavior)
+
             if hasattr(occupation_model, '_additional_methods_to_inherit'):
                 additional_methods_to_inherit = list(set(occupation_model._additional_methods_to_inherit))
                 for methodname in additional_methods_to_inherit:
@@ -944,8 +984,214 @@ class HodModelFactory(ModelFactory):
             func = getattr(component_model, func_name)
             return func(*args, **kwargs)
 
+        # Keys of param_dict that the behavior of the decorated function depends on. 
+        # The mock factory uses these to determine which stages of mock generation 
+        # need to be re-run when repopulating after a change to param_dict
+        decorated_func._param_dict_keys = list(component_model.param_dict.keys())
+
         return decorated_func
 
+    def mean_occupation_batch(self, param_dict_list, **kwargs):
+        """ Method used to compute the mean occupation of every halo 
+        for many different sets of model parameters in a single call. 
+
+        Parameters 
+        ----------
+        param_dict_list : list 
+            List of dictionaries of model parameters. 
+            Any key of ``self.param_dict`` missing from a dictionary 
+            takes its value from ``self.param_dict``. 
+
+        prim_haloprop : array, optional 
+            Array storing a mass-like variable that governs the occupation statistics. 
+            If ``prim_haloprop`` is not passed, then ``halo_table`` 
+            keyword arguments must be passed. 
+
+        halo_table : object, optional  
+            Data table storing halo catalog. 
+            If ``halo_table`` is not passed, then ``prim_haloprop`` 
+            keyword arguments must be passed. 
+
+        Returns 
+        -------
+        mean_occupation : dict 
+            Keys are the ``gal_types`` of the model, values are 
+            arrays of shape (len(param_dict_list), Nhalos) 
+            storing the mean occupation of each halo for each set of parameters. 
+
+        Notes 
+        -----
+        Each parameter of the occupation components is set to a column array 
+        storing its value in each set of parameters, 
+        so that a component whose ``mean_occupation`` is written with 
+        broadcastable numpy operations evaluates all sets of parameters 
+        with a single call. Components that do not broadcast in this way 
+        are evaluated one set of parameters at a time. 
+        """
+        param_dict_list = list(param_dict_list)
+        num_params = len(param_dict_list)
+        if num_params == 0:
+            raise HalotoolsError("param_dict_list passed to mean_occupation_batch is empty")
+
+        if 'halo_table' in kwargs:
+            num_halos = len(kwargs['halo_table'])
+        elif 'prim_haloprop' in kwargs:
+            num_halos = len(np.atleast_1d(kwargs['prim_haloprop']))
+        else:
+            raise HalotoolsError("mean_occupation_batch requires either "
+                "a halo_table or prim_haloprop keyword argument")
+
+        result = {}
+        for gal_type in self.gal_types:
+            occupation_model = self.model_blueprint[gal_type]['occupation']
+            param_models = [occupation_model]
+            if hasattr(occupation_model, 'central_occupation_model'):
+                param_models.append(occupation_model.central_occupation_model)
+            saved_param_dicts = [copy(model.param_dict) for model in param_models]
+
+            try:
+                # Set each parameter to a (num_params, 1) column array 
+                for key in occupation_model.param_dict.keys():
+                    values = [param_dict.get(key, self.param_dict.get(key, 
+                        occupation_model.param_dict[key])) for param_dict in param_dict_list]
+                    occupation_model.param_dict[key] = np.array(values).reshape(num_params, 1)
+                try:
+                    mean_occupation = np.asarray(occupation_model.mean_occupation(**kwargs))
+                except (ValueError, TypeError, IndexError):
+                    mean_occupation = None
+
+                if np.shape(mean_occupation) != (num_params, num_halos):
+                    # The component does not broadcast over parameters, 
+                    # so evaluate one set of parameters at a time
+                    mean_occupation = np.zeros((num_params, num_halos))
+                    for i, param_dict in enumerate(param_dict_list):
+                        for model, saved_param_dict in zip(param_models, saved_param_dicts):
+                            model.param_dict.update(saved_param_dict)
+                        for key in occupation_model.param_dict.keys():
+                            occupation_model.param_dict[key] = param_dict.get(key, 
+                                self.param_dict.get(key, saved_param_dicts[0][key]))
+                        mean_occupation[i] = occupation_model.mean_occupation(**kwargs)
+            finally:
+                for model, saved_param_dict in zip(param_models, saved_param_dicts):
+                    model.param_dict.update(saved_param_dict)
+
+            result[gal_type] = mean_occupation
+
+        return result
+
+    def mc_occupation_batch(self, param_dict_list, seed=None, **kwargs):
+        """ Method used to draw Monte Carlo realizations of the occupation 
+        of every halo for many different sets of model parameters in a single call. 
+
+        Parameters 
+        ----------
+        param_dict_list : list 
+            List of dictionaries of model parameters. 
+            Any key of ``self.param_dict`` missing from a dictionary 
+            takes its value from ``self.param_dict``. 
+
+        halo_table : object, optional  
+            Data table storing halo catalog. 
+
+        prim_haloprop : array, optional 
+            Array storing a mass-like variable that governs the occupation statistics. 
+
+        seed : int, optional 
+            Random number seed used to draw the occupations. Default is None. 
+
+        Returns 
+        -------
+        mc_occupation : dict 
+            Keys are the ``gal_types`` of the model, values are integer 
+            arrays of shape (len(param_dict_list), Nhalos) storing the 
+            number of galaxies in each halo for each set of parameters. 
+
+        Notes 
+        -----
+        The occupations of all the sets of parameters are drawn with a 
+        single call to the random number generator per ``gal_type``, 
+        rather than one call per set of parameters. 
+        """
+        mean_occupation = self.mean_occupation_batch(param_dict_list, **kwargs)
+
+        rng = model_helpers.random_stream(seed, 'mc_occupation_batch')
+        result = {}
+        for gal_type in self.gal_types:
+            upper_bound = self.model_blueprint[gal_type]['occupation']._upper_bound
+            mean = mean_occupation[gal_type]
+            if upper_bound == 1:
+                result[gal_type] = np.where(rng.random_sample(mean.shape) < mean, 1, 0)
+            elif upper_bound == float("inf"):
+                result[gal_type] = rng.poisson(mean)
+            else:
+                raise HalotoolsError("mc_occupation_batch only supports "
+                    "upper_bound equal to 1 or infinity")
+
+        return result
+
+    def populate_mock_batch(self, param_dict_list, summary_func=None, seed=None, **kwargs):
+        """ Method used to populate a simulation for many different sets of 
+        model parameters in a single call. 
+
+        Parameters 
+        ----------
+        param_dict_list : list 
+            List of dictionaries of model parameters. 
+            Any key of ``self.param_dict`` missing from a dictionary 
+            takes its value from ``self.param_dict``. 
+
+        summary_func : function, optional 
+            Function called on ``self.mock`` after each realization is populated. 
+            If passed, the list of its return values is returned instead of 
+            the galaxy tables, so that the galaxy table of each realization 
+            need not be held in memory. 
+
+        seed : int, optional 
+            Random number seed used to draw the occupations. Default is None. 
+
+        snapshot : object, optional 
+            Class instance of `~halotools.sim_manager.HaloCatalog`. 
+            Only used if a mock has not yet been bound to the model. 
+
+        Returns 
+        -------
+        result : list 
+            List with one entry per set of parameters, storing either 
+            the ``galaxy_table`` of the realization or the return value of ``summary_func``. 
+
+        Notes 
+        -----
+        The mean occupations and Monte Carlo occupations of all the realizations 
+        are computed with `mean_occupation_batch` and `mc_occupation_batch`. 
+        Occupation statistics such as the number density can be computed 
+        directly from the output of `mc_occupation_batch` without populating a mock. 
+        After calling this method, ``self.param_dict`` is restored to its values 
+        prior to the call. 
+        """
+        param_dict_list = list(param_dict_list)
+        if not hasattr(self, 'mock'):
+            self.populate_mock(**kwargs)
+
+        occupations = self.mc_occupation_batch(param_dict_list, seed=seed, 
+            halo_table=self.mock.halo_table)
+
+        saved_param_dict = copy(self.param_dict)
+        result = []
+        try:
+            for i, param_dict in enumerate(param_dict_list):
+                self.param_dict.update(saved_param_dict)
+                self.param_dict.update(param_dict)
+                self.mock.populate(occupations = 
+                    {gal_type: occupations[gal_type][i] for gal_type in self.gal_types})
+                if summary_func is None:
+                    result.append(self.mock.galaxy_table)
+                else:
+                    result.append(summary_func(self.mock))
+        finally:
+            self.param_dict.update(saved_param_dict)
+
+        return result
+
 
     def mc_pos(self, **kwargs):
         """ Method used to generate Monte Carlo realizations of galaxy positions. 
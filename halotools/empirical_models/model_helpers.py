@@ -9,12 +9,15 @@ used by many of the hod model components.
 __all__ = (
     ['GalPropModel', 'solve_for_polynomial_coefficients', 'polynomial_from_table', 
     'enforce_periodicity_of_box', 'custom_spline', 'create_composite_dtype', 'bind_default_kwarg_mixin_safe', 
-    'custom_incomplete_gamma']
+    'custom_incomplete_gamma', 'random_stream', 'stream_seed', 'multilinear_interpolation', 
+    'table_interpolant', 'cached_interpolant']
     )
 
 __author__ = ['Andrew Hearin', 'Surhud More']
 import numpy as np
 from copy import copy
+from itertools import product
+import zlib
 
 from scipy.interpolate import InterpolatedUnivariateSpline as spline
 from scipy.special import gammaincc, gamma, expi
@@ -261,6 +264,148 @@ def custom_spline(table_abcissa, table_ordinates, **kwargs):
         spline_function = spline(table_abcissa, table_ordinates, k=k)
         return spline_function
 
+class _PolynomialInterpolant(object):
+    """ Callable evaluating the unique polynomial passing through a table of points. 
+
+    The polynomial is expressed in a centered and rescaled variable 
+    to keep the linear system well-conditioned, and is evaluated by Horner's rule. 
+    """
+    def __init__(self, table_abcissa, table_ordinates):
+        table_abcissa = np.asarray(table_abcissa, dtype=float)
+        table_ordinates = np.asarray(table_ordinates, dtype=float)
+
+        self._center = table_abcissa.mean()
+        self._scale = max(np.ptp(table_abcissa)/2., 1.e-300)
+        t = (table_abcissa - self._center)/self._scale
+        self._coefficients = np.linalg.solve(
+            np.vander(t, increasing=True), table_ordinates)
+
+    def __call__(self, x):
+        if len(self._coefficients) == 1:
+            return np.zeros(custom_len(x)) + self._coefficients[0]
+
+        t = (np.asarray(x, dtype=float) - self._center)/self._scale
+        result = np.zeros_like(t) + self._coefficients[-1]
+        for coeff in self._coefficients[-2::-1]:
+            result = result*t + coeff
+        return result
+
+class _PiecewiseLinearInterpolant(object):
+    """ Callable evaluating the piecewise-linear interpolation of a table of points, 
+    with linear extrapolation beyond the first and last points. 
+    """
+    def __init__(self, table_abcissa, table_ordinates):
+        idx_sorted = np.argsort(table_abcissa)
+        self._abcissa = np.asarray(table_abcissa, dtype=float)[idx_sorted]
+        self._ordinates = np.asarray(table_ordinates, dtype=float)[idx_sorted]
+        self._slopes = np.diff(self._ordinates)/np.diff(self._abcissa)
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        idx = np.clip(np.searchsorted(self._abcissa, x, side='right') - 1, 
+            0, len(self._slopes) - 1)
+        return self._ordinates[idx] + self._slopes[idx]*(x - self._abcissa[idx])
+
+def table_interpolant(table_abcissa, table_ordinates, **kwargs):
+    """ Returns a function object interpolating the input table 
+    that agrees with `custom_spline`, but that avoids constructing a 
+    scipy spline object whenever possible. 
+
+    When the spline degree is one less than the number of table entries 
+    (the default for tables of up to six entries), the interpolating spline 
+    is simply the unique polynomial through the table, and for a degree-one spline 
+    it is piecewise linear. In both cases the returned object 
+    is a lightweight, vectorized numpy evaluator. 
+    For all other cases, `custom_spline` is called. 
+
+    Parameters 
+    ----------
+    table_abcissa : array_like
+        abcissa values defining the interpolation 
+
+    table_ordinates : array_like
+        ordinate values defining the interpolation 
+
+    k : int, optional
+        Degree of the desired spline interpolation
+
+    Returns 
+    -------
+    output : object  
+        Function object to use to evaluate the interpolation of 
+        the input table_abcissa & table_ordinates 
+    """
+    num_table_entries = custom_len(table_abcissa)
+    if (num_table_entries < 1) or (num_table_entries != custom_len(table_ordinates)):
+        # Let custom_spline raise the appropriate exception
+        return custom_spline(table_abcissa, table_ordinates, **kwargs)
+
+    max_scipy_spline_degree = 5
+    k = np.min([num_table_entries-1, kwargs.get('k', max_scipy_spline_degree), 
+        max_scipy_spline_degree])
+
+    if k == num_table_entries - 1:
+        return _PolynomialInterpolant(
+            np.atleast_1d(table_abcissa), np.atleast_1d(table_ordinates))
+    elif k == 1:
+        return _PiecewiseLinearInterpolant(table_abcissa, table_ordinates)
+    else:
+        return custom_spline(table_abcissa, table_ordinates, **kwargs)
+
+def cached_interpolant(obj, cache_key, table_abcissa, table_ordinates, **kwargs):
+    """ Returns the `table_interpolant` of the input table, 
+    rebuilding the interpolant only when the table has changed 
+    since the last call with the same ``cache_key``. 
+
+    Models whose behavior is set by interpolating between values stored in 
+    ``param_dict`` can call this function every time they are evaluated: 
+    while the values in ``param_dict`` are unchanged, the previously built 
+    interpolant is returned at the cost of a tuple comparison. 
+
+    Parameters 
+    ----------
+    obj : object 
+        Instance on which the interpolants are cached, 
+        in a dictionary bound to ``obj._interpolant_cache``. 
+
+    cache_key : string 
+        Name identifying the interpolant within the cache of ``obj``. 
+
+    table_abcissa : array_like
+        abcissa values defining the interpolation 
+
+    table_ordinates : array_like
+        ordinate values defining the interpolation 
+
+    k : int, optional
+        Degree of the desired spline interpolation
+
+    Returns 
+    -------
+    output : object  
+        Function object to use to evaluate the interpolation of 
+        the input table_abcissa & table_ordinates 
+    """
+    table_signature = (tuple(np.ravel(table_abcissa)), tuple(np.ravel(table_ordinates)), 
+        kwargs.get('k', None))
+
+    try:
+        cache = obj._interpolant_cache
+    except AttributeError:
+        cache = {}
+        obj._interpolant_cache = cache
+
+    try:
+        cached_signature, interpolant = cache[cache_key]
+        if cached_signature == table_signature:
+            return interpolant
+    except KeyError:
+        pass
+
+    interpolant = table_interpolant(table_abcissa, table_ordinates, **kwargs)
+    cache[cache_key] = (table_signature, interpolant)
+    return interpolant
+
 def call_func_table(func_table, abcissa, func_indices):
     """ Returns the output of an array of functions evaluated at a set of input points 
     if the indices of required functions is known. 
@@ -298,6 +443,73 @@ def call_func_table(func_table, abcissa, func_indices):
         out[ix] = f(abcissa[ix])
     return out
 
+def multilinear_interpolation(grid_axes, grid_values, *coords):
+    """ Vectorized multi-linear interpolation of a function tabulated on a rectilinear grid. 
+
+    Parameters 
+    ----------
+    grid_axes : sequence 
+        Sequence of monotonically increasing arrays, one per dimension of the grid, 
+        storing the grid points along each dimension. 
+
+    grid_values : array_like 
+        Array of shape (len(grid_axes[0]), len(grid_axes[1]), ...) 
+        storing the function evaluated at each grid point. 
+
+    coords : array_like 
+        One array per dimension of the grid storing the coordinates of the points 
+        at which to interpolate. The arrays are broadcast against each other. 
+        Coordinates outside the grid are clamped to the grid boundary. 
+
+    Returns 
+    -------
+    out : array_like 
+        Array storing the interpolated function at each point. 
+
+    Examples 
+    --------
+    >>> x, y = np.linspace(0, 1, 5), np.linspace(0, 2, 11)
+    >>> grid_values = x.reshape(5, 1) + y.reshape(1, 11)
+    >>> out = multilinear_interpolation([x, y], grid_values, [0.3, 0.6], [1.5, 0.25])
+    """
+    grid_values = np.asarray(grid_values)
+    if len(coords) != len(grid_axes) or grid_values.ndim != len(grid_axes):
+        raise HalotoolsError("multilinear_interpolation requires one coordinate array "
+            "and one grid axis per dimension of grid_values")
+    coords = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in coords])
+
+    # For each dimension, find the lower grid point of the cell containing each point 
+    # and the fractional distance of the point across the cell
+    lower_indices, upper_indices, fractions = [], [], []
+    for axis, x in zip(grid_axes, coords):
+        axis = np.asarray(axis, dtype=float)
+        if len(axis) == 1:
+            idx = np.zeros(x.shape, dtype=int)
+            lower_indices.append(idx)
+            upper_indices.append(idx)
+            fractions.append(np.zeros(x.shape))
+            continue
+        idx = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, len(axis) - 2)
+        fractions.append(np.clip((x - axis[idx])/(axis[idx+1] - axis[idx]), 0., 1.))
+        lower_indices.append(idx)
+        upper_indices.append(idx + 1)
+
+    # Sum the contributions of the 2**ndim corners of each cell
+    out = np.zeros(coords[0].shape)
+    for corner in product([0, 1], repeat=len(grid_axes)):
+        weight = np.ones(coords[0].shape)
+        corner_indices = []
+        for dim, upper in enumerate(corner):
+            if upper == 1:
+                weight = weight*fractions[dim]
+                corner_indices.append(upper_indices[dim])
+            else:
+                weight = weight*(1. - fractions[dim])
+                corner_indices.append(lower_indices[dim])
+        out += weight*grid_values[tuple(corner_indices)]
+
+    return out
+
 def bind_required_kwargs(required_kwargs, obj, **kwargs):
     """ Method binds each element of ``required_kwargs`` to 
     the input object ``obj``, or raises and exception for cases 
@@ -449,11 +661,79 @@ def custom_incomplete_gamma(a, x):
 custom_incomplete_gamma.__author__ = ['Surhud More']
 
 
+def random_stream(seed=None, *stream_keys):
+    """ Random number generator of the stream ``stream_keys`` of the master ``seed``. 
+
+    Each Monte Carlo stage of mock population, e.g., the occupations of each ``gal_type``, 
+    the positions of the galaxies, or a chunk of the halo catalog, draws its randoms 
+    from its own stream. The stream only depends on ``seed`` and ``stream_keys``, 
+    so the realization of a stage does not depend on which other stages were run, 
+    or in which order or process they were run. 
 
+    Parameters 
+    ----------
+    seed : int, optional 
+        Master random number seed. If None, the global numpy random number generator 
+        is returned, so that unseeded calls respect `numpy.random.seed`. 
 
+    stream_keys : ints or strings, optional 
+        Names of the stream, e.g. ``'mc_occupation', 'centrals'``. 
+        If no keys are passed, the generator is seeded directly by ``seed``. 
 
+    Returns 
+    -------
+    rng : `numpy.random.RandomState` 
+
+    Examples 
+    --------
+    >>> rng = random_stream(43, 'mc_occupation', 'satellites')
+    >>> uran = rng.random_sample(10)
+    """
+    if seed is None:
+        return np.random.mtrand._rand
+
+    seed = int(seed)
+    if seed < 0:
+        raise HalotoolsError("Random number seeds must be non-negative integers")
+    # Without stream keys, the stream of the seed is the usual seeded generator, 
+    # so that components called with an explicit seed reproduce previous realizations
+    if len(stream_keys) == 0:
+        return np.random.RandomState(seed)
+
+    # Split the master seed into 32-bit words, followed by one word per stream key
+    key_words = [seed & 0xffffffff, (seed >> 32) & 0xffffffff]
+    for key in stream_keys:
+        if isinstance(key, six.string_types):
+            key_words.append(zlib.crc32(key.encode('utf-8')) & 0xffffffff)
+        else:
+            key_words.append(int(key) & 0xffffffff)
+    key_words.append(len(stream_keys))
 
+    return np.random.RandomState(np.array(key_words, dtype=np.uint32))
 
 
+def stream_seed(seed=None, *stream_keys):
+    """ Integer seed of the stream ``stream_keys`` of the master ``seed``, 
+    used to pass a stream to functions accepting a ``seed`` keyword argument. 
+    See `random_stream`. 
 
+    Parameters 
+    ----------
+    seed : int, optional 
+        Master random number seed. If None, None is returned. 
+
+    stream_keys : ints or strings, optional 
+        Names of the stream. 
+
+    Returns 
+    -------
+    seed : int or None 
+
+    Examples 
+    --------
+    >>> chunk_seeds = [stream_seed(43, 'chunk', i) for i in range(4)]
+    """
+    if seed is None:
+        return None
+    return int(random_stream(seed, *stream_keys).randint(0, 2**31 - 1))
 
@@ -11,17 +11,32 @@ __author__ = ['Andrew Hearin']
 __all__ = ['MonteCarloGalProf']
 
 import numpy as np 
+import sys
+import hashlib
+import inspect
 
 from functools import partial
 from itertools import product
 from time import time
 
-from .model_helpers import custom_spline, call_func_table
+from .model_helpers import custom_spline, multilinear_interpolation, random_stream, stream_seed
 from ..utils.array_utils import custom_len, convert_to_ndarray
 from ..custom_exceptions import HalotoolsError 
+from ..sim_manager import cache_config
 
 from . import model_defaults
 
+# Number of grid points of the dense lookup tables per interval of the radius table
+_lookup_table_refinement = 4
+
+# Version of the format of the lookup tables stored in the Halotools cache. 
+# Increment to invalidate all previously cached tables. 
+_lookup_table_cache_version = 2
+
+# Names of the arrays of the lookup tables stored in the cache
+_cached_lookup_table_names = ['rad_prof_func_table', 'vel_prof_func_table', 
+    '_log_cdf_lookup_table', '_logradius_lookup_table']
+
 class MonteCarloGalProf(object):
     """ Orthogonal mix-in class used to turn an analytical 
     phase space model (e.g., `~halotools.empirical_models.NFWPhaseSpace`)
@@ -69,7 +84,8 @@ class MonteCarloGalProf(object):
     def build_lookup_tables(self, 
         logrmin = model_defaults.default_lograd_min, 
         logrmax = model_defaults.default_lograd_max, 
-        Npts_radius_table = model_defaults.Npts_radius_table):
+        Npts_radius_table = model_defaults.Npts_radius_table, 
+        use_cache = True):
         """ Method used to create a lookup table of the radial profile 
         and velocity profile.  
 
@@ -87,15 +103,33 @@ class MonteCarloGalProf(object):
             Number of control points used in the spline. 
             Default is set in `~halotools.empirical_models.model_defaults`. 
 
+        use_cache : bool, optional 
+            If True, the lookup tables are loaded from the Halotools cache 
+            if tables with the same profile model, cosmology, redshift, 
+            mass definition and binning have previously been built, 
+            and are stored in the cache after being built otherwise. 
+            Default is True. 
+
+        Notes 
+        -----
+        The lookup tables are dense numpy grids. ``rad_prof_func_table`` stores 
+        the log of the dimensionless radius as a function of the profile parameters 
+        and the log of the cumulative mass PDF, and ``vel_prof_func_table`` stores 
+        the dimensionless radial velocity dispersion as a function of the 
+        profile parameters and the log of the dimensionless radius. 
+        Monte Carlo realizations are drawn by multi-linear interpolation 
+        of these grids, see `~halotools.empirical_models.model_helpers.multilinear_interpolation`. 
+
+        Cached tables are memory-mapped, so that the processes populating 
+        a mock in parallel share a single copy of the tables. 
+        Cached tables are keyed by a hash of the source code of the profile model, 
+        so modifying the model invalidates the tables built by the previous code. 
         """
         key = self.prof_param_keys[0]
         if not hasattr(self, '_' + key + '_lookup_table_min'):
             raise HalotoolsError("You must first call _setup_lookup_tables"
                 "to determine the grids before building the lookup tables")
 
-        modelname = self.__class__.__name__
-        print("\n...Building lookup tables for the %s radial profile." % modelname)
-        
         radius_array = np.logspace(logrmin, logrmax, Npts_radius_table)
         self.logradius_array = np.log10(radius_array)
 
@@ -108,26 +142,31 @@ class MonteCarloGalProf(object):
             profile_params = np.linspace(parmin,parmax,npts_par)
             profile_params_list.append(profile_params)
             setattr(self, '_' + prof_param_key + '_lookup_table_bins', profile_params)
+
+        if (use_cache is True) and (len(profile_params_list) > 0):
+            cache_key = self._lookup_table_cache_key(logrmin, logrmax, Npts_radius_table)
+            if self._load_cached_lookup_tables(cache_key) is True:
+                return
+
+        modelname = self.__class__.__name__
+        print("\n...Building lookup tables for the %s radial profile." % modelname)
         
         # Using the itertools product method requires 
         # special handling of the length-zero edge case
         if len(profile_params_list) == 0:
             self.rad_prof_func_table = np.array([])
-            self.rad_prof_func_table_indices = np.array([])
+            self.vel_prof_func_table = np.array([])
         else:
-            func_table = []
-            velocity_func_table = []
+            log_cdf_tables = []
+            velocity_tables = []
             start = time()
             for ii, items in enumerate(product(*profile_params_list)):
                 table_ordinates = self.cumulative_mass_PDF(radius_array,*items)
-                log_table_ordinates = np.log10(table_ordinates)
-                funcobj = custom_spline(log_table_ordinates, self.logradius_array, k=4)
-                func_table.append(funcobj)
+                log_cdf_tables.append(np.log10(table_ordinates))
 
                 velocity_table_ordinates = self.dimensionless_velocity_dispersion(
                     radius_array, *items)
-                velocity_funcobj = custom_spline(self.logradius_array, velocity_table_ordinates)
-                velocity_func_table.append(velocity_funcobj)
+                velocity_tables.append(velocity_table_ordinates)
                 # Print a message for the expected runtime of the table build
                 if ii == 9:
                     current_lookup_time = time() - start
@@ -137,13 +176,84 @@ class MonteCarloGalProf(object):
                         )
                     print("    (This will take about %.0f seconds, and only needs to be done once)" % runtime)
 
+            # The dense grids are refined from the radius_array 
+            # by evaluating a spline of the table of each combination of profile parameters
+            npts_dense = _lookup_table_refinement*(Npts_radius_table - 1) + 1
+            self._log_cdf_lookup_table = np.linspace(
+                np.min([log_cdf[0] for log_cdf in log_cdf_tables]), 
+                np.max([log_cdf[-1] for log_cdf in log_cdf_tables]), npts_dense)
+            self._logradius_lookup_table = np.linspace(logrmin, logrmax, npts_dense)
+
+            rad_prof_table = []
+            vel_prof_table = []
+            for log_cdf, velocity_table_ordinates in zip(log_cdf_tables, velocity_tables):
+                funcobj = custom_spline(log_cdf, self.logradius_array, k=4)
+                logr = funcobj(self._log_cdf_lookup_table)
+                # Values of the cumulative mass PDF outside the table of these profile parameters 
+                # correspond to radii outside [logrmin, logrmax]
+                logr = np.where(self._log_cdf_lookup_table < log_cdf[0], logrmin, logr)
+                logr = np.where(self._log_cdf_lookup_table > log_cdf[-1], logrmax, logr)
+                rad_prof_table.append(np.clip(logr, logrmin, logrmax))
+
+                velocity_funcobj = custom_spline(self.logradius_array, velocity_table_ordinates)
+                vel_prof_table.append(velocity_funcobj(self._logradius_lookup_table))
+
             profile_params_dimensions = [len(profile_params) for profile_params in profile_params_list]
-            self.rad_prof_func_table = np.array(func_table).reshape(profile_params_dimensions)
-            self.vel_prof_func_table = np.array(velocity_func_table).reshape(profile_params_dimensions)
+            self.rad_prof_func_table = np.array(rad_prof_table).reshape(
+                profile_params_dimensions + [npts_dense])
+            self.vel_prof_func_table = np.array(vel_prof_table).reshape(
+                profile_params_dimensions + [npts_dense])
+
+            if use_cache is True:
+                self._save_cached_lookup_tables(cache_key)
+
+    def _lookup_table_cache_key(self, logrmin, logrmax, Npts_radius_table):
+        """ Private method returning a dictionary of everything the lookup tables depend on. 
+        """
+        binning = []
+        for key in self.prof_param_keys:
+            binning.append([key] + [float(getattr(self, '_' + key + '_lookup_table_' + suffix)) 
+                for suffix in ('min', 'max', 'spacing')])
+
+        redshift = getattr(self, 'redshift', None)
+        if redshift is not None:
+            redshift = float(redshift)
+
+        cache_key = {'profile_model': self.__class__.__name__, 
+            'cosmology': repr(getattr(self, 'cosmology', None)), 
+            'redshift': redshift, 'mdef': getattr(self, 'mdef', None), 
+            'binning': binning, 'logrmin': float(logrmin), 'logrmax': float(logrmax), 
+            'Npts_radius_table': int(Npts_radius_table), 
+            'refinement': _lookup_table_refinement, 
+            'version': _lookup_table_cache_version, 
+            'source_hash': _profile_source_hash(self.__class__)}
+        return cache_key
+
+    def _load_cached_lookup_tables(self, cache_key):
+        """ Private method binding memory-maps of the cached lookup tables with ``cache_key``. 
+        Returns False if there are no such tables in the cache. 
+        """
+        dirname = cache_config.get_cached_lookup_tables_dir(self.__class__.__name__, cache_key)
+        tables = cache_config.load_cached_lookup_tables(dirname, cache_key)
+        if (tables is None) or (set(tables.keys()) != set(_cached_lookup_table_names)):
+            return False
 
-            self.rad_prof_func_table_indices = (
-                np.arange(np.prod(profile_params_dimensions)).reshape(profile_params_dimensions)
-                )
+        for name, table in tables.items():
+            setattr(self, name, table)
+        return True
+
+    def _save_cached_lookup_tables(self, cache_key):
+        """ Private method storing the lookup tables in the cache under ``cache_key``. 
+        """
+        dirname = cache_config.get_cached_lookup_tables_dir(self.__class__.__name__, cache_key)
+        tables = {name: getattr(self, name) for name in _cached_lookup_table_names}
+        cache_config.store_cached_lookup_tables(dirname, cache_key, tables)
+
+    def _lookup_table_grid_axes(self):
+        """ Private method returning the grid points of the profile parameters 
+        of the lookup tables, one array per element of ``self.prof_param_keys``. 
+        """
+        return [getattr(self, '_' + key + '_lookup_table_bins') for key in self.prof_param_keys]
 
     def _mc_dimensionless_radial_distance(self, **kwargs):
         """ Method to generate Monte Carlo realizations of the profile model. 
@@ -174,44 +284,15 @@ class MonteCarloGalProf(object):
         # Draw random values for the cumulative mass PDF         
         # These will be turned into random radial positions 
         # by inverting the tabulated cumulative_mass_PDF
-        if 'seed' in kwargs.keys():
-            np.random.seed(kwargs['seed'])
-        rho = np.random.random(len(profile_params[0]))
-
-        # Discretize each profile parameter for every galaxy
-        # Store the collection of arrays in digitized_param_list 
-        # The number of elements of digitized_param_list is the number of profile parameters in the model
-        digitized_param_list = []
-        for param_index, param_key in enumerate(self.prof_param_keys):
-            input_profile_params = convert_to_ndarray(profile_params[param_index])
-            param_bins = getattr(self, '_' + param_key + '_lookup_table_bins')
-            digitized_params = np.digitize(input_profile_params, param_bins)
-            digitized_param_list.append(digitized_params)
-        # Each element of digitized_param_list is a length-Ngals array. 
-        # The i^th element of each array contains the bin index of 
-        # the discretized profile parameter of the galaxy. 
-        # So if self.NFWmodel_conc_lookup_table_bins = [4, 5, 6, 7,...], 
-        # and the i^th entry of the first argument in the input profile_params is 6.7, 
-        # then the i^th entry of the array stored in the 
-        # first element in digitized_param_list will be 3. 
-
-        # Now we have a collection of arrays storing indices of individual 
-        # profile parameters, [A_0, A_1, A_2, ...], [B_0, B_1, B_2, ...], etc. 
-        # For the combination of profile parameters [A_0, B_0, ...], we need 
-        # the profile function object f_0, which we need to then evaluate 
-        # on the randomly generated rho[0], and likewise for 
-        # [A_i, B_i, ...], f_i, and rho[i], for i = 0, ..., Ngals-1.
-        # To do this, we first determine the index in the profile function table 
-        # where the relevant function object is stored:
-        rad_prof_func_table_indices = (
-            self.rad_prof_func_table_indices[digitized_param_list]
-            )
-        # Now we have an array of indices for our functions, and we need to evaluate 
-        # the i^th function on the i^th element of rho. 
-        # Call the model_helpers module to access generic code for doing this.
+        rng = random_stream(kwargs.get('seed', None))
+        rho = rng.random_sample(len(profile_params[0]))
+
+        # Interpolate the inverse of the tabulated cumulative mass PDF 
+        # for all galaxies at once 
         # (Remember that the interpolation is being done in log-space)
-        return 10.**call_func_table(
-            self.rad_prof_func_table, np.log10(rho), rad_prof_func_table_indices)
+        grid_axes = self._lookup_table_grid_axes() + [self._log_cdf_lookup_table]
+        coords = [convert_to_ndarray(p) for p in profile_params] + [np.log10(rho)]
+        return 10.**multilinear_interpolation(grid_axes, self.rad_prof_func_table, *coords)
 
     def mc_unit_sphere(self, Npts, **kwargs):
         """ Returns Npts random points on the unit sphere. 
@@ -230,11 +311,10 @@ class MonteCarloGalProf(object):
             Length-Npts arrays of the coordinate positions. 
 
         """
-        if 'seed' in kwargs:
-            np.random.seed(kwargs['seed'])
+        rng = random_stream(kwargs.get('seed', None))
 
-        cos_t = np.random.uniform(-1.,1.,Npts)
-        phi = np.random.uniform(0,2*np.pi,Npts)
+        cos_t = rng.uniform(-1.,1.,Npts)
+        phi = rng.uniform(0,2*np.pi,Npts)
         sin_t = np.sqrt((1.-cos_t*cos_t))
 
         x = sin_t * np.cos(phi)
@@ -282,17 +362,16 @@ class MonteCarloGalProf(object):
                     "keyword argument to mc_solid_sphere,\n"
                     "must pass a ``profile_params`` keyword argument")
 
+        # The angles and radial positions are drawn from separate streams of the seed
+        seed = kwargs.get('seed', None)
+
         # get random angles
         Ngals = len(profile_params[0])
-        x, y, z = self.mc_unit_sphere(Ngals, **kwargs)
+        x, y, z = self.mc_unit_sphere(Ngals, seed = stream_seed(seed, 'mc_unit_sphere'))
 
         # Get the radial positions of the galaxies scaled by the halo radius
-        if 'seed' in kwargs:
-            seed = kwargs['seed']
-        else:
-            seed = None
         dimensionless_radial_distance = self._mc_dimensionless_radial_distance(
-            profile_params = profile_params, seed = seed) 
+            profile_params = profile_params, seed = stream_seed(seed, 'radial_distance')) 
 
         # get random positions within the solid sphere
         x *= dimensionless_radial_distance
@@ -451,39 +530,11 @@ class MonteCarloGalProf(object):
 
         if not hasattr(self, 'vel_prof_func_table'):
             self.build_lookup_tables()
-        # Discretize each profile parameter for every galaxy
-        # Store the collection of arrays in digitized_param_list 
-        # The number of elements of digitized_param_list is the number of profile parameters in the model
-        digitized_param_list = []
-        for param_index, param_key in enumerate(self.prof_param_keys):
-            input_profile_params = convert_to_ndarray(profile_params[param_index])
-            param_bins = getattr(self, '_' + param_key + '_lookup_table_bins')
-            digitized_params = np.digitize(input_profile_params, param_bins)
-            digitized_param_list.append(digitized_params)
-        # Each element of digitized_param_list is a length-Ngals array. 
-        # The i^th element of each array contains the bin index of 
-        # the discretized profile parameter of the galaxy. 
-        # So if self.NFWmodel_conc_lookup_table_bins = [4, 5, 6, 7,...], 
-        # and the i^th entry of the first argument in the input profile_params is 6.7, 
-        # then the i^th entry of the array stored in the 
-        # first element in digitized_param_list will be 3. 
-
-        # Now we have a collection of arrays storing indices of individual 
-        # profile parameters, [A_0, A_1, A_2, ...], [B_0, B_1, B_2, ...], etc. 
-        # For the combination of profile parameters [A_0, B_0, ...], we need 
-        # the profile function object f_0, which we need to then evaluate 
-        # on the randomly generated rho[0], and likewise for 
-        # [A_i, B_i, ...], f_i, and rho[i], for i = 0, ..., Ngals-1.
-        # To do this, we first determine the index in the profile function table 
-        # where the relevant function object is stored:
-        vel_prof_func_table_indices = (
-            self.rad_prof_func_table_indices[digitized_param_list]
-            )
-        # Now we have an array of indices for our functions, and we need to evaluate 
-        # the i^th function on the i^th element of rho. 
-        # Call the model_helpers module to access generic code for doing this.
-        dimensionless_radial_dispersions = call_func_table(
-            self.vel_prof_func_table, np.log10(x), vel_prof_func_table_indices)
+        # Interpolate the tabulated velocity dispersion profile for all galaxies at once 
+        grid_axes = self._lookup_table_grid_axes() + [self._logradius_lookup_table]
+        coords = [convert_to_ndarray(p) for p in profile_params] + [np.log10(x)]
+        dimensionless_radial_dispersions = multilinear_interpolation(
+            grid_axes, self.vel_prof_func_table, *coords)
 
         return dimensionless_radial_dispersions
 
@@ -521,14 +572,13 @@ class MonteCarloGalProf(object):
         virial_velocities = convert_to_ndarray(kwargs['virial_velocities'])
         radial_dispersions = virial_velocities*dimensionless_radial_dispersions
 
-        if 'seed' in kwargs.keys():
-            np.random.seed(kwargs['seed'])
+        rng = random_stream(kwargs.get('seed', None))
 
-        radial_velocities = np.random.normal(scale = radial_dispersions)
+        radial_velocities = rng.normal(scale = radial_dispersions)
 
         return radial_velocities
 
-    def mc_vel(self, halo_table):
+    def mc_vel(self, halo_table, seed=None):
         """ Method assigns a Monte Carlo realization of the Jeans velocity 
         solution to the halos in the input ``halo_table``. 
 
@@ -538,6 +588,10 @@ class MonteCarloGalProf(object):
             `astropy.table.Table` object storing the halo catalog. 
             Calling the `mc_vel` method will over-write the existing values of 
             the ``vx``, ``vy`` and ``vz`` columns. 
+
+        seed : int, optional  
+            Random number seed used in Monte Carlo realization. Default is None. 
+            Each velocity component is drawn from a separate stream of the seed. 
         """
         try:
             d = halo_table['host_centric_distance']
@@ -563,13 +617,13 @@ class MonteCarloGalProf(object):
     
         vx = self.mc_radial_velocity(
             virial_velocities = virial_velocities, 
-            x = x, profile_params = profile_params)
+            x = x, profile_params = profile_params, seed = stream_seed(seed, 'vx'))
         vy = self.mc_radial_velocity(
             virial_velocities = virial_velocities, 
-            x = x, profile_params = profile_params)
+            x = x, profile_params = profile_params, seed = stream_seed(seed, 'vy'))
         vz = self.mc_radial_velocity(
             virial_velocities = virial_velocities, 
-            x = x, profile_params = profile_params)
+            x = x, profile_params = profile_params, seed = stream_seed(seed, 'vz'))
 
 
         halo_table['vx'][:] = halo_table['halo_vx'] + vx
@@ -594,3 +648,38 @@ class MonteCarloGalProf(object):
 
 
         
+
+
+# Hashes of the source code of the profile models, computed once per class
+_profile_source_hashes = {}
+
+def _profile_source_hash(cls):
+    """ Hash of the source code of the Halotools modules defining the classes 
+    ``cls`` inherits from, and of the Halotools modules these modules import from. 
+    Used to invalidate the cached lookup tables when the code of the profile model changes. 
+    """
+    if cls not in _profile_source_hashes:
+        modnames = set(base.__module__ for base in inspect.getmro(cls) 
+            if base.__module__.split('.')[0] == 'halotools')
+        # Include the modules of the functions and classes the profile code calls, 
+        # e.g., the spline used to build the tables
+        for modname in list(modnames):
+            for obj in vars(sys.modules[modname]).values():
+                if inspect.ismodule(obj):
+                    modnames.add(obj.__name__)
+                elif inspect.isfunction(obj) or inspect.isclass(obj):
+                    modnames.add(obj.__module__)
+        modnames = sorted(modname for modname in modnames 
+            if modname.split('.')[0] == 'halotools')
+
+        source_hash = hashlib.sha1()
+        for modname in modnames:
+            try:
+                source = inspect.getsource(sys.modules[modname])
+            except (IOError, TypeError, KeyError):
+                source = modname
+            if not isinstance(source, bytes):
+                source = source.encode('utf-8')
+            source_hash.update(source)
+        _profile_source_hashes[cls] = source_hash.hexdigest()
+    return _profile_source_hashes[cls]
@@ -12,6 +12,8 @@ import numpy as np
 from .profile_models import *
 from .velocity_models import *
 from .monte_carlo_phase_space import *
+from .model_helpers import random_stream, stream_seed
+from ..utils.array_utils import convert_to_ndarray
 from . import model_defaults
 from ..sim_manager import sim_defaults
 
@@ -22,7 +24,7 @@ class NFWPhaseSpace(NFWProfile, NFWJeansVelocity, MonteCarloGalProf):
 
     """
 
-    def __init__(self, high_precision = False, **kwargs):
+    def __init__(self, high_precision = False, exact_sampling = False, **kwargs):
         """
         Parameters 
         ----------
@@ -59,6 +61,14 @@ class NFWPhaseSpace(NFWProfile, NFWJeansVelocity, MonteCarloGalProf):
             to ``default_high_prec_dconc`` in `~halotools.empirical_models.model_defaults`.
             If False, spacing is 0.5. Default is False. 
 
+        exact_sampling : bool, optional 
+            If set to True, satellite radii are drawn by exactly inverting the 
+            NFW cumulative mass PDF of each galaxy's own concentration, and radial 
+            velocity dispersions are computed from the analytical Jeans solution, 
+            so that no lookup tables need to be built. 
+            If False, both are interpolated from the lookup tables 
+            in concentration bins. Default is False. 
+
         """        
         NFWProfile.__init__(self, **kwargs)
         NFWJeansVelocity.__init__(self, **kwargs)
@@ -78,14 +88,85 @@ class NFWPhaseSpace(NFWProfile, NFWJeansVelocity, MonteCarloGalProf):
                 )
 
         self._setup_lookup_tables((cmin, cmax, dc))
+        self._exact_sampling = exact_sampling
 
         self._mock_generation_calling_sequence = ['assign_phase_space']
 
-    def assign_phase_space(self, halo_table):
+    def assign_phase_space(self, halo_table, seed=None):
+        """
+        """
+        self.mc_pos(halo_table = halo_table, seed = stream_seed(seed, 'mc_pos'))
+        self.mc_vel(halo_table = halo_table, seed = stream_seed(seed, 'mc_vel'))
+
+    def _mc_dimensionless_radial_distance(self, **kwargs):
+        """ Method to generate Monte Carlo realizations of the NFW profile. 
+
+        If the model was instantiated with ``exact_sampling`` set to True, 
+        the radii are computed with 
+        `~halotools.empirical_models.NFWProfile.inverse_cumulative_mass_PDF` 
+        using the continuous concentration of each galaxy. Otherwise, 
+        the behavior is that of 
+        `~halotools.empirical_models.MonteCarloGalProf._mc_dimensionless_radial_distance`. 
+
+        Parameters 
+        ----------
+        profile_params : list
+            List containing a single length-Ngals array of NFW concentrations. 
+
+        seed : int, optional  
+            Random number seed used in Monte Carlo realization. Default is None. 
+
+        Returns 
+        -------
+        r : array 
+            Length-Ngals array containing the radial position of galaxies within their halos, 
+            scaled by the size of the halo's boundary, so that :math:`0 < r < 1`. 
         """
+        if not self._exact_sampling:
+            return MonteCarloGalProf._mc_dimensionless_radial_distance(self, **kwargs)
+
+        conc = convert_to_ndarray(kwargs['profile_params'][0])
+
+        # Use the same random stream as the lookup-table method, 
+        # so that both methods map the same uniform draws to radii
+        rng = random_stream(kwargs.get('seed', None))
+        rho = rng.random_sample(len(conc))
+
+        return self.inverse_cumulative_mass_PDF(rho, conc)
+
+    def _vrad_disp_from_lookup(self, **kwargs):
+        """ Method returns the radial velocity dispersion of galaxies 
+        scaled by the virial velocity of their halos. 
+
+        If the model was instantiated with ``exact_sampling`` set to True, 
+        the dispersions are computed directly from 
+        `~halotools.empirical_models.NFWJeansVelocity.dimensionless_velocity_dispersion`. 
+        Otherwise, the behavior is that of 
+        `~halotools.empirical_models.MonteCarloGalProf._vrad_disp_from_lookup`. 
+
+        Parameters 
+        ----------
+        x : array_like 
+            Halo-centric distance scaled by the halo boundary, so that 
+            :math:`0 <= x <= 1`. Can be a scalar or length-Ngals numpy array
+
+        profile_params : list
+            List containing a single length-Ngals array of NFW concentrations. 
+
+        Returns 
+        -------
+        sigma_vr : array 
+            Length-Ngals array containing the radial velocity dispersion 
+            of galaxies within their halos, 
+            scaled by the size of the halo's virial velocity. 
         """
-        self.mc_pos(halo_table = halo_table)
-        self.mc_vel(halo_table = halo_table)
+        if not self._exact_sampling:
+            return MonteCarloGalProf._vrad_disp_from_lookup(self, **kwargs)
+
+        x = convert_to_ndarray(kwargs['x'])
+        x = x.astype(float)
+        conc = convert_to_ndarray(kwargs['profile_params'][0])
+        return self.dimensionless_velocity_dispersion(x, conc)
 
 
     def mc_generate_phase_space_points(self, Ngals = 1e4, conc=5, mass = 1e12):
@@ -194,8 +275,10 @@ class TrivialPhaseSpace(object):
         self.mdef = mdef 
         self.halo_boundary_key = model_defaults.get_halo_boundary_key(self.mdef)
 
-    def assign_phase_space(self, halo_table):
-        """
+    def assign_phase_space(self, halo_table, seed=None):
+        """ Assign the phase space coordinates of the host halos to the galaxies. 
+        The ``seed`` argument is accepted for consistency with the other 
+        phase space models, but no randoms are drawn. 
         """
         phase_space_keys = ['x', 'y', 'z', 'vx', 'vy', 'vz']
         for key in phase_space_keys:
@@ -14,8 +14,8 @@ from .conc_mass_models import ConcMass
 from profile_helpers import *
 from ..utils.array_utils import convert_to_ndarray
 from ..custom_exceptions import *
-from scipy.integrate import quad as quad_integration
 from scipy.optimize import minimize as scipy_minimize
+from scipy.special import lambertw
 
 from astropy import units as u
 from astropy.constants import G
@@ -25,6 +25,9 @@ __author__ = ['Andrew Hearin', 'Benedikt Diemer']
 
 __all__ = ['AnalyticDensityProf', 'TrivialProfile', 'NFWProfile']
 
+# Number of nodes used in the Gauss-Legendre quadrature of the enclosed mass
+_gauss_legendre_num_nodes = 64
+
 @six.add_metaclass(ABCMeta)
 class AnalyticDensityProf(object):
     """ Container class for any analytical radial profile model. 
@@ -192,19 +195,31 @@ class AnalyticDensityProf(object):
         """
         x = convert_to_ndarray(x)
         x = x.astype(np.float64)
-        enclosed_mass = np.zeros_like(x)
+        args = [np.asarray(arg)[..., np.newaxis] for arg in args]
 
-        for i in range(len(x)):
-            enclosed_mass[i], _ = quad_integration(
-                self._enclosed_dimensionless_mass_integrand, 0., x[i], epsrel = 1e-5, 
-                args = args)
-    
-        total, _ = quad_integration(
-                self._enclosed_dimensionless_mass_integrand, 0., 1.0, epsrel = 1e-5, 
-                args = args)
+        enclosed_mass = self._enclosed_dimensionless_mass(x, *args)
+        total = self._enclosed_dimensionless_mass(np.ones_like(x), *args)
 
         return enclosed_mass / total
 
+    def _enclosed_dimensionless_mass(self, x, *args):
+        """
+        Vectorized Gauss-Legendre quadrature of 
+        `_enclosed_dimensionless_mass_integrand` from zero to ``x``. 
+
+        The integral is computed in the variable :math:`s = \\sqrt{x'/x}`, 
+        which regularizes the cusp of the integrand at the halo center. 
+        Each element of ``args`` must already be broadcastable 
+        against an array of shape ``x.shape + (num_nodes, )``. 
+        """
+        nodes, weights = np.polynomial.legendre.leggauss(_gauss_legendre_num_nodes)
+        s = 0.5*(nodes + 1.)
+        weights = 0.5*weights
+
+        x = x[..., np.newaxis]
+        integrand = self._enclosed_dimensionless_mass_integrand(x*s**2, *args)
+        return np.sum(weights*2*x*s*integrand, axis=-1)
+
     def enclosed_mass(self, radius, total_mass, *args):
         """
         The mass enclosed within the input radius. 
@@ -605,6 +620,56 @@ class NFWProfile(AnalyticDensityProf, ConcMass):
         x = np.where(x > 1, 1, x)
         return self.g(conc*x) / self.g(conc)
 
+    def inverse_cumulative_mass_PDF(self, p, conc):
+        """
+        The dimensionless radius :math:`x = r / R_{\\rm halo}` enclosing 
+        the input fraction of the total mass, i.e., the inverse of `cumulative_mass_PDF`. 
+
+        Writing :math:`y = cx` and :math:`q = p\\times g(c)`, the equation 
+        :math:`g(y) = q` has the exact solution 
+        :math:`y = -1 - 1/W_{0}(-e^{-1-q})`, where :math:`W_{0}` is 
+        the principal branch of the Lambert W function. 
+        A single Newton step polishes the result to machine precision. 
+        Close to the branch point of :math:`W_{0}`, for :math:`q < 10^{-6}`, 
+        the series inversion of :math:`g(y) = y^{2}/2 - 2y^{3}/3 + ...` is used instead. 
+
+        Parameters
+        -------------
+        p: array_like
+            Fraction of the total mass enclosed, such that :math:`0 <= p <= 1`. 
+            Can be a scalar or a numpy array.
+
+        conc : array_like 
+            Value of the halo concentration. Can either be a scalar, or a numpy array 
+            of the same dimension as the input ``p``. 
+            
+        Returns
+        -------------
+        x: array_like
+            Halo-centric distance scaled by the halo boundary, 
+            with the same dimensions as the input ``p``. 
+        """
+        p = convert_to_ndarray(p).astype(float)
+        q = np.clip(p, 0, 1)*self.g(conc)
+
+        # For small q, the argument of W_0 rounds to or below the branch point -1/e, 
+        # and the evaluation of g(y) in the Newton step suffers from cancellation
+        small = q < 1.e-6
+        safe_q = np.where(small, 1., q)
+        w = lambertw(-np.exp(-1. - safe_q), 0).real
+        y = -1. - 1./w
+
+        # Polish the root with one Newton step on g(y) = q
+        y = y - (self.g(y) - safe_q)*(1. + y)**2/y
+
+        s = np.sqrt(2.*np.where(small, q, 0.))
+        y_series = s*(1. + s*(2./3. + s*(13./36. + s*23./135.)))
+        y = np.where(small, y_series, y)
+
+        x = np.clip(y/conc, 0, 1)
+        x = np.where(p <= 0, 0., x)
+        return np.where(p >= 1, 1., x)
+
 ### The current implementation of the Jeans solutions will not be correct for the BiasedNFWProfile class
 # class BiasedNFWProfile(NFWProfile):
 #     """ NFW halo profile, based on Navarro, Frenk and White (1999), 
@@ -113,11 +113,11 @@ class BinaryGalpropModel(model_helpers.GalPropModel):
             Array storing the values of the primary galaxy property 
             of the galaxies living in the input halos. 
         """
-        np.random.seed(seed=seed)
+        rng = model_helpers.random_stream(seed)
 
         mean_func = getattr(self, 'mean_'+self.galprop_key+'_fraction')
         mean_galprop_fraction = mean_func(**kwargs)
-        mc_generator = np.random.random(custom_len(mean_galprop_fraction))
+        mc_generator = rng.random_sample(custom_len(mean_galprop_fraction))
         return np.where(mc_generator < mean_galprop_fraction, True, False)
 
 class BinaryGalpropInterpolModel(BinaryGalpropModel):
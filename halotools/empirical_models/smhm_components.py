@@ -139,9 +139,9 @@ class LogNormalScatterModel(object):
 
         scatter_scale = self.mean_scatter(**kwargs)
 
-        np.random.seed(seed=seed)
+        rng = model_helpers.random_stream(seed)
             
-        return np.random.normal(loc=0, scale=scatter_scale)
+        return rng.normal(loc=0, scale=scatter_scale)
 
     def _update_interpol(self):
         """ Private method that updates the interpolating functon used to 
@@ -156,7 +156,8 @@ class LogNormalScatterModel(object):
 
         self.ordinates = [self.param_dict[self._get_param_key(i)] for i in range(len(self.abcissa))]
 
-        self.spline_function = model_helpers.custom_spline(
+        # The interpolant is only rebuilt when the values in param_dict have changed
+        self.spline_function = model_helpers.cached_interpolant(self, 'scatter', 
             self.abcissa, self.ordinates, k=self.spline_degree)
 
     def _initialize_param_dict(self):
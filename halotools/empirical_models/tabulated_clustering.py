@@ -0,0 +1,776 @@
+# -*- coding: utf-8 -*-
+"""
+Module used to predict the clustering of HOD-style models
+from tables of halo pair counts, without populating a mock catalog.
+The tables are computed once per halo catalog and stored in the Halotools cache,
+after which the two-point function, the galaxy-matter cross-correlation
+and the galaxy-galaxy lensing signal of any set of HOD parameters
+are weighted sums over the tables.
+"""
+
+__author__ = ['Andrew Hearin']
+__all__ = ['TabulatedHodClustering']
+
+import numpy as np
+import hashlib
+from astropy import units as u
+
+from . import model_defaults
+from .model_helpers import enforce_periodicity_of_box, stream_seed
+from .monte_carlo_phase_space import _profile_source_hash
+from ..custom_exceptions import HalotoolsError
+from ..sim_manager import sim_defaults
+from ..sim_manager import cache_config
+
+try:
+    from ..mock_observables.pair_counters.rect_cuboid_pairs import (
+        label_npairs, xy_z_label_npairs)
+    from ..mock_observables.lensing import _delta_sigma_from_enclosed_mass
+    HAS_MOCKOBS = True
+except ImportError:
+    HAS_MOCKOBS = False
+
+# Version of the format of the pair count tables stored in the Halotools cache.
+# Increment to invalidate all previously cached tables.
+_pair_count_table_cache_version = 2
+
+# Maximum number of same-halo satellite tracer pairs held in memory at once
+_max_one_halo_pairs_per_chunk = int(1e6)
+
+class TabulatedHodClustering(object):
+    """ Class used to predict the galaxy two-point function of
+    an HOD-style model from pre-computed tables of halo pair counts.
+
+    Halos are binned in the primary halo property of the model.
+    For every pair of bins, the tables store the cumulative number of pairs
+    of halo centers, of halo centers and satellite tracers, and of satellite tracers,
+    where the satellite tracers are Monte Carlo draws from the profile model
+    of the satellites of each halo. The tables of same-halo pairs are stored separately.
+    The expected galaxy pair counts of any set of model parameters are then
+    sums over these tables weighted by the mean occupations of the halos in each bin,
+    so that no mock needs to be populated.
+    If ``include_matter`` is True, the cumulative number of dark matter particles
+    around the halo centers and satellite tracers of each bin is tabulated as well,
+    from which the galaxy-matter cross-correlation and the
+    excess surface density :math:`\\Delta\\Sigma` of galaxy-galaxy lensing are predicted.
+
+    Galaxies whose profile model has no ``prof_param_keys``, e.g.,
+    `~halotools.empirical_models.TrivialPhaseSpace` centrals,
+    are placed at the halo center. Galaxy types with an occupation
+    ``upper_bound`` of 1 are assumed to have nearest-integer occupation statistics,
+    all others Poisson occupation statistics,
+    as in `~halotools.empirical_models.OccupationComponent`.
+    """
+
+    def __init__(self, snapshot, model,
+        rbins = model_defaults.default_rbins, rp_bins = None, pi_bins = None,
+        logmass_bin_width = 0.1, num_satellite_tracers = 5, seed = 43,
+        include_matter = False, N_threads = 1, use_cache = True):
+        """
+        Parameters
+        ----------
+        snapshot : object
+            Object containing the halo catalog, e.g.,
+            `~halotools.sim_manager.supported_sims.HaloCatalog`.
+
+        model : object
+            A model built by `~halotools.empirical_models.HodModelFactory`.
+
+        rbins : array, optional
+            Bins in which the correlation function will be calculated.
+            Default is set in `~halotools.empirical_models.model_defaults` module.
+
+        rp_bins : array, optional
+            Bins in projected separation in which the projected correlation function
+            and :math:`\\Delta\\Sigma` will be calculated.
+            Default is None, in which case neither are computed.
+
+        pi_bins : array, optional
+            Bins in line-of-sight separation used to integrate the
+            projected correlation function. Requires ``rp_bins``.
+            Default is None, in which case the projected correlation function
+            is not computed.
+
+        logmass_bin_width : float, optional
+            Width in dex of the bins of the primary halo property. Default is 0.1.
+
+        num_satellite_tracers : int, optional
+            Number of Monte Carlo draws from the satellite profile of each halo.
+            The cost of computing the tables grows with the square of
+            ``num_satellite_tracers``. Default is 5.
+
+        seed : int, optional
+            Random number seed used to draw the satellite tracers. Default is 43.
+
+        include_matter : bool, optional
+            If True, the pairs of halo centers and satellite tracers with the
+            particles of ``snapshot.ptcl_table`` are also tabulated, as required by
+            `compute_galaxy_matter_cross_clustering` and `compute_delta_sigma`.
+            Default is False.
+
+        N_threads : int, optional
+            Number of processes used to count pairs. Default is 1.
+
+        use_cache : bool, optional
+            If True, the tables are loaded from the Halotools cache
+            if tables have previously been computed for the same halos, binning,
+            profile model and satellite tracers,
+            and are stored in the cache after being computed otherwise.
+            Default is True.
+        """
+        if HAS_MOCKOBS is False:
+            msg = ("\nThe TabulatedHodClustering class is only available "
+                " if the mock_observables sub-package has been compiled.\n"
+                "You are likely encountering this error because you are using \nyour Halotools repository "
+                "as your working directory."
+                )
+            raise HalotoolsError(msg)
+
+        if (pi_bins is not None) & (rp_bins is None):
+            raise HalotoolsError("pi_bins must be passed together with rp_bins "
+                "to TabulatedHodClustering")
+        if int(num_satellite_tracers) < 2:
+            raise HalotoolsError("num_satellite_tracers must be at least 2")
+        if hasattr(model, 'galaxy_selection_func'):
+            raise HalotoolsError("TabulatedHodClustering does not support "
+                "models with a galaxy_selection_func")
+
+        self.snapshot = snapshot
+        self.model = model
+        self.Lbox = float(snapshot.Lbox)
+        self.rbins = np.asarray(rbins, dtype=float)
+        self.rp_bins = None if rp_bins is None else np.asarray(rp_bins, dtype=float)
+        self.pi_bins = None if pi_bins is None else np.asarray(pi_bins, dtype=float)
+        self.include_matter = include_matter
+        self.num_satellite_tracers = int(num_satellite_tracers)
+        self.seed = seed
+        self.N_threads = N_threads
+
+        self._set_gal_type_attributes()
+        self._preprocess_halo_catalog()
+        self._set_mass_bins(logmass_bin_width)
+        if self.include_matter is True:
+            self._preprocess_particle_catalog()
+
+        self._tables = None
+        if use_cache is True:
+            cache_key = self._cache_key()
+            cache_dirname = cache_config.get_cached_lookup_tables_dir(
+                self.__class__.__name__, cache_key)
+            self._tables = cache_config.load_cached_lookup_tables(cache_dirname, cache_key)
+        if self._tables is None:
+            self._tables = self._compute_tables()
+            if use_cache is True:
+                cache_config.store_cached_lookup_tables(cache_dirname, cache_key, self._tables)
+
+    def _set_gal_type_attributes(self):
+        """ Private method determining, for each ``gal_type`` of the model,
+        whether the galaxies reside at the halo center or trace the satellite profile,
+        and the profile model of the satellite tracers.
+        """
+        self._gal_type_position = {}
+        self._gal_type_is_poisson = {}
+        self._satellite_profile = None
+        for gal_type in self.model.gal_types:
+            prof_model = self.model.model_blueprint[gal_type]['profile']
+            if len(getattr(prof_model, 'prof_param_keys', [])) == 0:
+                self._gal_type_position[gal_type] = 'cen'
+            else:
+                if self._satellite_profile is not None:
+                    raise HalotoolsError("TabulatedHodClustering only supports models "
+                        "with a single gal_type distributed according to a halo profile")
+                self._gal_type_position[gal_type] = 'sat'
+                self._satellite_profile = prof_model
+
+            occupation_model = self.model.model_blueprint[gal_type]['occupation']
+            self._gal_type_is_poisson[gal_type] = (
+                getattr(occupation_model, '_upper_bound', 1) != 1)
+
+    def _preprocess_halo_catalog(self):
+        """ Private method selecting the halos that can host galaxies,
+        with the same cuts as `~halotools.empirical_models.HodMockFactory`.
+        """
+        halo_table = self.snapshot.host_halos
+        cutoff_mvir = sim_defaults.Num_ptcl_requirement*self.snapshot.particle_mass
+        halo_table = halo_table[halo_table['halo_mvir'] > cutoff_mvir]
+
+        if hasattr(self.model, 'halocut_funcobj'):
+            halo_table = self.model.halocut_funcobj(halo_table=halo_table)
+
+        if hasattr(self.model, 'new_haloprop_func_dict'):
+            for new_haloprop_key, new_haloprop_func in self.model.new_haloprop_func_dict.iteritems():
+                halo_table[new_haloprop_key] = new_haloprop_func(halo_table=halo_table)
+
+        if len(halo_table) == 0:
+            raise HalotoolsError("No halos of the snapshot pass the cuts of the model")
+        self.halo_table = halo_table
+
+        self._halo_pos = np.vstack([np.asarray(halo_table['halo_'+key], dtype=float)
+            for key in ('x', 'y', 'z')]).T
+
+    def _preprocess_particle_catalog(self):
+        """ Private method storing the positions of the dark matter particles
+        and the mass each particle represents.
+
+        ``snapshot.ptcl_table`` is a random downsampling of the particles
+        of the simulation, so each particle of the table represents the mass
+        :math:`\\bar{\\rho}_{\\rm m}L_{\\rm box}^{3}/N_{\\rm ptcl}`, in :math:`M_{\\odot}/h`,
+        where the mean comoving matter density is computed from ``snapshot.cosmology``.
+        """
+        ptcl_table = self.snapshot.ptcl_table
+        if len(ptcl_table) == 0:
+            raise HalotoolsError("The particle table of the snapshot is empty")
+        self._ptcl_pos = np.vstack([np.asarray(ptcl_table[key], dtype=float)
+            for key in ('x', 'y', 'z')]).T
+
+        cosmology = getattr(self.snapshot, 'cosmology', sim_defaults.default_cosmology)
+        rho_crit0 = cosmology.critical_density0.to(u.Msun/u.Mpc**3).value/cosmology.h**2
+        mean_matter_density = cosmology.Om0*rho_crit0
+        self.ptcl_mass = mean_matter_density*self.Lbox**3/len(self._ptcl_pos)
+
+    def _set_mass_bins(self, logmass_bin_width):
+        """ Private method binding the bins of the primary halo property
+        and the bin of each halo.
+        """
+        occupation_model = self.model.model_blueprint[self.model.gal_types[0]]['occupation']
+        self.prim_haloprop_key = getattr(occupation_model, 'prim_haloprop_key',
+            model_defaults.prim_haloprop_key)
+
+        logmass = np.log10(np.asarray(self.halo_table[self.prim_haloprop_key], dtype=float))
+        logmin = np.floor(logmass.min()/logmass_bin_width)*logmass_bin_width
+        num_bins = int(np.floor((logmass.max() - logmin)/logmass_bin_width)) + 1
+        self.logmass_bins = logmin + logmass_bin_width*np.arange(num_bins + 1)
+
+        self._halo_mass_bin = np.clip(np.digitize(logmass, self.logmass_bins) - 1,
+            0, num_bins - 1)
+        self._num_mass_bins = num_bins
+
+    def _mc_satellite_tracers(self):
+        """ Private method returning the halo-centric positions of the satellite tracers,
+        as an array of shape (Nhalos, num_satellite_tracers, 3).
+        """
+        prof_model = self._satellite_profile
+        num_halos = len(self.halo_table)
+        num_tracers = self.num_satellite_tracers
+
+        profile_params = [np.repeat(np.asarray(getattr(prof_model, key)(halo_table=self.halo_table), dtype=float),
+            num_tracers) for key in prof_model.prof_param_keys]
+        halo_radius = np.repeat(np.asarray(self.halo_table[prof_model.halo_boundary_key], dtype=float),
+            num_tracers)
+
+        x, y, z = prof_model.mc_halo_centric_pos(halo_radius = halo_radius,
+            profile_params = profile_params, seed = stream_seed(self.seed, 'satellite_tracers'))
+        return np.vstack([x, y, z]).T.reshape((num_halos, num_tracers, 3))
+
+    def _compute_tables(self):
+        """ Private method computing the tables of pair counts.
+
+        The tables of pairs in different halos are normalized by the number
+        of pairs of halos in the two mass bins, and the tables of pairs in the same halo
+        by the number of halos in the mass bin.
+        Tables of pairs involving satellite tracers are also normalized by
+        the number of tracers, so that all tables are the mean number of
+        galaxy pairs per pair of halos, or per halo, for unit occupations.
+        """
+        labels = self._halo_mass_bin
+        num_bins = self._num_mass_bins
+        num_tracers = self.num_satellite_tracers
+        period = np.array([self.Lbox]*3)
+        num_halos_per_bin = np.bincount(labels, minlength=num_bins).astype(float)
+
+        separation_bins = [('', (self.rbins, ), label_npairs, _cumulative_counts)]
+        if self.pi_bins is not None:
+            separation_bins.append(('projected_', (self.rp_bins, self.pi_bins),
+                xy_z_label_npairs, _xy_z_cumulative_counts))
+
+        if self._satellite_profile is not None:
+            offsets = self._mc_satellite_tracers()
+            tracer_pos = enforce_periodicity_of_box(
+                self._halo_pos[:, np.newaxis, :] + offsets, self.Lbox).reshape((-1, 3))
+            tracer_labels = np.repeat(labels, num_tracers)
+        else:
+            tracer_pos, tracer_labels = None, None
+
+        tables = {'num_halos_per_bin': num_halos_per_bin}
+        if self.include_matter is True:
+            tables.update(self._compute_matter_tables(tracer_pos, tracer_labels))
+
+        for prefix, bins, label_counter, cumulative_counter in separation_bins:
+            pair_norm = np.outer(num_halos_per_bin, num_halos_per_bin)
+            halo_norm = num_halos_per_bin
+
+            counts = label_counter(self._halo_pos, self._halo_pos, *bins,
+                labels1=labels, labels2=labels, Nlabels1=num_bins, Nlabels2=num_bins,
+                period=period, N_threads=self.N_threads)
+            # Remove the self-pairs of each halo, which have zero separation
+            counts = counts - _diagonal_table(num_halos_per_bin, counts.shape)
+            tables[prefix+'two_halo_cen_cen'] = _normalize_table(counts, pair_norm)
+
+            if self._satellite_profile is None:
+                continue
+
+            # Pairs of halo centers and the satellite tracers of the same halo
+            one_halo_counts = cumulative_counter(offsets.reshape((-1, 3)),
+                tracer_labels, num_bins, *bins)
+            tables[prefix+'one_halo_cen_sat'] = _normalize_table(one_halo_counts,
+                halo_norm*num_tracers)
+
+            counts = label_counter(self._halo_pos, tracer_pos, *bins,
+                labels1=labels, labels2=tracer_labels, Nlabels1=num_bins, Nlabels2=num_bins,
+                period=period, N_threads=self.N_threads)
+            counts = counts - _diagonal_table(one_halo_counts, counts.shape)
+            tables[prefix+'two_halo_cen_sat'] = _normalize_table(counts,
+                pair_norm*num_tracers)
+
+            # Pairs of distinct satellite tracers of the same halo
+            one_halo_counts = self._one_halo_tracer_pair_counts(offsets,
+                cumulative_counter, bins)
+            tables[prefix+'one_halo_sat_sat'] = _normalize_table(one_halo_counts,
+                halo_norm*num_tracers*(num_tracers - 1))
+
+            counts = label_counter(tracer_pos, tracer_pos, *bins,
+                labels1=tracer_labels, labels2=tracer_labels,
+                Nlabels1=num_bins, Nlabels2=num_bins,
+                period=period, N_threads=self.N_threads)
+            # Remove the pairs of tracers of the same halo, and the self-pairs of each tracer
+            counts = counts - _diagonal_table(one_halo_counts, counts.shape)
+            counts = counts - _diagonal_table(num_halos_per_bin*num_tracers, counts.shape)
+            tables[prefix+'two_halo_sat_sat'] = _normalize_table(counts,
+                pair_norm*num_tracers**2)
+
+        return tables
+
+    def _compute_matter_tables(self, tracer_pos, tracer_labels):
+        """ Private method computing the tables of the cumulative number of
+        dark matter particles around the halo centers and the satellite tracers,
+        normalized by the number of halos, and of tracers, in each mass bin.
+
+        The projected tables count the particles within each of ``rp_bins``
+        along the full line-of-sight extent of the periodic box.
+        """
+        num_bins = self._num_mass_bins
+        period = np.array([self.Lbox]*3)
+        num_halos_per_bin = np.bincount(self._halo_mass_bin, minlength=num_bins).astype(float)
+        ptcl_labels = np.zeros(len(self._ptcl_pos), dtype=int)
+
+        separation_bins = [('', (self.rbins, ), label_npairs)]
+        if self.rp_bins is not None:
+            separation_bins.append(('projected_', (self.rp_bins, np.array([self.Lbox/2.])),
+                xy_z_label_npairs))
+
+        sources = [('cen', self._halo_pos, self._halo_mass_bin, num_halos_per_bin)]
+        if self._satellite_profile is not None:
+            sources.append(('sat', tracer_pos, tracer_labels,
+                num_halos_per_bin*self.num_satellite_tracers))
+
+        tables = {}
+        for prefix, bins, label_counter in separation_bins:
+            for pos_name, pos, labels, norm in sources:
+                counts = label_counter(pos, self._ptcl_pos, *bins,
+                    labels1=labels, labels2=ptcl_labels, Nlabels1=num_bins, Nlabels2=1,
+                    period=period, N_threads=self.N_threads)
+                # Drop the particle label axis, and the single line-of-sight bin
+                counts = counts[:, 0].reshape((num_bins, len(bins[0])))
+                tables[prefix+pos_name+'_ptcl'] = _normalize_table(counts, norm)
+        return tables
+
+    def _one_halo_tracer_pair_counts(self, offsets, cumulative_counter, bins):
+        """ Private method counting the pairs of distinct satellite tracers
+        residing in the same halo, in chunks of halos.
+        """
+        num_halos, num_tracers = offsets.shape[0:2]
+        distinct = ~np.eye(num_tracers, dtype=bool)
+        chunk_size = max(1, _max_one_halo_pairs_per_chunk//(num_tracers**2))
+
+        result = 0
+        for first in range(0, num_halos, chunk_size):
+            chunk = offsets[first:first+chunk_size]
+            separation = chunk[:, :, np.newaxis, :] - chunk[:, np.newaxis, :, :]
+            separation = separation[:, distinct, :]
+            result = result + cumulative_counter(separation.reshape((-1, 3)),
+                np.repeat(self._halo_mass_bin[first:first+chunk_size], distinct.sum()),
+                self._num_mass_bins, *bins)
+        return result
+
+    def _cache_key(self):
+        """ Private method returning a dictionary of everything the tables depend on.
+        """
+        halo_hash = hashlib.sha1()
+        halo_hash.update(np.ascontiguousarray(self._halo_pos).tobytes())
+        halo_hash.update(np.ascontiguousarray(self._halo_mass_bin).tobytes())
+
+        cache_key = {'version': _pair_count_table_cache_version,
+            'simname': getattr(self.snapshot, 'simname', None),
+            'halo_finder': getattr(self.snapshot, 'halo_finder', None),
+            'redshift': getattr(self.snapshot, 'redshift', None),
+            'Lbox': self.Lbox,
+            'prim_haloprop_key': self.prim_haloprop_key,
+            'logmass_bins': self.logmass_bins.tolist(),
+            'rbins': self.rbins.tolist(),
+            'rp_bins': None if self.rp_bins is None else self.rp_bins.tolist(),
+            'pi_bins': None if self.pi_bins is None else self.pi_bins.tolist()}
+
+        if self._satellite_profile is not None:
+            prof_model = self._satellite_profile
+            for key in prof_model.prof_param_keys:
+                halo_hash.update(np.ascontiguousarray(getattr(prof_model, key)(
+                    halo_table=self.halo_table), dtype=float).tobytes())
+            halo_hash.update(np.ascontiguousarray(self.halo_table[prof_model.halo_boundary_key],
+                dtype=float).tobytes())
+            cache_key['profile_model'] = prof_model.__class__.__name__
+            cache_key['cosmology'] = repr(getattr(prof_model, 'cosmology', None))
+            cache_key['conc_mass_model'] = getattr(prof_model, 'conc_mass_model', None)
+            cache_key['source_hash'] = _profile_source_hash(prof_model.__class__)
+            cache_key['num_satellite_tracers'] = self.num_satellite_tracers
+            cache_key['seed'] = self.seed
+
+        if self.include_matter is True:
+            ptcl_hash = hashlib.sha1()
+            ptcl_hash.update(np.ascontiguousarray(self._ptcl_pos).tobytes())
+            cache_key['num_ptcl'] = len(self._ptcl_pos)
+            cache_key['ptcl_hash'] = ptcl_hash.hexdigest()
+
+        cache_key['halo_hash'] = halo_hash.hexdigest()
+        return cache_key
+
+    def _mean_occupations(self, param_dict, gal_type):
+        """ Private method returning the list of ``gal_types`` selected by ``gal_type``
+        and the mean occupations of the halos for the model parameters ``param_dict``.
+        """
+        if param_dict is None:
+            param_dict = self.model.param_dict
+        if gal_type is None:
+            gal_types = self.model.gal_types
+        elif gal_type in self.model.gal_types:
+            gal_types = [gal_type]
+        else:
+            raise HalotoolsError("The model has no gal_type %s" % gal_type)
+
+        mean_occupation = self.model.mean_occupation_batch([param_dict],
+            halo_table=self.halo_table)
+        return gal_types, mean_occupation
+
+    def _expected_pair_counts(self, prefix, param_dict, gal_type):
+        """ Private method returning the expected cumulative number of galaxy pairs
+        and the expected number of galaxies for the model parameters ``param_dict``.
+        """
+        gal_types, mean_occupation = self._mean_occupations(param_dict, gal_type)
+        labels = self._halo_mass_bin
+        num_bins = self._num_mass_bins
+
+        weights = {}
+        for gal_type in gal_types:
+            weights[gal_type] = np.bincount(labels,
+                weights=mean_occupation[gal_type][0], minlength=num_bins)
+
+        pair_counts = 0.
+        for gal_type1 in gal_types:
+            pos1 = self._gal_type_position[gal_type1]
+            occupation1 = mean_occupation[gal_type1][0]
+
+            for gal_type2 in gal_types:
+                pos2 = self._gal_type_position[gal_type2]
+                occupation2 = mean_occupation[gal_type2][0]
+
+                # Pairs of galaxies in different halos
+                if (pos1, pos2) == ('sat', 'cen'):
+                    table = np.swapaxes(self._tables[prefix+'two_halo_cen_sat'], 0, 1)
+                else:
+                    table = self._tables[prefix+'two_halo_'+pos1+'_'+pos2]
+                pair_counts = pair_counts + np.tensordot(weights[gal_type1],
+                    np.tensordot(weights[gal_type2], table, axes=(0, 1)), axes=(0, 0))
+
+                # Pairs of galaxies in the same halo
+                if gal_type1 == gal_type2:
+                    if self._gal_type_is_poisson[gal_type1] is False:
+                        continue
+                    pair_weights = occupation1**2
+                else:
+                    pair_weights = occupation1*occupation2
+                pair_weights = np.bincount(labels, weights=pair_weights, minlength=num_bins)
+
+                if (pos1, pos2) == ('cen', 'cen'):
+                    # Central-like galaxies of the same halo have zero separation
+                    pair_counts = pair_counts + pair_weights.sum()
+                else:
+                    table = self._tables[prefix+'one_halo_'+min(pos1, pos2)+'_'+max(pos1, pos2)]
+                    pair_counts = pair_counts + np.tensordot(pair_weights, table, axes=(0, 0))
+
+        num_gals = np.sum([w.sum() for w in weights.values()])
+        return pair_counts, num_gals
+
+    def _expected_matter_pair_counts(self, prefix, param_dict, gal_type):
+        """ Private method returning the expected cumulative number of
+        galaxy-particle pairs and the expected number of galaxies
+        for the model parameters ``param_dict``.
+        """
+        if self.include_matter is False:
+            raise HalotoolsError("TabulatedHodClustering must be instantiated with "
+                "include_matter = True to compute the galaxy-matter cross-correlation")
+        gal_types, mean_occupation = self._mean_occupations(param_dict, gal_type)
+
+        pair_counts, num_gals = 0., 0.
+        for gal_type in gal_types:
+            weights = np.bincount(self._halo_mass_bin,
+                weights=mean_occupation[gal_type][0], minlength=self._num_mass_bins)
+            table = self._tables[prefix+self._gal_type_position[gal_type]+'_ptcl']
+            pair_counts = pair_counts + np.tensordot(weights, table, axes=(0, 0))
+            num_gals += weights.sum()
+        if num_gals == 0:
+            raise HalotoolsError("The model predicts zero galaxies for the input parameters")
+        return pair_counts, num_gals
+
+    def number_density(self, param_dict = None, gal_type = None):
+        """ Expected comoving number density of the galaxies of the model.
+
+        Parameters
+        ----------
+        param_dict : dict, optional
+            Dictionary of model parameters. Any key of ``model.param_dict`` missing
+            from ``param_dict`` takes its value from ``model.param_dict``.
+            Default is ``model.param_dict``.
+
+        gal_type : string, optional
+            If passed, only galaxies of this ``gal_type`` are counted.
+
+        Returns
+        --------
+        number density : float
+            Comoving number density in units of :math:`(h/Mpc)^{3}`.
+        """
+        if param_dict is None:
+            param_dict = self.model.param_dict
+        mean_occupation = self.model.mean_occupation_batch([param_dict],
+            halo_table=self.halo_table)
+        if gal_type is None:
+            num_gals = np.sum([mean_occupation[key].sum() for key in self.model.gal_types])
+        else:
+            num_gals = mean_occupation[gal_type].sum()
+        return num_gals/self.Lbox**3
+
+    def compute_galaxy_clustering(self, param_dict = None, gal_type = None):
+        """ Expected two-point correlation function of the galaxies of the model,
+        estimated in the same way as the ``compute_galaxy_clustering`` method
+        of the mock factories, but without populating a mock.
+
+        Parameters
+        ----------
+        param_dict : dict, optional
+            Dictionary of model parameters. Any key of ``model.param_dict`` missing
+            from ``param_dict`` takes its value from ``model.param_dict``.
+            Default is ``model.param_dict``.
+
+        gal_type : string, optional
+            If passed, the auto-correlation of the galaxies of this ``gal_type``
+            is returned.
+
+        Returns
+        --------
+        rbin_centers : array
+            Midpoint of the bins used in the correlation function calculation
+
+        correlation_func : array
+            Correlation function in the bins defined by ``rbins``.
+
+        Notes
+        -----
+        Within each bin of the primary halo property, galaxies are assumed to occupy
+        halos in proportion to their mean occupation, so that the
+        clustering of models with assembly bias is not captured by the tables.
+
+        Examples
+        --------
+        >>> tab = TabulatedHodClustering(halocat, model) # doctest: +SKIP
+        >>> r, xi = tab.compute_galaxy_clustering() # doctest: +SKIP
+        >>> r, xi2 = tab.compute_galaxy_clustering(param_dict = {'logMmin': 12.5}) # doctest: +SKIP
+        """
+        pair_counts, num_gals = self._expected_pair_counts('', param_dict, gal_type)
+        if num_gals == 0:
+            raise HalotoolsError("The model predicts zero galaxies for the input parameters")
+
+        DD = np.diff(pair_counts)
+        shell_volume = np.diff(4*np.pi*self.rbins**3/3.)
+        RR = num_gals**2*shell_volume/self.Lbox**3
+
+        rbin_centers = (self.rbins[1:] + self.rbins[0:-1])/2.
+        return rbin_centers, DD/RR - 1.
+
+    def compute_galaxy_projected_clustering(self, param_dict = None, gal_type = None):
+        """ Expected projected two-point correlation function of the galaxies of the model,
+        estimated in the same way as `~halotools.mock_observables.clustering.wp`
+        with analytical randoms, but without populating a mock.
+        Only available if ``rp_bins`` and ``pi_bins`` were passed to the constructor.
+
+        Parameters
+        ----------
+        param_dict : dict, optional
+            Dictionary of model parameters. Any key of ``model.param_dict`` missing
+            from ``param_dict`` takes its value from ``model.param_dict``.
+            Default is ``model.param_dict``.
+
+        gal_type : string, optional
+            If passed, the auto-correlation of the galaxies of this ``gal_type``
+            is returned.
+
+        Returns
+        --------
+        rp_bin_centers : array
+            Midpoint of the projected bins.
+
+        projected_correlation_func : array
+            Projected correlation function in the bins defined by ``rp_bins``.
+        """
+        if self.pi_bins is None:
+            raise HalotoolsError("TabulatedHodClustering must be instantiated with "
+                "rp_bins and pi_bins to compute the projected clustering")
+
+        pair_counts, num_gals = self._expected_pair_counts('projected_', param_dict, gal_type)
+        if num_gals == 0:
+            raise HalotoolsError("The model predicts zero galaxies for the input parameters")
+
+        DD = np.diff(np.diff(pair_counts, axis=0), axis=1)
+        cylinder_volume = np.pi*np.outer(self.rp_bins**2, 2.*self.pi_bins)
+        RR = num_gals**2*np.diff(np.diff(cylinder_volume, axis=0), axis=1)/self.Lbox**3
+        xi = DD/RR - 1.
+
+        rp_bin_centers = (self.rp_bins[1:] + self.rp_bins[0:-1])/2.
+        return rp_bin_centers, 2.*np.sum(xi*np.diff(self.pi_bins), axis=1)
+
+    def compute_galaxy_matter_cross_clustering(self, param_dict = None, gal_type = None):
+        """ Expected galaxy-matter cross-correlation function of the galaxies of the model,
+        estimated in the same way as the ``compute_galaxy_matter_cross_clustering``
+        method of the mock factories, but without populating a mock.
+        Only available if ``include_matter`` was True in the constructor.
+
+        Parameters
+        ----------
+        param_dict : dict, optional
+            Dictionary of model parameters. Any key of ``model.param_dict`` missing
+            from ``param_dict`` takes its value from ``model.param_dict``.
+            Default is ``model.param_dict``.
+
+        gal_type : string, optional
+            If passed, the cross-correlation of the galaxies of this ``gal_type``
+            with the dark matter is returned.
+
+        Returns
+        --------
+        rbin_centers : array
+            Midpoint of the bins used in the correlation function calculation
+
+        correlation_func : array
+            Galaxy-matter cross-correlation function in the bins defined by ``rbins``.
+
+        Examples
+        --------
+        >>> tab = TabulatedHodClustering(halocat, model, include_matter = True) # doctest: +SKIP
+        >>> r, xi_gm = tab.compute_galaxy_matter_cross_clustering(param_dict = {'logMmin': 12.5}) # doctest: +SKIP
+        """
+        pair_counts, num_gals = self._expected_matter_pair_counts('', param_dict, gal_type)
+
+        DD = np.diff(pair_counts)
+        shell_volume = np.diff(4*np.pi*self.rbins**3/3.)
+        RR = num_gals*len(self._ptcl_pos)*shell_volume/self.Lbox**3
+
+        rbin_centers = (self.rbins[1:] + self.rbins[0:-1])/2.
+        return rbin_centers, DD/RR - 1.
+
+    def compute_delta_sigma(self, param_dict = None, gal_type = None):
+        """ Expected excess surface density :math:`\\Delta\\Sigma(R)` of the dark matter
+        around the galaxies of the model, the observable of galaxy-galaxy lensing,
+        projecting along the z-axis through the full periodic box.
+        Only available if ``include_matter`` was True and ``rp_bins``
+        was passed to the constructor.
+
+        Parameters
+        ----------
+        param_dict : dict, optional
+            Dictionary of model parameters. Any key of ``model.param_dict`` missing
+            from ``param_dict`` takes its value from ``model.param_dict``.
+            Default is ``model.param_dict``.
+
+        gal_type : string, optional
+            If passed, :math:`\\Delta\\Sigma` of the galaxies of this ``gal_type``
+            is returned.
+
+        Returns
+        --------
+        rp_bin_centers : array
+            Midpoint of the projected bins.
+
+        delta_sigma : array
+            :math:`\\Delta\\Sigma(R) = \\bar{\\Sigma}(<R) - \\Sigma(R)` at ``rp_bin_centers``,
+            in units of :math:`h M_{\\odot}/Mpc^{2}`, with comoving distances.
+
+        Notes
+        -----
+        :math:`\\Delta\\Sigma` is estimated from the tables in the same way as
+        `~halotools.mock_observables.delta_sigma` estimates it from a mock.
+
+        Examples
+        --------
+        >>> tab = TabulatedHodClustering(halocat, model, rp_bins = np.logspace(-1, 1, 10), include_matter = True) # doctest: +SKIP
+        >>> rp, delta_sigma = tab.compute_delta_sigma(param_dict = {'logMmin': 12.5}) # doctest: +SKIP
+        """
+        if self.rp_bins is None:
+            raise HalotoolsError("TabulatedHodClustering must be instantiated with "
+                "rp_bins to compute the excess surface density")
+
+        pair_counts, num_gals = self._expected_matter_pair_counts('projected_',
+            param_dict, gal_type)
+        # Mean projected mass within each of rp_bins around a galaxy
+        enclosed_mass = self.ptcl_mass*pair_counts/num_gals
+
+        rp_bin_centers = (self.rp_bins[1:] + self.rp_bins[0:-1])/2.
+        return rp_bin_centers, _delta_sigma_from_enclosed_mass(enclosed_mass, self.rp_bins)
+
+
+def _cumulative_counts(separation, labels, num_labels, rbins):
+    """ Cumulative number of the length-N array of 3-dimensional ``separation``
+    vectors with norm less than or equal to each of ``rbins``,
+    for each of the ``num_labels`` labels.
+    """
+    num_bins = len(rbins)
+    distance = np.sqrt(np.sum(separation**2, axis=1))
+    first_bin = np.searchsorted(rbins, distance, side='left')
+    counts = np.bincount(labels*(num_bins + 1) + first_bin,
+        minlength=num_labels*(num_bins + 1)).reshape((num_labels, num_bins + 1))
+    return np.cumsum(counts[:, :num_bins], axis=1)
+
+def _xy_z_cumulative_counts(separation, labels, num_labels, rp_bins, pi_bins):
+    """ Cumulative number of the length-N array of 3-dimensional ``separation``
+    vectors with a projection in the x-y plane less than or equal to each of ``rp_bins``,
+    and a z component less than or equal to each of ``pi_bins`` in absolute value,
+    for each of the ``num_labels`` labels.
+    """
+    num_rp, num_pi = len(rp_bins), len(pi_bins)
+    perp_distance = np.sqrt(separation[:, 0]**2 + separation[:, 1]**2)
+    para_distance = np.abs(separation[:, 2])
+    first_rp_bin = np.searchsorted(rp_bins, perp_distance, side='left')
+    first_pi_bin = np.searchsorted(pi_bins, para_distance, side='left')
+    index = (labels*(num_rp + 1) + first_rp_bin)*(num_pi + 1) + first_pi_bin
+    counts = np.bincount(index, minlength=num_labels*(num_rp + 1)*(num_pi + 1)
+        ).reshape((num_labels, num_rp + 1, num_pi + 1))
+    return np.cumsum(np.cumsum(counts[:, :num_rp, :num_pi], axis=1), axis=2)
+
+def _diagonal_table(values, shape):
+    """ Table of pair counts of shape (Nbins, Nbins, ...) storing ``values``
+    on the diagonal of the two mass bin axes and zero elsewhere.
+    ``values`` is either a length-Nbins array, constant in separation,
+    or an array of shape (Nbins, ...).
+    """
+    table = np.zeros(shape)
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values.reshape((-1, ) + (1, )*(len(shape) - 2))
+    diagonal = np.arange(shape[0])
+    table[diagonal, diagonal] = values
+    return table
+
+def _normalize_table(counts, norm):
+    """ Divide the pair ``counts`` by ``norm``, broadcast along the separation axes,
+    with empty bins set to zero.
+    """
+    norm = np.asarray(norm, dtype=float)
+    norm = norm.reshape(norm.shape + (1, )*(counts.ndim - norm.ndim))
+    return np.where(norm > 0, counts/np.where(norm > 0, norm, 1.), 0.)
@@ -8,6 +8,7 @@ from astropy.table import Table
 from scipy.stats import spearmanr
 
 from ..abunmatch import ConditionalAbunMatch
+from ..abunmatch import _rank_correlation_of_noise_level, _noise_weights
 from .. import model_defaults
 from ...sim_manager import FakeMock
 
@@ -247,8 +248,25 @@ def test_cam_ssfr():
 	check_spearmanr(fake_mock_variable_scatter, fake_data, sm_low, sm_high, 0.835)
 
 
-
-
-
-
-
+def test_noise_level_calibration():
+	""" Verify the calibration curve used by 
+	`~halotools.empirical_models.ConditionalAbunMatch` to map 
+	a correlation strength onto a noise level. 
+	"""
+	rng = np.random.RandomState(43)
+	npts = int(1e5)
+	u = rng.random_sample(npts)
+	s = rng.random_sample(npts)
+	for noise_level in (0.1, 0.5, 1., 2., 10.):
+		corr = spearmanr(u, u + noise_level*s)[0]
+		assert np.allclose(corr, _rank_correlation_of_noise_level(noise_level), atol=0.01)
+
+	correlation_strength = np.array([1., 0.9, 0.5, -0.5, 0.1, 0.])
+	signal_weight, noise_weight = _noise_weights(correlation_strength)
+	assert np.allclose(signal_weight + noise_weight, 1)
+	assert signal_weight[0] == 1
+	assert noise_weight[-1] == 1
+	assert signal_weight[2] == signal_weight[3]
+	noise_level = noise_weight[1:-1]/signal_weight[1:-1]
+	assert np.allclose(_rank_correlation_of_noise_level(noise_level), 
+		np.abs(correlation_strength[1:-1]), rtol=1e-4)
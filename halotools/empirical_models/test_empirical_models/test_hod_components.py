@@ -7,7 +7,7 @@ from .. import hod_components
 from astropy.table import Table
 from copy import copy
 
-__all__ = ['test_Zheng07Cens','test_Zheng07Sats']
+__all__ = ['test_Zheng07Cens','test_Zheng07Sats','test_mc_occupation_precomputed_mean']
 
 
 def test_Zheng07Cens():
@@ -307,13 +307,17 @@ def test_Zheng07Sats():
 	assert fracdiff_highmass > fracdiff_midmass
 
 
-
-
-
-
-
-
-
-
-
-
+def test_mc_occupation_precomputed_mean():
+	""" Verify that passing the pre-computed ``first_occupation_moment`` 
+	to `~halotools.empirical_models.OccupationComponent.mc_occupation` 
+	gives the identical Monte Carlo realization as computing the mean occupation internally, 
+	as relied upon by `~halotools.empirical_models.HodMockFactory` when repopulating. 
+	"""
+	mvir_array = np.logspace(10, 16, 1000)
+	for model in [hod_components.Zheng07Cens(), hod_components.Zheng07Sats()]:
+		mean_occ = model.mean_occupation(prim_haloprop=mvir_array)
+
+		mc_occ = model.mc_occupation(prim_haloprop=mvir_array, seed=43)
+		mc_occ2 = model.mc_occupation(prim_haloprop=mvir_array, seed=43, 
+			first_occupation_moment=mean_occ)
+		assert np.all(mc_occ == mc_occ2)
@@ -9,7 +9,7 @@ from .. import hod_components
 
 from ...sim_manager import FakeSim
 
-__all__ = ['test_Zheng07_composite']
+__all__ = ['test_Zheng07_composite', 'test_Zheng07_batch_occupation']
 
 def test_Zheng07_composite():
 	""" Method to test the basic behavior of 
@@ -91,6 +91,36 @@ def test_alt_Zheng07_composites():
 	# default_model.populate_mock(snapshot = fakesim)
 
 
+def test_Zheng07_batch_occupation():
+	""" Method to test that 
+	`~halotools.empirical_models.model_factories.HodModelFactory.mean_occupation_batch` 
+	agrees with the mean occupations computed one set of parameters at a time. 
+	"""
+	model = preloaded_models.Zheng07(threshold = -18)
+	testmass = np.logspace(10, 15, num=50)
+
+	param_dict_list = [{'logMmin': logMmin, 'logM1': logM1} 
+		for logMmin, logM1 in zip([11.2, 11.5, 12.], [12.5, 13., 13.5])]
+	mean_occupation = model.mean_occupation_batch(param_dict_list, prim_haloprop = testmass)
+	assert mean_occupation['centrals'].shape == (3, 50)
+	assert mean_occupation['satellites'].shape == (3, 50)
+
+	orig_param_dict = copy(model.param_dict)
+	for i, param_dict in enumerate(param_dict_list):
+		model.param_dict.update(param_dict)
+		ncen = model.mean_occupation_centrals(prim_haloprop = testmass)
+		nsat = model.mean_occupation_satellites(prim_haloprop = testmass)
+		assert np.allclose(mean_occupation['centrals'][i], ncen)
+		assert np.allclose(mean_occupation['satellites'][i], nsat)
+		model.param_dict.update(orig_param_dict)
+
+	mc_occupation = model.mc_occupation_batch(param_dict_list, seed = 43, 
+		prim_haloprop = testmass)
+	assert mc_occupation['centrals'].shape == (3, 50)
+	assert set(mc_occupation['centrals'].flatten()) <= set([0, 1])
+	assert np.all(mc_occupation['satellites'] >= 0)
+
+
 def test_Leauthaud11_composite():
 	"""
 	"""
@@ -1,13 +1,17 @@
 #!/usr/bin/env python
 
 import numpy as np 
+import pytest
+slow = pytest.mark.slow
+
 from .. import preloaded_models
 from .. import model_factories
 from .. import mock_factories
+from .. import model_defaults
 from .. import preloaded_models
 from ...sim_manager.generate_random_sim import FakeSim
 
-__all__ = ['test_preloaded_hod_mocks']
+__all__ = ['test_preloaded_hod_mocks', 'test_parallel_populate', 'test_particle_subsample']
 
 
 def test_preloaded_hod_mocks():
@@ -66,11 +70,46 @@ def test_preloaded_hod_mocks():
     #     test_hod_mock_attrs(model, sim)
 
 
+@slow
+def test_parallel_populate():
+    """ Verify that for a fixed ``seed`` and ``num_chunks``, the mock populated by 
+    `~halotools.empirical_models.HodMockFactory` does not depend on ``N_threads``, 
+    and that input ``occupations`` are used when populating in parallel. 
+    """
+    sim = FakeSim()
+    model = preloaded_models.Zheng07(threshold = -20)
+    mock = mock_factories.HodMockFactory(snapshot = sim, model = model, populate = False)
+
+    mock.populate(seed = 43, num_chunks = 4, N_threads = 1)
+    galaxy_table1 = mock.galaxy_table
+    mock.populate(seed = 43, num_chunks = 4, N_threads = 2)
+    galaxy_table2 = mock.galaxy_table
+    assert len(galaxy_table1) == len(galaxy_table2)
+    for key in galaxy_table1.keys():
+        assert np.all(galaxy_table1[key] == galaxy_table2[key])
+
+    occupations = {'centrals': np.ones(len(mock.halo_table), dtype=int), 
+        'satellites': np.zeros(len(mock.halo_table), dtype=int)}
+    mock.populate(seed = 43, num_chunks = 4, N_threads = 2, occupations = occupations)
+    assert len(mock.galaxy_table) == len(mock.halo_table)
+    assert np.all(mock.galaxy_table['gal_type'] == 'centrals')
+
+
+def test_particle_subsample():
+    """ Verify that the downsampling of the dark matter particles is only cached 
+    when a ``ptcl_seed`` is given. 
+    """
+    class Snapshot(object):
+        # FakeSim re-seeds the global random state each time ptcl_table is accessed
+        ptcl_table = FakeSim(num_ptcl = int(2e5)).ptcl_table
 
+    mock = mock_factories.HodMockFactory.__new__(mock_factories.HodMockFactory)
+    mock.snapshot = Snapshot()
 
+    ptcl_pos = mock._particle_subsample(100, 43)
+    assert ptcl_pos.shape == (int(model_defaults.default_nptcls), 3)
+    assert mock._particle_subsample(100, 43) is ptcl_pos
 
-
-
-
-
-
+    ptcl_pos1 = mock._particle_subsample(100, None)
+    ptcl_pos2 = mock._particle_subsample(100, None)
+    assert not np.all(ptcl_pos1 == ptcl_pos2)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+from time import time
+import numpy as np 
+import pytest
+slow = pytest.mark.slow
+
+from astropy.table import Table
+from ..mock_helpers import GalaxyColumns, CategoricalColumn, restore_categorical_columns
+from ..mock_helpers import split_halo_indices, concatenate_galaxy_columns
+from ..mock_helpers import infer_mask_from_kwargs
+from ..mock_helpers import write_galaxy_table, StoredMock
+from ...custom_exceptions import HalotoolsIOError
+
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
+
+__all__ = ['test_galaxy_columns', 'test_galaxy_columns_views', 
+    'test_categorical_column', 'test_galaxy_table_gal_type', 
+    'test_chunked_galaxy_columns', 'test_stored_mock', 
+    'test_galaxy_columns_population_speed']
+
+def test_galaxy_columns():
+    """ Verify that setting the columns of a slice of a 
+    `~halotools.empirical_models.mock_helpers.GalaxyColumns` instance 
+    writes into the memory of the parent instance, 
+    as the component models require during mock population. 
+    """
+    ngals = 10
+    galaxy_columns = GalaxyColumns(ngals)
+    galaxy_columns.allocate('x', float)
+    galaxy_columns['halo_x'] = np.arange(ngals)
+    assert len(galaxy_columns) == ngals
+    assert set(galaxy_columns.keys()) == set(['x', 'halo_x'])
+
+    satellites = galaxy_columns[5:]
+    assert len(satellites) == 5
+    satellites['x'] = satellites['halo_x'] + 0.5
+    satellites['x'][:] *= 2
+    assert np.all(galaxy_columns['x'][:5] == 0)
+    assert np.all(galaxy_columns['x'][5:] == 2*(np.arange(5, ngals) + 0.5))
+
+    galaxy_columns['conc'] = 0.
+    assert galaxy_columns['conc'].dtype == float
+    assert np.all(galaxy_columns['conc'] == 0)
+
+    mask = galaxy_columns['halo_x'] > 6
+    assert len(galaxy_columns[mask]) == 3
+
+    table = galaxy_columns.to_table()
+    assert len(table) == ngals
+    assert np.all(table['x'] == galaxy_columns['x'])
+
+
+def test_galaxy_columns_views():
+    """ Verify that the columns bound with 
+    `~halotools.empirical_models.mock_helpers.GalaxyColumns.bind_view` 
+    share the memory of the halo catalog until they are set, 
+    and that setting them never modifies the halo catalog. 
+    """
+    ngals = 10
+    halo_x = np.arange(ngals, dtype=float)
+    galaxy_columns = GalaxyColumns(ngals)
+    galaxy_columns.bind_view('halo_x', halo_x)
+    galaxy_columns.bind_view('x', halo_x)
+    assert np.may_share_memory(galaxy_columns['x'], halo_x)
+
+    try:
+        galaxy_columns['x'][:] = 0
+        raise AssertionError("The view of the halo catalog should be read-only")
+    except ValueError:
+        pass
+
+    galaxy_columns['x'] = galaxy_columns['halo_x'] + 0.5
+    galaxy_columns['x'][:] *= 2
+    assert not np.may_share_memory(galaxy_columns['x'], halo_x)
+    assert np.all(galaxy_columns['x'] == 2*(np.arange(ngals) + 0.5))
+    assert np.all(halo_x == np.arange(ngals))
+    assert np.all(galaxy_columns['halo_x'] == halo_x)
+
+    mask = galaxy_columns['halo_x'] > 6
+    assert np.all(galaxy_columns[mask]['halo_x'] == [7, 8, 9])
+
+    # The read-only views are not copied by the table until they are set
+    table = galaxy_columns.to_table()
+    assert np.may_share_memory(np.asarray(table['halo_x']), halo_x)
+    assert np.may_share_memory(np.asarray(table['x']), galaxy_columns['x'])
+    try:
+        table['halo_x'][:] = 0
+        raise AssertionError("The view of the halo catalog should be read-only")
+    except ValueError:
+        pass
+
+    table['halo_x'] = table['halo_x'] + 1
+    table['halo_x'][:] *= 2
+    assert np.all(table['halo_x'] == 2*(np.arange(ngals) + 1))
+    assert np.all(halo_x == np.arange(ngals))
+    assert not np.may_share_memory(np.asarray(table['halo_x']), halo_x)
+
+
+def test_categorical_column():
+    """ Verify that `~halotools.empirical_models.mock_helpers.CategoricalColumn` 
+    stores int8 codes, supports comparisons to the category names, 
+    and can be restored from the table metadata. 
+    """
+    gal_types = ['centrals', 'satellites']
+    names = np.array(['centrals', 'satellites', 'satellites', 'centrals', 'satellites'])
+    column = CategoricalColumn(names, categories=gal_types, name='gal_type')
+    assert column.dtype == np.int8
+    assert np.all(column.decode() == names)
+
+    assert np.all((column == 'centrals') == (names == 'centrals'))
+    assert np.all((column != 'centrals') == (names != 'centrals'))
+    assert not np.any(column == 'orphans')
+    assert np.all(column[1:3] == 'satellites')
+
+    galaxy_columns = GalaxyColumns(len(names))
+    galaxy_columns.allocate_categorical('gal_type', gal_types)
+    galaxy_columns['gal_type'][1:] = galaxy_columns['gal_type'].category_code('satellites')
+    table = galaxy_columns.to_table()
+    assert np.count_nonzero(table['gal_type'] == 'satellites') == 4
+
+    table.replace_column('gal_type', np.asarray(table['gal_type']))
+    table = restore_categorical_columns(table)
+    assert isinstance(table['gal_type'], CategoricalColumn)
+    assert np.count_nonzero(table['gal_type'] == 'satellites') == 4
+
+
+def test_galaxy_table_gal_type():
+    """ Verify that the ``gal_type`` column of a table created by 
+    `~halotools.empirical_models.mock_helpers.GalaxyColumns.to_table` 
+    is a `~halotools.empirical_models.mock_helpers.CategoricalColumn`, 
+    so that galaxies can be selected by comparing it to a string. 
+    """
+    ngals = 10
+    galaxy_columns = GalaxyColumns(ngals)
+    galaxy_columns.allocate_categorical('gal_type', ['centrals', 'satellites'])
+    galaxy_columns['gal_type'][6:] = galaxy_columns['gal_type'].category_code('satellites')
+    galaxy_columns['x'] = np.arange(ngals, dtype=float)
+    table = galaxy_columns.to_table()
+
+    assert isinstance(table['gal_type'], CategoricalColumn)
+    satellite_mask = table['gal_type'] == 'satellites'
+    assert np.shape(satellite_mask) == (ngals, )
+    assert np.count_nonzero(satellite_mask) == 4
+    assert np.count_nonzero(table['gal_type'] != 'centrals') == 4
+
+    satellites = table[table['gal_type'] != 'centrals']
+    assert len(satellites) == 4
+    assert np.all(satellites['x'] == np.arange(6, ngals))
+    assert np.all(satellites['gal_type'] == 'satellites')
+
+    mask = infer_mask_from_kwargs(table, gal_type = 'satellites')
+    assert np.all(mask == satellite_mask)
+
+
+def test_chunked_galaxy_columns():
+    """ Verify that the chunks of a halo catalog used for parallel mock population 
+    contain every halo exactly once, and that the galaxy properties of the chunks 
+    are correctly merged. 
+    """
+    nhalos = 101
+    halo_table = np.zeros(nhalos, dtype=[('halo_x', float)])
+    halo_table['halo_x'] = np.random.uniform(0, 250, nhalos)
+
+    for chunk_by in ['index', 'slab']:
+        chunks = split_halo_indices(halo_table, 4, chunk_by = chunk_by)
+        assert len(chunks) == 4
+        assert np.all(np.sort(np.concatenate(chunks)) == np.arange(nhalos))
+    # Slabs do not overlap along the x-axis
+    for chunk1, chunk2 in zip(chunks[:-1], chunks[1:]):
+        assert halo_table['halo_x'][chunk1].max() <= halo_table['halo_x'][chunk2].min()
+
+    column_dicts = [{'x': np.arange(3.), 'gal_type': np.array([0, 1, 1])}, 
+        {'x': np.arange(3., 5.), 'gal_type': np.array([1, 0])}]
+    galaxy_columns = concatenate_galaxy_columns(column_dicts, 
+        categories = {'gal_type': ['centrals', 'satellites']})
+    assert len(galaxy_columns) == 5
+    assert np.all(galaxy_columns['x'] == np.arange(5.))
+    assert np.all((galaxy_columns['gal_type'] == 'satellites') == [False, True, True, True, False])
+
+
+@pytest.mark.skipif('not HAS_H5PY')
+def test_stored_mock():
+    """ Verify that a galaxy table written by 
+    `~halotools.empirical_models.mock_helpers.write_galaxy_table` 
+    is read back column by column by 
+    `~halotools.empirical_models.mock_helpers.StoredMock`. 
+    """
+    ngals = 1000
+    galaxy_columns = GalaxyColumns(ngals)
+    galaxy_columns.allocate_categorical('gal_type', ['centrals', 'satellites'])
+    galaxy_columns['gal_type'][ngals//2:] = 1
+    galaxy_columns['x'] = np.random.uniform(0, 250, ngals)
+    galaxy_columns['halo_id'] = np.arange(ngals)
+    galaxy_columns['color'] = np.where(np.arange(ngals) % 3 == 0, 'red', 'blue')
+
+    dirname = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(dirname, 'mock.hdf5')
+        write_galaxy_table(fname, galaxy_columns, 
+            metadata = {'simname': 'fake', 'redshift': 0., 'seed': 43, 'halo_finder': None}, 
+            param_dict = {'logMmin': 12.}, chunk_size = 100)
+
+        try:
+            write_galaxy_table(fname, galaxy_columns)
+            raise AssertionError("Existing files should not be overwritten by default")
+        except HalotoolsIOError:
+            pass
+
+        with StoredMock(fname) as stored_mock:
+            assert len(stored_mock) == ngals
+            assert stored_mock.keys() == ['gal_type', 'x', 'halo_id', 'color']
+            assert stored_mock.simname == 'fake'
+            assert stored_mock.seed == 43
+            assert 'halo_finder' not in stored_mock.metadata
+            assert stored_mock.param_dict['logMmin'] == 12.
+
+            assert np.all(stored_mock['x'] == galaxy_columns['x'])
+            assert np.all(stored_mock['halo_id'] == galaxy_columns['halo_id'])
+            assert isinstance(stored_mock['color'], CategoricalColumn)
+            assert np.all(stored_mock['color'].decode() == galaxy_columns['color'])
+
+            mask = stored_mock['gal_type'] == 'satellites'
+            satellites = stored_mock.read(keys = ['x', 'gal_type'], rows = mask)
+            assert len(satellites) == ngals//2
+            assert isinstance(satellites['gal_type'], CategoricalColumn)
+            assert np.all(satellites['x'] == galaxy_columns['x'][ngals//2:])
+            assert np.all(satellites['gal_type'] == 'satellites')
+            assert np.all(stored_mock.read_column('x', rows = slice(10, 20)) == 
+                galaxy_columns['x'][10:20])
+    finally:
+        shutil.rmtree(dirname)
+
+
+def _populate_galaxy_table(halos, occupations, galaxy_table):
+    """ Fill ``galaxy_table`` with the galaxies of ``halos`` in the same sequence 
+    of steps as `~halotools.empirical_models.HodMockFactory.populate`, 
+    for either an `~astropy.table.Table` or a 
+    `~halotools.empirical_models.mock_helpers.GalaxyColumns` instance. 
+    """
+    first_index = 0
+    for gal_type, occupation in occupations.items():
+        gal_type_slice = slice(first_index, first_index + occupation.sum())
+        first_index += occupation.sum()
+        if isinstance(galaxy_table, GalaxyColumns):
+            galaxy_table['gal_type'][gal_type_slice] = (
+                galaxy_table['gal_type'].category_code(gal_type))
+        else:
+            galaxy_table['gal_type'][gal_type_slice] = gal_type
+        for key in halos.keys():
+            galaxy_table[key][gal_type_slice] = np.repeat(halos[key], occupation)
+
+        # Each component model method is passed the gal_type slice,
+        # and writes into its columns
+        for key in halos.keys():
+            galaxies = galaxy_table[gal_type_slice]
+            galaxies[key][:] += 0.1
+        galaxies = galaxy_table[gal_type_slice]
+        galaxies['conc_NFWmodel'][:] = 5.
+
+    galaxy_table['x'] = np.mod(galaxy_table['halo_x'], 250.)
+    return galaxy_table
+
+
+@slow
+def test_galaxy_columns_population_speed():
+    """ Compare the time taken to fill the preallocated columns of a 
+    `~halotools.empirical_models.mock_helpers.GalaxyColumns` instance 
+    to the time taken to fill an `~astropy.table.Table` built one column at a time, 
+    as `~halotools.empirical_models.HodMockFactory.populate` did previously. 
+    """
+    nhalos = int(1e4)
+    halos = {'halo_'+key: np.random.uniform(0, 250, nhalos) 
+        for key in ['x', 'y', 'z', 'vx', 'vy', 'vz', 'mvir', 'rvir', 'rs', 'spin']}
+    occupations = {'centrals': np.random.randint(0, 2, nhalos), 
+        'satellites': np.random.poisson(0.5, nhalos)}
+    ngals = sum(occupation.sum() for occupation in occupations.values())
+
+    def populate_table():
+        galaxy_table = Table()
+        for key in halos.keys():
+            galaxy_table[key] = np.zeros(ngals, dtype = halos[key].dtype)
+        galaxy_table['conc_NFWmodel'] = 0.
+        galaxy_table['gal_type'] = np.zeros(ngals, dtype=object)
+        return _populate_galaxy_table(halos, occupations, galaxy_table)
+
+    def populate_galaxy_columns():
+        galaxy_columns = GalaxyColumns(ngals)
+        for key in halos.keys():
+            galaxy_columns.allocate(key, halos[key].dtype)
+        galaxy_columns.allocate('conc_NFWmodel', float)
+        galaxy_columns.allocate_categorical('gal_type', list(occupations.keys()))
+        return _populate_galaxy_table(halos, occupations, galaxy_columns).to_table()
+
+    runtimes = {}
+    for populate in (populate_table, populate_galaxy_columns):
+        runtimes[populate] = []
+        for i in range(5):
+            start = time()
+            galaxy_table = populate()
+            runtimes[populate].append(time() - start)
+        nsats = np.count_nonzero(galaxy_table['gal_type'] == 'satellites')
+        assert nsats == occupations['satellites'].sum()
+
+    assert min(runtimes[populate_galaxy_columns]) < min(runtimes[populate_table])
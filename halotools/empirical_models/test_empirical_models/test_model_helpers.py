@@ -16,4 +16,75 @@ def test_enforce_periodicity_of_box():
 
 	newcoords = occuhelp.enforce_periodicity_of_box(coords, box_length)
 	assert np.all(newcoords >= 0)
-	assert np.all(newcoords <= box_length)
\ No newline at end of file
+	assert np.all(newcoords <= box_length)
+
+
+def test_random_stream():
+	""" Verify that the random streams of a seed are reproducible, 
+	that different streams are independent, and that a stream without keys 
+	is the usual seeded numpy generator. 
+	"""
+	seed = 43
+	uran1 = occuhelp.random_stream(seed, 'mc_occupation', 'centrals').random_sample(100)
+	uran2 = occuhelp.random_stream(seed, 'mc_occupation', 'centrals').random_sample(100)
+	assert np.all(uran1 == uran2)
+
+	uran3 = occuhelp.random_stream(seed, 'mc_occupation', 'satellites').random_sample(100)
+	assert not np.any(uran1 == uran3)
+
+	chunk_seeds = [occuhelp.stream_seed(seed, 'chunk', i) for i in range(10)]
+	assert len(set(chunk_seeds)) == 10
+	assert occuhelp.stream_seed(None, 'chunk', 0) is None
+
+	uran4 = occuhelp.random_stream(seed).random_sample(100)
+	assert np.all(uran4 == np.random.RandomState(seed).random_sample(100))
+
+
+def test_multilinear_interpolation():
+	""" Verify that multi-linear interpolation is exact for linear functions, 
+	and that points outside the grid are clamped to the grid boundary. 
+	"""
+	x = np.linspace(0, 1, 5)
+	y = np.linspace(0, 2, 11)
+	f = lambda a, b: 2*a - 3*b + 1
+	grid_values = f(x.reshape(5, 1), y.reshape(1, 11))
+
+	xpts = np.random.uniform(0, 1, 100)
+	ypts = np.random.uniform(0, 2, 100)
+	result = occuhelp.multilinear_interpolation([x, y], grid_values, xpts, ypts)
+	assert np.allclose(result, f(xpts, ypts))
+
+	result = occuhelp.multilinear_interpolation([x, y], grid_values, [-1, 2], [5, -1])
+	assert np.allclose(result, [f(0, 2), f(1, 0)])
+
+
+def test_cached_interpolant():
+	""" Verify that `~halotools.empirical_models.model_helpers.table_interpolant` 
+	agrees with `~halotools.empirical_models.model_helpers.custom_spline`, 
+	and that `~halotools.empirical_models.model_helpers.cached_interpolant` 
+	only rebuilds the interpolant when the table changes. 
+	"""
+	x = np.linspace(11, 18, 50)
+	abcissa = np.array([12., 13., 14.5, 15., 16., 17.])
+	ordinates = np.sin(abcissa)
+	for npts in range(1, len(abcissa)+1):
+		for k in (1, 2, 5):
+			f1 = occuhelp.table_interpolant(abcissa[:npts], ordinates[:npts], k=k)
+			f2 = occuhelp.custom_spline(abcissa[:npts], ordinates[:npts], k=k)
+			assert np.allclose(f1(x), f2(x))
+
+	class Dummy(object):
+		pass
+	obj = Dummy()
+	param_dict = {'param1': 0.3, 'param2': 0.1}
+	f1 = occuhelp.cached_interpolant(obj, 'dummy', [12, 15], 
+		[param_dict['param1'], param_dict['param2']])
+	f2 = occuhelp.cached_interpolant(obj, 'dummy', [12, 15], 
+		[param_dict['param1'], param_dict['param2']])
+	assert f1 is f2
+
+	param_dict['param1'] = 0.5
+	f3 = occuhelp.cached_interpolant(obj, 'dummy', [12, 15], 
+		[param_dict['param1'], param_dict['param2']])
+	assert f3 is not f1
+	assert np.allclose(f3([12, 15]), [0.5, 0.1])
@@ -1,11 +1,14 @@
 #!/usr/bin/env python
 
+import shutil
+import tempfile
 import pytest
 from unittest import TestCase
 
 import numpy as np 
 from astropy.table import Table 
 from ...sim_manager import HaloCatalog
+from ...sim_manager import cache_config
 from ..phase_space_models import NFWPhaseSpace
 from ...custom_exceptions import HalotoolsError
 
@@ -23,7 +26,7 @@ class TestNFWPhaseSpace(TestCase):
         self.nfw = NFWPhaseSpace()
         cmin, cmax, dc = 1, 25, 0.5
         self.nfw._setup_lookup_tables((cmin, cmax, dc))
-        self.nfw.build_lookup_tables()
+        self.nfw.build_lookup_tables(use_cache = False)
 
         Npts = 1e3
         self.c15 = np.ones(Npts) + 15
@@ -75,6 +78,56 @@ class TestNFWPhaseSpace(TestCase):
         assert hasattr(self.nfw, 'conc_NFWmodel')
         assert hasattr(self.nfw, 'conc_mass_model')
 
+    def test_lookup_table_cache(self):
+        """ Verify that lookup tables built with the same binning as the tables 
+        built in setup_class are stored in, and then loaded from, the cache. 
+        The cache directory is replaced by a temporary directory for the test. 
+        """
+        dirname = tempfile.mkdtemp()
+        get_lookup_tables_dir = cache_config.get_lookup_tables_dir
+        cache_config.get_lookup_tables_dir = lambda **kwargs: dirname
+        try:
+            nfw2 = NFWPhaseSpace()
+            nfw2._setup_lookup_tables((1, 25, 0.5))
+            nfw2.build_lookup_tables()
+            assert not isinstance(nfw2.rad_prof_func_table, np.memmap)
+            assert np.allclose(nfw2.rad_prof_func_table, self.nfw.rad_prof_func_table)
+
+            nfw3 = NFWPhaseSpace()
+            nfw3._setup_lookup_tables((1, 25, 0.5))
+            nfw3.build_lookup_tables()
+            assert isinstance(nfw3.rad_prof_func_table, np.memmap)
+            assert np.all(nfw3.rad_prof_func_table == nfw2.rad_prof_func_table)
+            assert np.all(nfw3.vel_prof_func_table == nfw2.vel_prof_func_table)
+        finally:
+            cache_config.get_lookup_tables_dir = get_lookup_tables_dir
+            shutil.rmtree(dirname)
+
+    def test_exact_sampling(self):
+        """ Verify that the exact NFW sampler agrees with the lookup-table sampler 
+        when both are given the same random stream, without building any tables. 
+        """
+        nfw_exact = NFWPhaseSpace(exact_sampling = True)
+
+        r_exact = nfw_exact._mc_dimensionless_radial_distance(profile_params=[self.c10], seed=43)
+        r_table = self.nfw._mc_dimensionless_radial_distance(profile_params=[self.c10], seed=43)
+        assert np.all(r_exact >= 0)
+        assert np.all(r_exact <= 1)
+        # Restrict the comparison to radii safely inside the range of the lookup table
+        inside = r_exact > 0.01
+        assert np.allclose(r_exact[inside], r_table[inside], rtol=1e-3)
+
+        vr_disp_exact = nfw_exact._vrad_disp_from_lookup(x = r_exact, profile_params=[self.c10])
+        vr_disp_table = self.nfw._vrad_disp_from_lookup(x = r_exact, profile_params=[self.c10])
+        assert np.allclose(vr_disp_exact, vr_disp_table, rtol=1e-3)
+
+        assert not hasattr(nfw_exact, 'rad_prof_func_table')
+
+        conc = np.random.uniform(1.5, 15, len(self.c10))
+        r = nfw_exact._mc_dimensionless_radial_distance(profile_params=[conc], seed=43)
+        assert np.allclose(nfw_exact.cumulative_mass_PDF(r, conc), 
+            np.random.RandomState(43).random_sample(len(conc)))
+
     def test_mc_unit_sphere(self):
         """ Method used to test 
         `~halotools.empirical_models.NFWPhaseSpace.mc_unit_sphere`. 
@@ -3,7 +3,10 @@ from astropy import cosmology
 import numpy as np
 from copy import copy
 
-__all__ = ['test_HaloProfileModel', 'test_TrivialProfile','test_NFWProfile']
+from ..profile_models import AnalyticDensityProf, NFWProfile
+
+__all__ = ['test_HaloProfileModel', 'test_TrivialProfile','test_NFWProfile', 
+    'test_cumulative_mass_PDF_quadrature', 'test_inverse_cumulative_mass_PDF']
 
 def test_HaloProfileModel():
     """ Method testing the abstract base class 
@@ -141,17 +144,42 @@ def test_NFWProfile():
     # assert np.all(model_instance.NFWmodel_conc_lookup_table_bins == initial_NFWmodel_conc_lookup_table_bins)
 
 
+def test_cumulative_mass_PDF_quadrature():
+    """ Verify that the generic quadrature used by 
+    `~halotools.empirical_models.AnalyticDensityProf.cumulative_mass_PDF` 
+    agrees with the analytical result of 
+    `~halotools.empirical_models.NFWProfile.cumulative_mass_PDF`. 
+    """
+    model_instance = NFWProfile()
+    x = np.logspace(-3, 0, 25)
 
+    for conc in (1., 5., 25.):
+        analytic = model_instance.cumulative_mass_PDF(x, conc)
+        quadrature = AnalyticDensityProf.cumulative_mass_PDF(model_instance, x, conc)
+        assert np.allclose(quadrature, analytic, rtol=1e-6)
 
+    conc = np.linspace(1, 25, len(x))
+    analytic = model_instance.cumulative_mass_PDF(x, conc)
+    quadrature = AnalyticDensityProf.cumulative_mass_PDF(model_instance, x, conc)
+    assert np.allclose(quadrature, analytic, rtol=1e-6)
 
 
+def test_inverse_cumulative_mass_PDF():
+    """ Verify that `~halotools.empirical_models.NFWProfile.inverse_cumulative_mass_PDF` 
+    inverts `~halotools.empirical_models.NFWProfile.cumulative_mass_PDF`. 
+    """
+    model_instance = NFWProfile()
+    x = np.logspace(-3, 0, 25)
+    conc = np.linspace(1, 25, len(x))
 
+    p = model_instance.cumulative_mass_PDF(x, conc)
+    assert np.allclose(model_instance.inverse_cumulative_mass_PDF(p, conc), x, rtol=1e-8)
 
+    assert np.allclose(model_instance.inverse_cumulative_mass_PDF([0, 1], 10), [0, 1])
 
-
-
-
-
-
-
-
+    # Fractions just inside the endpoints, where the Lambert W inversion is ill-conditioned
+    p = np.array([1e-300, 1e-12, 1e-7, 1 - 1e-16])
+    x = model_instance.inverse_cumulative_mass_PDF(p, 10)
+    assert np.all(np.isfinite(x))
+    assert np.all(np.diff(x) > 0)
+    assert np.allclose(model_instance.cumulative_mass_PDF(x[1:3], 10), p[1:3], rtol=1e-8)
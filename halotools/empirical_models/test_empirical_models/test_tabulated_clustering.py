@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+import numpy as np 
+
+from .. import preloaded_models
+from .. import mock_factories
+from ..tabulated_clustering import TabulatedHodClustering
+from ..mock_helpers import three_dim_pos_bundle
+from ...sim_manager.generate_random_sim import FakeSim
+from ...mock_observables.pair_counters.rect_cuboid_pairs import wnpairs
+from ...mock_observables import delta_sigma
+
+__all__ = ['test_central_clustering', 'test_central_matter_clustering']
+
+def test_central_clustering():
+    """ Verify that the tabulated clustering of central galaxies agrees with 
+    the pair counts of halos weighted by their mean central occupation. 
+    The halo masses of `~halotools.sim_manager.FakeSim` are constant within 
+    each mass bin, so that the two agree to numerical precision. 
+    """
+    snapshot = FakeSim()
+    model = preloaded_models.Zheng07()
+    rbins = np.logspace(-1, 1, 8)
+
+    tab = TabulatedHodClustering(snapshot, model, rbins = rbins, 
+        num_satellite_tracers = 2, use_cache = False)
+    r, xi = tab.compute_galaxy_clustering(gal_type = 'centrals')
+
+    ncen = model.mean_occupation_centrals(halo_table = tab.halo_table)
+    pos = three_dim_pos_bundle(table = tab.halo_table, 
+        key1='halo_x', key2='halo_y', key3='halo_z')
+    DD = np.diff(wnpairs(pos, pos, rbins, period = snapshot.Lbox, 
+        weights1 = ncen, weights2 = ncen))
+    RR = ncen.sum()**2*np.diff(4*np.pi*rbins**3/3.)/snapshot.Lbox**3
+    assert np.allclose(xi, DD/RR - 1)
+
+    assert np.allclose(tab.number_density(gal_type = 'centrals'), 
+        ncen.sum()/snapshot.Lbox**3)
+
+    # Evaluating other parameters leaves the model param_dict unchanged
+    logM1 = model.param_dict['logM1']
+    r, xi_all = tab.compute_galaxy_clustering()
+    r, xi_all2 = tab.compute_galaxy_clustering(param_dict = {'logM1': logM1 - 0.5})
+    assert model.param_dict['logM1'] == logM1
+    assert not np.allclose(xi_all, xi_all2)
+
+def test_central_matter_clustering():
+    """ Verify that the tabulated galaxy-matter cross-correlation and 
+    excess surface density of central galaxies agree with the pair counts 
+    of halos and dark matter particles weighted by the mean central occupation, 
+    and with `~halotools.mock_observables.delta_sigma` of a populated mock. 
+    """
+    snapshot = FakeSim()
+    model = preloaded_models.Zheng07()
+    rbins = np.logspace(-1, 1, 8)
+    rp_bins = np.logspace(-1, 1, 6)
+
+    tab = TabulatedHodClustering(snapshot, model, rbins = rbins, rp_bins = rp_bins, 
+        num_satellite_tracers = 2, include_matter = True, use_cache = False)
+    r, xi_gm = tab.compute_galaxy_matter_cross_clustering(gal_type = 'centrals')
+
+    ncen = model.mean_occupation_centrals(halo_table = tab.halo_table)
+    pos = three_dim_pos_bundle(table = tab.halo_table, 
+        key1='halo_x', key2='halo_y', key3='halo_z')
+    ptcl_pos = three_dim_pos_bundle(table = snapshot.ptcl_table, 
+        key1='x', key2='y', key3='z')
+    DD = np.diff(wnpairs(pos, ptcl_pos, rbins, period = snapshot.Lbox, 
+        weights1 = ncen, weights2 = np.ones(len(ptcl_pos))))
+    RR = ncen.sum()*len(ptcl_pos)*np.diff(4*np.pi*rbins**3/3.)/snapshot.Lbox**3
+    assert np.allclose(xi_gm, DD/RR - 1)
+
+    # With a sharp mass threshold, the mean central occupation of every halo 
+    # of FakeSim is either 0 or 1, so that the mock is identical to the expectation
+    model.param_dict['logMmin'] = 12.5
+    model.param_dict['sigma_logM'] = 0.01
+    rp, tabulated_delta_sigma = tab.compute_delta_sigma(gal_type = 'centrals')
+
+    mock = mock_factories.HodMockFactory(snapshot = snapshot, model = model)
+    centrals = mock.galaxy_table[mock.galaxy_table['gal_type'] == 'centrals']
+    assert len(centrals) == np.count_nonzero(tab.halo_table['halo_mvir'] > 10**12.5)
+    centrals_pos = three_dim_pos_bundle(table = centrals, key1='x', key2='y', key3='z')
+    mock_delta_sigma = delta_sigma(centrals_pos, ptcl_pos, rp_bins, 
+        period = snapshot.Lbox, particle_masses = tab.ptcl_mass)
+    assert np.allclose(tabulated_delta_sigma, mock_delta_sigma)
@@ -17,9 +17,31 @@ class TestNFWJeansVelocity(TestCase):
     def setup_class(self):
         """ Load the NFW model and build a coarse lookup table.
         """
-        pass
+        self.nfw = NFWPhaseSpace()
 
     def test_velocity_dispersion(self):
+        """ Verify that the analytical solution of the Jeans equation agrees with 
+        direct numerical integration, and that it broadcasts against concentration. 
         """
-        """
-        pass
+        from scipy.integrate import quad as quad_integration
+
+        x = np.logspace(-3, 0, 10)
+        for conc in (2., 10., 50.):
+            dispersion = self.nfw.dimensionless_velocity_dispersion(x, conc)
+
+            correct_dispersion = np.zeros_like(x)
+            for i, y in enumerate(conc*x):
+                term1, _ = quad_integration(self.nfw._jeans_integrand_term1, 
+                    y, float("inf"), epsrel=1e-8)
+                term2, _ = quad_integration(self.nfw._jeans_integrand_term2, 
+                    y, float("inf"), epsrel=1e-8)
+                prefactor = conc*y*(1. + y)**2/self.nfw.g(conc)
+                correct_dispersion[i] = np.sqrt(prefactor*(term1 - term2))
+
+            assert np.allclose(dispersion, correct_dispersion, rtol=1e-6)
+
+        conc = np.array([2., 10., 50.])
+        dispersion = self.nfw.dimensionless_velocity_dispersion(x[:, np.newaxis], conc)
+        assert dispersion.shape == (len(x), len(conc))
+        assert np.allclose(dispersion[:, 1], 
+            self.nfw.dimensionless_velocity_dispersion(x, 10.))
@@ -5,7 +5,6 @@ of galaxies within their halos.
 """
 
 import numpy as np 
-from scipy.integrate import quad as quad_integration
 from scipy.special import spence 
 
 from astropy.extern import six 
@@ -17,6 +16,11 @@ __author__ = ['Andrew Hearin']
 
 __all__ = ['IsotropicJeansVelocity', 'NFWJeansVelocity']
 
+# Above this value of y = c*x the Jeans integral is computed by quadrature 
+# rather than by its closed form, which suffers from cancellation errors
+_jeans_integral_quadrature_switch = 10.
+_jeans_integral_num_nodes = 32
+
 
 
 @six.add_metaclass(ABCMeta)
@@ -95,6 +99,43 @@ class NFWJeansVelocity(IsotropicJeansVelocity):
         """
         return 1/(y**2*(1+y)**3)
 
+    def _jeans_integral(self, y):
+        """ Integral of ``_jeans_integrand_term1 - _jeans_integrand_term2`` 
+        from ``y`` to infinity. 
+
+        For :math:`y <` ``_jeans_integral_quadrature_switch`` the closed-form solution 
+        of Lokas & Mamon (2001), Eq. (14), is used. At larger :math:`y` the terms 
+        of the closed form cancel catastrophically, and so the integral is instead 
+        computed by Gauss-Legendre quadrature in the variable :math:`t = 1/y`. 
+
+        Parameters 
+        -----------
+        y : array_like 
+            Lower limit of the integral, :math:`y = c x`. 
+
+        Returns 
+        -------
+        result : array_like 
+            Value of the integral, with the same shape as the input ``y``. 
+        """
+        y = np.asarray(y, dtype=float)
+        result = np.zeros_like(y)
+
+        small = y < _jeans_integral_quadrature_switch
+        ys = y[small]
+        log1p = np.log1p(ys)
+        # scipy's spence(z) is the dilogarithm Li2(1-z), so that spence(1+y) = Li2(-y)
+        result[small] = 0.5*(np.pi**2 - np.log(ys) - 1./ys - 1./(1.+ys)**2 - 6./(1.+ys) + 
+            (1. + 1./ys**2 - 4./ys - 2./(1.+ys))*log1p + 3.*log1p**2 + 6.*spence(1.+ys))
+
+        nodes, weights = np.polynomial.legendre.leggauss(_jeans_integral_num_nodes)
+        tmax = 1./y[~small][:, np.newaxis]
+        t = 0.5*tmax*(nodes + 1.)
+        integrand = t**3/(1.+t)**2*(np.log1p(t) - np.log(t) - 1./(1.+t))
+        result[~small] = np.sum(0.5*tmax*weights*integrand, axis=-1)
+
+        return result
+
     def dimensionless_velocity_dispersion(self, x, conc):
         """
         Parameters 
@@ -103,40 +144,21 @@ class NFWJeansVelocity(IsotropicJeansVelocity):
             Halo-centric distance scaled by the halo boundary, so that 
             :math:`0 <= x <= 1`. Can be a scalar or numpy array
 
-        conc : float 
-            Concentration of the halo.
+        conc : array_like 
+            Concentration of the halo. Can either be a scalar, or a numpy array 
+            that broadcasts against the input ``x``. 
 
         Returns 
         -------
         result : array_like 
             Radial velocity dispersion profile scaled by the virial velocity. 
-            The returned result has the same dimension as the input ``x``. 
+            The returned result has the shape of ``x`` broadcast against ``conc``. 
         """
         x = convert_to_ndarray(x)
         x = x.astype(float)
-        result = np.zeros_like(x)
-
-        prefactor = conc*(conc*x)*(1. + conc*x)**2/self.g(conc)
+        y = conc*x
 
-        lower_limit = conc*x
-        upper_limit = float("inf")
-        for i in range(len(x)):
-            term1, _ = quad_integration(self._jeans_integrand_term1, 
-                lower_limit[i], upper_limit, epsrel=1e-5)
-            term2, _ = quad_integration(self._jeans_integrand_term2, 
-                lower_limit[i], upper_limit, epsrel=1e-5)
-            result[i] = term1 - term2 
+        prefactor = conc*y*(1. + y)**2/self.g(conc)
+        result = self._jeans_integral(y)
 
         return np.sqrt(result*prefactor)
-
-
-
-
-
-
-
-
-
-
-
-
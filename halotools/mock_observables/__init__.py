@@ -3,4 +3,9 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
                         
 from .clustering import *
-from .groups import *
\ No newline at end of file
+from .groups import *
+from .counts_in_cells import *
+from .nearest_neighbors import *
+from .neighbor_counts import *
+from .population_pair_counts import *
+from .lensing import *
\ No newline at end of file
@@ -10,10 +10,12 @@ import sys
 import numpy as np
 from math import pi, gamma
 from .pair_counters.rect_cuboid_pairs import npairs, xy_z_npairs, jnpairs, s_mu_npairs
+from .pair_counters.rect_cuboid_pairs import halo_id_npairs
 ##########################################################################################
 
 
-__all__=['tpcf','tpcf_jackknife','redshift_space_tpcf','wp','s_mu_tpcf']
+__all__=['tpcf','tpcf_jackknife','redshift_space_tpcf','wp','s_mu_tpcf',\
+         'tpcf_one_two_halo_decomp']
 __author__ = ['Duncan Campbell']
 
 
@@ -1477,6 +1479,309 @@ def s_mu_tpcf(sample1, s_bins, mu_bins, sample2=None, randoms=None,\
             return xi_11
 
 
+def tpcf_one_two_halo_decomp(sample1, sample1_host_halo_id, rbins, sample2=None,\
+                             sample2_host_halo_id=None, randoms=None, period=None,\
+                             do_auto=True, do_cross=True, estimator='Natural',\
+                             N_threads=1, max_sample_size=int(1e6)):
+    """ 
+    Calculate the real space one-halo and two-halo decomposed two-point correlation 
+    functions, :math:`\\xi^{1h}(r)` and :math:`\\xi^{2h}(r)`.
+    
+    Pairs of points which reside in the same host halo contribute to the one-halo 
+    term, and pairs in different host halos contribute to the two-halo term.  Both 
+    sets of pair counts are found in a single pass of the pair counter.
+    
+    Parameters 
+    ----------
+    sample1 : array_like
+        Npts x 3 numpy array containing 3-D positions of points.
+    
+    sample1_host_halo_id : array_like
+        length Npts integer array of the host halo id of each point in sample1.
+    
+    rbins : array_like
+        array of boundaries defining the real space radial bins in which pairs are 
+        counted.
+    
+    sample2 : array_like, optional
+        Npts x 3 array containing 3-D positions of points.
+    
+    sample2_host_halo_id : array_like, optional
+        integer array of the host halo id of each point in sample2.  Must be passed if
+        sample2 is passed.
+    
+    randoms : array_like, optional
+        Npts x 3 array containing 3-D positions of points.  If no randoms are provided
+        analytic randoms are used (only valid for periodic boundary conditions).
+    
+    period : array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.
+    
+    do_auto : boolean, optional
+        do auto-correlation?
+    
+    do_cross : boolean, optional
+        do cross-correlation?
+    
+    estimator : string, optional
+        options: 'Natural', 'Davis-Peebles', 'Hewett' , 'Hamilton', 'Landy-Szalay'
+    
+    N_threads : int, optional
+        number of threads to use in calculation. Default is 1. A string 'max' may be used
+        to indicate that the pair counters should use all available cores on the machine.
+    
+    max_sample_size : int, optional
+        Defines maximum size of the sample that will be passed to the pair counter. 
+        
+        If sample size exeeds max_sample_size, the sample will be randomly down-sampled
+        such that the subsample is equal to max_sample_size. 
+    
+    Returns 
+    -------
+    correlation_functions : numpy.array
+        Two len(`rbins`)-1 length arrays containing the one and two halo correlation 
+        functions, :math:`\\xi^{1h}(r)` and :math:`\\xi^{2h}(r)`, computed in each of 
+        the bins defined by input `rbins`.  Each term is calculated by passing only the 
+        one or two halo pairs to the `estimator`, so that for the 'Natural' estimator
+        :math:`1 + \\xi(r) = (1 + \\xi^{1h}(r)) + (1 + \\xi^{2h}(r))`.
+        
+        If `sample2` is passed as input, six arrays of length len(`rbins`)-1 are 
+        returned: :math:`\\xi^{1h}_{11}(r)`, :math:`\\xi^{2h}_{11}(r)`, 
+        :math:`\\xi^{1h}_{12}(r)`, :math:`\\xi^{2h}_{12}(r)`, 
+        :math:`\\xi^{1h}_{22}(r)`, :math:`\\xi^{2h}_{22}(r)`.  If `do_auto` or 
+        `do_cross` is set to False, the appropriate result(s) is not returned.
+    
+    Notes
+    -----
+    If only the one-halo pair counts are needed, 
+    `~halotools.mock_observables.pair_counters.one_halo_npairs` finds them by grouping 
+    the points by host halo id, without any spatial search.
+    """
+    
+    estimators = _list_estimators()
+    
+    #process input parameters
+    sample1 = np.asarray(sample1)
+    sample1_host_halo_id = np.asarray(sample1_host_halo_id).astype(int)
+    if np.shape(sample1_host_halo_id) != (len(sample1),):
+        raise ValueError("sample1_host_halo_id must be a 1-D array of length len(sample1)")
+    if sample2 is not None: 
+        sample2 = np.asarray(sample2)
+        if sample2_host_halo_id is None:
+            raise ValueError("If sample2 is passed, sample2_host_halo_id must be passed.")
+        sample2_host_halo_id = np.asarray(sample2_host_halo_id).astype(int)
+        if np.shape(sample2_host_halo_id) != (len(sample2),):
+            raise ValueError("sample2_host_halo_id must be a 1-D array of length len(sample2)")
+        if np.all(sample1==sample2):
+            print("Warning: sample1 and sample2 are exactly the same, only the\
+                   auto-correlation will be returned.")
+    else: 
+        sample2 = sample1
+        sample2_host_halo_id = sample1_host_halo_id
+    if randoms is not None: randoms = np.asarray(randoms)
+    rbins = np.asarray(rbins)
+    
+    #Process period entry and check for consistency.
+    if period is None:
+            PBCs = False
+            period = np.array([np.inf]*np.shape(sample1)[-1])
+    else:
+        PBCs = True
+        period = np.asarray(period).astype("float64")
+        if np.shape(period) == ():
+            period = np.array([period]*np.shape(sample1)[-1])
+        elif np.shape(period)[0] != np.shape(sample1)[-1]:
+            raise ValueError("period should have shape (k,)")
+    
+    #down sample if sample size exceeds max_sample_size.
+    if (len(sample1)>max_sample_size) & (np.all(sample1==sample2)):
+        inds = np.arange(0,len(sample1))
+        np.random.shuffle(inds)
+        inds = inds[0:max_sample_size]
+        sample1 = sample1[inds]
+        sample1_host_halo_id = sample1_host_halo_id[inds]
+        sample2 = sample1
+        sample2_host_halo_id = sample1_host_halo_id
+        print('downsampling sample1...')
+    if len(sample2)>max_sample_size:
+        inds = np.arange(0,len(sample2))
+        np.random.shuffle(inds)
+        inds = inds[0:max_sample_size]
+        sample2 = sample2[inds]
+        sample2_host_halo_id = sample2_host_halo_id[inds]
+        print('down sampling sample2...')
+    if len(sample1)>max_sample_size:
+        inds = np.arange(0,len(sample1))
+        np.random.shuffle(inds)
+        inds = inds[0:max_sample_size]
+        sample1 = sample1[inds]
+        sample1_host_halo_id = sample1_host_halo_id[inds]
+        print('down sampling sample1...')
+    
+    #check radial bins
+    if np.shape(rbins) == ():
+        rbins = np.array([rbins])
+    if rbins.ndim != 1:
+        raise ValueError('rbins must be a 1-D array')
+    if len(rbins)<2:
+        raise ValueError('rbins must be of lenght >=2.')
+    
+    #check dimensionality of data. currently, points must be 3D.
+    k = np.shape(sample1)[-1]
+    if k!=3:
+        raise ValueError('data must be 3-dimensional.')
+    
+    #check for input parameter consistency
+    if (PBCs==True) & (np.max(rbins)>np.min(period)/2.0):
+        raise ValueError('cannot calculate for seperations larger than Lbox/2.')
+    if (randoms is None) & (min(period)==np.inf):
+        raise ValueError('if no PBCs are specified, randoms must be provided.')
+    if estimator not in estimators: 
+        raise ValueError('user must specify a supported estimator. Supported estimators \
+        are:{0}'.format(estimators))
+    if (PBCs==True) & (max(period)==np.inf):
+        raise ValueError('if a non-infinte PBC specified, all PBCs must be non-infinte.')
+    if (type(do_auto) is not bool) | (type(do_cross) is not bool):
+        raise ValueError('do_auto and do_cross keywords must be of type boolean.')
+    
+    def random_counts(sample1, sample2, randoms, rbins, period, PBCs, k, N_threads,\
+                      do_RR, do_DR):
+        """
+        Count random pairs.  If no randoms are passes, calculate analytical randoms; 
+        otherwise, do it the old fashioned way.
+        """
+        def nball_volume(R,k):
+            """
+            Calculate the volume of a n-shpere.  This is used for the analytical randoms.
+            """
+            return (np.pi**(k/2.0)/gamma(k/2.0+1.0))*R**k
+        
+        #randoms provided, with or without PBCs.
+        if randoms is not None:
+            if PBCs==False: period=None
+            if (do_RR==True) | (PBCs==False):
+                RR = npairs(randoms, randoms, rbins, period=period, N_threads=N_threads)
+                RR = np.diff(RR)
+            else: RR=None
+            if (do_DR==True) | (PBCs==False):
+                D1R = npairs(sample1, randoms, rbins, period=period, N_threads=N_threads)
+                D1R = np.diff(D1R)
+                if np.all(sample1 == sample2):
+                    D2R = None
+                else:
+                    D2R = npairs(sample2, randoms, rbins, period=period,\
+                                 N_threads=N_threads)
+                    D2R = np.diff(D2R)
+            else:
+                D1R=None
+                D2R=None
+            
+            return D1R, D2R, RR
+        #PBCs and no randoms--calculate randoms analytically.
+        else:
+            #do volume calculations
+            dv = nball_volume(rbins,k) #volume of spheres
+            dv = np.diff(dv) #volume of shells
+            global_volume = period.prod()
+            
+            #calculate randoms for sample1
+            N1 = np.shape(sample1)[0]
+            rho1 = N1/global_volume
+            D1R = (N1)*(dv*rho1)
+            
+            #if not calculating cross-correlation, set RR exactly equal to D1R.
+            if np.all(sample1 == sample2):
+                D2R = None
+                RR = D1R
+            else:
+                N2 = np.shape(sample2)[0]
+                rho2 = N2/global_volume
+                D2R = N2*(dv*rho2)
+                NR = N1*N2
+                rhor = NR/global_volume
+                RR = (dv*rhor)
+            
+            return D1R, D2R, RR
+    
+    def pair_counts(sample1, sample2, ids1, ids2, rbins, period, PBCs, N_threads,\
+                    do_auto, do_cross):
+        """
+        Count one and two halo data pairs.
+        """
+        if PBCs==False: period=None
+        
+        if do_auto==True:
+            D1D1_1h, D1D1_2h = halo_id_npairs(sample1, sample1, rbins, ids1, ids1,\
+                                              period=period, N_threads=N_threads)
+            D1D1_1h, D1D1_2h = np.diff(D1D1_1h), np.diff(D1D1_2h)
+        else:
+            D1D1_1h, D1D1_2h = None, None
+        
+        if np.all(sample1 == sample2):
+            D1D2_1h, D1D2_2h = D1D1_1h, D1D1_2h
+            D2D2_1h, D2D2_2h = D1D1_1h, D1D1_2h
+        else:
+            if do_cross==True:
+                D1D2_1h, D1D2_2h = halo_id_npairs(sample1, sample2, rbins, ids1, ids2,\
+                                                  period=period, N_threads=N_threads)
+                D1D2_1h, D1D2_2h = np.diff(D1D2_1h), np.diff(D1D2_2h)
+            else: D1D2_1h, D1D2_2h = None, None
+            if do_auto==True:
+                D2D2_1h, D2D2_2h = halo_id_npairs(sample2, sample2, rbins, ids2, ids2,\
+                                                  period=period, N_threads=N_threads)
+                D2D2_1h, D2D2_2h = np.diff(D2D2_1h), np.diff(D2D2_2h)
+            else: D2D2_1h, D2D2_2h = None, None
+        
+        return D1D1_1h, D1D1_2h, D1D2_1h, D1D2_2h, D2D2_1h, D2D2_2h
+    
+    #what needs to be done?
+    do_DD, do_DR, do_RR = _TP_estimator_requirements(estimator)
+    
+    #how many points are there? (for normalization purposes)
+    if randoms is not None:
+        N1 = len(sample1)
+        N2 = len(sample2)
+        NR = len(randoms)
+    else: #this is taken care of in the analytical randoms case.
+        N1 = 1.0
+        N2 = 1.0
+        NR = 1.0
+    
+    #count pairs
+    D1D1_1h, D1D1_2h, D1D2_1h, D1D2_2h, D2D2_1h, D2D2_2h =\
+        pair_counts(sample1, sample2, sample1_host_halo_id, sample2_host_halo_id,\
+                    rbins, period, PBCs, N_threads, do_auto, do_cross)
+    D1R, D2R, RR = random_counts(sample1, sample2, randoms, rbins, period,\
+                                 PBCs, k, N_threads, do_RR, do_DR)
+    
+    #return results
+    if np.all(sample2==sample1):
+        xi_11_1h = _TP_estimator(D1D1_1h,D1R,RR,N1,N1,NR,NR,estimator)
+        xi_11_2h = _TP_estimator(D1D1_2h,D1R,RR,N1,N1,NR,NR,estimator)
+        return xi_11_1h, xi_11_2h
+    else:
+        if (do_auto==True) & (do_cross==True): 
+            xi_11_1h = _TP_estimator(D1D1_1h,D1R,RR,N1,N1,NR,NR,estimator)
+            xi_11_2h = _TP_estimator(D1D1_2h,D1R,RR,N1,N1,NR,NR,estimator)
+            xi_12_1h = _TP_estimator(D1D2_1h,D1R,RR,N1,N2,NR,NR,estimator)
+            xi_12_2h = _TP_estimator(D1D2_2h,D1R,RR,N1,N2,NR,NR,estimator)
+            xi_22_1h = _TP_estimator(D2D2_1h,D2R,RR,N2,N2,NR,NR,estimator)
+            xi_22_2h = _TP_estimator(D2D2_2h,D2R,RR,N2,N2,NR,NR,estimator)
+            return xi_11_1h, xi_11_2h, xi_12_1h, xi_12_2h, xi_22_1h, xi_22_2h
+        elif (do_cross==True):
+            xi_12_1h = _TP_estimator(D1D2_1h,D1R,RR,N1,N2,NR,NR,estimator)
+            xi_12_2h = _TP_estimator(D1D2_2h,D1R,RR,N1,N2,NR,NR,estimator)
+            return xi_12_1h, xi_12_2h
+        elif (do_auto==True):
+            xi_11_1h = _TP_estimator(D1D1_1h,D1R,D1R,N1,N1,NR,NR,estimator)
+            xi_11_2h = _TP_estimator(D1D1_2h,D1R,D1R,N1,N1,NR,NR,estimator)
+            xi_22_1h = _TP_estimator(D2D2_1h,D2R,D2R,N2,N2,NR,NR,estimator)
+            xi_22_2h = _TP_estimator(D2D2_2h,D2R,D2R,N2,N2,NR,NR,estimator)
+            return xi_11_1h, xi_11_2h, xi_22_1h, xi_22_2h
+
+
 def _list_estimators():
     """
     private internal function.
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+"""
+functions to calculate one-point counts statistics, e.g. counts-in-cells and the
+void probability function.
+"""
+
+from __future__ import division, print_function
+####import modules########################################################################
+import numpy as np
+from .pair_counters.rect_cuboid_pairs import per_point_npairs
+##########################################################################################
+
+
+__all__=['counts_in_spheres', 'counts_in_cells', 'counts_in_cells_moments',\
+         'void_prob_func']
+__author__ = ['Duncan Campbell']
+
+
+def counts_in_spheres(sample1, rbins, centers=None, n_centers=int(1e5), period=None,\
+                      seed=None, N_threads=1):
+    """
+    Count the number of points in spheres of radius rbins[i] around each of the
+    sphere centers.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts x 3 numpy array containing 3-D positions of points.
+
+    rbins : array_like
+        array of sphere radii.
+
+    centers : array_like, optional
+        Ncenters x 3 numpy array containing 3-D positions of the sphere centers.
+        If None, ``n_centers`` centers are drawn uniformly from the periodic box, in
+        which case ``period`` must be specified.
+
+    n_centers : int, optional
+        number of random sphere centers to use if ``centers`` is not passed.
+        Default is 1e5.
+
+    period : array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.
+
+    seed : int, optional
+        random number seed used to draw the random sphere centers.
+
+    N_threads : int, optional
+        number of threads to use in calculation. Default is 1. A string 'max' may be used
+        to indicate that the pair counters should use all available cores on the machine.
+
+    Returns
+    -------
+    counts : numpy.array
+        Ncenters x len(rbins) integer array. counts[i,j] is the number of points
+        in sample1 within a distance rbins[j] of the i^th sphere center.
+    """
+
+    sample1, rbins, period = _process_args(sample1, rbins, period)
+
+    if centers is None:
+        if period is None:
+            raise ValueError("If no sphere centers are passed, period must be specified.")
+        centers = _random_centers(n_centers, period, seed)
+    else:
+        centers = np.asarray(centers, dtype=np.float64)
+        if (centers.ndim != 2) or (np.shape(centers)[1]!=3):
+            raise ValueError("centers must be of shape (Ncenters,3)")
+
+    counts = per_point_npairs(centers, sample1, rbins, period=period,\
+                              N_threads=N_threads)
+
+    return counts
+
+
+def counts_in_cells(sample1, rbins, centers=None, n_centers=int(1e5), period=None,\
+                    seed=None, N_threads=1, max_count=None):
+    """
+    Calculate the counts-in-cells distribution, :math:`P(N|r)`, the probability that
+    a sphere of radius r placed in the volume contains exactly N points.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts x 3 numpy array containing 3-D positions of points.
+
+    rbins : array_like
+        array of sphere radii.
+
+    centers : array_like, optional
+        Ncenters x 3 numpy array containing 3-D positions of the sphere centers.
+        If None, ``n_centers`` centers are drawn uniformly from the periodic box, in
+        which case ``period`` must be specified.
+
+    n_centers : int, optional
+        number of random sphere centers to use if ``centers`` is not passed.
+        Default is 1e5.
+
+    period : array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.
+
+    seed : int, optional
+        random number seed used to draw the random sphere centers.
+
+    N_threads : int, optional
+        number of threads to use in calculation. Default is 1. A string 'max' may be used
+        to indicate that the pair counters should use all available cores on the machine.
+
+    max_count : int, optional
+        largest value of N for which :math:`P(N|r)` is returned. Spheres with more
+        than ``max_count`` points are counted in the normalization but not in any bin.
+        Default is the largest count found in any sphere.
+
+    Returns
+    -------
+    pn : numpy.array
+        len(rbins) x (max_count+1) array. pn[j,N] is the probability that a sphere of
+        radius rbins[j] contains N points.
+
+    Notes
+    -----
+    The full distribution of counts for each sphere can be obtained with
+    `counts_in_spheres`.  Its moments can be calculated with `counts_in_cells_moments`.
+    """
+
+    counts = counts_in_spheres(sample1, rbins, centers=centers, n_centers=n_centers,\
+                               period=period, seed=seed, N_threads=N_threads)
+
+    n_spheres, n_bins = np.shape(counts)
+    if max_count is None:
+        max_count = np.max(counts) if n_spheres>0 else 0
+    max_count = int(max_count)
+
+    #histogram the counts in each radial bin at once by offsetting each bin
+    offsets = np.arange(n_bins)*(max_count+1)
+    in_range = counts <= max_count
+    pn = np.bincount((counts + offsets)[in_range], minlength=n_bins*(max_count+1))
+    pn = pn.reshape((n_bins, max_count+1))/float(max(n_spheres,1))
+
+    return pn
+
+
+def counts_in_cells_moments(counts, max_order=4):
+    """
+    Calculate the moments of the counts-in-cells distribution.
+
+    Parameters
+    ----------
+    counts : array_like
+        Ncenters x Nbins array of counts in spheres, e.g. as returned by
+        `counts_in_spheres`.
+
+    max_order : int, optional
+        highest order central moment to calculate. Default is 4.
+
+    Returns
+    -------
+    moments : numpy.array
+        max_order x Nbins array. moments[0] is the mean count in each bin, and
+        moments[k] is the :math:`(k+1)^{\\rm th}` central moment of the counts,
+        :math:`\\langle (N-\\bar{N})^{k+1} \\rangle`.
+    """
+
+    counts = np.atleast_2d(counts).astype(np.float64)
+    max_order = int(max_order)
+    if max_order < 1:
+        raise ValueError("max_order must be a positive integer")
+
+    mean = np.mean(counts, axis=0)
+    moments = np.zeros((max_order, np.shape(counts)[1]))
+    moments[0] = mean
+
+    delta = counts - mean
+    delta_k = delta.copy()
+    for k in range(1,max_order):
+        delta_k *= delta
+        moments[k] = np.mean(delta_k, axis=0)
+
+    return moments
+
+
+def void_prob_func(sample1, rbins, centers=None, n_centers=int(1e5), period=None,\
+                   seed=None, N_threads=1):
+    """
+    Calculate the void probability function, :math:`P_0(r)`, the probability that a
+    sphere of radius r placed in the volume contains no points.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts x 3 numpy array containing 3-D positions of points.
+
+    rbins : array_like
+        array of sphere radii.
+
+    centers : array_like, optional
+        Ncenters x 3 numpy array containing 3-D positions of the sphere centers.
+        If None, ``n_centers`` centers are drawn uniformly from the periodic box, in
+        which case ``period`` must be specified.
+
+    n_centers : int, optional
+        number of random sphere centers to use if ``centers`` is not passed.
+        Default is 1e5.
+
+    period : array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.
+
+    seed : int, optional
+        random number seed used to draw the random sphere centers.
+
+    N_threads : int, optional
+        number of threads to use in calculation. Default is 1. A string 'max' may be used
+        to indicate that the pair counters should use all available cores on the machine.
+
+    Returns
+    -------
+    vpf : numpy.array
+        len(rbins) length array of void probabilities.
+    """
+
+    pn = counts_in_cells(sample1, rbins, centers=centers, n_centers=n_centers,\
+                         period=period, seed=seed, N_threads=N_threads, max_count=0)
+
+    return pn[:,0]
+
+
+def _random_centers(n_centers, period, seed):
+    """
+    draw random sphere centers uniformly within the periodic box.
+    """
+
+    rng = np.random.RandomState(seed)
+    centers = rng.random_sample((int(n_centers),3))*period
+
+    return centers
+
+
+def _process_args(sample1, rbins, period):
+    """
+    utility function to process input to the counts-in-cells functions.
+    """
+
+    sample1 = np.asarray(sample1, dtype=np.float64)
+    if (sample1.ndim != 2) or (np.shape(sample1)[1]!=3):
+        raise ValueError("sample1 must be of shape (Npts,3)")
+
+    rbins = np.atleast_1d(rbins).astype(np.float64)
+    if rbins.ndim != 1:
+        raise ValueError("rbins must be a 1D array")
+    if np.any(rbins<=0.0):
+        raise ValueError("rbins must be strictly positive")
+
+    if period is not None:
+        period = np.atleast_1d(period).astype(np.float64)
+        if len(period) == 1:
+            period = np.array([period[0]]*3)
+        elif len(period) != 3:
+            raise ValueError("period should have len == dimension of points")
+        if np.any(np.isinf(period)):
+            period = None
+
+    return sample1, rbins, period
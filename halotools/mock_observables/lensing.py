@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+"""
+functions to calculate galaxy-galaxy lensing observables of simulated galaxies from the
+dark matter particles of the simulation.
+"""
+
+from __future__ import division, print_function
+####import modules########################################################################
+import numpy as np
+import multiprocessing
+from functools import partial
+from .pair_counters.rect_cuboid import rect_cuboid_cells
+from .pair_counters.cpairs.projected_mass import *
+##########################################################################################
+
+
+__all__=['delta_sigma']
+__author__ = ['Duncan Campbell']
+
+
+def delta_sigma(galaxies, particles, rp_bins, period=None, particle_masses=1.0,\
+                downsampling_factor=1.0, Nsub=None, N_threads=1, approx_cell_size=None):
+    """
+    Calculate the excess surface density, :math:`\\Delta\\Sigma(r_p)`, of the matter
+    around galaxies, the observable of galaxy-galaxy lensing.
+
+    The particles are projected along the z-direction through the full box, and the
+    mass of the particles in projected annuli and in the inner disks of the annuli
+    around each galaxy is counted in a single pass over a 2-D grid of cells.
+
+    Parameters
+    ----------
+    galaxies : array_like
+        Ngal x 3 numpy array containing 3-D positions of the lens galaxies.
+
+    particles : array_like
+        Nptcl x 3 numpy array containing 3-D positions of the dark matter particles.
+
+    rp_bins : array_like
+        numpy array of boundaries defining the projected radial bins in which
+        :math:`\\Delta\\Sigma` is calculated.
+
+    period : array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.  Only the x and y periods are used.
+
+    particle_masses : array_like, optional
+        mass of the particles, either a single number or a length Nptcl array.
+        Default is 1.
+
+    downsampling_factor : float, optional
+        factor by which the particles have been randomly downsampled from the full
+        set of particles of the simulation, e.g. 1000 if one particle in 1000 was kept.
+        Each particle is then counted as ``downsampling_factor`` times its mass.
+        Default is 1.
+
+    Nsub : array_like, optional
+        length 2 array of the number of divisions of the projected box along the x and
+        y directions defining jackknife subvolumes.  If a single integer is given, it
+        is used along both directions.  If passed, the jackknife covariance matrix of
+        :math:`\\Delta\\Sigma` is also returned.  Default is None.
+
+    N_threads : int, optional
+        number of threads to use in calculation. Default is 1. A string 'max' may be used
+        to indicate that the counters should use all available cores on the machine.
+
+    approx_cell_size : array_like, optional
+        approximate size of the cells of the 2-D grid of particles.
+        Default is half the largest of ``rp_bins``.
+
+    Returns
+    -------
+    delta_sigma : numpy.array
+        len(`rp_bins`)-1 length array containing :math:`\\Delta\\Sigma(r_p)` at the
+        midpoints of `rp_bins`, in units of the particle masses per squared unit of
+        length of the positions.
+
+    cov_matrix : numpy.ndarray
+        len(`rp_bins`)-1 x len(`rp_bins`)-1 jackknife covariance matrix of
+        :math:`\\Delta\\Sigma`.  Only returned if ``Nsub`` is passed.
+
+    Notes
+    -----
+    :math:`\\Delta\\Sigma(r_p) = \\bar{\\Sigma}(<r_p) - \\Sigma(r_p)`, where
+    :math:`\\Sigma(r_p)` is the mean surface density in each annulus, and the mass
+    within the midpoint of each annulus is interpolated assuming constant surface
+    density across the annulus.  The mean density of the universe cancels in the
+    difference, so no random points are needed.
+
+    The jackknife samples are defined by removing the galaxies of one subvolume at a
+    time, while keeping all the particles.
+
+    Examples
+    --------
+    >>> Npts = 1000
+    >>> Lbox = 250.0
+    >>> period = np.array([Lbox,Lbox,Lbox])
+    >>> galaxies = np.random.uniform(0, Lbox, (Npts, 3))
+    >>> particles = np.random.uniform(0, Lbox, (10*Npts, 3))
+    >>> rp_bins = np.logspace(-1, 1, 10)
+    >>> ds = delta_sigma(galaxies, particles, rp_bins, period=period, particle_masses=1e10) # doctest: +SKIP
+    """
+
+    if N_threads is not 1:
+        if N_threads=='max':
+            N_threads = multiprocessing.cpu_count()
+        if isinstance(N_threads,int):
+            pool = multiprocessing.Pool(N_threads)
+        else: return ValueError("N_threads argument must be an integer number or 'max'")
+
+    #process input
+    galaxies = np.asarray(galaxies, dtype=np.float64)
+    particles = np.asarray(particles, dtype=np.float64)
+    if (galaxies.ndim != 2) or (np.shape(galaxies)[1]!=3):
+        raise ValueError("galaxies must be of shape (Npts,3)")
+    if (particles.ndim != 2) or (np.shape(particles)[1]!=3):
+        raise ValueError("particles must be of shape (Npts,3)")
+    if len(galaxies)==0:
+        raise ValueError("galaxies must contain at least one point")
+
+    rp_bins = np.asarray(rp_bins, dtype=np.float64)
+    if (rp_bins.ndim != 1) or (len(rp_bins)<2):
+        raise ValueError("rp_bins must be a 1D array of length >=2")
+    if np.any(np.diff(rp_bins)<=0.0) or (rp_bins[0]<=0.0):
+        raise ValueError("rp_bins must be positive and strictly increasing")
+
+    weights = np.atleast_1d(particle_masses).astype(np.float64)
+    if len(weights)==1:
+        weights = np.zeros(len(particles)) + weights[0]
+    elif np.shape(weights) != (len(particles),):
+        raise ValueError("particle_masses must be a single number or have one value "
+                         "per particle")
+    weights = weights*downsampling_factor
+
+    #process period entry, and build the projected box the grid covers
+    if period is None:
+        PBCs = False
+        points = np.vstack((galaxies[:,0:2], particles[:,0:2]))
+        xymin = np.min(points, axis=0)
+        galaxies = galaxies[:,0:2] - xymin
+        particles = particles[:,0:2] - xymin
+        Lbox = np.max(points, axis=0) - xymin
+        Lbox = np.where(Lbox>0.0, Lbox, 1.0)
+        period = np.array([np.inf]*3)
+    else:
+        PBCs = True
+        period = np.atleast_1d(period).astype(np.float64)
+        if len(period) == 1:
+            period = np.array([period[0]]*3)
+        elif len(period) != 3:
+            raise ValueError("period should have len == dimension of points")
+        if np.max(rp_bins)>np.min(period[0:2])/2.0:
+            raise ValueError("cannot calculate for seperations larger than Lbox/2 "
+                             "with PBCs")
+        galaxies = galaxies[:,0:2]
+        particles = particles[:,0:2]
+        Lbox = period[0:2]
+
+    #tag each galaxy with the jackknife subvolume it is in
+    if Nsub is None:
+        Nlabels = 1
+        labels = np.zeros(len(galaxies), dtype=int)
+    else:
+        Nsub = np.atleast_1d(Nsub).astype(int)
+        if len(Nsub)==1: Nsub = np.array([Nsub[0]]*2)
+        elif len(Nsub)!=2:
+            raise ValueError("Nsub should have shape (2,) or be a single integer")
+        if np.any(Nsub<1):
+            raise ValueError("Nsub must be positive")
+        Nlabels = int(np.prod(Nsub))
+        index = np.floor(galaxies/(Lbox/Nsub)).astype(int)
+        index = np.minimum(np.maximum(index, 0), Nsub-1)
+        labels = np.ravel_multi_index((index[:,0], index[:,1]), (Nsub[0], Nsub[1]))
+
+    #build the 2-D grids.  The grid has a single cell in the z-direction.
+    if approx_cell_size is None:
+        approx_cell_size = np.max(rp_bins)/2.0
+    approx_cell_size = np.atleast_1d(approx_cell_size).astype(np.float64)
+    if len(approx_cell_size)==1:
+        approx_cell_size = np.array([approx_cell_size[0]]*2)
+    max_divs = min(_max_divs, max(1, int(np.ceil(np.sqrt(len(particles))))))
+    cell_size = np.minimum(np.maximum(approx_cell_size[0:2], Lbox/max_divs), Lbox)
+    grid_Lbox = np.append(Lbox, 1.0)
+    grid_cell_size = np.append(cell_size, 1.0)
+
+    grid2 = rect_cuboid_cells(particles[:,0], particles[:,1],\
+                              np.zeros(len(particles)), grid_Lbox, grid_cell_size)
+    grid1 = rect_cuboid_cells(galaxies[:,0], galaxies[:,1],\
+                              np.zeros(len(galaxies)), grid_Lbox, grid_cell_size)
+    weights = np.ascontiguousarray(weights[grid2.idx_sorted], dtype=np.float64)
+    labels = np.ascontiguousarray(labels[grid1.idx_sorted], dtype=int)
+
+    #split the galaxies, sorted by cell, into contiguous chunks to search
+    Nchunks = max(1, min(len(galaxies), 4*N_threads))
+    chunk_edges = np.linspace(0, len(galaxies), Nchunks+1).astype(int)
+    chunks = [(grid1.x[i1:i2], grid1.y[i1:i2], labels[i1:i2])\
+              for i1, i2 in zip(chunk_edges[:-1], chunk_edges[1:])]
+
+    #create a function to call with only one argument
+    engine = partial(_delta_sigma_engine, grid2, weights, rp_bins**2.0, Nlabels,\
+                     period, PBCs)
+
+    #do the counting
+    if N_threads>1:
+        mass = np.sum(pool.map(engine, chunks), axis=0)
+        pool.close()
+    if N_threads==1:
+        mass = np.sum(list(map(engine, chunks)), axis=0)
+
+    #cumulative mass within each of rp_bins of the galaxies of each subvolume
+    mass = np.cumsum(mass, axis=1)
+    Ngal = np.bincount(labels, minlength=Nlabels).astype(float)
+
+    full = _delta_sigma_from_enclosed_mass(np.sum(mass, axis=0)/len(galaxies), rp_bins)
+    if Nsub is None:
+        return full
+
+    #remove the galaxies of one subvolume at a time
+    Ngal_sub = len(galaxies) - Ngal
+    if np.any(Ngal_sub==0):
+        raise ValueError("all galaxies are in one jackknife subvolume")
+    mass_sub = (np.sum(mass, axis=0) - mass)/Ngal_sub[:,np.newaxis]
+    sub = _delta_sigma_from_enclosed_mass(mass_sub, rp_bins)
+
+    after_subtraction = sub - np.mean(sub, axis=0)
+    cov = ((Nlabels-1)/Nlabels)*np.dot(after_subtraction.T, after_subtraction)
+
+    return full, cov
+
+
+def _delta_sigma_engine(grid2, weights2, rp_bins, Nlabels, period, PBCs, chunk):
+    """
+    counting engine for delta_sigma function.  This code calls a cython function.
+    """
+
+    x1, y1, labels1 = chunk
+
+    num_divs = np.asarray(grid2.num_divs, dtype=int)
+    dL = np.asarray(grid2.dL, dtype=np.float64)
+
+    if PBCs==False:
+        mass = projected_mass_no_pbc(x1, y1, labels1, grid2.x, grid2.y, weights2,\
+                                     grid2.cell_starts, grid2.cell_stops,\
+                                     num_divs, dL, rp_bins, Nlabels)
+    else: #PBCs==True
+        mass = projected_mass_pbc(x1, y1, labels1, grid2.x, grid2.y, weights2,\
+                                  grid2.cell_starts, grid2.cell_stops,\
+                                  num_divs, dL, rp_bins, Nlabels, period)
+
+    return mass
+
+
+def _delta_sigma_from_enclosed_mass(enclosed_mass, rp_bins):
+    """
+    Calculate :math:`\\Delta\\Sigma` at the midpoints of ``rp_bins`` from the mean
+    projected mass enclosed within each of ``rp_bins``, given along the last axis of
+    ``enclosed_mass``.  The mass enclosed within each midpoint is interpolated assuming
+    constant surface density across the annulus.
+    """
+
+    enclosed_mass = np.asarray(enclosed_mass, dtype=np.float64)
+    annulus_sigma = np.diff(enclosed_mass, axis=-1)/np.diff(np.pi*rp_bins**2)
+
+    rp_bin_centers = (rp_bins[1:] + rp_bins[0:-1])/2.0
+    inner_area = np.pi*rp_bin_centers**2
+    inner_mass = enclosed_mass[...,0:-1] +\
+                 annulus_sigma*(inner_area - np.pi*rp_bins[0:-1]**2)
+
+    return inner_mass/inner_area - annulus_sigma
+
+
+#maximum number of grid cells along each dimension
+_max_divs = 1024
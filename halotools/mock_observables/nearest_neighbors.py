@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+"""
+functions to find the k nearest neighbors of points, e.g. for environment and
+isolation criteria.
+"""
+
+from __future__ import division, print_function
+####import modules########################################################################
+import numpy as np
+import multiprocessing
+from functools import partial
+from .pair_counters.rect_cuboid import rect_cuboid_cells
+from .pair_counters.cpairs.knn import knn_no_pbc, knn_pbc
+##########################################################################################
+
+
+__all__=['nearest_neighbors']
+__author__ = ['Duncan Campbell']
+
+
+def nearest_neighbors(sample1, k=1, sample2=None, period=None, N_threads=1,\
+                      approx_cell_size=None):
+    """
+    Find the k nearest neighbors in sample2 of each point in sample1.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+
+    k : int, optional
+        number of nearest neighbors to find. Default is 1.
+
+    sample2 : array_like, optional
+        Npts2 x 3 numpy array containing 3-D positions of points in which to search
+        for neighbors.  If None, the neighbors are searched for within sample1, and
+        each point is not counted as its own neighbor.
+
+    period : array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.
+
+    N_threads : int, optional
+        number of threads to use in calculation. Default is 1. A string 'max' may be used
+        to indicate that the search should use all available cores on the machine.
+
+    approx_cell_size : float, optional
+        approximate size of the cells of the grid used to search for neighbors.
+        Default is chosen such that each cell contains about k/2 points of sample2.
+
+    Returns
+    -------
+    distances : numpy.array
+        Npts1 x k array. distances[i,j] is the distance between the i-th point in
+        sample1 and its (j+1)-th nearest neighbor in sample2.
+
+    indices : numpy.array
+        Npts1 x k array. indices[i,j] is the index in sample2 of the (j+1)-th nearest
+        neighbor of the i-th point in sample1.
+
+    Notes
+    -----
+    The grid cells are searched in shells of increasing size around each point, so
+    the search stops as soon as the k-th nearest neighbor is known to have been found.
+    If sample2 contains fewer than k points, the missing neighbors have distance
+    ``np.inf`` and index -1.
+    """
+
+    if N_threads is not 1:
+        if N_threads=='max':
+            N_threads = multiprocessing.cpu_count()
+        if isinstance(N_threads,int):
+            pool = multiprocessing.Pool(N_threads)
+        else: return ValueError("N_threads argument must be an integer number or 'max'")
+
+    #process input
+    sample1 = np.asarray(sample1, dtype=np.float64)
+    if (sample1.ndim != 2) or (np.shape(sample1)[1]!=3):
+        raise ValueError("sample1 must be of shape (Npts,3)")
+
+    #do not count points as their own neighbors if searching within sample1
+    if sample2 is None:
+        sample2 = sample1
+        exclude1 = np.arange(len(sample1), dtype=int)
+    else:
+        sample2 = np.asarray(sample2, dtype=np.float64)
+        if (sample2.ndim != 2) or (np.shape(sample2)[1]!=3):
+            raise ValueError("sample2 must be of shape (Npts,3)")
+        exclude1 = np.zeros(len(sample1), dtype=int) - 1
+
+    k = int(k)
+    if k < 1:
+        raise ValueError("k must be a positive integer")
+
+    if period is None:
+        PBCs = False
+    else:
+        PBCs = True
+        period = np.atleast_1d(period).astype(np.float64)
+        if len(period) == 1:
+            period = np.array([period[0]]*3)
+        elif len(period) != 3:
+            raise ValueError("period should have len == dimension of points")
+        if np.any(np.isinf(period)):
+            PBCs = False
+
+    #build the box the grid covers
+    if PBCs==True:
+        Lbox = period
+    else:
+        xyzmin = np.minimum(np.min(sample1, axis=0), np.min(sample2, axis=0))
+        sample1 = sample1 - xyzmin
+        sample2 = sample2 - xyzmin
+        Lbox = np.maximum(np.max(sample1, axis=0), np.max(sample2, axis=0))
+        Lbox = np.where(Lbox>0.0, Lbox, 1.0)
+
+    #choose the cell size so that there are about k/2 points of sample2 per cell
+    if approx_cell_size is None:
+        approx_cell_size = (0.5*k*np.prod(Lbox)/max(len(sample2),1))**(1.0/3.0)
+
+    #limit the number of cells, the grid does not need more cells than points
+    max_divs = min(_max_divs, max(1, int(np.ceil(len(sample2)**(1.0/3.0)))))
+    cell_size = np.maximum(np.array([approx_cell_size]*3, dtype=np.float64), Lbox/max_divs)
+    cell_size = np.minimum(cell_size, Lbox)
+
+    grid2 = rect_cuboid_cells(sample2[:,0], sample2[:,1], sample2[:,2], Lbox, cell_size)
+    grid1 = rect_cuboid_cells(sample1[:,0], sample1[:,1], sample1[:,2], Lbox, cell_size)
+
+    #split the sample1 points, sorted by cell, into contiguous chunks to search
+    Nchunks = max(1, min(len(sample1), 4*N_threads))
+    chunk_edges = np.linspace(0, len(sample1), Nchunks+1).astype(int)
+    exclude1 = exclude1[grid1.idx_sorted]
+    chunks = [(grid1.x[i1:i2], grid1.y[i1:i2], grid1.z[i1:i2], exclude1[i1:i2])\
+              for i1, i2 in zip(chunk_edges[:-1], chunk_edges[1:])]
+
+    #create a function to call with only one argument
+    engine = partial(_nearest_neighbors_engine, grid2, k, period, PBCs)
+
+    #do the search
+    if N_threads>1:
+        result = pool.map(engine, chunks)
+        pool.close()
+    if N_threads==1:
+        result = list(map(engine, chunks))
+
+    #undo the sorting to match the input ordering of sample1
+    distances = np.empty((len(sample1), k))
+    indices = np.empty((len(sample1), k), dtype=int)
+    distances[grid1.idx_sorted] = np.vstack([r[0] for r in result])
+    indices[grid1.idx_sorted] = np.vstack([r[1] for r in result])
+
+    return distances, indices
+
+
+def _nearest_neighbors_engine(grid2, k, period, PBCs, chunk):
+    """
+    nearest neighbor engine for nearest_neighbors function.  This code calls a cython
+    function.
+    """
+
+    x1, y1, z1, exclude1 = chunk
+
+    num_divs = np.asarray(grid2.num_divs, dtype=int)
+    dL = np.asarray(grid2.dL, dtype=np.float64)
+    idx2 = np.asarray(grid2.idx_sorted, dtype=int)
+
+    if PBCs==False:
+        dists, inds = knn_no_pbc(x1, y1, z1, exclude1,\
+                                 grid2.x, grid2.y, grid2.z, idx2,\
+                                 grid2.cell_starts, grid2.cell_stops,\
+                                 num_divs, dL, k)
+    else: #PBCs==True
+        dists, inds = knn_pbc(x1, y1, z1, exclude1,\
+                              grid2.x, grid2.y, grid2.z, idx2,\
+                              grid2.cell_starts, grid2.cell_stops,\
+                              num_divs, dL, k, period)
+
+    return dists, inds
+
+
+#maximum number of grid cells along each dimension
+_max_divs = 128
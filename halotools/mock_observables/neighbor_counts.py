@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+
+"""
+functions to count the neighbors of points within a search radius that varies from
+point to point, e.g. the number of particles within the virial radius of each halo.
+"""
+
+from __future__ import division, print_function
+####import modules########################################################################
+import numpy as np
+import multiprocessing
+from functools import partial
+from .pair_counters.rect_cuboid import rect_cuboid_cells
+from .pair_counters.cpairs.variable_radius import *
+##########################################################################################
+
+
+__all__=['spherical_neighbor_counts', 'cylindrical_neighbor_counts']
+__author__ = ['Duncan Campbell']
+
+
+def spherical_neighbor_counts(sample1, radii, sample2=None, weights2=None, period=None,\
+                              N_threads=1, approx_cell_size=None):
+    """
+    Count the number of points in sample2 within a distance radii[i] of each point i
+    in sample1.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+
+    radii : array_like
+        length Npts1 array of search radii, one for each point in sample1.  If a
+        single number is passed, the same radius is used for every point.
+
+    sample2 : array_like, optional
+        Npts2 x 3 numpy array containing 3-D positions of points to count.  If None,
+        points in sample1 are counted, and each point is not counted as its own
+        neighbor.
+
+    weights2 : array_like, optional
+        length Npts2 array of weights.  If passed, the sum of the weights of the
+        neighbors is returned instead of the number of neighbors.
+
+    period : array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.
+
+    N_threads : int, optional
+        number of threads to use in calculation. Default is 1. A string 'max' may be used
+        to indicate that the counters should use all available cores on the machine.
+
+    approx_cell_size : array_like, optional
+        approximate size of the cells of the grid used to search for neighbors.
+        Default is the median search radius.
+
+    Returns
+    -------
+    counts : numpy.array
+        length Npts1 array.  Number of neighbors of each point in sample1, or the
+        sum of their weights if ``weights2`` is passed.
+
+    Notes
+    -----
+    Each point only searches the cells overlapping its own sphere, so a few points
+    with large radii do not slow down the counts for all the other points.
+    """
+
+    sample1, sample2, exclude1, weights2, period, PBCs =\
+        _process_args(sample1, sample2, weights2, period)
+
+    radii = _process_radii(radii, len(sample1), 'radii', period)
+
+    if approx_cell_size is None:
+        approx_cell_size = np.median(radii) if len(radii)>0 else 1.0
+    approx_cell_size = np.atleast_1d(approx_cell_size).astype(np.float64)
+    if len(approx_cell_size)==1:
+        approx_cell_size = np.array([approx_cell_size[0]]*3)
+
+    return _neighbor_counts(sample1, sample2, exclude1, weights2, (radii,),\
+                            period, PBCs, N_threads, approx_cell_size, False)
+
+
+def cylindrical_neighbor_counts(sample1, rp, pi, sample2=None, weights2=None,\
+                                period=None, N_threads=1, approx_cell_size=None):
+    """
+    Count the number of points in sample2 within a cylinder of radius rp[i] and
+    half-length pi[i] centered on each point i in sample1.  The axis of the cylinder
+    is along the z-direction.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+
+    rp : array_like
+        length Npts1 array of projected (x-y) search radii, one for each point in
+        sample1.  If a single number is passed, the same radius is used for every point.
+
+    pi : array_like
+        length Npts1 array of line-of-sight (z) search half-lengths, one for each
+        point in sample1.  If a single number is passed, the same half-length is used
+        for every point.
+
+    sample2 : array_like, optional
+        Npts2 x 3 numpy array containing 3-D positions of points to count.  If None,
+        points in sample1 are counted, and each point is not counted as its own
+        neighbor.
+
+    weights2 : array_like, optional
+        length Npts2 array of weights.  If passed, the sum of the weights of the
+        neighbors is returned instead of the number of neighbors.
+
+    period : array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.
+
+    N_threads : int, optional
+        number of threads to use in calculation. Default is 1. A string 'max' may be used
+        to indicate that the counters should use all available cores on the machine.
+
+    approx_cell_size : array_like, optional
+        approximate size of the cells of the grid used to search for neighbors.
+        Default is the median rp in the x-y directions and the median pi in the
+        z-direction.
+
+    Returns
+    -------
+    counts : numpy.array
+        length Npts1 array.  Number of neighbors of each point in sample1, or the
+        sum of their weights if ``weights2`` is passed.
+    """
+
+    sample1, sample2, exclude1, weights2, period, PBCs =\
+        _process_args(sample1, sample2, weights2, period)
+
+    rp = _process_radii(rp, len(sample1), 'rp', period)
+    pi = _process_radii(pi, len(sample1), 'pi', period)
+
+    if approx_cell_size is None:
+        if len(rp)>0:
+            approx_cell_size = np.array([np.median(rp), np.median(rp), np.median(pi)])
+        else: approx_cell_size = np.ones(3)
+    approx_cell_size = np.atleast_1d(approx_cell_size).astype(np.float64)
+    if len(approx_cell_size)==1:
+        approx_cell_size = np.array([approx_cell_size[0]]*3)
+
+    return _neighbor_counts(sample1, sample2, exclude1, weights2, (rp, pi),\
+                            period, PBCs, N_threads, approx_cell_size, True)
+
+
+def _neighbor_counts(sample1, sample2, exclude1, weights2, radii, period, PBCs,\
+                     N_threads, approx_cell_size, cylinder):
+    """
+    build the grid and do the counting for the neighbor counts functions.
+    """
+
+    if N_threads is not 1:
+        if N_threads=='max':
+            N_threads = multiprocessing.cpu_count()
+        if isinstance(N_threads,int):
+            pool = multiprocessing.Pool(N_threads)
+        else: return ValueError("N_threads argument must be an integer number or 'max'")
+
+    #return integer counts if no weights are passed
+    if weights2 is None:
+        return_int = True
+        weights2 = np.ones(len(sample2))
+    else: return_int = False
+
+    #build the box the grid covers
+    if PBCs==True:
+        Lbox = period
+    else:
+        xyzmin = np.minimum(np.min(sample1, axis=0), np.min(sample2, axis=0))
+        sample1 = sample1 - xyzmin
+        sample2 = sample2 - xyzmin
+        Lbox = np.maximum(np.max(sample1, axis=0), np.max(sample2, axis=0))
+        Lbox = np.where(Lbox>0.0, Lbox, 1.0)
+
+    #limit the number of cells, the grid does not need more cells than points
+    max_divs = min(_max_divs, max(1, int(np.ceil(len(sample2)**(1.0/3.0)))))
+    cell_size = np.maximum(approx_cell_size, Lbox/max_divs)
+    cell_size = np.minimum(cell_size, Lbox)
+
+    grid2 = rect_cuboid_cells(sample2[:,0], sample2[:,1], sample2[:,2], Lbox, cell_size)
+    grid1 = rect_cuboid_cells(sample1[:,0], sample1[:,1], sample1[:,2], Lbox, cell_size)
+    weights2 = np.ascontiguousarray(weights2[grid2.idx_sorted], dtype=np.float64)
+
+    #split the sample1 points, sorted by cell, into contiguous chunks to search
+    Nchunks = max(1, min(len(sample1), 4*N_threads))
+    chunk_edges = np.linspace(0, len(sample1), Nchunks+1).astype(int)
+    exclude1 = exclude1[grid1.idx_sorted]
+    radii = [np.ascontiguousarray(r[grid1.idx_sorted]) for r in radii]
+    chunks = [(grid1.x[i1:i2], grid1.y[i1:i2], grid1.z[i1:i2], exclude1[i1:i2]) +\
+              tuple(r[i1:i2] for r in radii)\
+              for i1, i2 in zip(chunk_edges[:-1], chunk_edges[1:])]
+
+    #create a function to call with only one argument
+    engine = partial(_neighbor_counts_engine, grid2, weights2, period, PBCs, cylinder)
+
+    #do the counting
+    if N_threads>1:
+        result = pool.map(engine, chunks)
+        pool.close()
+    if N_threads==1:
+        result = list(map(engine, chunks))
+
+    #undo the sorting to match the input ordering of sample1
+    counts = np.zeros(len(sample1))
+    counts[grid1.idx_sorted] = np.concatenate(result)
+
+    if return_int==True:
+        counts = np.round(counts).astype(int)
+
+    return counts
+
+
+def _neighbor_counts_engine(grid2, weights2, period, PBCs, cylinder, chunk):
+    """
+    counting engine for neighbor counts functions.  This code calls a cython function.
+    """
+
+    x1, y1, z1, exclude1 = chunk[0:4]
+
+    num_divs = np.asarray(grid2.num_divs, dtype=int)
+    dL = np.asarray(grid2.dL, dtype=np.float64)
+    idx2 = np.asarray(grid2.idx_sorted, dtype=int)
+
+    if cylinder==False:
+        r1 = chunk[4]
+        if PBCs==False:
+            counts = spherical_neighbor_counts_no_pbc(x1, y1, z1, r1, exclude1,\
+                                                      grid2.x, grid2.y, grid2.z,\
+                                                      weights2, idx2,\
+                                                      grid2.cell_starts, grid2.cell_stops,\
+                                                      num_divs, dL)
+        else: #PBCs==True
+            counts = spherical_neighbor_counts_pbc(x1, y1, z1, r1, exclude1,\
+                                                   grid2.x, grid2.y, grid2.z,\
+                                                   weights2, idx2,\
+                                                   grid2.cell_starts, grid2.cell_stops,\
+                                                   num_divs, dL, period)
+    else:
+        rp1, pi1 = chunk[4], chunk[5]
+        if PBCs==False:
+            counts = cylindrical_neighbor_counts_no_pbc(x1, y1, z1, rp1, pi1, exclude1,\
+                                                        grid2.x, grid2.y, grid2.z,\
+                                                        weights2, idx2,\
+                                                        grid2.cell_starts,\
+                                                        grid2.cell_stops,\
+                                                        num_divs, dL)
+        else: #PBCs==True
+            counts = cylindrical_neighbor_counts_pbc(x1, y1, z1, rp1, pi1, exclude1,\
+                                                     grid2.x, grid2.y, grid2.z,\
+                                                     weights2, idx2,\
+                                                     grid2.cell_starts, grid2.cell_stops,\
+                                                     num_divs, dL, period)
+
+    return counts
+
+
+#maximum number of grid cells along each dimension
+_max_divs = 128
+
+
+def _process_args(sample1, sample2, weights2, period):
+    """
+    utility function to process input to the neighbor counts functions.
+    """
+
+    sample1 = np.asarray(sample1, dtype=np.float64)
+    if (sample1.ndim != 2) or (np.shape(sample1)[1]!=3):
+        raise ValueError("sample1 must be of shape (Npts,3)")
+
+    #do not count points as their own neighbors if counting within sample1
+    if sample2 is None:
+        sample2 = sample1
+        exclude1 = np.arange(len(sample1), dtype=int)
+    else:
+        sample2 = np.asarray(sample2, dtype=np.float64)
+        if (sample2.ndim != 2) or (np.shape(sample2)[1]!=3):
+            raise ValueError("sample2 must be of shape (Npts,3)")
+        exclude1 = np.zeros(len(sample1), dtype=int) - 1
+
+    if weights2 is not None:
+        weights2 = np.asarray(weights2, dtype=np.float64)
+        if np.shape(weights2) != (len(sample2),):
+            raise ValueError("weights2 must be a 1D array with one weight per point")
+
+    if period is None:
+        PBCs = False
+    else:
+        PBCs = True
+        period = np.atleast_1d(period).astype(np.float64)
+        if len(period) == 1:
+            period = np.array([period[0]]*3)
+        elif len(period) != 3:
+            raise ValueError("period should have len == dimension of points")
+        if np.any(np.isinf(period)):
+            PBCs = False
+
+    return sample1, sample2, exclude1, weights2, period, PBCs
+
+
+def _process_radii(radii, Npts, name, period):
+    """
+    utility function to process the search radii passed to the neighbor counts
+    functions.
+    """
+
+    radii = np.atleast_1d(radii).astype(np.float64)
+    if len(radii)==1:
+        radii = np.zeros(Npts) + radii[0]
+    elif np.shape(radii) != (Npts,):
+        raise ValueError(name + " must be a single number or have one value per point")
+    if np.any(radii<0.0):
+        raise ValueError(name + " must be non-negative")
+    if (period is not None) and (len(radii)>0):
+        if np.any(np.max(radii)>np.min(period)/2.0):
+            raise ValueError("cannot count neighbors with seperations larger than "
+                             "Lbox/2 with PBCs")
+
+    return radii
@@ -12,14 +12,18 @@ import sys
 cimport cython
 import numpy as np
 cimport numpy as np
-from libc.math cimport fabs, fmin, sqrt
+from libc.math cimport fabs, fmin, floor, sqrt
 from distances cimport *
 
 __all__ = ['npairs_no_pbc', 'npairs_pbc', 'wnpairs_no_pbc', 'wnpairs_pbc',\
            'jnpairs_no_pbc', 'jnpairs_pbc',\
            'xy_z_npairs_no_pbc', 'xy_z_npairs_pbc', 'xy_z_wnpairs_no_pbc', 'xy_z_wnpairs_pbc',\
            'xy_z_jnpairs_no_pbc', 'xy_z_jnpairs_pbc',\
-           's_mu_npairs_no_pbc', 's_mu_npairs_pbc']
+           's_mu_npairs_no_pbc', 's_mu_npairs_pbc',\
+           'per_point_npairs_no_pbc', 'per_point_npairs_pbc',\
+           'halo_id_npairs_no_pbc', 'halo_id_npairs_pbc',\
+           'label_npairs_no_pbc', 'label_npairs_pbc',\
+           'xy_z_label_npairs_no_pbc', 'xy_z_label_npairs_pbc']
 __author__=['Duncan Campbell']
 
 @cython.boundscheck(False)
@@ -738,6 +742,454 @@ def s_mu_npairs_pbc(np.ndarray[np.float64_t, ndim=1] x_icell1,
     return counts
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def per_point_npairs_no_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+                            np.ndarray[np.float64_t, ndim=1] y1,
+                            np.ndarray[np.float64_t, ndim=1] z1,
+                            np.ndarray[np.float64_t, ndim=1] x2,
+                            np.ndarray[np.float64_t, ndim=1] y2,
+                            np.ndarray[np.float64_t, ndim=1] z2,
+                            np.ndarray[np.int_t, ndim=1] cell_starts,
+                            np.ndarray[np.int_t, ndim=1] cell_stops,
+                            np.ndarray[np.int_t, ndim=1] num_divs,
+                            np.ndarray[np.float64_t, ndim=1] dL,
+                            np.ndarray[np.float64_t, ndim=1] rbins):
+    """
+    real-space per-point pair counter without periodic boundary conditions (no PBCs).
+    For each point i in 1, calculate the number of points in 2 with separations less 
+    than or equal to rbins[k].
+    
+    The points in 2 are passed in full, sorted by the cells of a `rect_cuboid_cells` 
+    grid with num_divs cells of size dL, and each point in 1 searches the cells 
+    overlapping the bounding box of its largest sphere.
+    """
+    
+    return _per_point_npairs(x1, y1, z1, x2, y2, z2, cell_starts, cell_stops,\
+                             num_divs, dL, rbins, None, 0)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def per_point_npairs_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+                         np.ndarray[np.float64_t, ndim=1] y1,
+                         np.ndarray[np.float64_t, ndim=1] z1,
+                         np.ndarray[np.float64_t, ndim=1] x2,
+                         np.ndarray[np.float64_t, ndim=1] y2,
+                         np.ndarray[np.float64_t, ndim=1] z2,
+                         np.ndarray[np.int_t, ndim=1] cell_starts,
+                         np.ndarray[np.int_t, ndim=1] cell_stops,
+                         np.ndarray[np.int_t, ndim=1] num_divs,
+                         np.ndarray[np.float64_t, ndim=1] dL,
+                         np.ndarray[np.float64_t, ndim=1] rbins,
+                         np.ndarray[np.float64_t, ndim=1] period):
+    """
+    real-space per-point pair counter with periodic boundary conditions (PBCs).
+    For each point i in 1, calculate the number of points in 2 with separations less 
+    than or equal to rbins[k].
+    
+    The points in 2 are passed in full, sorted by the cells of a `rect_cuboid_cells` 
+    grid with num_divs cells of size dL, and each point in 1 searches the cells 
+    overlapping the bounding box of its largest sphere.
+    """
+    
+    return _per_point_npairs(x1, y1, z1, x2, y2, z2, cell_starts, cell_stops,\
+                             num_divs, dL, rbins, period, 1)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef _per_point_npairs(np.ndarray[np.float64_t, ndim=1] x1,
+                       np.ndarray[np.float64_t, ndim=1] y1,
+                       np.ndarray[np.float64_t, ndim=1] z1,
+                       np.ndarray[np.float64_t, ndim=1] x2,
+                       np.ndarray[np.float64_t, ndim=1] y2,
+                       np.ndarray[np.float64_t, ndim=1] z2,
+                       np.ndarray[np.int_t, ndim=1] cell_starts,
+                       np.ndarray[np.int_t, ndim=1] cell_stops,
+                       np.ndarray[np.int_t, ndim=1] num_divs,
+                       np.ndarray[np.float64_t, ndim=1] dL,
+                       np.ndarray[np.float64_t, ndim=1] rbins,
+                       np.ndarray[np.float64_t, ndim=1] period,
+                       int PBCs):
+    """
+    search shared by the per-point pair counters.  rbins are the squared radii.
+    """
+    
+    #c definitions
+    cdef int nbins = len(rbins)
+    cdef int nbins_minus_one = len(rbins) -1
+    cdef int Ni = len(x1)
+    cdef np.ndarray[np.int_t, ndim=2] counts = np.zeros((Ni, nbins), dtype=np.int)
+    cdef np.float64_t* p = NULL
+    cdef int nx = num_divs[0], ny = num_divs[1], nz = num_divs[2]
+    cdef int i, j, ix, iy, iz, icell
+    cdef int lox, hix, loy, hiy, loz, hiz
+    cdef double d, rmax_sq = rbins[nbins-1], rmax = sqrt(rbins[nbins-1])
+    
+    if PBCs: p = <np.float64_t*> period.data
+    
+    #loop over points in 1
+    for i in range(0,Ni):
+        
+        #range of cells overlapping the bounding box of the largest sphere
+        lox = <int> floor((x1[i]-rmax)/dL[0])
+        hix = <int> floor((x1[i]+rmax)/dL[0])
+        loy = <int> floor((y1[i]-rmax)/dL[1])
+        hiy = <int> floor((y1[i]+rmax)/dL[1])
+        loz = <int> floor((z1[i]-rmax)/dL[2])
+        hiz = <int> floor((z1[i]+rmax)/dL[2])
+        if PBCs:
+            #do not visit any cell more than once
+            if hix-lox+1 > nx: hix = lox + nx - 1
+            if hiy-loy+1 > ny: hiy = loy + ny - 1
+            if hiz-loz+1 > nz: hiz = loz + nz - 1
+        else:
+            lox = max(lox,0)
+            loy = max(loy,0)
+            loz = max(loz,0)
+            hix = min(hix,nx-1)
+            hiy = min(hiy,ny-1)
+            hiz = min(hiz,nz-1)
+        
+        for ix in range(lox,hix+1):
+            for iy in range(loy,hiy+1):
+                for iz in range(loz,hiz+1):
+                    icell = ((ix%nx+nx)%nx)*ny*nz + ((iy%ny+ny)%ny)*nz + ((iz%nz+nz)%nz)
+                    
+                    #loop over points in grid2's cell
+                    for j in range(cell_starts[icell],cell_stops[icell]):
+                        
+                        #calculate the square distance
+                        if PBCs:
+                            d = periodic_square_distance(x1[i],y1[i],z1[i],\
+                                                         x2[j],y2[j],z2[j], p)
+                        else:
+                            d = square_distance(x1[i],y1[i],z1[i],\
+                                                x2[j],y2[j],z2[j])
+                        if d > rmax_sq: continue
+                        
+                        #calculate counts in bins of the i^th point
+                        radial_binning(<np.int_t*> counts.data + i*nbins,\
+                                       <np.float64_t*> rbins.data, d, nbins_minus_one)
+    
+    return counts
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def halo_id_npairs_no_pbc(np.ndarray[np.float64_t, ndim=1] x_icell1,
+                          np.ndarray[np.float64_t, ndim=1] y_icell1,
+                          np.ndarray[np.float64_t, ndim=1] z_icell1,
+                          np.ndarray[np.int_t, ndim=1] id_icell1,
+                          np.ndarray[np.float64_t, ndim=1] x_icell2,
+                          np.ndarray[np.float64_t, ndim=1] y_icell2,
+                          np.ndarray[np.float64_t, ndim=1] z_icell2,
+                          np.ndarray[np.int_t, ndim=1] id_icell2,
+                          np.ndarray[np.float64_t, ndim=1] rbins):
+    """
+    real-space pair counter without periodic boundary conditions (no PBCs) which 
+    splits pairs by whether the two points share the same id.
+    Calculate the number of pairs with separations less than or equal to rbins[i], 
+    returned as counts[0,i] for pairs with the same id, and counts[1,i] for pairs 
+    with different ids.
+    """
+    
+    #c definitions
+    cdef int nbins = len(rbins)
+    cdef int nbins_minus_one = len(rbins) -1
+    cdef np.ndarray[np.int_t, ndim=2] counts = np.zeros((2, nbins), dtype=np.int)
+    cdef double d
+    cdef int i, j
+    cdef int Ni = len(x_icell1)
+    cdef int Nj = len(x_icell2)
+    
+    #loop over points in grid1's cells
+    for i in range(0,Ni):
+        #loop over points in grid2's cells
+        for j in range(0,Nj):
+                        
+            #calculate the square distance
+            d = square_distance(x_icell1[i],y_icell1[i],z_icell1[i],\
+                                x_icell2[j],y_icell2[j],z_icell2[j])
+                        
+            #calculate counts in bins of the same or different id histogram
+            if id_icell1[i]==id_icell2[j]:
+                radial_binning(<np.int_t*> counts.data,\
+                               <np.float64_t*> rbins.data, d, nbins_minus_one)
+            else:
+                radial_binning(<np.int_t*> counts.data + nbins,\
+                               <np.float64_t*> rbins.data, d, nbins_minus_one)
+        
+    return counts
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def halo_id_npairs_pbc(np.ndarray[np.float64_t, ndim=1] x_icell1,
+                       np.ndarray[np.float64_t, ndim=1] y_icell1,
+                       np.ndarray[np.float64_t, ndim=1] z_icell1,
+                       np.ndarray[np.int_t, ndim=1] id_icell1,
+                       np.ndarray[np.float64_t, ndim=1] x_icell2,
+                       np.ndarray[np.float64_t, ndim=1] y_icell2,
+                       np.ndarray[np.float64_t, ndim=1] z_icell2,
+                       np.ndarray[np.int_t, ndim=1] id_icell2,
+                       np.ndarray[np.float64_t, ndim=1] rbins,
+                       np.ndarray[np.float64_t, ndim=1] period):
+    """
+    real-space pair counter with periodic boundary conditions (PBCs) which splits 
+    pairs by whether the two points share the same id.
+    Calculate the number of pairs with separations less than or equal to rbins[i], 
+    returned as counts[0,i] for pairs with the same id, and counts[1,i] for pairs 
+    with different ids.
+    """
+    
+    #c definitions
+    cdef int nbins = len(rbins)
+    cdef int nbins_minus_one = len(rbins) -1
+    cdef np.ndarray[np.int_t, ndim=2] counts = np.zeros((2, nbins), dtype=np.int)
+    cdef double d
+    cdef int i, j
+    cdef int Ni = len(x_icell1)
+    cdef int Nj = len(x_icell2)
+    
+    #loop over points in grid1's cells
+    for i in range(0,Ni):
+        #loop over points in grid2's cells
+        for j in range(0,Nj):
+                        
+            #calculate the square distance
+            d = periodic_square_distance(x_icell1[i],y_icell1[i],z_icell1[i],\
+                                         x_icell2[j],y_icell2[j],z_icell2[j],\
+                                         <np.float64_t*> period.data)
+                        
+            #calculate counts in bins of the same or different id histogram
+            if id_icell1[i]==id_icell2[j]:
+                radial_binning(<np.int_t*> counts.data,\
+                               <np.float64_t*> rbins.data, d, nbins_minus_one)
+            else:
+                radial_binning(<np.int_t*> counts.data + nbins,\
+                               <np.float64_t*> rbins.data, d, nbins_minus_one)
+        
+    return counts
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def label_npairs_no_pbc(np.ndarray[np.float64_t, ndim=1] x_icell1,
+                        np.ndarray[np.float64_t, ndim=1] y_icell1,
+                        np.ndarray[np.float64_t, ndim=1] z_icell1,
+                        np.ndarray[np.int_t, ndim=1] label_icell1,
+                        np.ndarray[np.float64_t, ndim=1] x_icell2,
+                        np.ndarray[np.float64_t, ndim=1] y_icell2,
+                        np.ndarray[np.float64_t, ndim=1] z_icell2,
+                        np.ndarray[np.int_t, ndim=1] label_icell2,
+                        np.ndarray[np.float64_t, ndim=1] rbins,
+                        int Nlabels1, int Nlabels2):
+    """
+    real-space pair counter without periodic boundary conditions (no PBCs) which 
+    splits pairs by the labels of the two points.
+    Calculate the number of pairs with separations less than or equal to rbins[i], 
+    returned as counts[l1,l2,i] for pairs with labels l1 and l2.
+    """
+    
+    #c definitions
+    cdef int nbins = len(rbins)
+    cdef int nbins_minus_one = len(rbins) -1
+    cdef np.ndarray[np.int_t, ndim=3] counts =\
+        np.zeros((Nlabels1, Nlabels2, nbins), dtype=np.int)
+    cdef double d
+    cdef int i, j
+    cdef int Ni = len(x_icell1)
+    cdef int Nj = len(x_icell2)
+    
+    #loop over points in grid1's cells
+    for i in range(0,Ni):
+        #loop over points in grid2's cells
+        for j in range(0,Nj):
+                        
+            #calculate the square distance
+            d = square_distance(x_icell1[i],y_icell1[i],z_icell1[i],\
+                                x_icell2[j],y_icell2[j],z_icell2[j])
+                        
+            #calculate counts in bins of the histogram of the label pair
+            radial_binning(<np.int_t*> counts.data +\
+                           (label_icell1[i]*Nlabels2 + label_icell2[j])*nbins,\
+                           <np.float64_t*> rbins.data, d, nbins_minus_one)
+        
+    return counts
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def label_npairs_pbc(np.ndarray[np.float64_t, ndim=1] x_icell1,
+                     np.ndarray[np.float64_t, ndim=1] y_icell1,
+                     np.ndarray[np.float64_t, ndim=1] z_icell1,
+                     np.ndarray[np.int_t, ndim=1] label_icell1,
+                     np.ndarray[np.float64_t, ndim=1] x_icell2,
+                     np.ndarray[np.float64_t, ndim=1] y_icell2,
+                     np.ndarray[np.float64_t, ndim=1] z_icell2,
+                     np.ndarray[np.int_t, ndim=1] label_icell2,
+                     np.ndarray[np.float64_t, ndim=1] rbins,
+                     np.ndarray[np.float64_t, ndim=1] period,
+                     int Nlabels1, int Nlabels2):
+    """
+    real-space pair counter with periodic boundary conditions (PBCs) which splits 
+    pairs by the labels of the two points.
+    Calculate the number of pairs with separations less than or equal to rbins[i], 
+    returned as counts[l1,l2,i] for pairs with labels l1 and l2.
+    """
+    
+    #c definitions
+    cdef int nbins = len(rbins)
+    cdef int nbins_minus_one = len(rbins) -1
+    cdef np.ndarray[np.int_t, ndim=3] counts =\
+        np.zeros((Nlabels1, Nlabels2, nbins), dtype=np.int)
+    cdef double d
+    cdef int i, j
+    cdef int Ni = len(x_icell1)
+    cdef int Nj = len(x_icell2)
+    
+    #loop over points in grid1's cells
+    for i in range(0,Ni):
+        #loop over points in grid2's cells
+        for j in range(0,Nj):
+                        
+            #calculate the square distance
+            d = periodic_square_distance(x_icell1[i],y_icell1[i],z_icell1[i],\
+                                         x_icell2[j],y_icell2[j],z_icell2[j],\
+                                         <np.float64_t*> period.data)
+                        
+            #calculate counts in bins of the histogram of the label pair
+            radial_binning(<np.int_t*> counts.data +\
+                           (label_icell1[i]*Nlabels2 + label_icell2[j])*nbins,\
+                           <np.float64_t*> rbins.data, d, nbins_minus_one)
+        
+    return counts
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def xy_z_label_npairs_no_pbc(np.ndarray[np.float64_t, ndim=1] x_icell1,
+                             np.ndarray[np.float64_t, ndim=1] y_icell1,
+                             np.ndarray[np.float64_t, ndim=1] z_icell1,
+                             np.ndarray[np.int_t, ndim=1] label_icell1,
+                             np.ndarray[np.float64_t, ndim=1] x_icell2,
+                             np.ndarray[np.float64_t, ndim=1] y_icell2,
+                             np.ndarray[np.float64_t, ndim=1] z_icell2,
+                             np.ndarray[np.int_t, ndim=1] label_icell2,
+                             np.ndarray[np.float64_t, ndim=1] rp_bins,
+                             np.ndarray[np.float64_t, ndim=1] pi_bins,
+                             int Nlabels1, int Nlabels2):
+    """
+    2+1D pair counter without periodic boundary conditions (no PBCs) which splits 
+    pairs by the labels of the two points.
+    Calculate the number of pairs with separations in the x-y plane less than or equal 
+    to rp_bins[i], and separations in the z coordinate less than or equal to pi_bins[j], 
+    returned as counts[l1,l2,i,j] for pairs with labels l1 and l2.
+    """
+    
+    #c definitions
+    cdef int nrp_bins = len(rp_bins)
+    cdef int npi_bins = len(pi_bins)
+    cdef int nrp_bins_minus_one = len(rp_bins) -1
+    cdef int npi_bins_minus_one = len(pi_bins) -1
+    cdef np.ndarray[np.int_t, ndim=4] counts =\
+        np.zeros((Nlabels1, Nlabels2, nrp_bins, npi_bins), dtype=np.int)
+    cdef double d_perp, d_para
+    cdef int i, j
+    cdef int Ni = len(x_icell1)
+    cdef int Nj = len(x_icell2)
+    
+    #loop over points in grid1's cell
+    for i in range(0,Ni):
+                
+        #loop over points in grid2's cell
+        for j in range(0,Nj):
+                    
+            #calculate the square distance
+            d_perp = perp_square_distance(x_icell1[i], y_icell1[i],\
+                                          x_icell2[j], y_icell2[j])
+            d_para = para_square_distance(z_icell1[i], z_icell2[j])
+                        
+            #calculate counts in bins of the histogram of the label pair
+            xy_z_binning(<np.int_t*>counts.data +\
+                         (label_icell1[i]*Nlabels2 + label_icell2[j])*nrp_bins*npi_bins,\
+                         <np.float64_t*>rp_bins.data,\
+                         <np.float64_t*>pi_bins.data,\
+                         d_perp, d_para, nrp_bins_minus_one, npi_bins_minus_one)
+        
+    return counts
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def xy_z_label_npairs_pbc(np.ndarray[np.float64_t, ndim=1] x_icell1,
+                          np.ndarray[np.float64_t, ndim=1] y_icell1,
+                          np.ndarray[np.float64_t, ndim=1] z_icell1,
+                          np.ndarray[np.int_t, ndim=1] label_icell1,
+                          np.ndarray[np.float64_t, ndim=1] x_icell2,
+                          np.ndarray[np.float64_t, ndim=1] y_icell2,
+                          np.ndarray[np.float64_t, ndim=1] z_icell2,
+                          np.ndarray[np.int_t, ndim=1] label_icell2,
+                          np.ndarray[np.float64_t, ndim=1] rp_bins,
+                          np.ndarray[np.float64_t, ndim=1] pi_bins,
+                          np.ndarray[np.float64_t, ndim=1] period,
+                          int Nlabels1, int Nlabels2):
+    """
+    2+1D pair counter with periodic boundary conditions (PBCs) which splits 
+    pairs by the labels of the two points.
+    Calculate the number of pairs with separations in the x-y plane less than or equal 
+    to rp_bins[i], and separations in the z coordinate less than or equal to pi_bins[j], 
+    returned as counts[l1,l2,i,j] for pairs with labels l1 and l2.
+    """
+    
+    #c definitions
+    cdef int nrp_bins = len(rp_bins)
+    cdef int npi_bins = len(pi_bins)
+    cdef int nrp_bins_minus_one = len(rp_bins) -1
+    cdef int npi_bins_minus_one = len(pi_bins) -1
+    cdef np.ndarray[np.int_t, ndim=4] counts =\
+        np.zeros((Nlabels1, Nlabels2, nrp_bins, npi_bins), dtype=np.int)
+    cdef double d_perp, d_para
+    cdef int i, j
+    cdef int Ni = len(x_icell1)
+    cdef int Nj = len(x_icell2)
+    
+    #loop over points in grid1's cell
+    for i in range(0,Ni):
+                
+        #loop over points in grid2's cell
+        for j in range(0,Nj):
+                    
+            #calculate the square distance
+            d_perp = periodic_perp_square_distance(x_icell1[i],y_icell1[i],\
+                                                   x_icell2[j],y_icell2[j],\
+                                                   <np.float64_t*>period.data)
+            d_para = periodic_para_square_distance(z_icell1[i],\
+                                                   z_icell2[j],\
+                                                   <np.float64_t*>period.data)
+                        
+            #calculate counts in bins of the histogram of the label pair
+            xy_z_binning(<np.int_t*>counts.data +\
+                         (label_icell1[i]*Nlabels2 + label_icell2[j])*nrp_bins*npi_bins,\
+                         <np.float64_t*>rp_bins.data,\
+                         <np.float64_t*>pi_bins.data,\
+                         d_perp, d_para, nrp_bins_minus_one, npi_bins_minus_one)
+        
+    return counts
+
+
 cdef inline radial_binning(np.int_t* counts, np.float64_t* bins,\
                            np.float64_t d, np.int_t k):
     """
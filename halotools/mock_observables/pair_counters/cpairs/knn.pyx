@@ -0,0 +1,212 @@
+# cython: profile=False
+
+"""
+optimized cython k-nearest neighbor search.  These are called by the
+"nearest_neighbors" module as the engine to search the cells of a
+`rect_cuboid_cells` grid.  These functions should be used with care as there are no
+'checks' preformed to ensure the arguments are of the correct format.
+"""
+
+from __future__ import print_function, division
+import sys
+cimport cython
+import numpy as np
+cimport numpy as np
+from libc.math cimport sqrt, floor, fmin, INFINITY
+from distances cimport *
+
+__all__ = ['knn_no_pbc', 'knn_pbc']
+__author__=['Duncan Campbell']
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def knn_no_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+               np.ndarray[np.float64_t, ndim=1] y1,
+               np.ndarray[np.float64_t, ndim=1] z1,
+               np.ndarray[np.int_t, ndim=1] exclude1,
+               np.ndarray[np.float64_t, ndim=1] x2,
+               np.ndarray[np.float64_t, ndim=1] y2,
+               np.ndarray[np.float64_t, ndim=1] z2,
+               np.ndarray[np.int_t, ndim=1] idx2,
+               np.ndarray[np.int_t, ndim=1] cell_starts,
+               np.ndarray[np.int_t, ndim=1] cell_stops,
+               np.ndarray[np.int_t, ndim=1] num_divs,
+               np.ndarray[np.float64_t, ndim=1] dL,
+               int k):
+    """
+    k-nearest neighbor search without periodic boundary conditions (no PBCs).
+    For each point in 1, find the k nearest points in 2, where points in 2 are
+    sorted into the cells of a grid.  Cells are searched in shells of increasing
+    size around the cell containing the point in 1, until no unsearched cell can
+    contain a point closer than the k-th nearest neighbor found so far.
+
+    idx2 gives the index of each (sorted) point in 2 which is returned, and points
+    with idx2 == exclude1[i] are skipped for the i-th point in 1.
+    """
+
+    return _knn(x1, y1, z1, exclude1, x2, y2, z2, idx2, cell_starts, cell_stops,\
+                num_divs, dL, k, None, 0)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def knn_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+            np.ndarray[np.float64_t, ndim=1] y1,
+            np.ndarray[np.float64_t, ndim=1] z1,
+            np.ndarray[np.int_t, ndim=1] exclude1,
+            np.ndarray[np.float64_t, ndim=1] x2,
+            np.ndarray[np.float64_t, ndim=1] y2,
+            np.ndarray[np.float64_t, ndim=1] z2,
+            np.ndarray[np.int_t, ndim=1] idx2,
+            np.ndarray[np.int_t, ndim=1] cell_starts,
+            np.ndarray[np.int_t, ndim=1] cell_stops,
+            np.ndarray[np.int_t, ndim=1] num_divs,
+            np.ndarray[np.float64_t, ndim=1] dL,
+            int k,
+            np.ndarray[np.float64_t, ndim=1] period):
+    """
+    k-nearest neighbor search with periodic boundary conditions (PBCs).
+    For each point in 1, find the k nearest points in 2, where points in 2 are
+    sorted into the cells of a grid.  Cells are searched in shells of increasing
+    size around the cell containing the point in 1, until no unsearched cell can
+    contain a point closer than the k-th nearest neighbor found so far.
+
+    idx2 gives the index of each (sorted) point in 2 which is returned, and points
+    with idx2 == exclude1[i] are skipped for the i-th point in 1.
+    """
+
+    return _knn(x1, y1, z1, exclude1, x2, y2, z2, idx2, cell_starts, cell_stops,\
+                num_divs, dL, k, period, 1)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef _knn(np.ndarray[np.float64_t, ndim=1] x1,
+          np.ndarray[np.float64_t, ndim=1] y1,
+          np.ndarray[np.float64_t, ndim=1] z1,
+          np.ndarray[np.int_t, ndim=1] exclude1,
+          np.ndarray[np.float64_t, ndim=1] x2,
+          np.ndarray[np.float64_t, ndim=1] y2,
+          np.ndarray[np.float64_t, ndim=1] z2,
+          np.ndarray[np.int_t, ndim=1] idx2,
+          np.ndarray[np.int_t, ndim=1] cell_starts,
+          np.ndarray[np.int_t, ndim=1] cell_stops,
+          np.ndarray[np.int_t, ndim=1] num_divs,
+          np.ndarray[np.float64_t, ndim=1] dL,
+          int k,
+          np.ndarray[np.float64_t, ndim=1] period,
+          int PBCs):
+    """
+    shell expansion search shared by knn_no_pbc and knn_pbc
+    """
+
+    #c definitions
+    cdef int Ni = len(x1)
+    cdef np.ndarray[np.float64_t, ndim=2] dists = np.empty((Ni, k), dtype=np.float64)
+    cdef np.ndarray[np.int_t, ndim=2] inds = np.empty((Ni, k), dtype=np.int)
+    cdef np.float64_t* best_d
+    cdef np.int_t* best_j
+    cdef np.float64_t* p = NULL
+    cdef int nx = num_divs[0], ny = num_divs[1], nz = num_divs[2]
+    cdef int i, j, m, s, ox, oy, oz, cx, cy, cz, icell
+    cdef int lox, hix, loy, hiy, loz, hiz, oz_step, max_s
+    cdef double d, bound, edge
+
+    if PBCs: p = <np.float64_t*> period.data
+
+    for i in range(0,Ni):
+
+        best_d = <np.float64_t*> dists.data + i*k
+        best_j = <np.int_t*> inds.data + i*k
+        for m in range(0,k):
+            best_d[m] = INFINITY
+            best_j[m] = -1
+
+        #cell containing the i-th point
+        cx = <int> floor(x1[i]/dL[0])
+        cy = <int> floor(y1[i]/dL[1])
+        cz = <int> floor(z1[i]/dL[2])
+        cx = min(max(cx,0),nx-1)
+        cy = min(max(cy,0),ny-1)
+        cz = min(max(cz,0),nz-1)
+
+        #range of cell offsets in each dimension which visits every cell exactly once
+        if PBCs:
+            lox = -((nx-1)//2)
+            loy = -((ny-1)//2)
+            loz = -((nz-1)//2)
+        else:
+            lox = -cx
+            loy = -cy
+            loz = -cz
+        hix = lox + nx - 1
+        hiy = loy + ny - 1
+        hiz = loz + nz - 1
+        max_s = max(max(max(-lox,hix),max(-loy,hiy)),max(-loz,hiz))
+
+        #distance from the i-th point to the nearest edge of its own cell
+        edge = fmin(x1[i]-cx*dL[0], (cx+1)*dL[0]-x1[i])
+        edge = fmin(edge, fmin(y1[i]-cy*dL[1], (cy+1)*dL[1]-y1[i]))
+        edge = fmin(edge, fmin(z1[i]-cz*dL[2], (cz+1)*dL[2]-z1[i]))
+        edge = max(edge, 0.0)
+
+        s = 0
+        while True:
+            #loop over the cells on the surface of the cube of half-width s
+            for ox in range(max(-s,lox),min(s,hix)+1):
+                for oy in range(max(-s,loy),min(s,hiy)+1):
+                    if (ox==s) or (ox==-s) or (oy==s) or (oy==-s):
+                        oz = max(-s,loz)
+                        oz_step = 1
+                    else:
+                        oz = -s
+                        oz_step = 2*s
+                        if oz_step==0: oz_step=1
+                    while oz <= min(s,hiz):
+                        if oz >= loz:
+                            icell = ((((cx+ox)%nx+nx)%nx)*ny + (((cy+oy)%ny+ny)%ny))*nz +\
+                                    (((cz+oz)%nz+nz)%nz)
+                            for j in range(cell_starts[icell],cell_stops[icell]):
+                                if idx2[j]==exclude1[i]: continue
+                                if PBCs:
+                                    d = periodic_square_distance(x1[i],y1[i],z1[i],\
+                                                                 x2[j],y2[j],z2[j], p)
+                                else:
+                                    d = square_distance(x1[i],y1[i],z1[i],\
+                                                        x2[j],y2[j],z2[j])
+                                if d < best_d[k-1]:
+                                    _insert(best_d, best_j, d, idx2[j], k)
+                        oz += oz_step
+
+            #every cell has been searched
+            if s >= max_s: break
+
+            #no point in an unsearched cell can be closer than this
+            bound = s*fmin(fmin(dL[0],dL[1]),dL[2]) + edge
+            if best_d[k-1] <= bound*bound: break
+            s += 1
+
+        for m in range(0,k):
+            best_d[m] = sqrt(best_d[m])
+
+    return dists, inds
+
+
+cdef inline void _insert(np.float64_t* best_d, np.int_t* best_j, double d, np.int_t j,\
+                         int k):
+    """
+    insert a new neighbor into the sorted list of the k nearest neighbors
+    """
+
+    cdef int m = k-1
+    while (m > 0) and (best_d[m-1] > d):
+        best_d[m] = best_d[m-1]
+        best_j[m] = best_j[m-1]
+        m = m-1
+    best_d[m] = d
+    best_j[m] = j
@@ -0,0 +1,152 @@
+# cython: profile=False
+
+"""
+optimized cython counters of the mass in projected disks around points.  These are
+called by the "lensing" module as the engine to search the cells of a two-dimensional
+`rect_cuboid_cells` grid.  These functions should be used with care as there are no
+'checks' preformed to ensure the arguments are of the correct format.
+"""
+
+from __future__ import print_function, division
+import sys
+cimport cython
+import numpy as np
+cimport numpy as np
+from libc.math cimport floor, sqrt
+from distances cimport *
+
+__all__ = ['projected_mass_no_pbc', 'projected_mass_pbc']
+__author__=['Duncan Campbell']
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def projected_mass_no_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+                          np.ndarray[np.float64_t, ndim=1] y1,
+                          np.ndarray[np.int_t, ndim=1] label1,
+                          np.ndarray[np.float64_t, ndim=1] x2,
+                          np.ndarray[np.float64_t, ndim=1] y2,
+                          np.ndarray[np.float64_t, ndim=1] w2,
+                          np.ndarray[np.int_t, ndim=1] cell_starts,
+                          np.ndarray[np.int_t, ndim=1] cell_stops,
+                          np.ndarray[np.int_t, ndim=1] num_divs,
+                          np.ndarray[np.float64_t, ndim=1] dL,
+                          np.ndarray[np.float64_t, ndim=1] rp_bins,
+                          int Nlabels):
+    """
+    projected mass counter without periodic boundary conditions (no PBCs).
+    Calculate the sum of the weights of the points in 2 with projected separations
+    rp_bins[k-1] < d <= rp_bins[k] from the points in 1 with label l, returned as
+    counts[l,k].  Separations less than or equal to rp_bins[0] are counted in k=0.
+    """
+
+    return _projected_mass(x1, y1, label1, x2, y2, w2, cell_starts, cell_stops,\
+                           num_divs, dL, rp_bins, Nlabels, None, 0)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def projected_mass_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+                       np.ndarray[np.float64_t, ndim=1] y1,
+                       np.ndarray[np.int_t, ndim=1] label1,
+                       np.ndarray[np.float64_t, ndim=1] x2,
+                       np.ndarray[np.float64_t, ndim=1] y2,
+                       np.ndarray[np.float64_t, ndim=1] w2,
+                       np.ndarray[np.int_t, ndim=1] cell_starts,
+                       np.ndarray[np.int_t, ndim=1] cell_stops,
+                       np.ndarray[np.int_t, ndim=1] num_divs,
+                       np.ndarray[np.float64_t, ndim=1] dL,
+                       np.ndarray[np.float64_t, ndim=1] rp_bins,
+                       int Nlabels,
+                       np.ndarray[np.float64_t, ndim=1] period):
+    """
+    projected mass counter with periodic boundary conditions (PBCs).
+    Calculate the sum of the weights of the points in 2 with projected separations
+    rp_bins[k-1] < d <= rp_bins[k] from the points in 1 with label l, returned as
+    counts[l,k].  Separations less than or equal to rp_bins[0] are counted in k=0.
+    """
+
+    return _projected_mass(x1, y1, label1, x2, y2, w2, cell_starts, cell_stops,\
+                           num_divs, dL, rp_bins, Nlabels, period, 1)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef _projected_mass(np.ndarray[np.float64_t, ndim=1] x1,
+                     np.ndarray[np.float64_t, ndim=1] y1,
+                     np.ndarray[np.int_t, ndim=1] label1,
+                     np.ndarray[np.float64_t, ndim=1] x2,
+                     np.ndarray[np.float64_t, ndim=1] y2,
+                     np.ndarray[np.float64_t, ndim=1] w2,
+                     np.ndarray[np.int_t, ndim=1] cell_starts,
+                     np.ndarray[np.int_t, ndim=1] cell_stops,
+                     np.ndarray[np.int_t, ndim=1] num_divs,
+                     np.ndarray[np.float64_t, ndim=1] dL,
+                     np.ndarray[np.float64_t, ndim=1] rp_bins,
+                     int Nlabels,
+                     np.ndarray[np.float64_t, ndim=1] period,
+                     int PBCs):
+    """
+    search shared by the projected mass counters.  The cells searched for each point
+    are those overlapping the bounding square of its largest disk.  Each pair is
+    binned once, into the annulus containing it, so the disks and annuli of all
+    rp_bins are obtained from a single pass over the pairs.
+    """
+
+    #c definitions
+    cdef int Ni = len(x1)
+    cdef int nbins = len(rp_bins)
+    cdef np.ndarray[np.float64_t, ndim=2] counts =\
+        np.zeros((Nlabels, nbins), dtype=np.float64)
+    cdef np.float64_t* p = NULL
+    cdef int nx = num_divs[0], ny = num_divs[1]
+    cdef int i, j, k, lo, hi, ix, iy, icell
+    cdef int lox, hix, loy, hiy
+    cdef double d, rmax_sq = rp_bins[nbins-1], rmax = sqrt(rp_bins[nbins-1])
+
+    if PBCs: p = <np.float64_t*> period.data
+
+    for i in range(0,Ni):
+
+        #range of cells overlapping the bounding square of the largest disk
+        lox = <int> floor((x1[i]-rmax)/dL[0])
+        hix = <int> floor((x1[i]+rmax)/dL[0])
+        loy = <int> floor((y1[i]-rmax)/dL[1])
+        hiy = <int> floor((y1[i]+rmax)/dL[1])
+        if PBCs:
+            #do not visit any cell more than once
+            if hix-lox+1 > nx: hix = lox + nx - 1
+            if hiy-loy+1 > ny: hiy = loy + ny - 1
+        else:
+            lox = max(lox,0)
+            loy = max(loy,0)
+            hix = min(hix,nx-1)
+            hiy = min(hiy,ny-1)
+
+        for ix in range(lox,hix+1):
+            for iy in range(loy,hiy+1):
+                icell = ((ix%nx+nx)%nx)*ny + ((iy%ny+ny)%ny)
+
+                #loop over points in grid2's cell
+                for j in range(cell_starts[icell],cell_stops[icell]):
+
+                    if PBCs:
+                        d = periodic_perp_square_distance(x1[i],y1[i],x2[j],y2[j], p)
+                    else:
+                        d = perp_square_distance(x1[i],y1[i],x2[j],y2[j])
+                    if d > rmax_sq: continue
+
+                    #bisect for the first bin with d <= rp_bins[k]
+                    lo = 0
+                    hi = nbins-1
+                    while lo < hi:
+                        k = (lo+hi)//2
+                        if d <= rp_bins[k]: hi = k
+                        else: lo = k+1
+                    counts[label1[i],lo] += w2[j]
+
+    return counts
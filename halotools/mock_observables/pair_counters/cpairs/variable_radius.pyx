@@ -0,0 +1,225 @@
+# cython: profile=False
+
+"""
+optimized cython per-point neighbor counters with a search radius that varies from
+point to point.  These are called by the "neighbor_counts" module as the engine to
+search the cells of a `rect_cuboid_cells` grid.  These functions should be used with
+care as there are no 'checks' preformed to ensure the arguments are of the correct
+format.
+"""
+
+from __future__ import print_function, division
+import sys
+cimport cython
+import numpy as np
+cimport numpy as np
+from libc.math cimport floor
+from distances cimport *
+
+__all__ = ['spherical_neighbor_counts_no_pbc', 'spherical_neighbor_counts_pbc',\
+           'cylindrical_neighbor_counts_no_pbc', 'cylindrical_neighbor_counts_pbc']
+__author__=['Duncan Campbell']
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def spherical_neighbor_counts_no_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+                                     np.ndarray[np.float64_t, ndim=1] y1,
+                                     np.ndarray[np.float64_t, ndim=1] z1,
+                                     np.ndarray[np.float64_t, ndim=1] r1,
+                                     np.ndarray[np.int_t, ndim=1] exclude1,
+                                     np.ndarray[np.float64_t, ndim=1] x2,
+                                     np.ndarray[np.float64_t, ndim=1] y2,
+                                     np.ndarray[np.float64_t, ndim=1] z2,
+                                     np.ndarray[np.float64_t, ndim=1] w2,
+                                     np.ndarray[np.int_t, ndim=1] idx2,
+                                     np.ndarray[np.int_t, ndim=1] cell_starts,
+                                     np.ndarray[np.int_t, ndim=1] cell_stops,
+                                     np.ndarray[np.int_t, ndim=1] num_divs,
+                                     np.ndarray[np.float64_t, ndim=1] dL):
+    """
+    per-point weighted neighbor counter without periodic boundary conditions (no PBCs).
+    For each point i in 1, calculate the sum of the weights of the points in 2 with
+    separations less than or equal to r1[i].
+    """
+
+    return _variable_radius_counts(x1, y1, z1, r1, r1, exclude1, x2, y2, z2, w2, idx2,\
+                                   cell_starts, cell_stops, num_divs, dL, None, 0, 0)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def spherical_neighbor_counts_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+                                  np.ndarray[np.float64_t, ndim=1] y1,
+                                  np.ndarray[np.float64_t, ndim=1] z1,
+                                  np.ndarray[np.float64_t, ndim=1] r1,
+                                  np.ndarray[np.int_t, ndim=1] exclude1,
+                                  np.ndarray[np.float64_t, ndim=1] x2,
+                                  np.ndarray[np.float64_t, ndim=1] y2,
+                                  np.ndarray[np.float64_t, ndim=1] z2,
+                                  np.ndarray[np.float64_t, ndim=1] w2,
+                                  np.ndarray[np.int_t, ndim=1] idx2,
+                                  np.ndarray[np.int_t, ndim=1] cell_starts,
+                                  np.ndarray[np.int_t, ndim=1] cell_stops,
+                                  np.ndarray[np.int_t, ndim=1] num_divs,
+                                  np.ndarray[np.float64_t, ndim=1] dL,
+                                  np.ndarray[np.float64_t, ndim=1] period):
+    """
+    per-point weighted neighbor counter with periodic boundary conditions (PBCs).
+    For each point i in 1, calculate the sum of the weights of the points in 2 with
+    separations less than or equal to r1[i].
+    """
+
+    return _variable_radius_counts(x1, y1, z1, r1, r1, exclude1, x2, y2, z2, w2, idx2,\
+                                   cell_starts, cell_stops, num_divs, dL, period, 1, 0)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def cylindrical_neighbor_counts_no_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+                                       np.ndarray[np.float64_t, ndim=1] y1,
+                                       np.ndarray[np.float64_t, ndim=1] z1,
+                                       np.ndarray[np.float64_t, ndim=1] rp1,
+                                       np.ndarray[np.float64_t, ndim=1] pi1,
+                                       np.ndarray[np.int_t, ndim=1] exclude1,
+                                       np.ndarray[np.float64_t, ndim=1] x2,
+                                       np.ndarray[np.float64_t, ndim=1] y2,
+                                       np.ndarray[np.float64_t, ndim=1] z2,
+                                       np.ndarray[np.float64_t, ndim=1] w2,
+                                       np.ndarray[np.int_t, ndim=1] idx2,
+                                       np.ndarray[np.int_t, ndim=1] cell_starts,
+                                       np.ndarray[np.int_t, ndim=1] cell_stops,
+                                       np.ndarray[np.int_t, ndim=1] num_divs,
+                                       np.ndarray[np.float64_t, ndim=1] dL):
+    """
+    per-point weighted neighbor counter in cylinders without periodic boundary
+    conditions (no PBCs).  For each point i in 1, calculate the sum of the weights of
+    the points in 2 with projected separations less than or equal to rp1[i] and
+    line-of-sight separations less than or equal to pi1[i].
+    """
+
+    return _variable_radius_counts(x1, y1, z1, rp1, pi1, exclude1, x2, y2, z2, w2, idx2,\
+                                   cell_starts, cell_stops, num_divs, dL, None, 0, 1)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def cylindrical_neighbor_counts_pbc(np.ndarray[np.float64_t, ndim=1] x1,
+                                    np.ndarray[np.float64_t, ndim=1] y1,
+                                    np.ndarray[np.float64_t, ndim=1] z1,
+                                    np.ndarray[np.float64_t, ndim=1] rp1,
+                                    np.ndarray[np.float64_t, ndim=1] pi1,
+                                    np.ndarray[np.int_t, ndim=1] exclude1,
+                                    np.ndarray[np.float64_t, ndim=1] x2,
+                                    np.ndarray[np.float64_t, ndim=1] y2,
+                                    np.ndarray[np.float64_t, ndim=1] z2,
+                                    np.ndarray[np.float64_t, ndim=1] w2,
+                                    np.ndarray[np.int_t, ndim=1] idx2,
+                                    np.ndarray[np.int_t, ndim=1] cell_starts,
+                                    np.ndarray[np.int_t, ndim=1] cell_stops,
+                                    np.ndarray[np.int_t, ndim=1] num_divs,
+                                    np.ndarray[np.float64_t, ndim=1] dL,
+                                    np.ndarray[np.float64_t, ndim=1] period):
+    """
+    per-point weighted neighbor counter in cylinders with periodic boundary
+    conditions (PBCs).  For each point i in 1, calculate the sum of the weights of
+    the points in 2 with projected separations less than or equal to rp1[i] and
+    line-of-sight separations less than or equal to pi1[i].
+    """
+
+    return _variable_radius_counts(x1, y1, z1, rp1, pi1, exclude1, x2, y2, z2, w2, idx2,\
+                                   cell_starts, cell_stops, num_divs, dL, period, 1, 1)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef _variable_radius_counts(np.ndarray[np.float64_t, ndim=1] x1,
+                             np.ndarray[np.float64_t, ndim=1] y1,
+                             np.ndarray[np.float64_t, ndim=1] z1,
+                             np.ndarray[np.float64_t, ndim=1] rp1,
+                             np.ndarray[np.float64_t, ndim=1] pi1,
+                             np.ndarray[np.int_t, ndim=1] exclude1,
+                             np.ndarray[np.float64_t, ndim=1] x2,
+                             np.ndarray[np.float64_t, ndim=1] y2,
+                             np.ndarray[np.float64_t, ndim=1] z2,
+                             np.ndarray[np.float64_t, ndim=1] w2,
+                             np.ndarray[np.int_t, ndim=1] idx2,
+                             np.ndarray[np.int_t, ndim=1] cell_starts,
+                             np.ndarray[np.int_t, ndim=1] cell_stops,
+                             np.ndarray[np.int_t, ndim=1] num_divs,
+                             np.ndarray[np.float64_t, ndim=1] dL,
+                             np.ndarray[np.float64_t, ndim=1] period,
+                             int PBCs, int cylinder):
+    """
+    search shared by the spherical and cylindrical neighbor counters.  The cells
+    searched for each point are those overlapping the bounding box of its sphere or
+    cylinder, so points with large radii search more cells than points with small ones.
+    """
+
+    #c definitions
+    cdef int Ni = len(x1)
+    cdef np.ndarray[np.float64_t, ndim=1] counts = np.zeros((Ni,), dtype=np.float64)
+    cdef np.float64_t* p = NULL
+    cdef int nx = num_divs[0], ny = num_divs[1], nz = num_divs[2]
+    cdef int i, j, ix, iy, iz, icell
+    cdef int lox, hix, loy, hiy, loz, hiz
+    cdef double d_perp, d_para, rp_sq, pi_sq, r_xy, r_z
+
+    if PBCs: p = <np.float64_t*> period.data
+
+    for i in range(0,Ni):
+
+        rp_sq = rp1[i]*rp1[i]
+        pi_sq = pi1[i]*pi1[i]
+        r_xy = rp1[i]
+        r_z = pi1[i]
+
+        #range of cells overlapping the bounding box of the search volume
+        lox = <int> floor((x1[i]-r_xy)/dL[0])
+        hix = <int> floor((x1[i]+r_xy)/dL[0])
+        loy = <int> floor((y1[i]-r_xy)/dL[1])
+        hiy = <int> floor((y1[i]+r_xy)/dL[1])
+        loz = <int> floor((z1[i]-r_z)/dL[2])
+        hiz = <int> floor((z1[i]+r_z)/dL[2])
+        if PBCs:
+            #do not visit any cell more than once
+            if hix-lox+1 > nx: hix = lox + nx - 1
+            if hiy-loy+1 > ny: hiy = loy + ny - 1
+            if hiz-loz+1 > nz: hiz = loz + nz - 1
+        else:
+            lox = max(lox,0)
+            loy = max(loy,0)
+            loz = max(loz,0)
+            hix = min(hix,nx-1)
+            hiy = min(hiy,ny-1)
+            hiz = min(hiz,nz-1)
+
+        for ix in range(lox,hix+1):
+            for iy in range(loy,hiy+1):
+                for iz in range(loz,hiz+1):
+                    icell = (((ix%nx+nx)%nx)*ny + ((iy%ny+ny)%ny))*nz + ((iz%nz+nz)%nz)
+
+                    #loop over points in grid2's cell
+                    for j in range(cell_starts[icell],cell_stops[icell]):
+                        if idx2[j]==exclude1[i]: continue
+
+                        if PBCs:
+                            d_perp = periodic_perp_square_distance(x1[i],y1[i],\
+                                                                   x2[j],y2[j], p)
+                            d_para = periodic_para_square_distance(z1[i],z2[j], p)
+                        else:
+                            d_perp = perp_square_distance(x1[i],y1[i],x2[j],y2[j])
+                            d_para = para_square_distance(z1[i],z2[j])
+
+                        if cylinder:
+                            if (d_perp<=rp_sq) & (d_para<=pi_sq): counts[i] += w2[j]
+                        else:
+                            if (d_perp+d_para)<=rp_sq: counts[i] += w2[j]
+
+    return counts
@@ -40,6 +40,11 @@ class rect_cuboid_cells():
         self.z = np.ascontiguousarray(z[idx_sorted],dtype=np.float64)
         self.slice_array = slice_array
         self.idx_sorted = idx_sorted
+        
+        #integer bounds of each cell in the sorted arrays. the slice objects are not 
+        #usable from cython, so engines that loop over cells in cython use these.
+        self.cell_starts = np.array([s.start for s in slice_array], dtype=int)
+        self.cell_stops = np.append(self.cell_starts[1:], len(self.x)).astype(int)
 
     def compute_cell_structure(self, x, y, z):
         """ 
@@ -105,7 +110,13 @@ class rect_cuboid_cells():
                                                 self.num_divs[1],\
                                                 self.num_divs[2]))
         
-        idx_sorted = np.argsort(particle_indices)
+        #points that are already ordered by cell, e.g. halos stored in Morton order,
+        #need no sorting.  otherwise a stable sort keeps the input order within each
+        #cell, and is fastest when the input is nearly ordered.
+        if np.all(particle_indices[1:] >= particle_indices[:-1]):
+            idx_sorted = np.arange(len(particle_indices))
+        else:
+            idx_sorted = np.argsort(particle_indices, kind='mergesort')
         bin_indices = np.searchsorted(particle_indices[idx_sorted], 
                                       np.arange(np.prod(self.num_divs)))
         bin_indices = np.append(bin_indices, None)
@@ -17,9 +17,12 @@ from time import time
 import sys
 import multiprocessing
 from functools import partial
+from ...utils.array_utils import array_is_monotonic
 
 
-__all__=['npairs', 'wnpairs', 'jnpairs', 'xy_z_npairs', 'xy_z_wnpairs', 'xy_z_jnpairs']
+__all__=['npairs', 'wnpairs', 'jnpairs', 'xy_z_npairs', 'xy_z_wnpairs', 'xy_z_jnpairs',\
+         'per_point_npairs', 'halo_id_npairs', 'one_halo_npairs',\
+         'label_npairs', 'xy_z_label_npairs']
 __author__=['Duncan Campbell']
 
 
@@ -199,6 +202,698 @@ def _npairs_engine(grid1, grid2, rbins, period, PBCs, icell1):
 
 
 
+def per_point_npairs(data1, data2, rbins, Lbox=None, period=None, verbose=False,\
+                     N_threads=1):
+    """
+    real-space per-point pair counter.
+    
+    For each point x1 in data1, count the number of points x2 in data2 where 
+    distance(x1, x2) <= rbins[i]. Summing the result over the points in data1 
+    gives the same result as `npairs`.
+    
+    Parameters
+    ----------
+    data1: array_like
+        N1 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    data2: array_like
+        N2 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    rbins: array_like
+        numpy array of boundaries defining the bins in which pairs are counted.
+    
+    Lbox: array_like, optional
+        length of cube sides which encloses data1 and data2.
+    
+    period: array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only 
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.  If True, period is set to be Lbox
+    
+    verbose: Boolean, optional
+        If True, print out information and progress.
+    
+    N_threads: int, optional
+        number of 'threads' to use in the pair counting.  if set to 'max', use all 
+        available cores.  N_threads=0 is the default.
+    
+    Returns
+    -------
+    N_pairs : array of shape (N1, len(rbins))
+        number of points in data2 within rbins[i] of each point in data1
+    """
+    
+    if N_threads is not 1:
+        if N_threads=='max':
+            N_threads = multiprocessing.cpu_count()
+        if isinstance(N_threads,int):
+            pool = multiprocessing.Pool(N_threads)
+        else: return ValueError("N_threads argument must be an integer number or 'max'")
+    
+    #process input
+    data1 = np.array(data1)
+    data2 = np.array(data2)
+    rbins = np.array(rbins)
+    if np.all(period==np.inf): period=None
+    
+    #enforce shape requirements on input
+    if (np.shape(data1)[1]!=3) | (data1.ndim>2):
+        raise ValueError("data1 must be of shape (Npts,3)")
+    if (np.shape(data2)[1]!=3) | (data2.ndim>2):
+        raise ValueError("data2 must be of shape (Npts,3)")
+    if rbins.ndim != 1:
+        raise ValueError("rbins must be a 1D array")
+    #the cython engine searches out to the last radius, so rbins must be increasing
+    if len(rbins)>2: rbins_increasing = (array_is_monotonic(rbins)==1)
+    else: rbins_increasing = np.all(np.diff(rbins)>=0.0)
+    if not rbins_increasing:
+        raise ValueError("rbins must be monotonically increasing")
+    
+    #process Lbox parameter
+    if (Lbox is None) & (period is None): 
+        data1, data2, Lbox = _enclose_in_box(data1, data2)
+    elif (Lbox is None) & (period is not None):
+        Lbox = period
+    elif np.shape(Lbox)==():
+        Lbox = np.array([Lbox]*3)
+    elif np.shape(Lbox)==(1,):
+        Lbox = np.array([Lbox[0]]*3)
+    else: Lbox = np.array(Lbox)
+    if np.shape(Lbox) != (3,):
+        raise ValueError("Lbox must be an array of length 3, or number indicating the \
+                          length of one side of a cube")
+    
+    #are we working with periodic boundary conditions (PBCs)?
+    if period is None: 
+        PBCs = False
+    elif np.shape(period) == (3,):
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif np.shape(period) == (1,):
+        period = np.array([period[0]]*3)
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif isinstance(period, (int, long, float, complex)):
+        period = np.array([period]*3)
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif (period == True) & (Lbox is not None):
+        PBCs = True
+        period = Lbox
+    elif (period == True) & (Lbox is None):
+        raise ValueError("If period is set to True, Lbox must be defined.")
+    else: PBCs=True
+    
+    #check to see we dont count pairs more than once
+    if (PBCs==True) & np.any(np.max(rbins)>Lbox/2.0):
+        raise ValueError('cannot count pairs with seperations \
+                          larger than Lbox/2 with PBCs')
+    
+    #build grids for data1 and data2.  the number of cells is limited, as the grid does 
+    #not need more cells than points, and each point searches the cells overlapping 
+    #its largest sphere, so cells smaller than the largest sphere are not required.
+    max_divs = min(_max_divs, max(1, int(np.ceil(len(data2)**(1.0/3.0)))))
+    cell_size = np.maximum(np.max(rbins), Lbox/max_divs)
+    cell_size = np.minimum(cell_size, Lbox)
+    grid1 = rect_cuboid_cells(data1[:,0], data1[:,1], data1[:,2], Lbox, cell_size)
+    grid2 = rect_cuboid_cells(data2[:,0], data2[:,1], data2[:,2], Lbox, cell_size)
+    
+    #square radial bins to make distance calculation cheaper
+    rbins = rbins**2.0
+    
+    #print come information
+    if verbose==True:
+        print("running grid per-point pairs with {0} by {1} points".format(len(data1),len(data2)))
+        print("cell size= {0}".format(grid1.dL))
+        print("number of cells = {0}".format(np.prod(grid1.num_divs)))
+    
+    #split the data1 points, sorted by cell, into contiguous chunks to search
+    Nchunks = max(1, min(len(data1), 4*N_threads))
+    chunk_edges = np.linspace(0, len(data1), Nchunks+1).astype(int)
+    chunks = [(grid1.x[i1:i2], grid1.y[i1:i2], grid1.z[i1:i2])\
+              for i1, i2 in zip(chunk_edges[:-1], chunk_edges[1:])]
+    
+    #create a function to call with only one argument
+    engine = partial(_per_point_npairs_engine, grid2, rbins, period, PBCs)
+    
+    #do the pair counting
+    if N_threads>1:
+        chunk_counts = pool.map(engine, chunks)
+        pool.close()
+    if N_threads==1:
+        chunk_counts = list(map(engine, chunks))
+    
+    #the chunks are returned in the order of the sorted grid1 points, 
+    #so undo the sorting to match the input ordering of data1
+    counts = np.zeros((len(data1), len(rbins)), dtype=int)
+    counts[grid1.idx_sorted] = np.vstack(chunk_counts)
+    
+    return counts
+
+
+def _per_point_npairs_engine(grid2, rbins, period, PBCs, chunk):
+    """
+    pair counting engine for per_point_npairs function.  This code calls a cython 
+    function.
+    """
+    
+    x1, y1, z1 = chunk
+    
+    num_divs = np.asarray(grid2.num_divs, dtype=int)
+    dL = np.asarray(grid2.dL, dtype=np.float64)
+    
+    #the cells of grid2 searched for each point are found inside the cython function
+    if PBCs==False:
+        counts = per_point_npairs_no_pbc(x1, y1, z1, grid2.x, grid2.y, grid2.z,\
+                                         grid2.cell_starts, grid2.cell_stops,\
+                                         num_divs, dL, rbins)
+    else: #PBCs==True
+        counts = per_point_npairs_pbc(x1, y1, z1, grid2.x, grid2.y, grid2.z,\
+                                      grid2.cell_starts, grid2.cell_stops,\
+                                      num_divs, dL, rbins, period)
+    return counts
+
+
+#maximum number of grid cells along each dimension used by per_point_npairs
+_max_divs = 128
+
+
+def halo_id_npairs(data1, data2, rbins, ids1, ids2, Lbox=None, period=None,\
+                   verbose=False, N_threads=1):
+    """
+    real-space pair counter which splits pairs by host halo.
+    
+    Count the number of pairs (x1,x2) that can be formed, with x1 drawn from data1 and x2
+    drawn from data2, and where distance(x1, x2) <= rbins[i], separately for pairs 
+    where x1 and x2 share the same id (e.g. reside in the same host halo), and pairs 
+    where they do not.  Both sets of counts are found in a single pass.
+    
+    Parameters
+    ----------
+    data1: array_like
+        N1 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    data2: array_like
+        N2 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    rbins: array_like
+        numpy array of boundaries defining the bins in which pairs are counted.
+    
+    ids1: array_like
+        length N1 integer array of ids, e.g. the host halo id of each point in data1.
+    
+    ids2: array_like
+        length N2 integer array of ids, e.g. the host halo id of each point in data2.
+    
+    Lbox: array_like, optional
+        length of cube sides which encloses data1 and data2.
+    
+    period: array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only 
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.  If True, period is set to be Lbox
+    
+    verbose: Boolean, optional
+        If True, print out information and progress.
+    
+    N_threads: int, optional
+        number of 'threads' to use in the pair counting.  if set to 'max', use all 
+        available cores.  N_threads=0 is the default.
+    
+    Returns
+    -------
+    N_pairs_same_id : array of length len(rbins)
+        number of pairs with the same id, e.g. one-halo pairs
+    
+    N_pairs_diff_id : array of length len(rbins)
+        number of pairs with different ids, e.g. two-halo pairs
+    """
+    
+    if N_threads is not 1:
+        if N_threads=='max':
+            N_threads = multiprocessing.cpu_count()
+        if isinstance(N_threads,int):
+            pool = multiprocessing.Pool(N_threads)
+        else: return ValueError("N_threads argument must be an integer number or 'max'")
+    
+    #process input
+    data1 = np.array(data1)
+    data2 = np.array(data2)
+    rbins = np.array(rbins)
+    ids1 = np.array(ids1).astype(int)
+    ids2 = np.array(ids2).astype(int)
+    if np.all(period==np.inf): period=None
+    
+    #enforce shape requirements on input
+    if (np.shape(data1)[1]!=3) | (data1.ndim>2):
+        raise ValueError("data1 must be of shape (Npts,3)")
+    if (np.shape(data2)[1]!=3) | (data2.ndim>2):
+        raise ValueError("data2 must be of shape (Npts,3)")
+    if rbins.ndim != 1:
+        raise ValueError("rbins must be a 1D array")
+    if np.shape(ids1) != (len(data1),):
+        raise ValueError("ids1 must be a 1D array of length N1")
+    if np.shape(ids2) != (len(data2),):
+        raise ValueError("ids2 must be a 1D array of length N2")
+    
+    #process Lbox parameter
+    if (Lbox is None) & (period is None): 
+        data1, data2, Lbox = _enclose_in_box(data1, data2)
+    elif (Lbox is None) & (period is not None):
+        Lbox = period
+    elif np.shape(Lbox)==():
+        Lbox = np.array([Lbox]*3)
+    elif np.shape(Lbox)==(1,):
+        Lbox = np.array([Lbox[0]]*3)
+    else: Lbox = np.array(Lbox)
+    if np.shape(Lbox) != (3,):
+        raise ValueError("Lbox must be an array of length 3, or number indicating the \
+                          length of one side of a cube")
+    
+    #are we working with periodic boundary conditions (PBCs)?
+    if period is None: 
+        PBCs = False
+    elif np.shape(period) == (3,):
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif np.shape(period) == (1,):
+        period = np.array([period[0]]*3)
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif isinstance(period, (int, long, float, complex)):
+        period = np.array([period]*3)
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif (period == True) & (Lbox is not None):
+        PBCs = True
+        period = Lbox
+    elif (period == True) & (Lbox is None):
+        raise ValueError("If period is set to True, Lbox must be defined.")
+    else: PBCs=True
+    
+    #check to see we dont count pairs more than once
+    if (PBCs==True) & np.any(np.max(rbins)>Lbox/2.0):
+        raise ValueError('cannot count pairs with seperations \
+                          larger than Lbox/2 with PBCs')
+    
+    #build grids for data1 and data2
+    cell_size = np.array([np.max(rbins)]*3)
+    grid1 = rect_cuboid_cells(data1[:,0], data1[:,1], data1[:,2], Lbox, cell_size)
+    grid2 = rect_cuboid_cells(data2[:,0], data2[:,1], data2[:,2], Lbox, cell_size)
+    
+    #sort the ids in the same way as the points
+    ids1 = np.ascontiguousarray(ids1[grid1.idx_sorted])
+    ids2 = np.ascontiguousarray(ids2[grid2.idx_sorted])
+    
+    #square radial bins to make distance calculation cheaper
+    rbins = rbins**2.0
+    
+    #print come information
+    if verbose==True:
+        print("running grid halo id pairs with {0} by {1} points".format(len(data1),len(data2)))
+        print("cell size= {0}".format(grid1.dL))
+        print("number of cells = {0}".format(np.prod(grid1.num_divs)))
+    
+    #number of cells
+    Ncell1 = np.prod(grid1.num_divs)
+    
+    #create a function to call with only one argument
+    engine = partial(_halo_id_npairs_engine, grid1, grid2, ids1, ids2, rbins, period, PBCs)
+    
+    #do the pair counting
+    if N_threads>1:
+        counts = np.sum(pool.map(engine,range(Ncell1)),axis=0)
+        pool.close()
+    if N_threads==1:
+        counts = np.sum(list(map(engine,range(Ncell1))),axis=0)
+    
+    return counts[0], counts[1]
+
+
+def _halo_id_npairs_engine(grid1, grid2, ids1, ids2, rbins, period, PBCs, icell1):
+    """
+    pair counting engine for halo_id_npairs function.  This code calls a cython function.
+    """
+    
+    counts = np.zeros((2,len(rbins)), dtype=int)
+    
+    #extract the points in the cell
+    x_icell1, y_icell1, z_icell1 = (grid1.x[grid1.slice_array[icell1]],\
+                                    grid1.y[grid1.slice_array[icell1]],\
+                                    grid1.z[grid1.slice_array[icell1]])
+    id_icell1 = ids1[grid1.slice_array[icell1]]
+        
+    #get the list of neighboring cells
+    ix1, iy1, iz1 = np.unravel_index(icell1,(grid1.num_divs[0],\
+                                             grid1.num_divs[1],\
+                                             grid1.num_divs[2]))
+    adj_cell_arr = grid1.adjacent_cells(ix1, iy1, iz1)
+            
+    #Loop over each of the (up to) 27 subvolumes neighboring, including the current cell.
+    for icell2 in adj_cell_arr:
+                
+        #extract the points in the cell
+        x_icell2 = grid2.x[grid2.slice_array[icell2]]
+        y_icell2 = grid2.y[grid2.slice_array[icell2]]
+        z_icell2 = grid2.z[grid2.slice_array[icell2]]
+        id_icell2 = ids2[grid2.slice_array[icell2]]
+            
+        #use cython functions to do pair counting
+        if PBCs==False:
+            counts += halo_id_npairs_no_pbc(x_icell1, y_icell1, z_icell1, id_icell1,\
+                                            x_icell2, y_icell2, z_icell2, id_icell2,\
+                                            rbins)
+        else: #PBCs==True
+            counts += halo_id_npairs_pbc(x_icell1, y_icell1, z_icell1, id_icell1,\
+                                         x_icell2, y_icell2, z_icell2, id_icell2,\
+                                         rbins, period)
+    return counts
+
+
+def label_npairs(data1, data2, rbins, labels1, labels2, Nlabels1=None, Nlabels2=None,\
+                 Lbox=None, period=None, verbose=False, N_threads=1):
+    """
+    real-space pair counter which splits pairs by the labels of the two points.
+    
+    Count the number of pairs (x1,x2) that can be formed, with x1 drawn from data1 and x2
+    drawn from data2, and where distance(x1, x2) <= rbins[i], separately for every 
+    combination of the label of x1 and the label of x2, e.g. for every pair of halo mass 
+    bins.  All combinations of labels are counted in a single pass.
+    
+    Parameters
+    ----------
+    data1: array_like
+        N1 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    data2: array_like
+        N2 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    rbins: array_like
+        numpy array of boundaries defining the bins in which pairs are counted.
+    
+    labels1: array_like
+        length N1 integer array of labels, between 0 and Nlabels1-1.
+    
+    labels2: array_like
+        length N2 integer array of labels, between 0 and Nlabels2-1.
+    
+    Nlabels1: int, optional
+        number of distinct labels of data1.  If None, set to max(labels1)+1.
+    
+    Nlabels2: int, optional
+        number of distinct labels of data2.  If None, set to max(labels2)+1.
+    
+    Lbox: array_like, optional
+        length of cube sides which encloses data1 and data2.
+    
+    period: array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only 
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.  If True, period is set to be Lbox
+    
+    verbose: Boolean, optional
+        If True, print out information and progress.
+    
+    N_threads: int, optional
+        number of 'threads' to use in the pair counting.  if set to 'max', use all 
+        available cores.  N_threads=0 is the default.
+    
+    Returns
+    -------
+    N_pairs : array of shape (Nlabels1, Nlabels2, len(rbins))
+        number of pairs, where N_pairs[l1,l2,i] is the number of pairs with 
+        separations less than or equal to rbins[i] between points of data1 with 
+        label l1 and points of data2 with label l2.
+    """
+    
+    if N_threads is not 1:
+        if N_threads=='max':
+            N_threads = multiprocessing.cpu_count()
+        if isinstance(N_threads,int):
+            pool = multiprocessing.Pool(N_threads)
+        else: return ValueError("N_threads argument must be an integer number or 'max'")
+    
+    #process input
+    data1 = np.array(data1)
+    data2 = np.array(data2)
+    rbins = np.array(rbins)
+    labels1 = np.array(labels1).astype(int)
+    labels2 = np.array(labels2).astype(int)
+    if np.all(period==np.inf): period=None
+    
+    #enforce shape requirements on input
+    if (np.shape(data1)[1]!=3) | (data1.ndim>2):
+        raise ValueError("data1 must be of shape (Npts,3)")
+    if (np.shape(data2)[1]!=3) | (data2.ndim>2):
+        raise ValueError("data2 must be of shape (Npts,3)")
+    if rbins.ndim != 1:
+        raise ValueError("rbins must be a 1D array")
+    Nlabels1, Nlabels2 = _process_labels(data1, data2, labels1, labels2,\
+                                         Nlabels1, Nlabels2)
+    
+    #process Lbox parameter
+    if (Lbox is None) & (period is None): 
+        data1, data2, Lbox = _enclose_in_box(data1, data2)
+    elif (Lbox is None) & (period is not None):
+        Lbox = period
+    elif np.shape(Lbox)==():
+        Lbox = np.array([Lbox]*3)
+    elif np.shape(Lbox)==(1,):
+        Lbox = np.array([Lbox[0]]*3)
+    else: Lbox = np.array(Lbox)
+    if np.shape(Lbox) != (3,):
+        raise ValueError("Lbox must be an array of length 3, or number indicating the \
+                          length of one side of a cube")
+    
+    #are we working with periodic boundary conditions (PBCs)?
+    if period is None: 
+        PBCs = False
+    elif np.shape(period) == (3,):
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif np.shape(period) == (1,):
+        period = np.array([period[0]]*3)
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif isinstance(period, (int, long, float, complex)):
+        period = np.array([period]*3)
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif (period == True) & (Lbox is not None):
+        PBCs = True
+        period = Lbox
+    elif (period == True) & (Lbox is None):
+        raise ValueError("If period is set to True, Lbox must be defined.")
+    else: PBCs=True
+    
+    #check to see we dont count pairs more than once
+    if (PBCs==True) & np.any(np.max(rbins)>Lbox/2.0):
+        raise ValueError('cannot count pairs with seperations \
+                          larger than Lbox/2 with PBCs')
+    
+    #build grids for data1 and data2
+    cell_size = np.array([np.max(rbins)]*3)
+    grid1 = rect_cuboid_cells(data1[:,0], data1[:,1], data1[:,2], Lbox, cell_size)
+    grid2 = rect_cuboid_cells(data2[:,0], data2[:,1], data2[:,2], Lbox, cell_size)
+    
+    #sort the labels in the same way as the points
+    labels1 = np.ascontiguousarray(labels1[grid1.idx_sorted])
+    labels2 = np.ascontiguousarray(labels2[grid2.idx_sorted])
+    
+    #square radial bins to make distance calculation cheaper
+    rbins = rbins**2.0
+    
+    #print come information
+    if verbose==True:
+        print("running grid label pairs with {0} by {1} points".format(len(data1),len(data2)))
+        print("cell size= {0}".format(grid1.dL))
+        print("number of cells = {0}".format(np.prod(grid1.num_divs)))
+    
+    #number of cells
+    Ncell1 = np.prod(grid1.num_divs)
+    
+    #create a function to call with only one argument
+    engine = partial(_label_npairs_engine, grid1, grid2, labels1, labels2,\
+                     Nlabels1, Nlabels2, rbins, period, PBCs)
+    
+    #do the pair counting.  The counts of each cell are accumulated as they are 
+    #returned, since there is one histogram per combination of labels.
+    counts = np.zeros((Nlabels1, Nlabels2, len(rbins)), dtype=int)
+    if N_threads>1:
+        for cell_counts in pool.imap_unordered(engine,range(Ncell1)):
+            counts += cell_counts
+        pool.close()
+    if N_threads==1:
+        for icell1 in range(Ncell1):
+            counts += engine(icell1)
+    
+    return counts
+
+
+def _label_npairs_engine(grid1, grid2, labels1, labels2, Nlabels1, Nlabels2,\
+                         rbins, period, PBCs, icell1):
+    """
+    pair counting engine for label_npairs function.  This code calls a cython function.
+    """
+    
+    counts = np.zeros((Nlabels1, Nlabels2, len(rbins)), dtype=int)
+    
+    #extract the points in the cell
+    x_icell1, y_icell1, z_icell1 = (grid1.x[grid1.slice_array[icell1]],\
+                                    grid1.y[grid1.slice_array[icell1]],\
+                                    grid1.z[grid1.slice_array[icell1]])
+    label_icell1 = labels1[grid1.slice_array[icell1]]
+    if len(x_icell1)==0: return counts
+        
+    #get the list of neighboring cells
+    ix1, iy1, iz1 = np.unravel_index(icell1,(grid1.num_divs[0],\
+                                             grid1.num_divs[1],\
+                                             grid1.num_divs[2]))
+    adj_cell_arr = grid1.adjacent_cells(ix1, iy1, iz1)
+            
+    #Loop over each of the (up to) 27 subvolumes neighboring, including the current cell.
+    for icell2 in adj_cell_arr:
+                
+        #extract the points in the cell
+        x_icell2 = grid2.x[grid2.slice_array[icell2]]
+        y_icell2 = grid2.y[grid2.slice_array[icell2]]
+        z_icell2 = grid2.z[grid2.slice_array[icell2]]
+        label_icell2 = labels2[grid2.slice_array[icell2]]
+            
+        #use cython functions to do pair counting
+        if PBCs==False:
+            counts += label_npairs_no_pbc(x_icell1, y_icell1, z_icell1, label_icell1,\
+                                          x_icell2, y_icell2, z_icell2, label_icell2,\
+                                          rbins, Nlabels1, Nlabels2)
+        else: #PBCs==True
+            counts += label_npairs_pbc(x_icell1, y_icell1, z_icell1, label_icell1,\
+                                       x_icell2, y_icell2, z_icell2, label_icell2,\
+                                       rbins, period, Nlabels1, Nlabels2)
+    return counts
+
+
+def one_halo_npairs(data1, data2, rbins, ids1, ids2, period=None, max_pairs=int(1e7)):
+    """
+    real-space pair counter for pairs that share the same id, e.g. one-halo pairs.
+    
+    Count the number of pairs (x1,x2) that can be formed, with x1 drawn from data1 and x2
+    drawn from data2, where x1 and x2 share the same id, and where 
+    distance(x1, x2) <= rbins[i].  No spatial search is done: the points are grouped by 
+    id and only pairs within each group are considered, so the cost scales with the 
+    sum over groups of N1_group*N2_group, rather than with the number of points.
+    
+    Parameters
+    ----------
+    data1: array_like
+        N1 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    data2: array_like
+        N2 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    rbins: array_like
+        numpy array of boundaries defining the bins in which pairs are counted.
+    
+    ids1: array_like
+        length N1 integer array of ids, e.g. the host halo id of each point in data1.
+    
+    ids2: array_like
+        length N2 integer array of ids, e.g. the host halo id of each point in data2.
+    
+    period: array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only 
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.
+    
+    max_pairs: int, optional
+        maximum number of pairs to hold in memory at once.
+    
+    Returns
+    -------
+    N_pairs : array of length len(rbins)
+        number of pairs with the same id
+    """
+    
+    #process input
+    data1 = np.array(data1, dtype=np.float64)
+    data2 = np.array(data2, dtype=np.float64)
+    rbins = np.array(rbins)
+    ids1 = np.array(ids1).astype(int)
+    ids2 = np.array(ids2).astype(int)
+    
+    #enforce shape requirements on input
+    if (np.shape(data1)[1]!=3) | (data1.ndim>2):
+        raise ValueError("data1 must be of shape (Npts,3)")
+    if (np.shape(data2)[1]!=3) | (data2.ndim>2):
+        raise ValueError("data2 must be of shape (Npts,3)")
+    if rbins.ndim != 1:
+        raise ValueError("rbins must be a 1D array")
+    if np.shape(ids1) != (len(data1),):
+        raise ValueError("ids1 must be a 1D array of length N1")
+    if np.shape(ids2) != (len(data2),):
+        raise ValueError("ids2 must be a 1D array of length N2")
+    if period is not None:
+        period = np.atleast_1d(period).astype(np.float64)
+        if len(period)==1: period = np.array([period[0]]*3)
+        if np.all(period==np.inf): period=None
+    
+    #square radial bins to make distance calculation cheaper
+    rbins = rbins**2.0
+    
+    #group the points in data2 by id, and find the group of each point in data1
+    idx_sorted2 = np.argsort(ids2, kind='mergesort')
+    sorted_ids2 = ids2[idx_sorted2]
+    data2 = data2[idx_sorted2]
+    first2 = np.searchsorted(sorted_ids2, ids1, side='left')
+    last2 = np.searchsorted(sorted_ids2, ids1, side='right')
+    num_partners = last2 - first2
+    
+    #split data1 into chunks that form at most ~max_pairs pairs
+    cum_partners = np.cumsum(num_partners)
+    chunk_edges = np.searchsorted(cum_partners,\
+                                  np.arange(max_pairs, cum_partners[-1], max_pairs)\
+                                  if len(cum_partners)>0 else [])
+    chunk_edges = np.unique(np.concatenate(([0], chunk_edges, [len(data1)]))).astype(int)
+    
+    counts = np.zeros(len(rbins), dtype=int)
+    for i1, i2 in zip(chunk_edges[:-1], chunk_edges[1:]):
+        n = num_partners[i1:i2]
+        if np.sum(n)==0: continue
+        
+        #indices of every pair in the chunk
+        i = np.repeat(np.arange(i1, i2), n)
+        offsets = np.arange(np.sum(n)) - np.repeat(np.cumsum(n) - n, n)
+        j = np.repeat(first2[i1:i2], n) + offsets
+        
+        #calculate the square distances
+        d = np.zeros(len(i))
+        for k in range(3):
+            dx = np.fabs(data1[i,k] - data2[j,k])
+            if period is not None:
+                dx = np.minimum(dx, period[k] - dx)
+            d += dx*dx
+        
+        counts += np.searchsorted(np.sort(d), rbins, side='right')
+    
+    return counts
+
+
 def wnpairs(data1, data2, rbins, Lbox=None, period=None, weights1=None, weights2=None,\
             verbose=False, N_threads=1):
     """
@@ -854,6 +1549,225 @@ def _xy_z_npairs_engine(grid1, grid2, rp_bins, pi_bins, period, PBCs, icell1):
     return counts
 
 
+def xy_z_label_npairs(data1, data2, rp_bins, pi_bins, labels1, labels2, Nlabels1=None,\
+                      Nlabels2=None, Lbox=None, period=None, verbose=False, N_threads=1):
+    """
+    2+1D pair counter which splits pairs by the labels of the two points.
+    
+    Count the number of pairs (x1,x2) that can be formed, with x1 drawn from data1 and x2
+    drawn from data2, and with separations in the x-y plane less than or equal to 
+    rp_bins[i] and separations in the z coordinate less than or equal to pi_bins[j], 
+    separately for every combination of the label of x1 and the label of x2.  All 
+    combinations of labels are counted in a single pass.
+    
+    Parameters
+    ----------
+    data1: array_like
+        N1 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    data2: array_like
+        N2 by 3 numpy array of 3-dimensional positions. Should be between zero and 
+        period.
+            
+    rp_bins: array_like
+        numpy array of boundaries defining the radial projected bins in which pairs are 
+        counted.
+    
+    pi_bins: array_like
+        numpy array of boundaries defining the parallel bins in which pairs are counted.
+    
+    labels1: array_like
+        length N1 integer array of labels, between 0 and Nlabels1-1.
+    
+    labels2: array_like
+        length N2 integer array of labels, between 0 and Nlabels2-1.
+    
+    Nlabels1: int, optional
+        number of distinct labels of data1.  If None, set to max(labels1)+1.
+    
+    Nlabels2: int, optional
+        number of distinct labels of data2.  If None, set to max(labels2)+1.
+    
+    Lbox: array_like, optional
+        length of cube sides which encloses data1 and data2.
+    
+    period: array_like, optional
+        length 3 array defining axis-aligned periodic boundary conditions. If only 
+        one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+        If none, PBCs are set to infinity.  If True, period is set to be Lbox
+    
+    verbose: Boolean, optional
+        If True, print out information and progress.
+    
+    N_threads: int, optional
+        number of 'threads' to use in the pair counting.  if set to 'max', use all 
+        available cores.  N_threads=0 is the default.
+    
+    Returns
+    -------
+    N_pairs : array of shape (Nlabels1, Nlabels2, len(rp_bins), len(pi_bins))
+        number of pairs, where N_pairs[l1,l2,i,j] is the number of pairs between 
+        points of data1 with label l1 and points of data2 with label l2.
+    """
+    
+    if N_threads is not 1:
+        if N_threads=='max':
+            N_threads = multiprocessing.cpu_count()
+        if isinstance(N_threads,int):
+            pool = multiprocessing.Pool(N_threads)
+        else: return ValueError("N_threads argument must be an integer number or 'max'")
+    
+    #process input
+    data1 = np.array(data1)
+    data2 = np.array(data2)
+    rp_bins = np.array(rp_bins)
+    pi_bins = np.array(pi_bins)
+    labels1 = np.array(labels1).astype(int)
+    labels2 = np.array(labels2).astype(int)
+    if np.all(period==np.inf): period=None
+    
+    #enforce shape requirements on input
+    if (np.shape(data1)[1]!=3) | (data1.ndim>2):
+        raise ValueError("data1 must be of shape (Npts,3)")
+    if (np.shape(data2)[1]!=3) | (data2.ndim>2):
+        raise ValueError("data2 must be of shape (Npts,3)")
+    if rp_bins.ndim != 1:
+        raise ValueError("rp_bins must be a 1D array")
+    if pi_bins.ndim != 1:
+        raise ValueError("pi_bins must be a 1D array")
+    Nlabels1, Nlabels2 = _process_labels(data1, data2, labels1, labels2,\
+                                         Nlabels1, Nlabels2)
+    
+    #process Lbox parameter
+    if (Lbox is None) & (period is None): 
+        data1, data2, Lbox = _enclose_in_box(data1, data2)
+    elif (Lbox is None) & (period is not None):
+        Lbox = period
+    elif np.shape(Lbox)==():
+        Lbox = np.array([Lbox]*3)
+    elif np.shape(Lbox)==(1,):
+        Lbox = np.array([Lbox[0]]*3)
+    else: Lbox = np.array(Lbox)
+    if np.shape(Lbox) != (3,):
+        raise ValueError("Lbox must be an array of length 3, or number indicating the \
+                          length of one side of a cube")
+    
+    #are we working with periodic boundary conditions (PBCs)?
+    if period is None: 
+        PBCs = False
+    elif np.shape(period) == (3,):
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif np.shape(period) == (1,):
+        period = np.array([period[0]]*3)
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif isinstance(period, (int, long, float, complex)):
+        period = np.array([period]*3)
+        PBCs = True
+        if np.any(period!=Lbox):
+            raise ValueError("period must == Lbox") 
+    elif (period == True) & (Lbox is not None):
+        PBCs = True
+        period = Lbox
+    elif (period == True) & (Lbox is None):
+        raise ValueError("If period is set to True, Lbox must be defined.")
+    else: PBCs=True
+    
+    #check to see we dont count pairs more than once    
+    if (PBCs==True) & np.any(np.max(rp_bins)>Lbox[0:2]/2.0):
+        raise ValueError('grid_pairs pair counter cannot count pairs with seperations\
+                          larger than Lbox/2 with PBCs')
+    if (PBCs==True) & np.any(np.max(pi_bins)>Lbox[2]/2.0):
+        raise ValueError('grid_pairs pair counter cannot count pairs with seperations\
+                          larger than Lbox/2 with PBCs')
+    
+    #build grids for data1 and data2
+    cell_size = np.array([np.max(rp_bins),np.max(rp_bins),np.max(pi_bins)])
+    grid1 = rect_cuboid_cells(data1[:,0], data1[:,1], data1[:,2], Lbox, cell_size)
+    grid2 = rect_cuboid_cells(data2[:,0], data2[:,1], data2[:,2], Lbox, cell_size)
+    
+    #sort the labels in the same way as the points
+    labels1 = np.ascontiguousarray(labels1[grid1.idx_sorted])
+    labels2 = np.ascontiguousarray(labels2[grid2.idx_sorted])
+    
+    #square radial bins to make distance calculation cheaper
+    rp_bins = rp_bins**2.0
+    pi_bins = pi_bins**2.0
+    
+    #print come information
+    if verbose==True:
+        print("running grid label pairs with {0} by {1} points".format(len(data1),len(data2)))
+        print("cell size= {0}".format(grid1.dL))
+        print("number of cells = {0}".format(np.prod(grid1.num_divs)))
+    
+    #number of cells
+    Ncell1 = np.prod(grid1.num_divs)
+    
+    #create a function to call with only one argument
+    engine = partial(_xy_z_label_npairs_engine, grid1, grid2, labels1, labels2,\
+                     Nlabels1, Nlabels2, rp_bins, pi_bins, period, PBCs)
+    
+    #do the pair counting.  The counts of each cell are accumulated as they are 
+    #returned, since there is one histogram per combination of labels.
+    counts = np.zeros((Nlabels1, Nlabels2, len(rp_bins), len(pi_bins)), dtype=int)
+    if N_threads>1:
+        for cell_counts in pool.imap_unordered(engine,range(Ncell1)):
+            counts += cell_counts
+        pool.close()
+    if N_threads==1:
+        for icell1 in range(Ncell1):
+            counts += engine(icell1)
+    
+    return counts
+
+
+def _xy_z_label_npairs_engine(grid1, grid2, labels1, labels2, Nlabels1, Nlabels2,\
+                              rp_bins, pi_bins, period, PBCs, icell1):
+    """
+    pair counting engine for xy_z_label_npairs function.  This code calls a cython 
+    function.
+    """
+    
+    counts = np.zeros((Nlabels1, Nlabels2, len(rp_bins), len(pi_bins)), dtype=int)
+    
+    #extract the points in the cell
+    x_icell1, y_icell1, z_icell1 = (grid1.x[grid1.slice_array[icell1]],\
+                                    grid1.y[grid1.slice_array[icell1]],\
+                                    grid1.z[grid1.slice_array[icell1]])
+    label_icell1 = labels1[grid1.slice_array[icell1]]
+    if len(x_icell1)==0: return counts
+        
+    #get the list of neighboring cells
+    ix1, iy1, iz1 = np.unravel_index(icell1,(grid1.num_divs[0],\
+                                             grid1.num_divs[1],\
+                                             grid1.num_divs[2]))
+    adj_cell_arr = grid1.adjacent_cells(ix1, iy1, iz1)
+            
+    #Loop over each of the (up to) 27 subvolumes neighboring, including the current cell.
+    for icell2 in adj_cell_arr:
+                
+        #extract the points in the cell
+        x_icell2 = grid2.x[grid2.slice_array[icell2]]
+        y_icell2 = grid2.y[grid2.slice_array[icell2]]
+        z_icell2 = grid2.z[grid2.slice_array[icell2]]
+        label_icell2 = labels2[grid2.slice_array[icell2]]
+            
+        #use cython functions to do pair counting
+        if PBCs==False:
+            counts += xy_z_label_npairs_no_pbc(x_icell1, y_icell1, z_icell1, label_icell1,\
+                                               x_icell2, y_icell2, z_icell2, label_icell2,\
+                                               rp_bins, pi_bins, Nlabels1, Nlabels2)
+        else: #PBCs==True
+            counts += xy_z_label_npairs_pbc(x_icell1, y_icell1, z_icell1, label_icell1,\
+                                            x_icell2, y_icell2, z_icell2, label_icell2,\
+                                            rp_bins, pi_bins, period, Nlabels1, Nlabels2)
+    return counts
+
+
 def s_mu_npairs(data1, data2, s_bins, mu_bins, Lbox=None, period=None, verbose=False, N_threads=1):
     """
     real-space pair counter.
@@ -1534,6 +2448,33 @@ def _xy_z_jnpairs_engine(grid1, grid2, weights1, weights2, jtags1, jtags2, N_sam
 
 
 
+def _process_labels(data1, data2, labels1, labels2, Nlabels1, Nlabels2):
+    """
+    check the labels passed to the labelled pair counters, and return the number of 
+    distinct labels of data1 and data2.
+    """
+    if np.shape(labels1) != (len(data1),):
+        raise ValueError("labels1 must be a 1D array of length N1")
+    if np.shape(labels2) != (len(data2),):
+        raise ValueError("labels2 must be a 1D array of length N2")
+    
+    if Nlabels1 is None:
+        if len(labels1)>0: Nlabels1 = np.max(labels1)+1
+        else: Nlabels1 = 1
+    if Nlabels2 is None:
+        if len(labels2)>0: Nlabels2 = np.max(labels2)+1
+        else: Nlabels2 = 1
+    Nlabels1 = int(Nlabels1)
+    Nlabels2 = int(Nlabels2)
+    
+    if (len(labels1)>0) and ((np.min(labels1)<0) | (np.max(labels1)>=Nlabels1)):
+        raise ValueError("labels1 must be between 0 and Nlabels1-1")
+    if (len(labels2)>0) and ((np.min(labels2)<0) | (np.max(labels2)>=Nlabels2)):
+        raise ValueError("labels2 must be between 0 and Nlabels2-1")
+    
+    return Nlabels1, Nlabels2
+
+
 def _enclose_in_box(data1, data2):
     """
     build axis aligned box which encloses all points. 
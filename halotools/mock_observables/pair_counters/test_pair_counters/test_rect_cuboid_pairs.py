@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
 import numpy as np
+import pytest
 #load comparison simple pair counters
 from ..pairs import npairs as simp_npairs
 from ..pairs import wnpairs as simp_wnpairs
@@ -8,6 +9,9 @@ from ..pairs import wnpairs as simp_wnpairs
 from ..rect_cuboid_pairs import npairs, wnpairs, jnpairs
 from ..rect_cuboid_pairs import xy_z_npairs, xy_z_wnpairs, xy_z_jnpairs
 from ..rect_cuboid_pairs import s_mu_npairs
+from ..rect_cuboid_pairs import per_point_npairs
+from ..rect_cuboid_pairs import halo_id_npairs, one_halo_npairs
+from ..rect_cuboid_pairs import label_npairs, xy_z_label_npairs
 
 np.random.seed(1)
 
@@ -447,4 +451,146 @@ def test_xy_z_jnpairs_nonperiodic():
     assert np.all(result[0]==result_compare), "shape xy_z jackknife pair counts of result is incorrect"
     
     
-    
\ No newline at end of file
+    
+
+
+def test_per_point_npairs_periodic():
+    
+    Npts = 1e3
+    Lbox = [1.0,1.0,1.0]
+    period = np.array(Lbox)
+    
+    data1 = np.random.random((100,3))
+    x = np.random.uniform(0, Lbox[0], Npts)
+    y = np.random.uniform(0, Lbox[1], Npts)
+    z = np.random.uniform(0, Lbox[2], Npts)
+    data2 = np.vstack((x,y,z)).T
+    
+    rbins = np.array([0.0,0.1,0.2,0.3,0.4,0.5])
+    
+    result = per_point_npairs(data1, data2, rbins, Lbox=Lbox, period=period)
+    
+    assert np.shape(result)==(100,6), "shape of per-point pair counts is incorrect"
+    
+    for i in [0, 17, 99]:
+        test_result = simp_npairs(data1[i:i+1], data2, rbins, period=period)
+        assert np.all(result[i]==test_result), "per-point pair counts are incorrect"
+    
+    result_compare = npairs(data1, data2, rbins, Lbox=Lbox, period=period)
+    assert np.all(np.sum(result,axis=0)==result_compare), "per-point pair counts are incorrect"
+
+
+def test_per_point_npairs_small_radius():
+    
+    #search radius much smaller than the box, where a grid with cells the size of the
+    #search radius would have many millions of mostly empty cells
+    Lbox = np.array([250.0,250.0,250.0])
+    period = Lbox
+    
+    data1 = np.random.uniform(0, Lbox[0], (int(1e4),3))
+    data2 = np.random.uniform(0, Lbox[0], (int(1e5),3))
+    
+    rbins = np.array([0.5,1.0])
+    
+    result = per_point_npairs(data1, data2, rbins, Lbox=Lbox, period=period)
+    
+    assert np.shape(result)==(int(1e4),2), "shape of per-point pair counts is incorrect"
+    
+    for i in [0, 17, 9999]:
+        test_result = simp_npairs(data1[i:i+1], data2, rbins, period=period)
+        assert np.all(result[i]==test_result), "per-point pair counts are incorrect"
+    
+    #the largest search radius is taken from the last of rbins
+    with pytest.raises(ValueError):
+        per_point_npairs(data1, data2, rbins[::-1], Lbox=Lbox, period=period)
+
+
+def test_halo_id_npairs_periodic():
+    
+    Npts = 1e3
+    Lbox = [1.0,1.0,1.0]
+    period = np.array(Lbox)
+    
+    x = np.random.uniform(0, Lbox[0], Npts)
+    y = np.random.uniform(0, Lbox[1], Npts)
+    z = np.random.uniform(0, Lbox[2], Npts)
+    data1 = np.vstack((x,y,z)).T
+    ids1 = np.random.random_integers(0, 99, size=int(Npts))
+    
+    rbins = np.array([0.0,0.1,0.2,0.3,0.4,0.5])
+    
+    result_1h, result_2h = halo_id_npairs(data1, data1, rbins, ids1, ids1,\
+                                          Lbox=Lbox, period=period)
+    
+    assert np.shape(result_1h)==(6,), "shape of one halo pair counts is incorrect"
+    assert np.shape(result_2h)==(6,), "shape of two halo pair counts is incorrect"
+    
+    result_compare = npairs(data1, data1, rbins, Lbox=Lbox, period=period)
+    assert np.all(result_1h+result_2h==result_compare), "pair counts are not conserved"
+    
+    test_result = np.zeros(6, dtype=int)
+    for halo_id in np.unique(ids1):
+        members = data1[ids1==halo_id]
+        test_result += simp_npairs(members, members, rbins, period=period)
+    assert np.all(result_1h==test_result), "one halo pair counts are incorrect"
+    
+    result_1h_fast = one_halo_npairs(data1, data1, rbins, ids1, ids1, period=period)
+    assert np.all(result_1h_fast==result_1h), "one halo pair counts are inconsistent"
+
+
+def test_label_npairs_periodic():
+    
+    Npts = 1e3
+    Lbox = [1.0,1.0,1.0]
+    period = np.array(Lbox)
+    
+    x = np.random.uniform(0, Lbox[0], Npts)
+    y = np.random.uniform(0, Lbox[1], Npts)
+    z = np.random.uniform(0, Lbox[2], Npts)
+    data1 = np.vstack((x,y,z)).T
+    labels1 = np.random.random_integers(0, 2, size=int(Npts))
+    labels2 = np.random.random_integers(0, 3, size=int(Npts))
+    
+    rbins = np.array([0.0,0.1,0.2,0.3,0.4,0.5])
+    
+    result = label_npairs(data1, data1, rbins, labels1, labels2, Nlabels2=5,\
+                          Lbox=Lbox, period=period)
+    
+    assert np.shape(result)==(3,5,6), "shape of labelled pair counts is incorrect"
+    
+    result_compare = npairs(data1, data1, rbins, Lbox=Lbox, period=period)
+    assert np.all(np.sum(result, axis=(0,1))==result_compare),\
+        "pair counts are not conserved"
+    
+    for l1 in range(3):
+        for l2 in range(5):
+            test_result = simp_npairs(data1[labels1==l1], data1[labels2==l2], rbins,\
+                                      period=period)
+            assert np.all(result[l1,l2]==test_result), "labelled pair counts are incorrect"
+
+
+def test_xy_z_label_npairs_periodic():
+    
+    Npts = 1e3
+    Lbox = [1.0,1.0,1.0]
+    period = np.array(Lbox)
+    
+    x = np.random.uniform(0, Lbox[0], Npts)
+    y = np.random.uniform(0, Lbox[1], Npts)
+    z = np.random.uniform(0, Lbox[2], Npts)
+    data1 = np.vstack((x,y,z)).T
+    labels1 = np.random.random_integers(0, 2, size=int(Npts))
+    
+    rp_bins = np.arange(0,0.31,0.1)
+    pi_bins = np.arange(0,0.31,0.1)
+    
+    result = xy_z_label_npairs(data1, data1, rp_bins, pi_bins, labels1, labels1,\
+                               Lbox=Lbox, period=period)
+    
+    assert np.shape(result)==(3,3,4,4), "shape of labelled pair counts is incorrect"
+    
+    for l1 in range(3):
+        for l2 in range(3):
+            test_result = xy_z_npairs(data1[labels1==l1], data1[labels1==l2],\
+                                      rp_bins, pi_bins, Lbox=Lbox, period=period)
+            assert np.all(result[l1,l2]==test_result), "labelled pair counts are incorrect"
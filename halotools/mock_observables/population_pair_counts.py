@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+"""
+pair count classes which can be updated as the points in a sample change, e.g. between
+steps of a chain which only change the satellite population of a mock.
+"""
+
+from __future__ import division, print_function
+####import modules########################################################################
+import numpy as np
+from math import pi, gamma
+from .pair_counters.rect_cuboid_pairs import npairs
+from .clustering import _TP_estimator, _TP_estimator_requirements, _list_estimators
+##########################################################################################
+
+__all__=['PopulationPairCounts']
+__author__ = ['Duncan Campbell']
+
+
+class PopulationPairCounts(object):
+    """
+    real space pair counts of a sample made up of several populations of points.
+
+    The pair counts between every pair of populations, e.g. centrals-centrals,
+    centrals-satellites and satellites-satellites, are stored separately.  When one
+    population changes, only the pairs involving that population are recounted, and
+    when only a few points of a population are removed or inserted, only the pairs of
+    those points are counted.
+    """
+
+    def __init__(self, rbins, period=None, randoms=None, N_threads=1):
+        """
+        create population pair counts object.
+
+        Parameters
+        ----------
+        rbins : array_like
+            array of boundaries defining the real space radial bins in which pairs are
+            counted.
+
+        period : array_like, optional
+            length 3 array defining axis-aligned periodic boundary conditions. If only
+            one number, Lbox, is specified, period is assumed to be np.array([Lbox]*3).
+            If none, PBCs are set to infinity.
+
+        randoms : array_like, optional
+            Npts x 3 array containing 3-D positions of points.  If no randoms are
+            provided analytic randoms are used (only valid for periodic boundary
+            conditions).  Random-random pairs are only counted once, and data-random
+            pairs are updated along with the data-data pairs.
+
+        N_threads : int, optional
+            number of threads to use in calculation. Default is 1. A string 'max' may be
+            used to indicate that the pair counters should use all available cores on the
+            machine.
+        """
+
+        self.rbins = np.asarray(rbins)
+        if self.rbins.ndim != 1:
+            raise ValueError('rbins must be a 1-D array')
+        if len(self.rbins)<2:
+            raise ValueError('rbins must be of lenght >=2.')
+
+        #Process period entry and check for consistency.
+        if period is None:
+            self.PBCs = False
+            self.period = np.array([np.inf]*3)
+        else:
+            self.PBCs = True
+            self.period = np.asarray(period).astype("float64")
+            if np.shape(self.period) == ():
+                self.period = np.array([self.period]*3)
+            elif np.shape(self.period)[0] != 3:
+                raise ValueError("period should have shape (3,)")
+            if np.max(self.rbins)>np.min(self.period)/2.0:
+                raise ValueError('cannot calculate for seperations larger than Lbox/2.')
+
+        if (randoms is None) & (self.PBCs==False):
+            raise ValueError('if no PBCs are specified, randoms must be provided.')
+
+        self.N_threads = N_threads
+
+        #random-random pairs do not change, count them now.
+        if randoms is not None:
+            self.randoms = np.asarray(randoms, dtype=np.float64)
+            self._RR = self._count(self.randoms, self.randoms)
+        else:
+            self.randoms = None
+            self._RR = None
+
+        self._populations = [] #population names in the order they were added
+        self._positions = {} #positions of each population
+        self._DD = {} #cumulative pair counts keyed by (name1, name2)
+        self._DR = {} #cumulative data-random pair counts keyed by name
+
+    @property
+    def populations(self):
+        """
+        Return the names of the populations, in the order they were added.
+        """
+        return list(self._populations)
+
+    @property
+    def positions(self):
+        """
+        Return the Npts x 3 positions of all the points, with the populations
+        concatenated in the order they were added.
+        """
+        if len(self._populations)==0:
+            return np.zeros((0,3))
+        return np.vstack([self._positions[name] for name in self._populations])
+
+    def population_positions(self, name):
+        """
+        Return the Npts x 3 positions of the points in population `name`.
+        """
+        self._check_name(name)
+        return self._positions[name]
+
+    def set_population(self, name, positions):
+        """
+        Add a population, or replace all the points of an existing population.
+
+        Only the pairs involving population `name` are counted.
+
+        Parameters
+        ----------
+        name : string
+            name of the population, e.g. 'centrals'.
+
+        positions : array_like
+            Npts x 3 numpy array containing 3-D positions of the points in the
+            population.
+        """
+
+        positions = self._process_positions(positions)
+
+        if name not in self._populations:
+            self._populations.append(name)
+        self._positions[name] = positions
+
+        for other in self._populations:
+            self._DD[self._key(name, other)] = self._count(positions,\
+                                                           self._positions[other])
+        if self.randoms is not None:
+            self._DR[name] = self._count(positions, self.randoms)
+
+    def update_population(self, name, remove=None, insert=None):
+        """
+        Remove and/or insert points in an existing population.
+
+        Only the pairs of the removed and inserted points are counted.  The resulting
+        pair counts are identical to counting the pairs of the updated population from
+        scratch.  The remaining points keep their order, and the inserted points are
+        appended to the end of the population.
+
+        Parameters
+        ----------
+        name : string
+            name of the population.
+
+        remove : array_like, optional
+            integer indices, or a boolean mask, of the points of the population to
+            remove.
+
+        insert : array_like, optional
+            Npts x 3 numpy array containing 3-D positions of points to add to the
+            population.
+        """
+
+        self._check_name(name)
+        old = self._positions[name]
+
+        #split the population into the points which are kept and removed
+        keep = np.ones(len(old), dtype=bool)
+        if remove is not None:
+            remove = np.asarray(remove)
+            if remove.dtype==bool:
+                if np.shape(remove) != (len(old),):
+                    raise ValueError("boolean remove mask must have one entry per point")
+                keep = ~remove
+            else: keep[remove.astype(int)] = False
+        removed = old[~keep]
+        kept = old[keep]
+
+        if insert is None:
+            insert = np.zeros((0,3))
+        insert = self._process_positions(insert)
+
+        #with P = K + R, PP = KK + 2KR + RR and RP = RK + RR, so KK = PP - 2RP + RR
+        key = self._key(name, name)
+        counts = self._DD[key] - 2*self._count(removed, old) +\
+                 self._count(removed, removed)
+        #with P' = K + I, P'P' = KK + 2KI + II
+        counts += 2*self._count(kept, insert) + self._count(insert, insert)
+        self._DD[key] = counts
+
+        #P'Q = PQ - RQ + IQ
+        for other in self._populations:
+            if other==name: continue
+            key = self._key(name, other)
+            self._DD[key] = self._DD[key] - self._count(removed, self._positions[other]) +\
+                            self._count(insert, self._positions[other])
+        if self.randoms is not None:
+            self._DR[name] = self._DR[name] - self._count(removed, self.randoms) +\
+                             self._count(insert, self.randoms)
+
+        self._positions[name] = np.vstack((kept, insert))
+
+    def remove_population(self, name):
+        """
+        Remove population `name` and all of its pair counts.
+        """
+
+        self._check_name(name)
+        for other in self._populations:
+            del self._DD[self._key(name, other)]
+        self._DR.pop(name, None)
+        del self._positions[name]
+        self._populations.remove(name)
+
+    def pair_counts(self, name1=None, name2=None):
+        """
+        Return the cumulative number of pairs with separations less than or equal to
+        each of `rbins`.
+
+        Parameters
+        ----------
+        name1 : string, optional
+            name of the first population.  If None, pairs of all the points are
+            returned.
+
+        name2 : string, optional
+            name of the second population.  If None, name2 is set to name1.
+
+        Returns
+        -------
+        N_pairs : numpy.array
+            len(`rbins`) array of the number of pairs, counted in the same way as
+            `~halotools.mock_observables.pair_counters.npairs`, i.e. each pair is
+            counted once for each ordering of the two points.
+        """
+
+        if name1 is None:
+            counts = np.zeros(len(self.rbins), dtype=int)
+            for key in self._DD:
+                if key[0]==key[1]: counts = counts + self._DD[key]
+                else: counts = counts + 2*self._DD[key]
+            return counts
+
+        if name2 is None: name2 = name1
+        self._check_name(name1)
+        self._check_name(name2)
+        return self._DD[self._key(name1, name2)]
+
+    def tpcf(self, estimator='Natural'):
+        """
+        Calculate the real space two-point correlation function, :math:`\\xi(r)`, of all
+        the points.
+
+        The result is identical to that of `~halotools.mock_observables.tpcf` called on
+        `positions` with the same `rbins`, `period` and `randoms`.
+
+        Parameters
+        ----------
+        estimator : string, optional
+            options: 'Natural', 'Davis-Peebles', 'Hewett' , 'Hamilton', 'Landy-Szalay'
+
+        Returns
+        -------
+        correlation_function : numpy.array
+            len(`rbins`)-1 length array containing the correlation function
+            :math:`\\xi(r)` computed in each of the bins defined by `rbins`.
+        """
+
+        if estimator not in _list_estimators():
+            raise ValueError('user must specify a supported estimator. Supported \
+            estimators are:{0}'.format(_list_estimators()))
+
+        do_DD, do_DR, do_RR = _TP_estimator_requirements(estimator)
+
+        DD = np.diff(self.pair_counts())
+        N1 = np.sum([len(self._positions[name]) for name in self._populations])
+
+        #randoms provided
+        if self.randoms is not None:
+            DR = np.zeros(len(self.rbins), dtype=int)
+            for name in self._populations:
+                DR = DR + self._DR[name]
+            DR = np.diff(DR)
+            RR = np.diff(self._RR)
+            NR = len(self.randoms)
+        #PBCs and no randoms--calculate randoms analytically.
+        else:
+            dv = _nball_volume(self.rbins,3) #volume of spheres
+            dv = np.diff(dv) #volume of shells
+            global_volume = self.period.prod()
+            rho1 = N1/global_volume
+            DR = (N1)*(dv*rho1)
+            RR = DR #in the analytic case, for the auto-correlation, DR==RR.
+            N1 = 1.0
+            NR = 1.0
+
+        return _TP_estimator(DD,DR,RR,N1,N1,NR,NR,estimator)
+
+    def _count(self, data1, data2):
+        """
+        count the cumulative pairs between data1 and data2.
+        """
+        if (len(data1)==0) | (len(data2)==0):
+            return np.zeros(len(self.rbins), dtype=int)
+        if self.PBCs==True: period = self.period
+        else: period = None
+        return npairs(data1, data2, self.rbins, period=period, N_threads=self.N_threads)
+
+    def _key(self, name1, name2):
+        """
+        return the key of the pair counts between two populations.
+        """
+        if self._populations.index(name1) <= self._populations.index(name2):
+            return (name1, name2)
+        else: return (name2, name1)
+
+    def _check_name(self, name):
+        """
+        raise an error if there is no population called name.
+        """
+        if name not in self._populations:
+            raise ValueError("there is no population named {0}".format(name))
+
+    def _process_positions(self, positions):
+        """
+        check the shape of an array of positions.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        if len(positions)==0:
+            return np.zeros((0,3))
+        if (positions.ndim != 2) or (np.shape(positions)[1]!=3):
+            raise ValueError("positions must be of shape (Npts,3)")
+        return positions
+
+
+def _nball_volume(R,k):
+    """
+    Calculate the volume of a n-shpere.  This is used for the analytical randoms.
+    """
+    return (np.pi**(k/2.0)/gamma(k/2.0+1.0))*R**k
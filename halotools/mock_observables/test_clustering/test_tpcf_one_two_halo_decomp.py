@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+from __future__ import division, print_function
+import numpy as np
+import sys
+from ..clustering import tpcf, tpcf_one_two_halo_decomp
+
+__all__=['test_tpcf_one_two_halo_auto_periodic','test_tpcf_one_two_halo_cross_periodic']
+
+
+####one and two halo two point correlation function#######################################
+
+def test_tpcf_one_two_halo_auto_periodic():
+    Npts = 1000
+    host_halo_ids = np.random.random_integers(0, 99, size=Npts)
+    halo_centers = np.random.random((100,3))
+    sample1 = (halo_centers[host_halo_ids] + np.random.normal(0,0.02,(Npts,3)))%1.0
+    period = np.array([1,1,1])
+    rbins = np.linspace(0.01,0.3,5)
+    
+    xi_1h, xi_2h = tpcf_one_two_halo_decomp(sample1, host_halo_ids, rbins, 
+                                            period=period, estimator='Natural')
+    
+    assert xi_1h.ndim == 1, "More than one correlation function returned erroneously."
+    assert xi_2h.ndim == 1, "More than one correlation function returned erroneously."
+    
+    #with the natural estimator the one and two halo terms sum to the full result
+    xi = tpcf(sample1, rbins, period=period, estimator='Natural')
+    assert np.allclose((1.0+xi_1h)+(1.0+xi_2h), 1.0+xi), "decomposition is incorrect."
+
+
+def test_tpcf_one_two_halo_cross_periodic():
+    sample1 = np.random.random((100,3))
+    sample2 = np.random.random((100,3))
+    ids1 = np.random.random_integers(0, 9, size=100)
+    ids2 = np.random.random_integers(0, 9, size=100)
+    period = np.array([1,1,1])
+    rbins = np.linspace(0,0.3,5)
+    
+    result = tpcf_one_two_halo_decomp(sample1, ids1, rbins, sample2=sample2, 
+                                      sample2_host_halo_id=ids2, period=period)
+    
+    assert len(result)==6, "wrong number of correlation functions returned."
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+from __future__ import division, print_function
+import numpy as np
+from ..counts_in_cells import counts_in_spheres, counts_in_cells,\
+                              counts_in_cells_moments, void_prob_func
+from ..pair_counters.pairs import npairs as simp_npairs
+
+__all__=['test_counts_in_spheres', 'test_counts_in_cells_normalization',\
+         'test_counts_in_cells_moments', 'test_void_prob_func']
+
+#set random seed to get consistent behavior
+np.random.seed(1)
+
+
+def test_counts_in_spheres():
+    
+    sample1 = np.random.random((1000,3))
+    centers = np.random.random((50,3))
+    period = np.array([1.0,1.0,1.0])
+    rbins = np.array([0.05,0.1,0.2])
+    
+    counts = counts_in_spheres(sample1, rbins, centers=centers, period=period)
+    
+    assert np.shape(counts)==(50,3), "counts in spheres returned with incorrect shape"
+    for i in [0, 25, 49]:
+        test_result = simp_npairs(centers[i:i+1], sample1, rbins, period=period)
+        assert np.all(counts[i]==test_result), "counts in spheres are incorrect"
+
+
+def test_counts_in_cells_normalization():
+    
+    sample1 = np.random.random((1000,3))
+    period = np.array([1.0,1.0,1.0])
+    rbins = np.array([0.05,0.1,0.2])
+    
+    pn = counts_in_cells(sample1, rbins, n_centers=1000, period=period, seed=43)
+    
+    assert np.shape(pn)[0]==3, "P(N) returned with incorrect shape"
+    assert np.allclose(np.sum(pn,axis=1),1.0), "P(N) is not normalized"
+    
+    #the same seed gives the same random centers
+    pn2 = counts_in_cells(sample1, rbins, n_centers=1000, period=period, seed=43)
+    assert np.all(pn==pn2), "P(N) is not reproducible for a fixed seed"
+
+
+def test_counts_in_cells_moments():
+    
+    sample1 = np.random.random((1000,3))
+    period = np.array([1.0,1.0,1.0])
+    rbins = np.array([0.05,0.1,0.2])
+    
+    counts = counts_in_spheres(sample1, rbins, n_centers=1000, period=period, seed=43)
+    moments = counts_in_cells_moments(counts, max_order=3)
+    
+    assert np.shape(moments)==(3,3), "moments returned with incorrect shape"
+    assert np.allclose(moments[0], np.mean(counts,axis=0)), "mean counts are incorrect"
+    assert np.allclose(moments[1], np.var(counts,axis=0)), "variance of counts is incorrect"
+    
+    #for a random sample the mean count is the expected number of points in a sphere
+    expected_mean = 1000*4.0/3.0*np.pi*rbins**3
+    assert np.allclose(moments[0], expected_mean, rtol=0.1), "mean counts are biased"
+
+
+def test_void_prob_func():
+    
+    sample1 = np.random.random((1000,3))
+    period = np.array([1.0,1.0,1.0])
+    rbins = np.array([0.01,0.05,0.1])
+    
+    vpf = void_prob_func(sample1, rbins, n_centers=1000, period=period, seed=43)
+    
+    assert np.shape(vpf)==(3,), "VPF returned with incorrect shape"
+    assert np.all(np.diff(vpf)<=0), "VPF must decrease with increasing radius"
+    
+    #for a poisson sample, P0 = exp(-nV)
+    expected_vpf = np.exp(-1000*4.0/3.0*np.pi*rbins**3)
+    assert np.allclose(vpf, expected_vpf, atol=0.05), "VPF inconsistent with poisson sample"
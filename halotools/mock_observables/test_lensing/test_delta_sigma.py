@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+from __future__ import division, print_function
+import numpy as np
+from ..lensing import delta_sigma
+
+__all__=['test_delta_sigma_periodic', 'test_delta_sigma_jackknife']
+
+#set random seed to get consistent behavior
+np.random.seed(1)
+
+
+def _brute_force_enclosed_mass(galaxies, particles, rp_bins, masses, period):
+    """
+    calculate the projected mass within each of rp_bins of each galaxy from all the 
+    pairwise separations.
+    """
+    
+    d = np.fabs(galaxies[:,np.newaxis,0:2] - particles[np.newaxis,:,0:2])
+    d = np.minimum(d, period[0:2] - d)
+    rp = np.sqrt(np.sum(d*d, axis=2))
+    
+    return np.array([np.sum(masses*(rp<=r), axis=1) for r in rp_bins]).T
+
+
+def _brute_force_delta_sigma(enclosed_mass, rp_bins):
+    """
+    excess surface density at the bin midpoints from the mean enclosed mass.
+    """
+    
+    sigma = np.diff(enclosed_mass)/np.diff(np.pi*rp_bins**2)
+    rp = (rp_bins[1:] + rp_bins[:-1])/2.0
+    inner_mass = enclosed_mass[:-1] + sigma*np.pi*(rp**2 - rp_bins[:-1]**2)
+    
+    return inner_mass/(np.pi*rp**2) - sigma
+
+
+def test_delta_sigma_periodic():
+    """
+    test delta_sigma with periodic boundary conditions and per-particle masses 
+    against a brute force calculation.
+    """
+    
+    Lbox = 10.0
+    period = np.array([Lbox]*3)
+    galaxies = np.random.uniform(0, Lbox, (50,3))
+    particles = np.random.uniform(0, Lbox, (2000,3))
+    masses = np.random.uniform(1, 2, len(particles))
+    rp_bins = np.logspace(-1, 0.5, 6)
+    
+    result = delta_sigma(galaxies, particles, rp_bins, period=period,\
+                         particle_masses=masses, downsampling_factor=10.0)
+    
+    enclosed_mass = _brute_force_enclosed_mass(galaxies, particles, rp_bins,\
+                                               10.0*masses, period)
+    correct = _brute_force_delta_sigma(np.mean(enclosed_mass, axis=0), rp_bins)
+    
+    assert np.allclose(result, correct)
+
+
+def test_delta_sigma_jackknife():
+    """
+    test the jackknife covariance of delta_sigma against a brute force calculation.
+    """
+    
+    Lbox = 10.0
+    period = np.array([Lbox]*3)
+    galaxies = np.random.uniform(0, Lbox, (50,3))
+    particles = np.random.uniform(0, Lbox, (2000,3))
+    rp_bins = np.logspace(-1, 0.5, 6)
+    
+    result, cov = delta_sigma(galaxies, particles, rp_bins, period=period, Nsub=2)
+    
+    enclosed_mass = _brute_force_enclosed_mass(galaxies, particles, rp_bins,\
+                                               np.ones(len(particles)), period)
+    correct = _brute_force_delta_sigma(np.mean(enclosed_mass, axis=0), rp_bins)
+    assert np.allclose(result, correct)
+    
+    index = np.floor(galaxies[:,0:2]/(Lbox/2.0)).astype(int)
+    labels = index[:,0]*2 + index[:,1]
+    sub = np.array([_brute_force_delta_sigma(np.mean(enclosed_mass[labels!=i], axis=0),\
+                                             rp_bins) for i in range(4)])
+    sub = sub - np.mean(sub, axis=0)
+    assert np.allclose(cov, (3.0/4.0)*np.dot(sub.T, sub))
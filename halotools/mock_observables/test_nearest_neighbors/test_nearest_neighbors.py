@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+from __future__ import division, print_function
+import numpy as np
+from ..nearest_neighbors import nearest_neighbors
+from ..pair_counters.pairs import distance
+
+__all__=['test_nearest_neighbors_periodic', 'test_nearest_neighbors_nonperiodic',\
+         'test_nearest_neighbors_auto', 'test_nearest_neighbors_too_few_points',\
+         'test_nearest_neighbors_small_cells']
+
+#set random seed to get consistent behavior
+np.random.seed(1)
+
+
+def _brute_force_knn(sample1, sample2, k, period=None):
+    """
+    find the k nearest neighbors by calculating all the pairwise distances.
+    """
+    
+    d = np.array([distance(x1, sample2, period=period) for x1 in sample1])
+    idx = np.argsort(d, axis=1)[:,0:k]
+    return np.sort(d, axis=1)[:,0:k], idx
+
+
+def test_nearest_neighbors_periodic():
+    
+    sample1 = np.random.random((100,3))
+    sample2 = np.random.random((500,3))
+    period = np.array([1.0,1.0,1.0])
+    
+    dists, inds = nearest_neighbors(sample1, 10, sample2=sample2, period=period)
+    test_dists, test_inds = _brute_force_knn(sample1, sample2, 10, period=period)
+    
+    assert np.shape(dists)==(100,10), "distances returned with incorrect shape"
+    assert np.allclose(dists, test_dists), "nearest neighbor distances are incorrect"
+    assert np.all(inds==test_inds), "nearest neighbor indices are incorrect"
+
+
+def test_nearest_neighbors_nonperiodic():
+    
+    sample1 = np.random.random((100,3))
+    sample2 = np.random.random((500,3))
+    
+    dists, inds = nearest_neighbors(sample1, 64, sample2=sample2, period=None)
+    test_dists, test_inds = _brute_force_knn(sample1, sample2, 64, period=None)
+    
+    assert np.allclose(dists, test_dists), "nearest neighbor distances are incorrect"
+
+
+def test_nearest_neighbors_auto():
+    
+    sample1 = np.random.random((200,3))
+    period = np.array([1.0,1.0,1.0])
+    
+    dists, inds = nearest_neighbors(sample1, 3, period=period)
+    
+    #points are not their own neighbors
+    assert np.all(dists>0), "points were counted as their own neighbors"
+    assert np.all(inds!=np.arange(200)[:,None]), "points were counted as their own neighbors"
+    
+    test_dists, test_inds = _brute_force_knn(sample1, sample1, 4, period=period)
+    assert np.allclose(dists, test_dists[:,1:]), "nearest neighbor distances are incorrect"
+
+
+def test_nearest_neighbors_too_few_points():
+    
+    sample1 = np.random.random((10,3))
+    sample2 = np.random.random((5,3))
+    
+    dists, inds = nearest_neighbors(sample1, 8, sample2=sample2, period=1.0)
+    
+    assert np.all(np.isinf(dists[:,5:])), "missing neighbors should have infinite distance"
+    assert np.all(inds[:,5:]==-1), "missing neighbors should have index -1"
+    assert np.all(np.isfinite(dists[:,0:5])), "nearest neighbor distances are incorrect"
+
+
+def test_nearest_neighbors_small_cells():
+    
+    #without a limit on the number of cells, this cell size would give a grid of
+    #10^12 cells
+    sample1 = np.random.random((100,3))
+    sample2 = np.random.random((500,3))
+    period = np.array([1.0,1.0,1.0])
+    
+    dists, inds = nearest_neighbors(sample1, 4, sample2=sample2, period=period,\
+                                    approx_cell_size=1e-4)
+    test_dists, test_inds = _brute_force_knn(sample1, sample2, 4, period=period)
+    
+    assert np.allclose(dists, test_dists), "nearest neighbor distances are incorrect"
+    assert np.all(inds==test_inds), "nearest neighbor indices are incorrect"
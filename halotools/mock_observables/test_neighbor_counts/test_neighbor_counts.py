@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+from __future__ import division, print_function
+import numpy as np
+from ..neighbor_counts import spherical_neighbor_counts, cylindrical_neighbor_counts
+
+__all__=['test_spherical_neighbor_counts', 'test_spherical_neighbor_counts_weights',\
+         'test_cylindrical_neighbor_counts']
+
+#set random seed to get consistent behavior
+np.random.seed(1)
+
+
+def _brute_force_counts(sample1, sample2, rp, pi=None, period=None, weights2=None):
+    """
+    count the neighbors of each point by calculating all the pairwise separations.
+    """
+    
+    d = np.fabs(sample1[:,np.newaxis,:] - sample2[np.newaxis,:,:])
+    if period is not None:
+        d = np.minimum(d, period - d)
+    if pi is None:
+        mask = np.sqrt(np.sum(d*d, axis=2)) <= rp[:,np.newaxis]
+    else:
+        mask = (np.sqrt(np.sum(d[:,:,0:2]**2, axis=2)) <= rp[:,np.newaxis]) &\
+               (d[:,:,2] <= pi[:,np.newaxis])
+    if weights2 is None:
+        weights2 = np.ones(len(sample2))
+    
+    return np.sum(mask*weights2[np.newaxis,:], axis=1)
+
+
+def test_spherical_neighbor_counts():
+    
+    sample1 = np.random.random((100,3))
+    sample2 = np.random.random((1000,3))
+    period = np.array([1.0,1.0,1.0])
+    radii = np.random.random(100)**3*0.5
+    
+    counts = spherical_neighbor_counts(sample1, radii, sample2=sample2, period=period)
+    test_counts = _brute_force_counts(sample1, sample2, radii, period=period)
+    assert np.all(counts==test_counts), "periodic neighbor counts are incorrect"
+    
+    counts = spherical_neighbor_counts(sample1, radii, sample2=sample2, period=None)
+    test_counts = _brute_force_counts(sample1, sample2, radii, period=None)
+    assert np.all(counts==test_counts), "non-periodic neighbor counts are incorrect"
+    
+    #points are not their own neighbors when counting within one sample
+    counts = spherical_neighbor_counts(sample1, radii, period=period)
+    test_counts = _brute_force_counts(sample1, sample1, radii, period=period) - 1
+    assert np.all(counts==test_counts), "auto neighbor counts are incorrect"
+
+
+def test_spherical_neighbor_counts_weights():
+    
+    sample1 = np.random.random((100,3))
+    sample2 = np.random.random((1000,3))
+    weights2 = np.random.random(1000)
+    period = np.array([1.0,1.0,1.0])
+    
+    counts = spherical_neighbor_counts(sample1, 0.1, sample2=sample2,\
+                                       weights2=weights2, period=period)
+    test_counts = _brute_force_counts(sample1, sample2, np.zeros(100)+0.1,\
+                                      period=period, weights2=weights2)
+    assert np.allclose(counts, test_counts), "weighted neighbor counts are incorrect"
+
+
+def test_cylindrical_neighbor_counts():
+    
+    sample1 = np.random.random((100,3))
+    sample2 = np.random.random((1000,3))
+    period = np.array([1.0,1.0,1.0])
+    rp = np.random.random(100)*0.2
+    pi = np.random.random(100)*0.5
+    
+    counts = cylindrical_neighbor_counts(sample1, rp, pi, sample2=sample2, period=period)
+    test_counts = _brute_force_counts(sample1, sample2, rp, pi=pi, period=period)
+    assert np.all(counts==test_counts), "periodic cylinder counts are incorrect"
+    
+    counts = cylindrical_neighbor_counts(sample1, rp, pi, sample2=sample2, period=None)
+    test_counts = _brute_force_counts(sample1, sample2, rp, pi=pi, period=None)
+    assert np.all(counts==test_counts), "non-periodic cylinder counts are incorrect"
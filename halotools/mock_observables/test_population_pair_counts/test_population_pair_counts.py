@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+from __future__ import division, print_function
+import numpy as np
+from ..population_pair_counts import PopulationPairCounts
+from ..clustering import tpcf
+from ..pair_counters.rect_cuboid_pairs import npairs
+
+__all__=['test_population_pair_counts_update','test_population_pair_counts_randoms']
+
+np.random.seed(1)
+
+
+def test_population_pair_counts_update():
+    centrals = np.random.random((200,3))
+    satellites = np.random.random((100,3))
+    period = np.array([1.0,1.0,1.0])
+    rbins = np.linspace(0.01,0.3,5)
+    
+    pair_counts = PopulationPairCounts(rbins, period=period)
+    pair_counts.set_population('centrals', centrals)
+    pair_counts.set_population('satellites', satellites)
+    
+    result = pair_counts.tpcf()
+    result_compare = tpcf(pair_counts.positions, rbins, period=period)
+    assert np.all(result==result_compare), "correlation function is incorrect"
+    
+    pair_counts.update_population('satellites', remove=np.arange(0,100,3),\
+                                  insert=np.random.random((20,3)))
+    
+    assert len(pair_counts.population_positions('satellites'))==86,\
+        "number of satellites after the update is incorrect"
+    
+    result = pair_counts.tpcf()
+    result_compare = tpcf(pair_counts.positions, rbins, period=period)
+    assert np.all(result==result_compare), "updated correlation function is incorrect"
+    
+    satellites = pair_counts.population_positions('satellites')
+    result = pair_counts.pair_counts('satellites', 'centrals')
+    result_compare = npairs(centrals, satellites, rbins, period=period)
+    assert np.all(result==result_compare), "cen-sat pair counts are incorrect"
+
+
+def test_population_pair_counts_randoms():
+    centrals = np.random.random((200,3))
+    satellites = np.random.random((100,3))
+    randoms = np.random.random((300,3))
+    rbins = np.linspace(0.01,0.3,5)
+    
+    pair_counts = PopulationPairCounts(rbins, randoms=randoms)
+    pair_counts.set_population('centrals', centrals)
+    pair_counts.set_population('satellites', satellites)
+    pair_counts.update_population('centrals', remove=np.random.random(200)<0.1)
+    
+    result = pair_counts.tpcf(estimator='Landy-Szalay')
+    result_compare = tpcf(pair_counts.positions, rbins, randoms=randoms,\
+                          estimator='Landy-Szalay')
+    assert np.all(result==result_compare), "updated correlation function is incorrect"
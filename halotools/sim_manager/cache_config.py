@@ -3,15 +3,21 @@
 various files used throughout the halotools package. 
 """
 
-__all__ = ['get_catalogs_dir']
+__all__ = ['get_catalogs_dir', 'get_lookup_tables_dir']
 
 supported_sim_list = ['bolshoi', 'bolplanck', 'consuelo', 'multidark']
 
 import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
 from astropy.config.paths import get_cache_dir as get_astropy_cache_dir
 from astropy.config.paths import _find_home
 
 import warnings
+from warnings import warn
 
 from . import sim_defaults
 from ..custom_exceptions import UnsupportedSimError, CatalogTypeError
@@ -160,6 +166,131 @@ def get_catalogs_dir(**kwargs):
             return halo_finder_dirname
 
 
+def get_lookup_tables_dir(**kwargs):
+    """ Find the path to the subdirectory of the halotools cache directory 
+    where the lookup tables of the empirical models are stored, 
+    e.g., the tables used to generate Monte Carlo realizations of galaxy profiles. 
+
+    If the directory doesn't exist, make it, then return the path. 
+
+    Parameters
+    ----------
+    external_cache_loc : string, optional 
+        Absolute path to an alternative Halotools cache. 
+
+    Returns
+    -------
+    dirname : str
+        Path to the halotools directory storing lookup tables.
+    """
+    cache_kwargs = {}
+    if 'external_cache_loc' in kwargs:
+        cache_kwargs['external_cache_loc'] = kwargs['external_cache_loc']
+    halotools_cache_dir = get_catalogs_dir(**cache_kwargs)
+
+    lookup_tables_dirname = os.path.join(halotools_cache_dir, 'lookup_tables')
+    defensively_create_subdir(lookup_tables_dirname)
+    return lookup_tables_dirname
+
+
+def get_cached_lookup_tables_dir(model_name, cache_key, **kwargs):
+    """ Find the path to the subdirectory of `get_lookup_tables_dir` 
+    storing the lookup tables of ``model_name`` with the given ``cache_key``. 
+    The directory is not created. 
+
+    Parameters
+    ----------
+    model_name : string 
+        Name of the model the tables belong to, e.g., the name of its class. 
+
+    cache_key : dict 
+        JSON-serializable dictionary of everything the tables depend on. 
+
+    external_cache_loc : string, optional 
+        Absolute path to an alternative Halotools cache. 
+
+    Returns
+    -------
+    dirname : str
+        Path to the directory storing the tables.
+    """
+    digest = hashlib.sha1(json.dumps(cache_key, sort_keys=True).encode('utf-8')).hexdigest()
+    return os.path.join(get_lookup_tables_dir(**kwargs), model_name, digest)
+
+
+def load_cached_lookup_tables(dirname, cache_key):
+    """ Memory-map the lookup tables stored by `store_cached_lookup_tables` 
+    in ``dirname`` under ``cache_key``. 
+
+    Parameters
+    ----------
+    dirname : string 
+        Directory storing the tables, e.g., as returned by `get_cached_lookup_tables_dir`. 
+
+    cache_key : dict 
+        JSON-serializable dictionary of everything the tables depend on. 
+
+    Returns
+    -------
+    tables : dict 
+        Dictionary of read-only memory-mapped arrays, 
+        or None if there are no tables with ``cache_key`` in ``dirname``. 
+    """
+    # Round trip through json so that the key compares equal to the stored metadata
+    cache_key = json.loads(json.dumps(cache_key, sort_keys=True))
+    try:
+        with open(os.path.join(dirname, 'metadata.json'), 'r') as f:
+            metadata = json.load(f)
+        if metadata['cache_key'] != cache_key:
+            return None
+        tables = {}
+        for name in metadata['table_names']:
+            tables[name] = np.load(os.path.join(dirname, name + '.npy'), mmap_mode='r')
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+    return tables
+
+
+def store_cached_lookup_tables(dirname, cache_key, tables):
+    """ Store the dictionary of arrays ``tables`` in ``dirname`` under ``cache_key``. 
+
+    The tables are written to a temporary directory which is then renamed, 
+    so that processes computing the same tables at the same time 
+    never read a partially written table. If the tables cannot be stored, 
+    a warning is issued and the cache is left unchanged. 
+
+    Parameters
+    ----------
+    dirname : string 
+        Directory storing the tables, e.g., as returned by `get_cached_lookup_tables_dir`. 
+
+    cache_key : dict 
+        JSON-serializable dictionary of everything the tables depend on. 
+
+    tables : dict 
+        Dictionary of numpy arrays. 
+    """
+    try:
+        parent_dirname = os.path.dirname(dirname)
+        if not os.path.isdir(parent_dirname):
+            os.makedirs(parent_dirname)
+        tmp_dirname = tempfile.mkdtemp(dir=parent_dirname)
+    except (IOError, OSError) as e:
+        warn("Unable to store the lookup tables in the Halotools cache:\n%s" % e)
+        return
+
+    try:
+        for name, table in tables.items():
+            np.save(os.path.join(tmp_dirname, name + '.npy'), table)
+        with open(os.path.join(tmp_dirname, 'metadata.json'), 'w') as f:
+            json.dump({'cache_key': cache_key, 'table_names': sorted(tables.keys())}, 
+                f, sort_keys=True)
+        os.rename(tmp_dirname, dirname)
+    except (IOError, OSError):
+        # Another process has already stored the same tables
+        shutil.rmtree(tmp_dirname, ignore_errors=True)
+
+
 def processed_halo_tables_web_location(**kwargs):
     """ Method returns the web location where pre-processed 
     halo catalog binaries generated by, and for use with, 
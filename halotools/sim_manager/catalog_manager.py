@@ -27,6 +27,7 @@ import datetime
 from ..utils.array_utils import find_idx_nearest_val
 from ..utils.array_utils import custom_len, convert_to_ndarray
 from ..utils.io_utils import download_file_from_url
+from ..utils.halocat_utils import morton_order
 
 from astropy.tests.helper import remote_data
 from astropy.table import Table
@@ -1084,6 +1085,20 @@ class CatalogManager(object):
             Each dict key of `notes` will be a metadata attribute of the hdf5 file, accessible 
             via hdf5_fileobj.attrs[key]. The value attached to each key can be any string. 
 
+        morton_order : boolean, optional 
+            If True, the rows of the halo table are stored in Morton order, 
+            see `~halotools.utils.halocat_utils.morton_order`, so that halos close in space 
+            are close in memory and the halos of each cubical subvolume of the box 
+            occupy consecutive rows. The offsets of the rows of each Morton cell 
+            are stored in the ``morton_cell_offsets`` dataset of the hdf5 file, 
+            used by `~halotools.sim_manager.HaloCatalog.read_halo_subvolume`. 
+            Default is False. 
+
+        morton_num_levels : int, optional 
+            Number of times the box is divided in half along each dimension 
+            to define the Morton cells. 
+            Default is set by ``default_morton_num_levels`` in `~halotools.sim_manager.sim_defaults`. 
+
         Returns 
         -------
         output_fname : string 
@@ -1111,6 +1126,15 @@ class CatalogManager(object):
             overwrite = kwargs['overwrite']
         else:
             overwrite = False
+
+        if kwargs.get('morton_order', False) is True:
+            morton_num_levels = kwargs.get('morton_num_levels', 
+                sim_defaults.default_morton_num_levels)
+            idx_sorted, cell_offsets = morton_order(
+                halo_table['halo_x'], halo_table['halo_y'], halo_table['halo_z'], 
+                reader.halocat.Lbox, morton_num_levels)
+            halo_table = halo_table[idx_sorted]
+
         halo_table.write(output_fname, path='data', overwrite = overwrite, append = overwrite)
 
         ### Add metadata to the hdf5 file
@@ -1141,6 +1165,15 @@ class CatalogManager(object):
         for note_key, note in notes.iteritems():
             f.attrs[note_key] = note
 
+        # An overwritten file may store the Morton index of a previous halo table
+        if 'morton_cell_offsets' in f:
+            del f['morton_cell_offsets']
+        if 'morton_num_levels' in f.attrs:
+            del f.attrs['morton_num_levels']
+        if kwargs.get('morton_order', False) is True:
+            f.attrs['morton_num_levels'] = morton_num_levels
+            f.create_dataset('morton_cell_offsets', data = cell_offsets)
+
         f.close()
 
         return output_fname
@@ -18,6 +18,10 @@ default_redshift = 0.0
 
 default_numptcl = 2.0e5
 
+# Number of times the box is divided in half along each dimension 
+# to order halo catalogs along the Morton curve, see utils.halocat_utils.morton_order
+default_morton_num_levels = 5
+
 Num_ptcl_requirement = 300
 mass_like_variable_to_apply_cut = 'halo_mpeak'
 
@@ -23,6 +23,7 @@ from . import sim_defaults, catalog_manager
 
 from ..utils.array_utils import find_idx_nearest_val
 from ..utils.array_utils import custom_len
+from ..utils.halocat_utils import morton_subvolume_rows
 
 from ..custom_exceptions import *
 
@@ -310,6 +311,56 @@ class HaloCatalog(object):
             mask = self._halo_table['halo_hostid'] == self._halo_table['halo_id']
             return self._halo_table[mask]        
 
+    def read_halo_subvolume(self, ix, iy, iz, num_levels=None):
+        """ Read from disk only the halos in one cubical subvolume of the box. 
+
+        Only available for halo catalogs stored in Morton order, 
+        see `~halotools.sim_manager.CatalogManager.store_newly_processed_halo_table`. 
+        The halos of each subvolume are then stored in consecutive rows of the hdf5 file, 
+        which are read without loading the rest of the catalog. 
+
+        Parameters 
+        ----------
+        ix, iy, iz : int 
+            Integer coordinates of the subvolume, each between 0 and ``2**num_levels - 1``. 
+
+        num_levels : int, optional 
+            The box is divided into ``2**num_levels`` subvolumes along each dimension. 
+            Default is the ``morton_num_levels`` the catalog was stored with, 
+            which is the largest permitted value. 
+
+        Returns 
+        -------
+        halos : `~astropy.table.Table`
+            Halos whose positions lie in the subvolume. 
+
+        Examples 
+        --------
+        >>> default_halocat = HaloCatalog() # doctest: +SKIP
+        >>> halos = default_halocat.read_halo_subvolume(0, 0, 0, num_levels = 2) # doctest: +SKIP
+        """
+        try:
+            import h5py
+        except ImportError:
+            raise HalotoolsError("Must have h5py package installed to use this feature")
+
+        f = h5py.File(self.processed_halo_table_fname, 'r')
+        try:
+            if 'morton_cell_offsets' not in f:
+                raise HalotoolsIOError("\nThe halo catalog stored in %s is not in Morton order.\n"
+                    "Store the catalog with the morton_order keyword argument of "
+                    "CatalogManager.store_newly_processed_halo_table to read its subvolumes." 
+                    % self.processed_halo_table_fname)
+            if num_levels is None:
+                num_levels = int(f.attrs['morton_num_levels'])
+            rows = morton_subvolume_rows(f['morton_cell_offsets'][...], 
+                ix, iy, iz, num_levels)
+            halos = Table(f['data'][rows])
+        finally:
+            f.close()
+
+        return halos
+
     @property 
     def ptcl_table(self):
         """
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 import numpy as np
 import os
+import shutil
+import tempfile
 import unittest
 from astropy.tests.helper import pytest
 
@@ -11,7 +13,8 @@ from astropy.config.paths import _find_home
 
 __all__ = (
 	['test_cache_config', 'test_catalogs_config', 
-	'test_supported_simnames', 'test_supported_halo_finders']
+	'test_supported_simnames', 'test_supported_halo_finders', 
+	'test_cached_lookup_tables']
 	)
 
 def test_cache_config():
@@ -69,10 +72,30 @@ def test_supported_halo_finders():
 	with pytest.raises(UnsupportedSimError) as exc:
 		x = cache_config.get_supported_halo_finders('JoseCanseco')
 
-
-
-
-
-
-
-
+def test_cached_lookup_tables():
+	""" Verify that lookup tables stored in the cache are memory-mapped 
+	when loaded with the same cache key, and ignored otherwise. 
+	"""
+	tmp_dirname = tempfile.mkdtemp()
+	try:
+		cache_key = {'model': 'dummy', 'bins': (0., 1.)}
+		dirname = os.path.join(tmp_dirname, 'DummyModel', 'key')
+		assert cache_config.load_cached_lookup_tables(dirname, cache_key) is None
+
+		tables = {'a': np.arange(5.), 'b': np.ones((2, 3))}
+		cache_config.store_cached_lookup_tables(dirname, cache_key, tables)
+		cached_tables = cache_config.load_cached_lookup_tables(dirname, cache_key)
+		assert set(cached_tables.keys()) == set(['a', 'b'])
+		for name in tables:
+			assert isinstance(cached_tables[name], np.memmap)
+			assert np.all(cached_tables[name] == tables[name])
+
+		other_key = {'model': 'dummy', 'bins': (0., 2.)}
+		assert cache_config.load_cached_lookup_tables(dirname, other_key) is None
+
+		# Tables already stored under dirname are not overwritten
+		cache_config.store_cached_lookup_tables(dirname, other_key, tables)
+		assert cache_config.load_cached_lookup_tables(dirname, cache_key) is not None
+		assert os.listdir(os.path.dirname(dirname)) == ['key']
+	finally:
+		shutil.rmtree(tmp_dirname)
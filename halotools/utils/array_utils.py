@@ -141,7 +141,7 @@ def find_idx_nearest_val(array, value):
             return idx_nearest
 
 
-def randomly_downsample_data(array, num_downsample):
+def randomly_downsample_data(array, num_downsample, seed=None):
     """ Method returns a length-num_downsample random downsampling of the input array.
 
     Parameters 
@@ -151,10 +151,15 @@ def randomly_downsample_data(array, num_downsample):
     num_downsample : int 
         Size of the desired downsampled version of the data
 
+    seed : int, optional 
+        Random number seed used to select the downsampled elements. 
+        Default is None, in which case the global numpy random state is used. 
+
     Returns 
     -------
     downsampled_array : array or Astropy Table
-        Random downsampling of the input array
+        Random downsampling of the input array, 
+        with the selected elements in the order they appear in the input array. 
 
     Examples 
     --------
@@ -162,16 +167,46 @@ def randomly_downsample_data(array, num_downsample):
     >>> desired_sample_size = 1e3
     >>> downsampled_x = randomly_downsample_data(x, desired_sample_size)
 
+    Notes 
+    -----
+    The elements are selected by drawing random indices, 
+    so that the cost scales with ``num_downsample`` rather than 
+    requiring a sort of the full input array. 
+
     """
 
     input_array_length = custom_len(array) 
+    num_downsample = int(num_downsample)
     if num_downsample > input_array_length:
         raise SyntaxError("Length of the desired downsampling = %i, "
             "which exceeds input array length = %i " % (num_downsample, input_array_length))
     else:
-        randomizer = np.random.random(input_array_length)
-        idx_sorted = np.argsort(randomizer)
-        return array[idx_sorted[0:num_downsample]]
+        idx = _random_indices(input_array_length, num_downsample, seed=seed)
+        return array[idx]
+
+def _random_indices(num_elements, num_selected, seed=None):
+    """ Sorted array of ``num_selected`` distinct indices drawn uniformly at random 
+    from ``range(num_elements)``. 
+
+    Indices are drawn with replacement and the duplicates discarded until enough 
+    distinct indices have been drawn, which requires only a few passes 
+    when at most half of the elements are selected. 
+    Otherwise the indices are the first ``num_selected`` elements of a random permutation. 
+    """
+    if seed is None:
+        rng = np.random
+    else:
+        rng = np.random.RandomState(seed)
+
+    if 2*num_selected > num_elements:
+        idx = rng.permutation(num_elements)[0:num_selected]
+        return np.sort(idx)
+
+    idx = np.unique(rng.randint(0, num_elements, num_selected))
+    while len(idx) < num_selected:
+        idx = np.unique(np.append(idx, 
+            rng.randint(0, num_elements, num_selected - len(idx))))
+    return idx
 
 def array_is_monotonic(array, strict = False):
     """
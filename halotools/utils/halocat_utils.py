@@ -68,7 +68,125 @@ def host_status(halos):
 	return output.astype(str)
 
 
+def morton_cell_ids(x, y, z, Lbox, num_levels):
+	""" Index of the cell containing each point along the Morton (Z-order) curve 
+	through the ``2**num_levels`` x ``2**num_levels`` x ``2**num_levels`` 
+	cubical cells of the box. 
 
+	Cells that are close to one another in space are close along the curve, 
+	and the ``8**m`` cells of each of the cubical subvolumes 
+	of ``2**(num_levels-m)`` cells per dimension have consecutive indices. 
 
+	Parameters 
+	----------
+	x, y, z : arrays 
+		Length-Npts arrays storing the spatial positions of the points. 
+
+	Lbox : float or array 
+		Size of the box, either a single number or one number per dimension. 
+
+	num_levels : int 
+		Number of times the box is divided in half along each dimension. 
+
+	Returns 
+	-------
+	cell_ids : array 
+		Length-Npts integer array storing the index of the cell of each point, 
+		between 0 and ``8**num_levels - 1``. 
+	"""
+	Lbox = np.zeros(3) + Lbox
+	num_divs = 2**int(num_levels)
+	cell_coords = []
+	for pos, L in zip((x, y, z), Lbox):
+		i = np.floor(np.asarray(pos)*(num_divs/float(L))).astype(np.int64)
+		# take care of points right on the boundary
+		cell_coords.append(np.clip(i, 0, num_divs-1))
+	return _interleave_bits(cell_coords[0], cell_coords[1], cell_coords[2], num_levels)
+
+def _interleave_bits(ix, iy, iz, num_levels):
+	""" Morton index of the cells with integer coordinates ``ix``, ``iy``, ``iz``. 
+	"""
+	ix = np.asarray(ix, dtype=np.int64)
+	iy = np.asarray(iy, dtype=np.int64)
+	iz = np.asarray(iz, dtype=np.int64)
+	cell_ids = np.zeros(np.broadcast(ix, iy, iz).shape, dtype=np.int64)
+	for level in range(int(num_levels)):
+		cell_ids |= ((ix >> level) & 1) << (3*level + 2)
+		cell_ids |= ((iy >> level) & 1) << (3*level + 1)
+		cell_ids |= ((iz >> level) & 1) << (3*level)
+	return cell_ids
+
+def morton_order(x, y, z, Lbox, num_levels):
+	""" Order the points along the Morton (Z-order) curve, see `morton_cell_ids`. 
+
+	Storing a halo catalog in this order places halos that are close in space 
+	close in memory, and the halos of each cubical subvolume in consecutive rows. 
+
+	Parameters 
+	----------
+	x, y, z : arrays 
+		Length-Npts arrays storing the spatial positions of the points. 
+
+	Lbox : float or array 
+		Size of the box, either a single number or one number per dimension. 
+
+	num_levels : int 
+		Number of times the box is divided in half along each dimension. 
 
+	Returns 
+	-------
+	idx_sorted : array 
+		Length-Npts array of indices sorting the points along the curve. 
+		Points in the same cell keep their input order. 
+
+	cell_offsets : array 
+		Length ``8**num_levels + 1`` array. The sorted points in the cell 
+		with index ``i`` are the rows ``cell_offsets[i]`` to ``cell_offsets[i+1]``. 
 
+	Examples 
+	--------
+	>>> Npts, Lbox = 1000, 250.
+	>>> x, y, z = np.random.uniform(0, Lbox, (3, Npts))
+	>>> idx_sorted, cell_offsets = morton_order(x, y, z, Lbox, 3)
+	>>> x, y, z = x[idx_sorted], y[idx_sorted], z[idx_sorted]
+	"""
+	cell_ids = morton_cell_ids(x, y, z, Lbox, num_levels)
+	idx_sorted = np.argsort(cell_ids, kind='mergesort')
+	cell_offsets = np.searchsorted(cell_ids[idx_sorted], 
+		np.arange(8**int(num_levels) + 1))
+	return idx_sorted, cell_offsets
+
+def morton_subvolume_rows(cell_offsets, ix, iy, iz, num_levels):
+	""" Rows of the points sorted by `morton_order` that lie in a cubical subvolume. 
+
+	Parameters 
+	----------
+	cell_offsets : array 
+		Array returned by `morton_order`. 
+
+	ix, iy, iz : int 
+		Integer coordinates of the subvolume, each between 0 and ``2**num_levels - 1``. 
+
+	num_levels : int 
+		The box is divided into ``2**num_levels`` subvolumes along each dimension. 
+		Must not exceed the ``num_levels`` used to compute ``cell_offsets``. 
+
+	Returns 
+	-------
+	rows : slice 
+		Consecutive rows of the sorted points lying in the subvolume. 
+	"""
+	num_cells = len(cell_offsets) - 1
+	sorted_levels = int(round(np.log(num_cells)/np.log(8)))
+	num_levels = int(num_levels)
+	if (num_levels < 0) or (num_levels > sorted_levels):
+		raise ValueError("num_levels must be between 0 and %i" % sorted_levels)
+	for i in (ix, iy, iz):
+		if (i < 0) or (i >= 2**num_levels):
+			raise ValueError("Subvolume coordinates must be between 0 and %i" % (2**num_levels - 1))
+
+	# The cells of the subvolume are consecutive along the finer curve
+	cells_per_subvolume = 8**(sorted_levels - num_levels)
+	first_cell = int(_interleave_bits(ix, iy, iz, num_levels))*cells_per_subvolume
+	return slice(int(cell_offsets[first_cell]), 
+		int(cell_offsets[first_cell + cells_per_subvolume]))
@@ -3,7 +3,7 @@ import numpy as np
 
 from .. import array_utils
 
-__all__ = ['test_find_idx_nearest_val']
+__all__ = ['test_find_idx_nearest_val', 'test_randomly_downsample_data']
 
 def test_find_idx_nearest_val():
 
@@ -52,5 +52,24 @@ def test_find_idx_nearest_val():
 	assert np.all(result <= 11)
 
 
+def test_randomly_downsample_data():
 
+	x = np.arange(1000)
 
+	# Check that the downsampling selects distinct elements of x, 
+	# for both small and large downsamplings
+	for num_downsample in (1, 10, 499, 500, 501, 999, 1000):
+		result = array_utils.randomly_downsample_data(x, num_downsample)
+		assert len(result) == num_downsample
+		assert len(np.unique(result)) == num_downsample
+
+	# Check that a fixed seed gives a fixed downsampling
+	result1 = array_utils.randomly_downsample_data(x, 100, seed=43)
+	result2 = array_utils.randomly_downsample_data(x, 100, seed=43)
+	assert np.all(result1 == result2)
+
+	# Check that every element is equally likely to be selected
+	counts = np.zeros(len(x))
+	for seed in range(200):
+		counts[array_utils.randomly_downsample_data(x, 100, seed=seed)] += 1
+	assert abs(counts[0:500].sum() - counts[500:].sum()) < 0.1*counts.sum()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+import numpy as np 
+
+from .. import halocat_utils
+
+__all__ = ['test_morton_order']
+
+def test_morton_order():
+
+	Npts, Lbox, num_levels = 5000, 250., 3
+	x, y, z = np.random.uniform(0, Lbox, (3, Npts))
+	x[0], y[0], z[0] = Lbox, Lbox, Lbox
+
+	idx_sorted, cell_offsets = halocat_utils.morton_order(x, y, z, Lbox, num_levels)
+	assert np.all(np.sort(idx_sorted) == np.arange(Npts))
+	assert len(cell_offsets) == 8**num_levels + 1
+	assert cell_offsets[-1] == Npts
+	x, y, z = x[idx_sorted], y[idx_sorted], z[idx_sorted]
+
+	# Check that the consecutive rows of each subvolume are exactly 
+	# the points lying in the subvolume, for subvolumes of every size
+	for levels in range(num_levels + 1):
+		divs = 2**levels
+		dL = Lbox/divs
+		num_selected = 0
+		for ix, iy, iz in np.ndindex(divs, divs, divs):
+			rows = halocat_utils.morton_subvolume_rows(cell_offsets, ix, iy, iz, levels)
+			mask = ((np.minimum(np.floor(x/dL), divs-1) == ix) & 
+				(np.minimum(np.floor(y/dL), divs-1) == iy) & 
+				(np.minimum(np.floor(z/dL), divs-1) == iz))
+			assert np.all(np.where(mask)[0] == np.arange(Npts)[rows])
+			num_selected += np.count_nonzero(mask)
+		assert num_selected == Npts
+